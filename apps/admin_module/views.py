@@ -1,4 +1,3 @@
-import os
 import logging
 import tempfile
 import zipfile
@@ -10,7 +9,7 @@ from django.views.generic import ListView, DetailView, CreateView, UpdateView, D
 from django.contrib.messages.views import SuccessMessageMixin
 from django.contrib import messages
 from django.core.exceptions import PermissionDenied
-from django.http import HttpResponse, Http404, JsonResponse
+from django.http import Http404, JsonResponse
 from django.urls import reverse_lazy
 from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
@@ -23,6 +22,8 @@ from django.core.files.storage import default_storage
 from django.core.files.base import ContentFile
 from django.db import models
 
+from core.dashboard import DashboardMetrics
+from core.downloads import serve_file
 from core.mixins.organization import OrganizationScopedQuerysetMixin
 from core.decorators import skip_org_check
 
@@ -65,51 +66,59 @@ class AdminDashboardView(AdminRequiredMixin, TemplateView):
             'org_logo': getattr(organization, 'logo', None),
         })
         
-        # User statistics
-        from users.models import CustomUser
+        # User, export and security statistics
+        from users.models import CustomUser, SecurityAuditLog, AccountLockout
+        today = timezone.now().date()
         users = CustomUser.objects.filter(organization=organization)
+        exports = DataExportLog.objects.filter(organization=organization)
+        
+        metrics = DashboardMetrics()
+        metrics.source(users) \
+            .count('user_count') \
+            .count('active_user_count', Q(is_active=True)) \
+            .count('inactive_user_count', Q(is_active=False)) \
+            .count('admin_count', Q(role='admin')) \
+            .histogram('role_distribution', 'role')
+        metrics.source(exports) \
+            .count('total_exports') \
+            .count('completed', Q(status='completed')) \
+            .count('pending', Q(status='pending')) \
+            .count('failed', Q(status='failed')) \
+            .aggregate('total_size_mb', Sum('file_size_mb', filter=Q(status='completed')))
+        metrics.source(SecurityAuditLog.objects.filter(organization=organization)) \
+            .count('security_events_today', Q(timestamp__date=today)) \
+            .count('failed_logins_today', Q(event_type='login_failed', timestamp__date=today))
+        metrics.source(AccountLockout.objects.filter(user__organization=organization)) \
+            .count('active_lockouts', Q(is_active=True))
+        results = metrics.evaluate()
+        
         context.update({
-            'user_count': users.count(),
-            'active_user_count': users.filter(is_active=True).count(),
-            'inactive_user_count': users.filter(is_active=False).count(),
-            'admin_count': users.filter(role='admin').count(),
+            'user_count': results['user_count'],
+            'active_user_count': results['active_user_count'],
+            'inactive_user_count': results['inactive_user_count'],
+            'admin_count': results['admin_count'],
             'recent_users': users.order_by('-date_joined')[:5],
+            # Role distribution for chart
+            'role_distribution': results['role_distribution'],
         })
         
-        # Role distribution for chart
-        role_distribution = users.values('role').annotate(count=Count('id'))
-        context['role_distribution'] = {item['role']: item['count'] for item in role_distribution}
-        
         # Data export statistics
-        exports = DataExportLog.objects.filter(organization=organization)
         context.update({
-            'total_exports': exports.count(),
+            'total_exports': results['total_exports'],
             'recent_exports': exports.order_by('-created_at')[:5],
             'export_stats': {
-                'completed': exports.filter(status='completed').count(),
-                'pending': exports.filter(status='pending').count(),
-                'failed': exports.filter(status='failed').count(),
-                'total_size_mb': exports.filter(status='completed').aggregate(
-                    total_size=Sum('file_size_mb')
-                )['total_size'] or 0,
+                'completed': results['completed'],
+                'pending': results['pending'],
+                'failed': results['failed'],
+                'total_size_mb': results['total_size_mb'] or 0,
             }
         })
         
         # Security statistics
-        from users.models import SecurityAuditLog, AccountLockout
-        security_logs = SecurityAuditLog.objects.filter(organization=organization)
         context.update({
-            'security_events_today': security_logs.filter(
-                timestamp__date=timezone.now().date()
-            ).count(),
-            'failed_logins_today': security_logs.filter(
-                event_type='login_failed',
-                timestamp__date=timezone.now().date()
-            ).count(),
-            'active_lockouts': AccountLockout.objects.filter(
-                user__organization=organization,
-                is_active=True
-            ).count(),
+            'security_events_today': results['security_events_today'],
+            'failed_logins_today': results['failed_logins_today'],
+            'active_lockouts': results['active_lockouts'],
         })
         
         return context
@@ -265,31 +274,14 @@ def download_export_file(request, export_id):
     if not export.file_path or export.is_deleted or export.is_expired:
         raise Http404(_("File not found or has expired."))
     
-    try:
-        # Get file from storage
-        if default_storage.exists(export.file_path):
-            file_obj = default_storage.open(export.file_path, 'rb')
-            
-            # Create response
-            response = HttpResponse(file_obj.read(), content_type='application/octet-stream')
-            
-            # Set filename
-            filename = os.path.basename(export.file_path)
-            response['Content-Disposition'] = f'attachment; filename="{filename}"'
-            
-            # Log download
-            logger.info(
-                f"Export file downloaded: {export.id} by {request.user.email} "
-                f"from IP {request.META.get('REMOTE_ADDR')}"
-            )
-            
-            return response
-        else:
-            raise Http404(_("File not found."))
-            
-    except Exception as e:
-        logger.error(f"Error downloading export file {export.id}: {e}")
-        raise Http404(_("Error accessing file."))
+    # Streamed (or handed to the front proxy), never read into memory
+    response = serve_file(request, export.file_path)
+
+    logger.info(
+        f"Export file downloaded: {export.id} by {request.user.email} "
+        f"from IP {request.META.get('REMOTE_ADDR')}"
+    )
+    return response
 
 @login_required
 def cancel_export(request, export_id):
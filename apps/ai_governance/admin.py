@@ -106,14 +106,14 @@ class TestRunAdmin(admin.ModelAdmin):
     list_filter = ('organization', 'status', 'contains_pii', 'data_classification')
     search_fields = ('id', 'model_asset__name', 'dataset_asset__name')
     ordering = ('-created_at',)
-    readonly_fields = ('created_at', 'updated_at', 'created_by', 'updated_by', 'started_at', 'completed_at', 'worker_info')
+    readonly_fields = ('created_at', 'updated_at', 'created_by', 'updated_by', 'started_at', 'completed_at', 'worker_info', 'sampling')
     
     fieldsets = (
         ('Test Configuration', {
             'fields': ('model_asset', 'dataset_asset', 'test_plan', 'parameters')
         }),
         ('Execution Status', {
-            'fields': ('status', 'started_at', 'completed_at', 'error_message', 'worker_info')
+            'fields': ('status', 'started_at', 'completed_at', 'error_message', 'worker_info', 'sampling')
         }),
         ('Security & Privacy', {
             'fields': ('contains_pii', 'data_classification', 'encryption_key_id', 'retention_date'),
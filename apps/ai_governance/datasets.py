@@ -0,0 +1,394 @@
+"""
+Dataset access layer for AI governance testing.
+
+Registered datasets are converted to Parquet once per dataset version and
+then read through memory-mapped Arrow tables, so test runs can project
+columns, push predicates down to the row-group level and draw deterministic
+stratified samples without materialising the full table in pandas.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, List, Optional, Sequence
+
+import numpy as np
+from django.conf import settings
+from django.core.files.storage import default_storage
+
+logger = logging.getLogger(__name__)
+
+ROW_INDEX_COLUMN = '__row_index__'
+
+
+def _require_pyarrow():
+    """Import pyarrow lazily so the module loads without the optional dependency."""
+    try:
+        import pyarrow  # noqa: F401
+        import pyarrow.csv  # noqa: F401
+        import pyarrow.dataset  # noqa: F401
+        import pyarrow.parquet  # noqa: F401
+    except ImportError as exc:  # pragma: no cover - depends on environment
+        raise ImportError(
+            'pyarrow is required for dataset access; install it with "pip install pyarrow"'
+        ) from exc
+    return pyarrow
+
+
+def allocate_strata(stratum_sizes: Sequence[int], sample_size: int, min_per_stratum: int = 1, rng=None) -> np.ndarray:
+    """
+    Split ``sample_size`` rows between strata of the given sizes.
+
+    Every stratum first gets up to ``min_per_stratum`` rows, lowered so that the
+    floors of all strata fit in the sample; the rest is shared in proportion to
+    the rows each stratum has left (largest remainder). When there are more
+    strata than rows to give out, ``rng`` (or, without one, stratum size)
+    decides which strata get a single row. The total is exactly
+    ``min(sample_size, sum(stratum_sizes))``.
+    """
+    sizes = np.asarray(stratum_sizes, dtype=np.int64)
+    allocation = np.zeros(len(sizes), dtype=np.int64)
+    sample_size = int(min(max(sample_size, 0), sizes.sum()))
+    non_empty = np.flatnonzero(sizes)
+    if not sample_size:
+        return allocation
+
+    if len(non_empty) > sample_size:
+        if rng is not None:
+            picked = rng.choice(non_empty, size=sample_size, replace=False, p=sizes[non_empty] / sizes.sum())
+        else:
+            picked = non_empty[np.argsort(-sizes[non_empty], kind='stable')[:sample_size]]
+        allocation[picked] = 1
+        return allocation
+
+    allocation = np.minimum(sizes, min(min_per_stratum, sample_size // len(non_empty)))
+    remaining = sample_size - allocation.sum()
+    spare = sizes - allocation
+    if remaining:
+        # Integer quotas: spare * remaining / total spare, exactly
+        extra, fraction = np.divmod(spare * remaining, spare.sum())
+        leftover = remaining - extra.sum()
+        # Largest fractional parts first; they always have a spare row
+        extra[np.argsort(-fraction, kind='stable')[:leftover]] += 1
+        allocation += extra
+    return allocation
+
+
+class DatasetStore:
+    """
+    Versioned Parquet cache for registered DatasetAsset files.
+
+    CSV sources are streamed into Parquet in bounded record batches, so a
+    multi-GB CSV is converted with roughly one block of memory. Parquet sources
+    stored on the local filesystem are read in place.
+    """
+
+    def __init__(self):
+        self.cache_dir = Path(getattr(
+            settings,
+            'AI_GOVERNANCE_DATASET_CACHE_DIR',
+            os.path.join(tempfile.gettempdir(), 'ai_governance_datasets'),
+        ))
+        self.csv_block_size = getattr(settings, 'AI_GOVERNANCE_CSV_BLOCK_SIZE', 16 * 1024 * 1024)  # 16 MB
+        self.row_group_size = getattr(settings, 'AI_GOVERNANCE_PARQUET_ROW_GROUP_SIZE', 128 * 1024)
+        self.hits = 0
+        self.misses = 0
+
+    # ------------------------------------------------------------------
+    # Versioning and materialisation
+    # ------------------------------------------------------------------
+
+    def dataset_version(self, dataset_asset) -> str:
+        """
+        Return a fingerprint of the dataset content.
+
+        The fingerprint combines the registered path and format with the
+        source file size and modification time, so editing the file or
+        re-pointing the asset produces a new cache entry. Paths that are not
+        on the local filesystem are looked up in the default storage backend.
+        """
+        if os.path.exists(dataset_asset.path):
+            stat = os.stat(dataset_asset.path)
+            size, modified = stat.st_size, stat.st_mtime_ns
+        else:
+            size = default_storage.size(dataset_asset.path)
+            modified = default_storage.get_modified_time(dataset_asset.path).isoformat()
+        fingerprint = '|'.join([
+            str(dataset_asset.pk),
+            dataset_asset.path,
+            (dataset_asset.format or '').lower(),
+            str(size),
+            str(modified),
+        ])
+        return hashlib.sha256(fingerprint.encode('utf-8')).hexdigest()[:16]
+
+    def _cache_path(self, dataset_asset, version: str) -> Path:
+        org_part = str(getattr(dataset_asset, 'organization_id', None) or 'shared')
+        return self.cache_dir / org_part / f'{dataset_asset.pk}-{version}.parquet'
+
+    def materialize(self, dataset_asset) -> Path:
+        """
+        Return a local Parquet path for the dataset, converting it on first use.
+        """
+        fmt = (dataset_asset.format or '').lower()
+        if fmt == 'parquet':
+            # Parquet is already columnar; read it in place.
+            return Path(dataset_asset.path)
+        if fmt != 'csv':
+            raise ValueError(f"Unsupported dataset format: {dataset_asset.format}")
+
+        version = self.dataset_version(dataset_asset)
+        target = self._cache_path(dataset_asset, version)
+        if target.exists():
+            self.hits += 1
+            logger.debug(f"Dataset cache hit for {dataset_asset.pk} ({version})")
+            return target
+
+        self.misses += 1
+        logger.info(f"Converting dataset {dataset_asset.pk} to Parquet at {target}")
+        self._convert_csv(dataset_asset.path, target)
+        return target
+
+    def _convert_csv(self, source: str, target: Path):
+        """Stream a CSV file into Parquet one record batch at a time."""
+        pa = _require_pyarrow()
+        target.parent.mkdir(parents=True, exist_ok=True)
+
+        # Write to a temporary file and rename, so concurrent workers never
+        # observe a partially written cache entry.
+        fd, tmp_path = tempfile.mkstemp(dir=target.parent, suffix='.parquet.tmp')
+        os.close(fd)
+        try:
+            reader = pa.csv.open_csv(
+                source,
+                read_options=pa.csv.ReadOptions(block_size=self.csv_block_size),
+            )
+            writer = None
+            try:
+                for batch in reader:
+                    if writer is None:
+                        writer = pa.parquet.ParquetWriter(tmp_path, batch.schema, compression='snappy')
+                    writer.write_batch(batch, row_group_size=self.row_group_size)
+                if writer is None:
+                    # Header-only CSV: still produce a valid (empty) Parquet file.
+                    pa.parquet.write_table(reader.schema.empty_table(), tmp_path)
+            finally:
+                if writer is not None:
+                    writer.close()
+            os.replace(tmp_path, target)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+    # ------------------------------------------------------------------
+    # Reads
+    # ------------------------------------------------------------------
+
+    def read_table(
+        self,
+        dataset_asset,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[List[Any]] = None,
+    ):
+        """
+        Read a memory-mapped Arrow table with column projection and predicate pushdown.
+
+        Args:
+            dataset_asset: DatasetAsset instance
+            columns: Columns to read (all columns when omitted)
+            filters: Filters in pyarrow/pandas DNF form, e.g. ``[('age', '>=', 18)]``
+
+        Returns:
+            pyarrow.Table
+        """
+        pa = _require_pyarrow()
+        path = self.materialize(dataset_asset)
+        return pa.parquet.read_table(
+            path,
+            columns=list(columns) if columns else None,
+            filters=filters or None,
+            memory_map=True,
+        )
+
+    def load(
+        self,
+        dataset_asset,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[List[Any]] = None,
+    ):
+        """Load the (projected, filtered) dataset as a pandas DataFrame."""
+        return self.read_table(dataset_asset, columns=columns, filters=filters).to_pandas()
+
+    def iter_batches(
+        self,
+        dataset_asset,
+        columns: Optional[Sequence[str]] = None,
+        batch_size: int = 65536,
+    ):
+        """Stream the dataset as pandas DataFrames of at most ``batch_size`` rows."""
+        pa = _require_pyarrow()
+        path = self.materialize(dataset_asset)
+        parquet_file = pa.parquet.ParquetFile(path, memory_map=True)
+        for batch in parquet_file.iter_batches(batch_size=batch_size, columns=list(columns) if columns else None):
+            yield batch.to_pandas()
+
+    def count_rows(self, dataset_asset) -> int:
+        """Return the number of rows from Parquet metadata without reading data pages."""
+        pa = _require_pyarrow()
+        path = self.materialize(dataset_asset)
+        return pa.parquet.ParquetFile(path).metadata.num_rows
+
+    # ------------------------------------------------------------------
+    # Sampling
+    # ------------------------------------------------------------------
+
+    def stratified_sample(
+        self,
+        dataset_asset,
+        sample_size: int,
+        stratify_by: Optional[Sequence[str]] = None,
+        columns: Optional[Sequence[str]] = None,
+        filters: Optional[List[Any]] = None,
+        seed: int = 0,
+    ):
+        """
+        Draw a deterministic stratified sample as a pandas DataFrame.
+
+        Only the stratification (and filter) columns are scanned to choose the
+        rows; the selected rows are then fetched with a positional ``take`` on
+        the memory-mapped file. The chosen row indices are cached per dataset
+        version, so repeated runs with the same parameters reuse them.
+        """
+        pa = _require_pyarrow()
+        path = self.materialize(dataset_asset)
+        indices = self.sample_indices(
+            dataset_asset,
+            sample_size,
+            stratify_by=stratify_by,
+            filters=filters,
+            seed=seed,
+        )
+        dataset = pa.dataset.dataset(path, format='parquet')
+        table = dataset.take(pa.array(indices, type=pa.int64()), columns=list(columns) if columns else None)
+        return table.to_pandas()
+
+    def sample_indices(
+        self,
+        dataset_asset,
+        sample_size: int,
+        stratify_by: Optional[Sequence[str]] = None,
+        filters: Optional[List[Any]] = None,
+        seed: int = 0,
+    ) -> np.ndarray:
+        """Return sorted row positions for a stratified sample, using the local cache."""
+        stratify_by = list(stratify_by or [])
+        version = self.dataset_version(dataset_asset)
+        params = json.dumps({
+            'n': int(sample_size),
+            'stratify_by': stratify_by,
+            'filters': filters or [],
+            'seed': int(seed),
+        }, sort_keys=True, default=str)
+        params_hash = hashlib.sha256(params.encode('utf-8')).hexdigest()[:16]
+        cache_file = self._cache_path(dataset_asset, version).with_name(
+            f'{dataset_asset.pk}-{version}-sample-{params_hash}.npy'
+        )
+        if cache_file.exists():
+            self.hits += 1
+            return np.load(cache_file)
+
+        self.misses += 1
+        indices = self._compute_sample_indices(dataset_asset, sample_size, stratify_by, filters, seed)
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=cache_file.parent, suffix='.npy.tmp')
+        with os.fdopen(fd, 'wb') as handle:
+            np.save(handle, indices)
+        os.replace(tmp_path, cache_file)
+        return indices
+
+    def _compute_sample_indices(self, dataset_asset, sample_size, stratify_by, filters, seed) -> np.ndarray:
+        pa = _require_pyarrow()
+        import pyarrow.compute as pc
+
+        path = self.materialize(dataset_asset)
+        filter_columns = sorted({clause[0] for clause in self._flatten_filters(filters)})
+        narrow_columns = list(dict.fromkeys(stratify_by + filter_columns))
+
+        if narrow_columns:
+            narrow = pa.parquet.read_table(path, columns=narrow_columns, memory_map=True)
+            total_rows = narrow.num_rows
+        else:
+            narrow = None
+            total_rows = pa.parquet.ParquetFile(path).metadata.num_rows
+
+        positions = np.arange(total_rows, dtype=np.int64)
+        if filters and narrow is not None:
+            narrow = narrow.append_column(ROW_INDEX_COLUMN, pa.array(positions))
+            narrow = narrow.filter(pa.parquet.filters_to_expression(filters))
+            positions = narrow.column(ROW_INDEX_COLUMN).to_numpy()
+
+        rng = np.random.default_rng(seed)
+        if sample_size >= len(positions):
+            return positions
+
+        if not stratify_by:
+            chosen = rng.choice(positions, size=sample_size, replace=False)
+            return np.sort(chosen)
+
+        # Group row positions by stratum key.
+        if len(stratify_by) == 1:
+            keys = narrow.column(stratify_by[0])
+        else:
+            keys = pc.binary_join_element_wise(
+                *[pc.cast(narrow.column(col), pa.string()) for col in stratify_by], '\x1f'
+            )
+        encoded = pc.dictionary_encode(keys).combine_chunks()
+        # Null keys form their own stratum (code -1).
+        codes = pc.fill_null(encoded.indices, -1).to_numpy().astype(np.int64)
+
+        strata = {}
+        for code in np.unique(codes):
+            strata[int(code)] = positions[codes == code]
+
+        members_by_stratum = [members for _, members in sorted(strata.items())]
+        allocation = allocate_strata([len(members) for members in members_by_stratum], sample_size, rng=rng)
+        chosen = [
+            rng.choice(members, size=count, replace=False)
+            for members, count in zip(members_by_stratum, allocation)
+            if count
+        ]
+        return np.sort(np.concatenate(chosen)) if chosen else np.array([], dtype=np.int64)
+
+    @staticmethod
+    def _flatten_filters(filters) -> List[tuple]:
+        if not filters:
+            return []
+        if isinstance(filters[0], (list, tuple)) and filters[0] and isinstance(filters[0][0], (list, tuple)):
+            return [clause for conjunction in filters for clause in conjunction]
+        return list(filters)
+
+    # ------------------------------------------------------------------
+    # Maintenance
+    # ------------------------------------------------------------------
+
+    def purge(self, dataset_asset=None) -> int:
+        """Remove cached files for one dataset (or all datasets). Returns files removed."""
+        if not self.cache_dir.exists():
+            return 0
+        pattern = f'{dataset_asset.pk}-*' if dataset_asset is not None else '*'
+        removed = 0
+        for cached in self.cache_dir.glob(f'*/{pattern}'):
+            try:
+                cached.unlink()
+                removed += 1
+            except OSError as exc:
+                logger.warning(f"Failed to remove cached dataset file {cached}: {exc}")
+        return removed
+
+
+# Global instance
+dataset_store = DatasetStore()
@@ -0,0 +1,222 @@
+"""
+Result ingestion pipeline for AI governance test runs.
+
+Adapter outputs are accumulated in memory and written with ``bulk_create``
+in a single transaction per test run. ``bulk_create`` bypasses the per-row
+post_save audit signals, so the pipeline emits one consolidated activity
+log entry instead. Completed adapter outputs are checkpointed in the cache
+so a retried run resumes rather than recomputing finished tests.
+"""
+
+import logging
+from dataclasses import asdict
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+from core.blobstore import blob_store
+
+from .security import pii_masking_service
+from .signals import log_ai_governance_activity
+
+logger = logging.getLogger(__name__)
+
+
+def _adopt_artifact_files(paths: Iterable[str]) -> None:
+    for path in paths:
+        try:
+            blob_store.adopt(path)
+        except OSError as e:
+            logger.warning(f"Could not deduplicate artifact file {path}: {e}")
+
+
+def _status_value(status: Any) -> str:
+    """Adapters report TestStatus enums, the executor's fallback path plain strings."""
+    return getattr(status, 'value', status)
+
+
+class ResultIngestionPipeline:
+    """
+    Accumulate test adapter results for one test run and persist them in bulk.
+
+    Usage:
+        pipeline = ResultIngestionPipeline(test_run)
+        remaining = pipeline.pending_configs(test_configs)
+        ...execute remaining tests, calling pipeline.checkpoint(results)...
+        pipeline.flush()
+    """
+
+    def __init__(self, test_run, batch_size: Optional[int] = None):
+        self.test_run = test_run
+        self.batch_size = batch_size or getattr(settings, 'AI_GOVERNANCE_BULK_BATCH_SIZE', 500)
+        self.checkpoint_timeout = getattr(settings, 'AI_GOVERNANCE_CHECKPOINT_TIMEOUT', 60 * 60 * 24)
+        self.mask_pii = bool(
+            test_run.contains_pii
+            or (test_run.dataset_asset.contains_pii if test_run.dataset_asset else False)
+        )
+        self._results: Dict[str, Any] = {}
+        self._persisted: Optional[Set[str]] = None
+
+    # ------------------------------------------------------------------
+    # Checkpointing
+    # ------------------------------------------------------------------
+
+    @property
+    def checkpoint_key(self) -> str:
+        return f'ai_gov_test_run_checkpoint:{self.test_run.pk}'
+
+    def persisted_test_names(self) -> Set[str]:
+        """Test names whose results are already stored for this run."""
+        if self._persisted is None:
+            from .models import TestResult
+            self._persisted = set(
+                TestResult.objects.filter(test_run=self.test_run).values_list('test_name', flat=True)
+            )
+        return self._persisted
+
+    def restore_checkpoint(self) -> List[Any]:
+        """Load adapter outputs checkpointed by a previous attempt of this run."""
+        from services.ai.governance_engine.test_adapters.base import TestResult as AdapterResult, TestStatus
+
+        restored = []
+        for payload in cache.get(self.checkpoint_key) or []:
+            if payload['test_name'] in self.persisted_test_names():
+                continue
+            result = AdapterResult(**{**payload, 'status': TestStatus(payload['status'])})
+            self._results[result.test_name] = result
+            restored.append(result)
+        if restored:
+            logger.info(f"Restored {len(restored)} checkpointed results for test run {self.test_run.pk}")
+        return restored
+
+    def pending_configs(self, test_configs: Iterable[Any]) -> List[Any]:
+        """
+        Return the test configs that still need to run.
+
+        Tests already persisted or restored from a checkpoint are skipped.
+        """
+        self.restore_checkpoint()
+        done = self.persisted_test_names() | set(self._results)
+        return [config for config in test_configs if config.test_name not in done]
+
+    def checkpoint(self, results: Iterable[Any]):
+        """Record completed adapter outputs and checkpoint them for retries."""
+        for result in results:
+            self._results[result.test_name] = result
+        payload = []
+        for result in self._results.values():
+            data = asdict(result)
+            data['status'] = _status_value(result.status)
+            payload.append(data)
+        try:
+            cache.set(self.checkpoint_key, payload, self.checkpoint_timeout)
+        except Exception as exc:
+            # A missing checkpoint only costs recomputation on retry.
+            logger.warning(f"Failed to checkpoint test run {self.test_run.pk}: {exc}")
+
+    @property
+    def results(self) -> List[Any]:
+        return list(self._results.values())
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def _summary_for(self, result) -> Dict[str, Any]:
+        summary = {
+            'status': _status_value(result.status),
+            'score': result.score,
+            'execution_time': result.execution_time,
+            'metadata': result.metadata,
+        }
+        if result.error_message:
+            summary['error_message'] = result.error_message
+        if self.mask_pii:
+            _, mask_counts = pii_masking_service.mask_pii(str(summary))
+            if mask_counts:
+                logger.info(f"Masked PII in test result summary: {mask_counts}")
+        return summary
+
+    def flush(self) -> Dict[str, int]:
+        """
+        Write accumulated results, metrics and artifacts in one transaction.
+
+        Returns:
+            Counts of rows created per model
+        """
+        from .models import TestResult, Metric, EvidenceArtifact
+
+        test_run = self.test_run
+        organization = test_run.organization
+        pending = [r for name, r in self._results.items() if name not in self.persisted_test_names()]
+        counts = {'test_results': 0, 'metrics': 0, 'artifacts': 0, 'skipped_metrics': 0}
+        if not pending:
+            return counts
+
+        test_results = []
+        for result in pending:
+            row = TestResult(
+                organization=organization,
+                test_run=test_run,
+                test_name=result.test_name,
+                summary=self._summary_for(result),
+                passed=result.passed,
+            )
+            # bulk_create bypasses save(); apply the model's PII/classification rules here.
+            row.clean()
+            test_results.append(row)
+
+        with transaction.atomic():
+            TestResult.objects.bulk_create(test_results, batch_size=self.batch_size)
+
+            metrics = []
+            artifacts = []
+            for row, result in zip(test_results, pending):
+                for metric_name, metric_value in result.metrics.items():
+                    try:
+                        value = float(metric_value)
+                    except (TypeError, ValueError):
+                        counts['skipped_metrics'] += 1
+                        continue
+                    metrics.append(Metric(
+                        organization=organization,
+                        test_result=row,
+                        name=metric_name,
+                        value=value,
+                        passed=result.passed,
+                    ))
+                for artifact_path in result.artifacts:
+                    artifact = EvidenceArtifact(
+                        organization=organization,
+                        test_run=test_run,
+                        artifact_type='other',  # Could be determined from file extension
+                        file_path=artifact_path,
+                    )
+                    artifact.clean()
+                    artifacts.append(artifact)
+
+            Metric.objects.bulk_create(metrics, batch_size=self.batch_size)
+            EvidenceArtifact.objects.bulk_create(artifacts, batch_size=self.batch_size)
+
+            counts.update(test_results=len(test_results), metrics=len(metrics), artifacts=len(artifacts))
+
+            # One consolidated audit entry replaces the per-row post_save logging.
+            log_ai_governance_activity(
+                activity_type='test_results_ingested',
+                details={
+                    'test_run_id': test_run.pk,
+                    'test_names': [r.test_name for r in pending],
+                    **counts,
+                },
+                user=None,
+                organization=organization,
+            )
+
+        self.persisted_test_names().update(r.test_name for r in pending)
+        transaction.on_commit(lambda: cache.delete(self.checkpoint_key))
+        # bulk_create skips the blob store's post_save hook; take artifact files in here
+        artifact_paths = {artifact.file_path for artifact in artifacts}
+        transaction.on_commit(lambda: _adopt_artifact_files(artifact_paths))
+        return counts
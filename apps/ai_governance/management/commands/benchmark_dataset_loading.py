@@ -0,0 +1,136 @@
+"""
+Management command to benchmark dataset loading for AI governance tests.
+
+Compares a full ``pandas.read_csv`` load against the columnar dataset store
+(cold conversion, warm memory-mapped reads, projection, predicate pushdown
+and stratified sampling) on a synthetic CSV. Each scenario runs in a forked
+child process so peak RSS is measured per scenario.
+"""
+
+import multiprocessing
+import os
+import resource
+import tempfile
+import time
+from types import SimpleNamespace
+
+import numpy as np
+from django.core.management.base import BaseCommand, CommandError
+
+from ai_governance.datasets import DatasetStore
+
+
+def _generate_csv(path, size_mb, seed=42, chunk_rows=500_000):
+    """Write a synthetic tabular CSV of roughly ``size_mb`` megabytes."""
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    target_bytes = size_mb * 1024 * 1024
+    header = True
+    with open(path, 'w', newline='') as handle:
+        while handle.tell() < target_bytes:
+            chunk = pd.DataFrame({
+                'age': rng.integers(18, 90, chunk_rows),
+                'income': rng.normal(55_000, 15_000, chunk_rows).round(2),
+                'score': rng.random(chunk_rows),
+                'gender': rng.choice(['female', 'male', 'other'], chunk_rows, p=[0.48, 0.48, 0.04]),
+                'region': rng.choice(['north', 'south', 'east', 'west'], chunk_rows),
+                'label': rng.integers(0, 2, chunk_rows),
+            })
+            chunk.to_csv(handle, index=False, header=header)
+            header = False
+
+
+def _run_scenario(name, asset, cache_dir, queue):
+    from django.conf import settings
+    settings.AI_GOVERNANCE_DATASET_CACHE_DIR = cache_dir
+    store = DatasetStore()
+
+    start = time.perf_counter()
+    if name == 'pandas_read_csv':
+        import pandas as pd
+        rows = len(pd.read_csv(asset.path))
+    elif name == 'store_convert':
+        store.materialize(asset)
+        rows = store.count_rows(asset)
+    elif name == 'store_full':
+        rows = len(store.load(asset))
+    elif name == 'store_projection':
+        rows = len(store.load(asset, columns=['gender', 'label']))
+    elif name == 'store_pushdown':
+        rows = len(store.load(asset, columns=['income', 'label'], filters=[('age', '>=', 80)]))
+    elif name == 'store_stratified_sample':
+        rows = len(store.stratified_sample(asset, 10_000, stratify_by=['gender', 'label'], seed=7))
+    else:
+        raise ValueError(name)
+    elapsed = time.perf_counter() - start
+
+    # ru_maxrss is reported in kilobytes on Linux.
+    peak_mb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    queue.put({'scenario': name, 'seconds': elapsed, 'peak_rss_mb': peak_mb, 'rows': rows})
+
+
+class Command(BaseCommand):
+    help = 'Benchmark memory and time of dataset loading against a synthetic CSV'
+
+    scenarios = [
+        'pandas_read_csv',
+        'store_convert',
+        'store_full',
+        'store_projection',
+        'store_pushdown',
+        'store_stratified_sample',
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size-mb',
+            type=int,
+            default=2048,
+            help='Approximate size of the synthetic CSV in MB (default: 2048)'
+        )
+        parser.add_argument(
+            '--csv-path',
+            type=str,
+            help='Use an existing CSV instead of generating one'
+        )
+        parser.add_argument(
+            '--skip-pandas',
+            action='store_true',
+            help='Skip the full pandas.read_csv baseline (it may not fit in memory)'
+        )
+
+    def handle(self, *args, **options):
+        if 'fork' not in multiprocessing.get_all_start_methods():
+            raise CommandError('This benchmark requires the "fork" start method (Linux/macOS)')
+        ctx = multiprocessing.get_context('fork')
+
+        work_dir = tempfile.mkdtemp(prefix='ai_gov_dataset_bench_')
+        csv_path = options.get('csv_path')
+        if not csv_path:
+            csv_path = os.path.join(work_dir, 'synthetic.csv')
+            self.stdout.write(f"Generating ~{options['size_mb']} MB synthetic CSV at {csv_path}")
+            _generate_csv(csv_path, options['size_mb'])
+
+        asset = SimpleNamespace(pk='benchmark', organization_id=None, path=csv_path, format='csv')
+        cache_dir = os.path.join(work_dir, 'cache')
+        csv_mb = os.path.getsize(csv_path) / (1024 * 1024)
+        self.stdout.write(f'CSV size: {csv_mb:.1f} MB')
+
+        scenarios = [s for s in self.scenarios if not (options['skip_pandas'] and s == 'pandas_read_csv')]
+        self.stdout.write(f"{'scenario':<26}{'seconds':>10}{'peak RSS MB':>14}{'rows':>12}")
+        for name in scenarios:
+            queue = ctx.Queue()
+            process = ctx.Process(target=_run_scenario, args=(name, asset, cache_dir, queue))
+            process.start()
+            process.join()
+            if process.exitcode != 0:
+                self.stdout.write(self.style.ERROR(f'{name:<26} failed (exit code {process.exitcode})'))
+                continue
+            result = queue.get()
+            self.stdout.write(
+                f"{result['scenario']:<26}{result['seconds']:>10.2f}"
+                f"{result['peak_rss_mb']:>14.1f}{result['rows']:>12}"
+            )
+
+        self.stdout.write(self.style.SUCCESS(f'Benchmark artifacts kept in {work_dir}'))
@@ -0,0 +1,125 @@
+"""
+Management command to benchmark persistence of test results.
+
+Compares the legacy per-row ``objects.create`` path (one INSERT plus the
+post_save audit logging per row) with the bulk ResultIngestionPipeline for a
+synthetic test run. All writes happen inside a transaction that is rolled
+back, so the command is safe to run against a live tenant.
+"""
+
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django_tenants.utils import tenant_context
+from organizations.models import Organization
+
+from ai_governance.ingestion import ResultIngestionPipeline
+from ai_governance.models import ModelAsset, TestRun, TestResult, Metric, EvidenceArtifact
+from services.ai.governance_engine.test_adapters.base import TestResult as AdapterResult, TestStatus
+
+
+class _Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark DB round trips and wall time for persisting test run results'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            type=int,
+            required=True,
+            help='Organization ID to run the benchmark in'
+        )
+        parser.add_argument(
+            '--metrics',
+            type=int,
+            default=500,
+            help='Total number of metrics to persist (default: 500)'
+        )
+        parser.add_argument(
+            '--tests',
+            type=int,
+            default=10,
+            help='Number of test results the metrics are spread over (default: 10)'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            org = Organization.objects.get(id=options['organization'])
+        except Organization.DoesNotExist:
+            raise CommandError(f"Organization with ID {options['organization']} not found")
+
+        results = self._build_results(options['tests'], options['metrics'])
+
+        with tenant_context(org):
+            legacy = self._measure(org, lambda run: self._persist_legacy(run, results))
+            bulk = self._measure(org, lambda run: self._persist_bulk(run, results))
+
+        self.stdout.write(f"{'path':<10}{'queries':>10}{'seconds':>10}")
+        self.stdout.write(f"{'legacy':<10}{legacy['queries']:>10}{legacy['seconds']:>10.3f}")
+        self.stdout.write(f"{'bulk':<10}{bulk['queries']:>10}{bulk['seconds']:>10.3f}")
+
+    def _build_results(self, tests, metrics):
+        per_test = max(1, metrics // tests)
+        return [
+            AdapterResult(
+                test_name=f'benchmark_test_{i}',
+                status=TestStatus.COMPLETED,
+                passed=i % 2 == 0,
+                score=0.5,
+                metrics={f'metric_{j}': j / per_test for j in range(per_test)},
+                artifacts=[f'artifacts/benchmark_{i}.json'],
+            )
+            for i in range(tests)
+        ]
+
+    def _measure(self, org, persist):
+        measurement = {}
+        try:
+            with transaction.atomic():
+                model_asset = ModelAsset.objects.create(
+                    organization=org, name='benchmark-model', model_type='tabular', uri='benchmark://model'
+                )
+                test_run = TestRun.objects.create(organization=org, model_asset=model_asset)
+                with CaptureQueriesContext(connection) as ctx:
+                    start = time.perf_counter()
+                    persist(test_run)
+                    measurement['seconds'] = time.perf_counter() - start
+                measurement['queries'] = len(ctx.captured_queries)
+                raise _Rollback()
+        except _Rollback:
+            pass
+        return measurement
+
+    def _persist_legacy(self, test_run, results):
+        for result in results:
+            test_result = TestResult.objects.create(
+                organization=test_run.organization,
+                test_run=test_run,
+                test_name=result.test_name,
+                summary={'status': result.status.value, 'score': result.score},
+                passed=result.passed,
+            )
+            for name, value in result.metrics.items():
+                Metric.objects.create(
+                    organization=test_run.organization,
+                    test_result=test_result,
+                    name=name,
+                    value=value,
+                    passed=result.passed,
+                )
+            for path in result.artifacts:
+                EvidenceArtifact.objects.create(
+                    organization=test_run.organization,
+                    test_run=test_run,
+                    file_path=path,
+                )
+
+    def _persist_bulk(self, test_run, results):
+        pipeline = ResultIngestionPipeline(test_run)
+        pipeline.checkpoint(results)
+        pipeline.flush()
@@ -0,0 +1,99 @@
+"""
+Management command to benchmark webhook fan-out throughput.
+
+Starts a local HTTP stub server that answers after a configurable delay and
+delivers the same payload to N subscribers, first sequentially with a fresh
+connection per request (the previous behaviour) and then through the
+concurrent WebhookDispatcher. No database access is required.
+"""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import requests
+from django.core.management.base import BaseCommand
+
+from ai_governance.webhook_dispatcher import CircuitBreaker, DeliveryJob, WebhookDispatcher
+
+
+class _SlowHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def do_POST(self):
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(self.server.delay)
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark webhook delivery throughput against a local stub server'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--subscribers',
+            type=int,
+            default=1000,
+            help='Number of subscriber deliveries (default: 1000)'
+        )
+        parser.add_argument(
+            '--delay-ms',
+            type=int,
+            default=50,
+            help='Simulated endpoint latency in milliseconds (default: 50)'
+        )
+        parser.add_argument(
+            '--concurrency',
+            type=int,
+            default=32,
+            help='Dispatcher fan-out width (default: 32)'
+        )
+        parser.add_argument(
+            '--skip-sequential',
+            action='store_true',
+            help='Skip the sequential baseline'
+        )
+
+    def handle(self, *args, **options):
+        server = ThreadingHTTPServer(('127.0.0.1', 0), _SlowHandler)
+        server.daemon_threads = True
+        server.delay = options['delay_ms'] / 1000
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+
+        count = options['subscribers']
+        body = json.dumps({'event_type': 'webhook.benchmark'}, separators=(',', ':')).encode('utf-8')
+        urls = [f'http://127.0.0.1:{server.server_address[1]}/hook/{i}' for i in range(count)]
+
+        try:
+            if not options['skip_sequential']:
+                start = time.perf_counter()
+                for url in urls:
+                    requests.post(url, data=body, headers={'Content-Type': 'application/json'}, timeout=30)
+                self._report('sequential', count, time.perf_counter() - start)
+
+            dispatcher = WebhookDispatcher(
+                concurrency=options['concurrency'],
+                circuit_breaker=CircuitBreaker(failure_threshold=count + 1),
+            )
+            jobs = [DeliveryJob(i, url, body, {'Content-Type': 'application/json'}) for i, url in enumerate(urls)]
+            start = time.perf_counter()
+            outcomes = dispatcher.deliver(jobs)
+            elapsed = time.perf_counter() - start
+            failed = sum(1 for outcome in outcomes if not outcome.success)
+            self._report(f"dispatcher x{options['concurrency']}", count, elapsed, failed)
+        finally:
+            server.shutdown()
+            server.server_close()
+
+    def _report(self, label, count, elapsed, failed=0):
+        self.stdout.write(
+            f'{label:<18} {count} deliveries in {elapsed:.2f}s '
+            f'({count / elapsed:.1f}/s, {failed} failed)'
+        )
@@ -167,7 +167,7 @@ class Command(BaseCommand):
         # Check text fields for PII
         text_fields = []
         if hasattr(record, 'summary') and record.summary:
-            text_fields.append(('summary', record.summary))
+            text_fields.append(('summary', str(record.summary)))
         if hasattr(record, 'description') and record.description:
             text_fields.append(('description', record.description))
         if hasattr(record, 'metadata') and record.metadata:
@@ -176,19 +176,18 @@ class Command(BaseCommand):
             text_fields.append(('parameters', str(record.parameters)))
         
         for field_name, field_value in text_fields:
-            if isinstance(field_value, str):
-                detected_pii = pii_masking_service.detect_pii(field_value)
-                if detected_pii:
-                    finding['pii_detected'][field_name] = detected_pii
-                    finding['pii_count'] += sum(len(matches) for matches in detected_pii.values())
-                    
-                    if mask_pii:
-                        masked_value, mask_counts = pii_masking_service.mask_pii(field_value)
-                        finding['masked_data'][field_name] = {
-                            'original': field_value,
-                            'masked': masked_value,
-                            'mask_counts': mask_counts
-                        }
+            # One pass detects and masks every PII type
+            masked_value, mask_counts, detected_pii = pii_masking_service.scan_pii(field_value)
+            if detected_pii:
+                finding['pii_detected'][field_name] = detected_pii
+                finding['pii_count'] += sum(len(matches) for matches in detected_pii.values())
+                
+                if mask_pii:
+                    finding['masked_data'][field_name] = {
+                        'original': field_value,
+                        'masked': masked_value,
+                        'mask_counts': mask_counts
+                    }
         
         # Only return finding if PII was detected
         if finding['pii_count'] > 0:
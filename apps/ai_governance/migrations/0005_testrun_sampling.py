@@ -0,0 +1,18 @@
+# Generated by Django 5.1.14 on 2026-10-18 21:27
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_governance', '0004_webhookdelivery'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='testrun',
+            name='sampling',
+            field=models.JSONField(blank=True, default=dict, help_text='Sampling strategy, seed and error bounds used for each test adapter'),
+        ),
+    ]
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.14 on 2026-10-18 21:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('ai_governance', '0005_testrun_sampling'),
+        ('organizations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='testrun',
+            index=models.Index(fields=['organization', 'created_at'], name='ai_governan_organiz_86bd08_idx'),
+        ),
+    ]
@@ -204,6 +204,11 @@ class TestRun(OrganizationOwnedModel, AuditableModel, SoftDeletionModel):
     completed_at = models.DateTimeField(null=True, blank=True)
     error_message = models.TextField(blank=True)
     worker_info = models.JSONField(default=dict, blank=True)
+    sampling = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text='Sampling strategy, seed and error bounds used for each test adapter'
+    )
     
     # Security fields
     contains_pii = models.BooleanField(default=False, help_text='Whether this test run processes PII')
@@ -229,6 +234,7 @@ class TestRun(OrganizationOwnedModel, AuditableModel, SoftDeletionModel):
             models.Index(fields=['organization']),
             models.Index(fields=['status']),
             models.Index(fields=['created_at']),
+            models.Index(fields=['organization', 'created_at']),
         ]
 
     def __str__(self):
@@ -563,6 +569,41 @@ class WebhookSubscription(OrganizationOwnedModel, AuditableModel, SoftDeletionMo
         super().save(*args, **kwargs)
 
 
+class WebhookDelivery(OrganizationOwnedModel):
+    """
+    One delivery of an event payload to a webhook subscription, with retry state.
+    """
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('succeeded', 'Succeeded'),
+        ('failed', 'Failed'),
+    ]
+
+    subscription = models.ForeignKey(WebhookSubscription, on_delete=models.CASCADE, related_name='deliveries')
+    event_type = models.CharField(max_length=64, db_index=True)
+    payload = models.JSONField(default=dict, blank=True)
+    status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_attempt_at = models.DateTimeField(null=True, blank=True)
+    delivered_at = models.DateTimeField(null=True, blank=True)
+    last_status_code = models.PositiveIntegerField(null=True, blank=True)
+    last_error = models.TextField(blank=True)
+    response_time_ms = models.PositiveIntegerField(null=True, blank=True)
+
+    class Meta:
+        app_label = 'ai_governance'
+        verbose_name = 'Webhook Delivery'
+        verbose_name_plural = 'Webhook Deliveries'
+        indexes = [
+            models.Index(fields=['organization']),
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f"{self.event_type} -> {self.subscription_id} ({self.status})"
+
+
 class ModelRiskAssessment(OrganizationOwnedModel, AuditableModel, SoftDeletionModel):
     """
     Formal risk assessment for AI/ML models with approval workflow.
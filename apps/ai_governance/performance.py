@@ -3,14 +3,18 @@ Performance monitoring and caching utilities for AI governance.
 Follows the same patterns as other apps in the project.
 """
 
+import math
 import time
 import logging
+from dataclasses import dataclass, field
 from functools import wraps
-from typing import Dict, Any, Optional, Callable
+from typing import Dict, Any, Iterable, List, Optional, Callable
+
 from django.core.cache import cache
 from django.conf import settings
 from django.utils import timezone
 from django.db import connection
+from django.db.models import Avg, DurationField, ExpressionWrapper, F, Q
 from django.core.cache.utils import make_template_fragment_key
 
 logger = logging.getLogger(__name__)
@@ -148,18 +152,18 @@ class MetricsCollector:
             return cached_metrics
         
         # Compute metrics
-        from .models import ModelAsset, TestRun, TestResult, Metric
+        from core.dashboard import DashboardMetrics
+        from .models import ModelAsset, TestRun, Metric
         
-        metrics = {
-            'total_models': ModelAsset.objects.filter(organization_id=self.organization_id).count(),
-            'total_test_runs': TestRun.objects.filter(organization_id=self.organization_id).count(),
-            'recent_test_runs': TestRun.objects.filter(
-                organization_id=self.organization_id,
-                created_at__gte=timezone.now() - timezone.timedelta(days=30)
-            ).count(),
-            'total_metrics': Metric.objects.filter(organization_id=self.organization_id).count(),
-            'computed_at': timezone.now().isoformat()
-        }
+        dashboard = DashboardMetrics()
+        dashboard.source(ModelAsset.objects.filter(organization_id=self.organization_id)).count('total_models')
+        dashboard.source(TestRun.objects.filter(organization_id=self.organization_id)) \
+            .count('total_test_runs') \
+            .count('recent_test_runs', Q(created_at__gte=timezone.now() - timezone.timedelta(days=30)))
+        dashboard.source(Metric.objects.filter(organization_id=self.organization_id)).count('total_metrics')
+        
+        metrics = dashboard.evaluate()
+        metrics['computed_at'] = timezone.now().isoformat()
         
         # Cache the results
         self.monitor.set_cached_metrics(self.organization_id, 'dashboard', metrics)
@@ -172,7 +176,8 @@ class MetricsCollector:
         if cached_metrics:
             return cached_metrics
         
-        from .models import TestRun, TestResult
+        from core.dashboard import DashboardMetrics
+        from .models import TestRun
         
         # Get recent test runs
         recent_runs = TestRun.objects.filter(
@@ -180,14 +185,23 @@ class MetricsCollector:
             created_at__gte=timezone.now() - timezone.timedelta(days=7)
         )
         
-        metrics = {
-            'total_runs': recent_runs.count(),
-            'completed_runs': recent_runs.filter(status='completed').count(),
-            'failed_runs': recent_runs.filter(status='failed').count(),
-            'avg_execution_time': self._calculate_avg_execution_time(recent_runs),
-            'success_rate': self._calculate_success_rate(recent_runs),
-            'computed_at': timezone.now().isoformat()
-        }
+        dashboard = DashboardMetrics()
+        dashboard.source(recent_runs) \
+            .count('total_runs') \
+            .count('completed_runs', Q(status='completed')) \
+            .count('failed_runs', Q(status='failed')) \
+            .aggregate('avg_duration', Avg(
+                ExpressionWrapper(F('completed_at') - F('started_at'), output_field=DurationField()),
+                filter=Q(status='completed', started_at__isnull=False, completed_at__isnull=False),
+            ))
+        results = dashboard.evaluate()
+        
+        avg_duration = results.pop('avg_duration')
+        results['avg_execution_time'] = avg_duration.total_seconds() if avg_duration else 0.0
+        results['success_rate'] = (
+            results['completed_runs'] / results['total_runs'] * 100 if results['total_runs'] else 0.0
+        )
+        metrics = dict(results, computed_at=timezone.now().isoformat())
         
         # Cache the results
         self.monitor.set_cached_metrics(self.organization_id, 'test_performance', metrics)
@@ -200,39 +214,34 @@ class MetricsCollector:
         if cached_metrics:
             return cached_metrics
         
-        from .models import Framework, ComplianceMapping, TestResult
+        from core.dashboard import DashboardMetrics
+        from .models import ComplianceMapping, TestResult
         
-        # Get framework compliance scores
-        frameworks = Framework.objects.filter(organization_id=self.organization_id)
-        compliance_scores = {}
+        # Pass/total counts per test name over the last 30 days, in one grouped query each
+        recent_results = TestResult.objects.filter(
+            test_run__organization_id=self.organization_id,
+            created_at__gte=timezone.now() - timezone.timedelta(days=30)
+        )
+        dashboard = DashboardMetrics()
+        dashboard.source(recent_results) \
+            .histogram('total_by_test', 'test_name') \
+            .histogram('passed_by_test', 'test_name', filter=Q(passed=True))
+        counts = dashboard.evaluate()
         
-        for framework in frameworks:
-            # Get test results for this framework
-            mappings = ComplianceMapping.objects.filter(
-                organization_id=self.organization_id,
-                clause__framework=framework
-            )
-            
-            if mappings.exists():
-                # Calculate compliance score based on test results
-                total_tests = 0
-                passed_tests = 0
-                
-                for mapping in mappings:
-                    test_results = TestResult.objects.filter(
-                        test_run__organization_id=self.organization_id,
-                        test_name=mapping.test_name,
-                        created_at__gte=timezone.now() - timezone.timedelta(days=30)
-                    )
-                    
-                    total_tests += test_results.count()
-                    passed_tests += test_results.filter(passed=True).count()
-                
-                compliance_scores[framework.code] = {
-                    'score': (passed_tests / total_tests * 100) if total_tests > 0 else 0,
-                    'total_tests': total_tests,
-                    'passed_tests': passed_tests
-                }
+        # Framework compliance scores from the mapped tests
+        mappings = ComplianceMapping.objects.filter(
+            organization_id=self.organization_id,
+            clause__framework__organization_id=self.organization_id,
+        ).values_list('clause__framework__code', 'test_name')
+        
+        compliance_scores = {}
+        for framework_code, test_name in mappings:
+            scores = compliance_scores.setdefault(framework_code, {'total_tests': 0, 'passed_tests': 0})
+            scores['total_tests'] += counts['total_by_test'].get(test_name, 0)
+            scores['passed_tests'] += counts['passed_by_test'].get(test_name, 0)
+        for scores in compliance_scores.values():
+            total_tests = scores['total_tests']
+            scores['score'] = (scores['passed_tests'] / total_tests * 100) if total_tests > 0 else 0
         
         metrics = {
             'frameworks': compliance_scores,
@@ -245,46 +254,70 @@ class MetricsCollector:
         
         return metrics
     
-    def _calculate_avg_execution_time(self, test_runs) -> float:
-        """Calculate average execution time for test runs."""
-        completed_runs = test_runs.filter(
-            status='completed',
-            started_at__isnull=False,
-            completed_at__isnull=False
-        )
-        
-        if not completed_runs.exists():
-            return 0.0
-        
-        total_time = 0
-        count = 0
-        
-        for run in completed_runs:
-            if run.started_at and run.completed_at:
-                execution_time = (run.completed_at - run.started_at).total_seconds()
-                total_time += execution_time
-                count += 1
-        
-        return total_time / count if count > 0 else 0.0
+
+
+@dataclass
+class Sample:
+    """
+    A sample drawn from a test dataset, with the information needed to
+    reproduce it and to judge how far metrics computed on it may drift from
+    the full-dataset value.
+    """
+    data: Any
+    strategy: str
+    population_size: int
+    sample_size: int
+    seed: int = 0
+    confidence: float = 0.95
+    margin_of_error: float = 0.0
+    weights: Optional[Any] = None
+    details: Dict[str, Any] = field(default_factory=dict)
     
-    def _calculate_success_rate(self, test_runs) -> float:
-        """Calculate success rate for test runs."""
-        total_runs = test_runs.count()
-        if total_runs == 0:
-            return 0.0
-        
-        successful_runs = test_runs.filter(status='completed').count()
-        return (successful_runs / total_runs) * 100
+    def describe(self) -> Dict[str, Any]:
+        """JSON-serialisable description stored with test runs and results."""
+        return {
+            'strategy': self.strategy,
+            'population_size': int(self.population_size),
+            'sample_size': int(self.sample_size),
+            'sampling_fraction': round(self.sample_size / self.population_size, 6) if self.population_size else 1.0,
+            'seed': self.seed,
+            'confidence': self.confidence,
+            'margin_of_error': round(float(self.margin_of_error), 6),
+            **self.details,
+        }
 
 
 class SamplingService:
     """
     Service for intelligent sampling of test data to improve performance.
+    
+    Strategies:
+        random: simple random sample without replacement
+        stratified: proportional allocation over protected attributes and the
+            label, with a minimum per stratum so small groups stay measurable
+        adversarial: importance sampling towards the decision boundary (or
+            feature-space outliers when the model cannot score rows)
+        sensitive: stratified on the configured sensitive attributes
+        reservoir: single-pass sample of a stream of rows or DataFrame chunks
+    
+    Every sample reports a margin of error for proportion-type metrics
+    (accuracy, selection and error rates) at the configured confidence, using
+    the worst case p=0.5 and a finite population correction.
     """
     
+    Z_SCORES = {0.8: 1.2816, 0.9: 1.6449, 0.95: 1.96, 0.98: 2.3263, 0.99: 2.5758}
+    
     def __init__(self):
         self.default_sample_size = getattr(settings, 'AI_GOVERNANCE_DEFAULT_SAMPLE_SIZE', 1000)
         self.max_sample_size = getattr(settings, 'AI_GOVERNANCE_MAX_SAMPLE_SIZE', 10000)
+        self.min_stratum_size = getattr(settings, 'AI_GOVERNANCE_MIN_STRATUM_SIZE', 30)
+        # Labels with more distinct values than this are not used as a stratum key
+        self.max_label_classes = getattr(settings, 'AI_GOVERNANCE_MAX_LABEL_CLASSES', 20)
+        self.default_confidence = getattr(settings, 'AI_GOVERNANCE_SAMPLING_CONFIDENCE', 0.95)
+        # Share of the importance distribution spread uniformly, so every row
+        # keeps a non-zero inclusion probability (defensive importance sampling)
+        self.uniform_mix = getattr(settings, 'AI_GOVERNANCE_IMPORTANCE_UNIFORM_MIX', 0.2)
+        self.max_reported_strata = 50
     
     def get_sample_size(self, total_size: int, test_type: str) -> int:
         """Determine appropriate sample size based on total data size and test type."""
@@ -314,7 +347,359 @@ class SamplingService:
             'privacy': 'sensitive'  # Focus on sensitive data points
         }
         return strategies.get(test_type, 'random')
+    
+    # ------------------------------------------------------------------
+    # Error bounds
+    # ------------------------------------------------------------------
+    
+    def z_score(self, confidence: float) -> float:
+        """Two-sided normal critical value for the confidence level."""
+        if confidence in self.Z_SCORES:
+            return self.Z_SCORES[confidence]
+        from statistics import NormalDist
+        return NormalDist().inv_cdf(0.5 + confidence / 2)
+    
+    def margin_of_error(self, sample_size: int, population_size: int, confidence: Optional[float] = None) -> float:
+        """Worst-case margin of error of a proportion estimated from a simple random sample."""
+        if sample_size <= 0:
+            return 1.0
+        if sample_size >= population_size:
+            return 0.0
+        fpc = ((population_size - sample_size) / (population_size - 1)) ** 0.5
+        return self.z_score(confidence or self.default_confidence) * (0.25 / sample_size) ** 0.5 * fpc
+    
+    def required_sample_size(self, population_size: int, max_error: float, confidence: Optional[float] = None) -> int:
+        """Smallest simple random sample whose margin of error is within ``max_error``."""
+        n0 = (self.z_score(confidence or self.default_confidence) ** 2) * 0.25 / (max_error ** 2)
+        return min(population_size, math.ceil(n0 / (1 + (n0 - 1) / population_size)))
+    
+    # ------------------------------------------------------------------
+    # Strategies
+    # ------------------------------------------------------------------
+    
+    def random_sample(self, df, sample_size: int, seed: int = 0, confidence: Optional[float] = None) -> Sample:
+        """Simple random sample without replacement, kept in the original row order."""
+        import numpy as np
+
+        confidence = confidence or self.default_confidence
+        population = len(df)
+        if sample_size >= population:
+            return Sample(df, 'full', population, population, seed, confidence)
+        
+        rng = np.random.default_rng(seed)
+        positions = np.sort(rng.choice(population, size=sample_size, replace=False))
+        return Sample(
+            df.iloc[positions], 'random', population, sample_size, seed, confidence,
+            margin_of_error=self.margin_of_error(sample_size, population, confidence),
+        )
+    
+    def stratified_sample(
+        self,
+        df,
+        sample_size: int,
+        stratify_by: List[str],
+        seed: int = 0,
+        confidence: Optional[float] = None,
+        strategy: str = 'stratified',
+    ) -> Sample:
+        """
+        Stratified sample over the given columns.
+        
+        Rows are allocated to strata proportionally, with at least
+        ``min_stratum_size`` rows (or the whole stratum when smaller) so that
+        group-level fairness metrics remain estimable. The floor is lowered
+        when the strata would not fit in ``sample_size`` otherwise; the sample
+        never exceeds it (see ``datasets.allocate_strata``). Design weights
+        (stratum population / stratum sample) restore population-level
+        estimates when small strata are over-represented.
+        """
+        import numpy as np
+        import pandas as pd
+        from .datasets import allocate_strata
+
+        confidence = confidence or self.default_confidence
+        population = len(df)
+        stratify_by = [column for column in stratify_by if column in df.columns]
+        if not stratify_by:
+            sample = self.random_sample(df, sample_size, seed, confidence)
+            sample.details['stratified_fallback'] = 'no stratification columns found'
+            return sample
+        if sample_size >= population:
+            return Sample(df, 'full', population, population, seed, confidence,
+                          details={'stratify_by': stratify_by})
+        
+        codes = df.groupby(stratify_by, sort=True, dropna=False, observed=True).ngroup().to_numpy()
+        rng = np.random.default_rng(seed)
+        order = np.argsort(codes, kind='stable')
+        boundaries = np.flatnonzero(np.diff(codes[order])) + 1
+        groups = np.split(order, boundaries)
+        allocation = allocate_strata(
+            [len(group) for group in groups], sample_size, min_per_stratum=self.min_stratum_size, rng=rng,
+        )
+        
+        selected = []
+        weights = []
+        strata = {}
+        z = self.z_score(confidence)
+        variance = 0.0
+        strata_values = df[stratify_by]
+        unsampled = 0
+        for group, n_h in zip(groups, allocation):
+            N_h = len(group)
+            if not n_h:
+                # More strata than sample rows: this one was not drawn
+                unsampled += 1
+                continue
+            chosen = rng.choice(group, size=n_h, replace=False) if n_h < N_h else group
+            selected.append(chosen)
+            weights.append(np.full(n_h, N_h / n_h))
+            moe_h = self.margin_of_error(n_h, N_h, confidence)
+            key = ' / '.join(str(value) for value in strata_values.iloc[group[0]].tolist())
+            strata[key] = {'population': int(N_h), 'sample': int(n_h), 'margin_of_error': round(moe_h, 6)}
+            if n_h < N_h:
+                # Var of the stratified estimator: sum W_h^2 * p(1-p)/n_h * fpc_h, worst case p=0.5
+                variance += (N_h / population) ** 2 * 0.25 / n_h * (N_h - n_h) / (N_h - 1)
+        
+        positions = np.concatenate(selected)
+        sort = np.argsort(positions)
+        positions = positions[sort]
+        data = df.iloc[positions]
+        return Sample(
+            data, strategy, population, len(positions), seed, confidence,
+            margin_of_error=z * variance ** 0.5,
+            weights=pd.Series(np.concatenate(weights)[sort], index=data.index),
+            details={
+                'stratify_by': stratify_by,
+                'strata_count': len(groups),
+                'unsampled_strata': unsampled,
+                # Per-stratum bounds for the largest strata keep the record bounded
+                'strata': dict(sorted(strata.items(), key=lambda item: -item[1]['population'])[:self.max_reported_strata]),
+            },
+        )
+    
+    def importance_sample(self, df, sample_size: int, model: Any = None, seed: int = 0,
+                          confidence: Optional[float] = None) -> Sample:
+        """
+        Importance sample concentrated on hard cases for robustness testing.
+        
+        Rows are scored by model uncertainty (predicted probability close to
+        the decision boundary) when the model can score them, otherwise by
+        their distance from the feature means. Rows are drawn without
+        replacement with probability proportional to the score mixed with a
+        uniform share; inverse-probability weights and the Kish effective
+        sample size give the reported margin of error.
+        """
+        import numpy as np
+        import pandas as pd
+
+        confidence = confidence or self.default_confidence
+        population = len(df)
+        if sample_size >= population:
+            return Sample(df, 'full', population, population, seed, confidence)
+        
+        # Same convention as the test adapters: the last column is the target
+        features = df.iloc[:, :-1] if df.shape[1] > 1 else df
+        scores, scoring = self._boundary_scores(features, model)
+        
+        q = (1 - self.uniform_mix) * scores / scores.sum() + self.uniform_mix / population
+        # Efraimidis-Spirakis weighted sampling without replacement: the k
+        # largest keys u^(1/q) (compared in log space) form the sample
+        rng = np.random.default_rng(seed)
+        keys = np.log(rng.random(population)) / q
+        positions = np.sort(np.argpartition(keys, -sample_size)[-sample_size:])
+        
+        weights = 1.0 / (sample_size * q[positions])
+        effective_size = weights.sum() ** 2 / (weights ** 2).sum()
+        data = df.iloc[positions]
+        return Sample(
+            data, 'adversarial', population, sample_size, seed, confidence,
+            margin_of_error=self.margin_of_error(int(effective_size), population, confidence),
+            weights=pd.Series(weights, index=data.index),
+            details={
+                'scoring': scoring,
+                'effective_sample_size': round(float(effective_size), 1),
+                'uniform_mix': self.uniform_mix,
+            },
+        )
+    
+    def reservoir_sample(self, stream: Iterable, sample_size: int, seed: int = 0,
+                         confidence: Optional[float] = None) -> Sample:
+        """
+        Uniform sample of ``sample_size`` rows from a stream read once.
+        
+        The stream yields pandas DataFrames (e.g. Parquet record batches) or
+        individual records. Memory is bounded by the reservoir: each chunk
+        only contributes the rows that replace a reservoir slot (Algorithm R,
+        vectorised per chunk).
+        """
+        import numpy as np
+        import pandas as pd
+
+        confidence = confidence or self.default_confidence
+        rng = np.random.default_rng(seed)
+        parts = []
+        slots = np.zeros((sample_size, 2), dtype=np.int64)  # (part, row) held by each slot
+        seen = 0
+        
+        for chunk in self._iter_chunks(stream):
+            size = len(chunk)
+            if not size:
+                continue
+            slot_for_row = np.full(size, -1, dtype=np.int64)
+            fill = min(max(sample_size - seen, 0), size)
+            slot_for_row[:fill] = np.arange(seen, seen + fill)
+            if fill < size:
+                draws = rng.integers(0, np.arange(seen + fill, seen + size) + 1)
+                slot_for_row[fill:] = np.where(draws < sample_size, draws, -1)
+            seen += size
+            
+            accepted = np.flatnonzero(slot_for_row >= 0)
+            if not accepted.size:
+                continue
+            # A slot replaced twice within the chunk keeps the later row
+            _, last = np.unique(slot_for_row[accepted][::-1], return_index=True)
+            rows = np.sort(accepted[::-1][last])
+            slots[slot_for_row[rows]] = np.column_stack([np.full(len(rows), len(parts)), np.arange(len(rows))])
+            parts.append(chunk.iloc[rows])
+            if len(parts) > 64:
+                parts, slots = self._compact_reservoir(parts, slots[:min(seen, sample_size)])
+                slots = np.vstack([slots, np.zeros((sample_size - len(slots), 2), dtype=np.int64)])
+        
+        filled = min(seen, sample_size)
+        if not parts:
+            return Sample(pd.DataFrame(), 'reservoir', 0, 0, seed, confidence)
+        parts, _ = self._compact_reservoir(parts, slots[:filled])
+        return Sample(
+            parts[0].reset_index(drop=True), 'reservoir', seen, filled, seed, confidence,
+            margin_of_error=self.margin_of_error(filled, seen, confidence),
+        )
+    
+    # ------------------------------------------------------------------
+    # Test execution
+    # ------------------------------------------------------------------
+    
+    def sample_for_tests(
+        self,
+        test_type: str,
+        dataset: Any,
+        test_configs: Optional[List[Any]] = None,
+        model: Any = None,
+        options: Optional[Dict[str, Any]] = None,
+    ) -> Sample:
+        """
+        Draw the sample a test adapter should run on.
+        
+        Args:
+            test_type: Adapter name (fairness, explainability, robustness, privacy)
+            dataset: Full test DataFrame
+            test_configs: The adapter's TestConfig objects (sensitive attributes
+                are read from their parameters)
+            model: Model under test, used for boundary scoring
+            options: The test run's ``sampling`` parameters: ``enabled``,
+                ``strategy``, ``sample_size``, ``max_error``, ``confidence``,
+                ``seed`` and ``stratify_by``
+        """
+        options = options or {}
+        confidence = float(options.get('confidence', self.default_confidence))
+        seed = int(options.get('seed', 0))
+        population = len(dataset)
+        
+        if not options.get('enabled', True):
+            return Sample(dataset, 'full', population, population, seed, confidence)
+        
+        if options.get('sample_size'):
+            sample_size = min(population, int(options['sample_size']))
+        elif options.get('max_error'):
+            sample_size = self.required_sample_size(population, float(options['max_error']), confidence)
+        else:
+            sample_size = self.get_sample_size(population, test_type)
+        
+        if sample_size >= population:
+            return Sample(dataset, 'full', population, population, seed, confidence)
+        
+        strategy = options.get('strategy') or self.get_sampling_strategy(test_type)
+        if strategy in ('stratified', 'sensitive'):
+            stratify_by = options.get('stratify_by') or self._sensitive_attributes(test_configs)
+            label = dataset.columns[-1]
+            if (strategy == 'stratified' and dataset.shape[1] > 1
+                    and dataset[label].nunique(dropna=False) <= self.max_label_classes):
+                # Keep outcome rates per group estimable (equal opportunity, equalized odds);
+                # a continuous label would make every row its own stratum
+                stratify_by = list(dict.fromkeys(list(stratify_by) + [label]))
+            return self.stratified_sample(dataset, sample_size, stratify_by, seed, confidence, strategy=strategy)
+        if strategy == 'adversarial':
+            return self.importance_sample(dataset, sample_size, model, seed, confidence)
+        return self.random_sample(dataset, sample_size, seed, confidence)
+    
+    # ------------------------------------------------------------------
+    # Helpers
+    # ------------------------------------------------------------------
+    
+    def _sensitive_attributes(self, test_configs: Optional[List[Any]]) -> List[str]:
+        attributes = []
+        for config in test_configs or []:
+            attribute = (getattr(config, 'parameters', None) or {}).get('sensitive_attribute')
+            for value in attribute if isinstance(attribute, (list, tuple)) else [attribute]:
+                if value and value not in attributes:
+                    attributes.append(value)
+        return attributes
+    
+    def _boundary_scores(self, features, model: Any):
+        """Per-row importance scores and the method used to compute them."""
+        import numpy as np
+
+        if model is not None and hasattr(model, 'predict_proba'):
+            try:
+                proba = np.asarray(model.predict_proba(features))
+                if proba.ndim == 2 and proba.shape[1] >= 2:
+                    top_two = np.sort(proba, axis=1)[:, -2:]
+                    # Small margin between the two most likely classes = near the boundary
+                    return 1.0 - (top_two[:, 1] - top_two[:, 0]) + 1e-6, 'decision_boundary'
+            except Exception as exc:
+                logger.info(f'Boundary scoring unavailable, using feature outliers: {exc}')
+        
+        numeric = features.select_dtypes(include=[np.number])
+        if numeric.shape[1] == 0:
+            return np.ones(len(features)), 'uniform'
+        values = numeric.to_numpy(dtype=float)
+        std = np.nanstd(values, axis=0)
+        std[std == 0] = 1.0
+        distance = np.nan_to_num(np.abs((values - np.nanmean(values, axis=0)) / std)).mean(axis=1)
+        return distance + 1e-6, 'feature_outliers'
+    
+    def _iter_chunks(self, stream: Iterable):
+        """Yield DataFrames from a stream of DataFrames, record batches or records."""
+        import pandas as pd
+
+        pending = []
+        for item in stream:
+            if isinstance(item, pd.DataFrame):
+                if pending:
+                    yield pd.DataFrame(pending)
+                    pending = []
+                yield item
+            elif hasattr(item, 'to_pandas'):
+                yield item.to_pandas()
+            else:
+                pending.append(item)
+                if len(pending) >= 10000:
+                    yield pd.DataFrame(pending)
+                    pending = []
+        if pending:
+            yield pd.DataFrame(pending)
+    
+    def _compact_reservoir(self, parts, slots):
+        """Collapse reservoir parts into one DataFrame in slot-arrival order."""
+        import numpy as np
+        import pandas as pd
+
+        offsets = np.cumsum([0] + [len(part) for part in parts[:-1]])
+        combined = pd.concat(parts)
+        positions = np.sort(offsets[slots[:, 0]] + slots[:, 1])
+        compacted = combined.iloc[positions]
+        return [compacted], np.column_stack([np.zeros(len(positions), dtype=np.int64), np.arange(len(positions))])
 
 
 # Global instances
 performance_monitor = PerformanceMonitor()
+sampling_service = SamplingService()
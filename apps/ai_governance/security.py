@@ -300,11 +300,34 @@ class PIIMaskingService:
         'name': r'\b[A-Z][a-z]+ [A-Z][a-z]+\b',  # Simple name pattern
     }
     
+    # Lookaheads added to detectors in the combined single-pass pattern. In a
+    # single pass the leftmost match wins, so the name detector must not swallow
+    # the start of an email or MAC address that a higher-priority detector masks.
+    COMBINED_PATTERN_GUARDS = {
+        'name': r'(?![A-Za-z0-9._%+-]*@)(?![:-][0-9A-Fa-f]{2}\b)',
+    }
+    
     def __init__(self):
         self.compiled_patterns = {
             key: re.compile(pattern, re.IGNORECASE)
             for key, pattern in self.PII_PATTERNS.items()
         }
+        # All detectors as named alternatives, in PII_PATTERNS priority order,
+        # so masking needs one scan of the text instead of one findall and one
+        # sub per detector.
+        self.combined_pattern = re.compile(
+            '|'.join(
+                f'(?P<{key}>{pattern}{self.COMBINED_PATTERN_GUARDS.get(key, "")})'
+                for key, pattern in self.PII_PATTERNS.items()
+            ),
+            re.IGNORECASE
+        )
+        self._maskers = {
+            'email': self._mask_email,
+            'phone': self._mask_phone,
+            'ssn': self._mask_ssn,
+            'credit_card': self._mask_credit_card,
+        }
     
     def detect_pii(self, text: str) -> Dict[str, List[str]]:
         """Detect PII in text and return found patterns."""
@@ -317,48 +340,88 @@ class PIIMaskingService:
         
         return detected_pii
     
-    def mask_pii(self, text: str, mask_char: str = '*') -> Tuple[str, Dict[str, int]]:
+    def scan_pii(self, text: str, mask_char: str = '*') -> Tuple[str, Dict[str, int], Dict[str, List[str]]]:
         """
-        Mask PII in text and return masked text with count of masked items.
+        Mask PII in a single pass over the text.
+        
+        Returns:
+            Tuple of (masked text, count of masked items per PII type,
+            unique matched values per PII type)
         """
-        masked_text = text
         mask_counts = {}
+        matches = {}
         
-        for pii_type, pattern in self.compiled_patterns.items():
-            matches = pattern.findall(masked_text)
-            if matches:
-                mask_counts[pii_type] = len(matches)
-                
-                # Replace with masked version
-                if pii_type == 'email':
-                    masked_text = pattern.sub(
-                        lambda m: self._mask_email(m.group(), mask_char),
-                        masked_text
-                    )
-                elif pii_type == 'phone':
-                    masked_text = pattern.sub(
-                        lambda m: self._mask_phone(m.group(), mask_char),
-                        masked_text
-                    )
-                elif pii_type == 'ssn':
-                    masked_text = pattern.sub(
-                        lambda m: self._mask_ssn(m.group(), mask_char),
-                        masked_text
-                    )
-                elif pii_type == 'credit_card':
-                    masked_text = pattern.sub(
-                        lambda m: self._mask_credit_card(m.group(), mask_char),
-                        masked_text
-                    )
-                else:
-                    # Generic masking for other PII types
-                    masked_text = pattern.sub(
-                        lambda m: mask_char * len(m.group()),
-                        masked_text
-                    )
+        def replace(match):
+            pii_type = match.lastgroup
+            value = match.group()
+            mask_counts[pii_type] = mask_counts.get(pii_type, 0) + 1
+            matches.setdefault(pii_type, set()).add(value)
+            masker = self._maskers.get(pii_type)
+            if masker:
+                return masker(value, mask_char)
+            # Generic masking for other PII types
+            return mask_char * len(value)
         
+        masked_text = self.combined_pattern.sub(replace, text)
+        return masked_text, mask_counts, {key: sorted(values) for key, values in matches.items()}
+    
+    def mask_pii(self, text: str, mask_char: str = '*') -> Tuple[str, Dict[str, int]]:
+        """
+        Mask PII in text and return masked text with count of masked items.
+        """
+        masked_text, mask_counts, _ = self.scan_pii(text, mask_char)
         return masked_text, mask_counts
     
+    def mask_series(self, series, mask_char: str = '*'):
+        """
+        Mask PII in a pandas Series of strings.
+        
+        Each distinct value is scanned once and the result mapped back, so
+        low-cardinality columns cost one scan per category rather than per row.
+        
+        Returns:
+            Tuple of (masked Series, count of masked items per PII type)
+        """
+        counts = {}
+        is_text = series.map(lambda value: isinstance(value, str))
+        if not is_text.any():
+            return series.copy(), counts
+        
+        frequencies = series[is_text].value_counts()
+        masked_values = {}
+        for value, frequency in frequencies.items():
+            masked_value, mask_counts, _ = self.scan_pii(value, mask_char)
+            masked_values[value] = masked_value
+            for pii_type, count in mask_counts.items():
+                counts[pii_type] = counts.get(pii_type, 0) + count * int(frequency)
+        
+        masked = series.copy()
+        masked[is_text] = series[is_text].map(masked_values)
+        return masked, counts
+    
+    def mask_dataframe(self, df, columns: Optional[List[str]] = None, mask_char: str = '*'):
+        """
+        Mask PII in the string columns of a pandas DataFrame.
+        
+        Args:
+            df: DataFrame to mask (not modified)
+            columns: Columns to mask (defaults to object/string columns)
+            mask_char: Character used for masking
+            
+        Returns:
+            Tuple of (masked DataFrame, {column: count of masked items per PII type})
+        """
+        if columns is None:
+            columns = list(df.select_dtypes(include=['object', 'string']).columns)
+        
+        masked_df = df.copy()
+        column_counts = {}
+        for column in columns:
+            masked_df[column], counts = self.mask_series(df[column], mask_char)
+            if counts:
+                column_counts[column] = counts
+        return masked_df, column_counts
+    
     def _mask_email(self, email: str, mask_char: str) -> str:
         """Mask email address while preserving domain."""
         local, domain = email.split('@', 1)
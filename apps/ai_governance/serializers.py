@@ -141,13 +141,13 @@ class TestRunSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'model_asset', 'model_asset_name', 'dataset_asset', 'dataset_asset_name',
             'test_plan', 'test_plan_name', 'status', 'parameters', 'started_at', 'completed_at',
-            'error_message', 'worker_info', 'contains_pii', 'data_classification',
+            'error_message', 'worker_info', 'sampling', 'contains_pii', 'data_classification',
             'encryption_key_id', 'retention_date', 'organization', 'organization_name',
             'execution_time', 'created_at', 'updated_at', 'created_by', 'updated_by'
         ]
         read_only_fields = [
             'id', 'organization', 'started_at', 'completed_at', 'error_message', 'worker_info',
-            'created_at', 'updated_at', 'created_by', 'updated_by'
+            'sampling', 'created_at', 'updated_at', 'created_by', 'updated_by'
         ]
     
     def get_execution_time(self, obj):
@@ -232,4 +232,14 @@ def log_ai_governance_activity(activity_type, details, user=None, organization=N
         logger.info(f"AI Governance activity logged: {activity_type} by user {user} in organization {organization}")
         
     except Exception as e:
-        logger.warning(f"Failed to log AI governance activity: {str(e)}")
\ No newline at end of file
+        logger.warning(f"Failed to log AI governance activity: {str(e)}")
+
+
+def _track_artifact_files():
+    """Artifact files under MEDIA_ROOT are deduplicated and released like uploaded files."""
+    from core.blobstore import blob_store
+    from .models import EvidenceArtifact
+    blob_store.track(EvidenceArtifact, 'file_path')
+
+
+_track_artifact_files()
@@ -4,7 +4,7 @@ from django.utils import timezone
 import logging
 
 from .signals import log_ai_governance_activity
-from .security import pii_masking_service, encryption_service, data_retention_service
+from .security import encryption_service, data_retention_service
 
 logger = logging.getLogger(__name__)
 
@@ -52,37 +52,57 @@ def load_model_for_testing(model_asset):
         raise
 
 
-def load_dataset_for_testing(dataset_asset):
+def load_dataset_for_testing(dataset_asset, options=None):
     """
     Load a dataset from a DatasetAsset for testing.
     
+    Datasets are served through the columnar dataset store: CSV files are
+    converted to Parquet once per dataset version and memory-mapped on
+    subsequent runs.
+    
     Args:
         dataset_asset: DatasetAsset instance
+        options: Optional dict with ``columns`` (projection), ``filters``
+            (pyarrow DNF predicates), ``sample_size``, ``stratify_by`` and
+            ``seed`` for a deterministic stratified sample. With ``stream``
+            the file is read once in batches into a reservoir of
+            ``sample_size`` rows instead.
         
     Returns:
-        Loaded dataset (X, y) or DataFrame
+        Loaded dataset as a DataFrame (a reservoir sample records its
+        description in ``DataFrame.attrs['sampling']``)
     """
+    from .datasets import dataset_store
+    from .performance import sampling_service
+    
+    options = options or {}
+    columns = options.get('columns')
+    filters = options.get('filters')
+    sample_size = options.get('sample_size')
+    
     try:
-        # This is a placeholder implementation
-        # In practice, you would load the dataset from the path
-        # using pandas, pyarrow, or other appropriate libraries
-        
         logger.info(f"Loading dataset from {dataset_asset.path}")
         
-        if dataset_asset.format == 'csv':
-            # Load CSV dataset
-            import pandas as pd
-            df = pd.read_csv(dataset_asset.path)
-            return df
-            
-        elif dataset_asset.format == 'parquet':
-            # Load Parquet dataset
-            import pandas as pd
-            df = pd.read_parquet(dataset_asset.path)
-            return df
-            
-        else:
-            raise ValueError(f"Unsupported dataset format: {dataset_asset.format}")
+        if options.get('stream'):
+            sample = sampling_service.reservoir_sample(
+                dataset_store.iter_batches(dataset_asset, columns=columns),
+                int(sample_size or sampling_service.max_sample_size),
+                seed=options.get('seed', 0),
+            )
+            sample.data.attrs['sampling'] = sample.describe()
+            return sample.data
+        
+        if sample_size:
+            return dataset_store.stratified_sample(
+                dataset_asset,
+                int(sample_size),
+                stratify_by=options.get('stratify_by'),
+                columns=columns,
+                filters=filters,
+                seed=options.get('seed', 0),
+            )
+        
+        return dataset_store.load(dataset_asset, columns=columns, filters=filters)
             
     except Exception as exc:
         logger.error(f"Failed to load dataset {dataset_asset.id}: {exc}")
@@ -95,9 +115,11 @@ def execute_test_run(self, test_run_id):
     Execute a test run for AI governance with performance monitoring and alerts.
     High priority queue for immediate test execution.
     """
-    from .models import TestRun, TestResult, Metric, EvidenceArtifact
+    from django.db.models import Count, Q
+    from .models import TestRun
+    from .ingestion import ResultIngestionPipeline
     from services.ai.governance_engine.test_executor import TestExecutor, TestExecutionPlan, TestConfig
-    from .performance import performance_monitor, SamplingService
+    from .performance import performance_monitor, sampling_service
     from .alerts import alert_manager
     
     # Apply performance monitoring
@@ -131,10 +153,13 @@ def execute_test_run(self, test_run_id):
             
             # Load model and dataset
             model = load_model_for_testing(test_run.model_asset)
-            dataset = load_dataset_for_testing(test_run.dataset_asset) if test_run.dataset_asset else None
+            dataset = load_dataset_for_testing(
+                test_run.dataset_asset,
+                options=test_run.parameters.get('dataset_options'),
+            ) if test_run.dataset_asset else None
             
             # Apply PII masking to dataset if it contains PII
-            if dataset and test_run.dataset_asset.contains_pii:
+            if dataset is not None and test_run.dataset_asset.contains_pii:
                 logger.info(f"Dataset {test_run.dataset_asset.name} contains PII, applying masking")
                 # In a real implementation, you would mask the dataset here
                 # For now, we'll just log the action
@@ -154,73 +179,75 @@ def execute_test_run(self, test_run_id):
                     )
                     test_configs.append(test_config)
             
-            # Execute tests using the test executor
-            executor = TestExecutor()
-            execution_plan = TestExecutionPlan(
-                model_asset_id=str(test_run.model_asset.id),
-                dataset_asset_id=str(test_run.dataset_asset.id) if test_run.dataset_asset else None,
-                test_configs=test_configs,
-                execution_parameters=test_run.parameters
-            )
+            # Each adapter runs on a sample chosen for its test type; the
+            # strategy, seed and error bounds are recorded on the run
+            sampling_options = test_run.parameters.get('sampling') or {}
+            sampling_record = {
+                'options': sampling_options,
+                'adapters': dict((test_run.sampling or {}).get('adapters', {})),
+            }
+            if dataset is not None and dataset.attrs.get('sampling'):
+                sampling_record['source'] = dataset.attrs['sampling']
             
-            # Execute the test plan
-            test_results = executor.execute_test_plan(
-                execution_plan,
-                model=model,
-                dataset=dataset
-            )
+            def sample_for_adapter(adapter_name, data, configs, model_under_test):
+                sample = sampling_service.sample_for_tests(
+                    adapter_name, data, configs, model=model_under_test, options=sampling_options
+                )
+                info = sample.describe()
+                sampling_record['adapters'][adapter_name] = info
+                logger.info(
+                    f"Test run {test_run_id} {adapter_name}: {info['strategy']} sample of "
+                    f"{info['sample_size']}/{info['population_size']} rows (±{info['margin_of_error']:.3f})"
+                )
+                return sample.data, info
             
-            # Save results to database
-            for result in test_results:
-                # Apply PII masking to test result summary if needed
-                summary_data = {
-                    'status': result.status.value,
-                    'score': result.score,
-                    'execution_time': result.execution_time,
-                    'metadata': result.metadata
-                }
-                
-                # Check if summary contains PII and mask if necessary
-                if test_run.contains_pii or test_run.dataset_asset.contains_pii if test_run.dataset_asset else False:
-                    summary_str = str(summary_data)
-                    masked_summary, mask_counts = pii_masking_service.mask_pii(summary_str)
-                    if mask_counts:
-                        logger.info(f"Masked PII in test result summary: {mask_counts}")
-                        # In a real implementation, you would parse the masked summary back to dict
-                
-                # Create TestResult record
-                test_result = TestResult.objects.create(
-                    test_run=test_run,
-                    test_name=result.test_name,
-                    summary=summary_data,
-                    passed=result.passed
+            # Skip tests persisted or checkpointed by a previous attempt of this run
+            pipeline = ResultIngestionPipeline(test_run)
+            pending_configs = pipeline.pending_configs(test_configs)
+            if len(pending_configs) < len(test_configs):
+                logger.info(
+                    f"Resuming test run {test_run_id}: {len(test_configs) - len(pending_configs)} "
+                    f"of {len(test_configs)} tests already completed"
+                )
+            
+            # Execute tests using the test executor
+            if pending_configs:
+                executor = TestExecutor()
+                execution_plan = TestExecutionPlan(
+                    model_asset_id=str(test_run.model_asset.id),
+                    dataset_asset_id=str(test_run.dataset_asset.id) if test_run.dataset_asset else None,
+                    test_configs=pending_configs,
+                    execution_parameters=test_run.parameters
                 )
                 
-                # Create Metric records
-                for metric_name, metric_value in result.metrics.items():
-                    Metric.objects.create(
-                        test_result=test_result,
-                        name=metric_name,
-                        value=metric_value,
-                        passed=result.passed
-                    )
-                
-                # Create EvidenceArtifact records
-                for artifact_path in result.artifacts:
-                    EvidenceArtifact.objects.create(
-                        test_run=test_run,
-                        artifact_type='other',  # Could be determined from file extension
-                        file_path=artifact_path
-                    )
+                # Execute the test plan, checkpointing each adapter's results
+                test_results = executor.execute_test_plan(
+                    execution_plan,
+                    model=model,
+                    dataset=dataset,
+                    result_callback=pipeline.checkpoint,
+                    sampler=sample_for_adapter
+                )
+                # Include fallback results for adapters that failed outright
+                pipeline.checkpoint(test_results)
+            
+            # Save results, metrics and artifacts in one transaction
+            ingestion_counts = pipeline.flush()
+            logger.info(f"Persisted results for test run {test_run_id}: {ingestion_counts}")
             
             # Mark as completed
+            test_run.sampling = sampling_record
             test_run.status = 'completed'
             test_run.completed_at = timezone.now()
             test_run.save()
             
             # Log test execution completion
-            passed_tests = sum(1 for result in test_results if result.passed)
-            total_tests = len(test_results)
+            totals = test_run.results.aggregate(
+                total=Count('id'),
+                passed=Count('id', filter=Q(passed=True))
+            )
+            passed_tests = totals['passed']
+            total_tests = totals['total']
             
             log_ai_governance_activity(
                 activity_type='test_execution_completed',
@@ -240,7 +267,7 @@ def execute_test_run(self, test_run_id):
             # Trigger webhooks
             trigger_webhooks.delay(test_run_id, 'test_run.completed')
             
-            return f"Test run {test_run_id} completed successfully with {len(test_results)} results"
+            return f"Test run {test_run_id} completed successfully with {total_tests} results"
             
         except Exception as exc:
             logger.error(f"Test run {test_run_id} failed: {exc}")
@@ -312,7 +339,7 @@ def trigger_webhooks(test_run_id, event_type):
             logger.warning(f"Unknown webhook event type: {event_type}")
             return
         
-        logger.info(f"Webhook results for {event_type}: {results['sent']} sent, {results['failed']} failed")
+        logger.info(f"Webhook results for {event_type}: {results['queued']} queued, {results['failed']} failed")
         
         if results['errors']:
             logger.error(f"Webhook errors: {results['errors']}")
@@ -321,6 +348,75 @@ def trigger_webhooks(test_run_id, event_type):
         logger.error(f"Failed to trigger webhooks for test run {test_run_id}: {exc}")
 
 
+WEBHOOK_DISPATCH_KEY = 'ai_gov_webhook_dispatch'
+
+
+def schedule_webhook_dispatch(countdown=0):
+    """
+    Queue ``dispatch_webhook_deliveries`` unless a run is already queued at
+    or before that time.
+    
+    The queued run is recorded in the cache with a token; only the run that
+    holds the current token re-arms itself, so there is at most one
+    dispatcher chain however many events queue deliveries.
+    
+    Returns:
+        bool: Whether a run was queued
+    """
+    import time
+    import uuid
+    from django.core.cache import cache
+    
+    eta = time.time() + countdown
+    scheduled = cache.get(WEBHOOK_DISPATCH_KEY)
+    if scheduled and scheduled['eta'] <= eta + 1:
+        return False
+    token = uuid.uuid4().hex
+    # Outlive the countdown so a backlogged worker still finds its token
+    cache.set(WEBHOOK_DISPATCH_KEY, {'eta': eta, 'token': token}, countdown + 600)
+    dispatch_webhook_deliveries.apply_async(kwargs={'token': token}, countdown=countdown)
+    return True
+
+
+@shared_task(queue='ai_governance_high')
+def dispatch_webhook_deliveries(token=None):
+    """
+    Send due webhook deliveries concurrently and schedule the next retry pass.
+    
+    Args:
+        token (str): Scheduling token from ``schedule_webhook_dispatch``; a run
+            whose token has been superseded by an earlier one exits at once
+    """
+    from django.core.cache import cache
+    from .webhook_dispatcher import webhook_dispatcher
+    
+    scheduled = cache.get(WEBHOOK_DISPATCH_KEY)
+    if token is not None and scheduled and scheduled['token'] != token:
+        return {'superseded': True}
+    # Deliveries queued from now on need a new run
+    cache.delete(WEBHOOK_DISPATCH_KEY)
+    
+    try:
+        summary = webhook_dispatcher.process_due()
+        logger.info(
+            f"Webhook dispatch: {summary['sent']} sent, {summary['retried']} retrying, "
+            f"{summary['failed']} failed, {summary['deferred']} deferred (circuit open)"
+        )
+        
+        # Re-arm for the next due delivery (retries and deferred circuits)
+        next_due_in = webhook_dispatcher.next_due_in()
+        if next_due_in is not None:
+            schedule_webhook_dispatch(countdown=max(1, int(next_due_in)))
+        
+        return summary
+        
+    except Exception as exc:
+        logger.error(f"Failed to dispatch webhook deliveries: {exc}")
+        # The run key is gone, so nothing else would re-arm the chain until the next enqueue
+        schedule_webhook_dispatch(countdown=getattr(settings, 'WEBHOOK_DISPATCH_ERROR_BACKOFF', 60))
+        raise
+
+
 @shared_task(queue='ai_governance_bulk')
 def cleanup_old_test_runs(days_old=30):
     """
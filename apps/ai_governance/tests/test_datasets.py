@@ -0,0 +1,96 @@
+# apps/ai_governance/tests/test_datasets.py
+
+import shutil
+import tempfile
+from datetime import datetime, timedelta, timezone as dt_timezone
+from pathlib import Path
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ai_governance.datasets import DatasetStore, allocate_strata
+
+
+class AllocateStrataTests(SimpleTestCase):
+    def test_total_never_exceeds_sample_size(self):
+        allocation = allocate_strata([3] * 270, 100, rng=np.random.default_rng(0))
+        self.assertEqual(allocation.sum(), 100)
+        self.assertEqual(allocation.max(), 1)
+
+        allocation = allocate_strata([100] * 100, 1000, min_per_stratum=30)
+        self.assertEqual(allocation.tolist(), [10] * 100)
+
+        allocation = allocate_strata([5000, 5000, 20], 600, min_per_stratum=30)
+        self.assertEqual(allocation.tolist(), [290, 290, 20])
+        self.assertEqual(allocate_strata([4, 0, 2], 50).tolist(), [4, 0, 2])
+
+    def test_surplus_strata_are_picked_by_size_without_rng(self):
+        self.assertEqual(allocate_strata([1, 9, 5, 7], 2).tolist(), [0, 1, 0, 1])
+
+
+class DatasetStoreSamplingTests(SimpleTestCase):
+    def setUp(self):
+        self.workdir = Path(tempfile.mkdtemp(prefix='dataset-store-test-'))
+        self.addCleanup(shutil.rmtree, self.workdir)
+        rng = np.random.default_rng(0)
+        rows = 5000
+        frame = pd.DataFrame({
+            'age': rng.integers(18, 80, size=rows),
+            # 300 postcodes, most rarer than one row per sample slot
+            'postcode': rng.integers(0, 300, size=rows),
+            'group': rng.choice(['a', 'b', 'c'], size=rows, p=[0.6, 0.38, 0.02]),
+        })
+        path = self.workdir / 'people.csv'
+        frame.to_csv(path, index=False)
+        self.frame = frame
+        self.asset = SimpleNamespace(pk=1, organization_id=None, path=str(path), format='csv')
+        self.store = DatasetStore()
+        self.store.cache_dir = self.workdir / 'cache'
+
+    def test_stratified_sample_size_is_exact_with_many_strata(self):
+        sample = self.store.stratified_sample(self.asset, 100, stratify_by=['postcode'])
+        self.assertEqual(len(sample), 100)
+        self.assertEqual(sample['postcode'].nunique(), 100)
+
+        sample = self.store.stratified_sample(self.asset, 300, stratify_by=['group'])
+        self.assertEqual(len(sample), 300)
+        self.assertEqual(set(sample['group']), {'a', 'b', 'c'})
+
+    def test_filters_are_applied_before_sampling(self):
+        sample = self.store.stratified_sample(
+            self.asset, 200, stratify_by=['group'], filters=[('age', '>=', 65)],
+        )
+        self.assertEqual(len(sample), 200)
+        self.assertTrue((sample['age'] >= 65).all())
+
+        eligible = int((self.frame['age'] >= 65).sum())
+        everything = self.store.sample_indices(self.asset, 10 ** 6, filters=[('age', '>=', 65)])
+        self.assertEqual(len(everything), eligible)
+
+    def test_seed_makes_samples_reproducible_and_cached(self):
+        first = self.store.sample_indices(self.asset, 250, stratify_by=['group'], seed=7)
+        self.assertEqual(self.store.hits, 0)
+        again = self.store.sample_indices(self.asset, 250, stratify_by=['group'], seed=7)
+        self.assertEqual(self.store.hits, 1)
+        np.testing.assert_array_equal(first, again)
+
+        fresh = DatasetStore()
+        fresh.cache_dir = self.workdir / 'other-cache'
+        np.testing.assert_array_equal(fresh.sample_indices(self.asset, 250, stratify_by=['group'], seed=7), first)
+        other = self.store.sample_indices(self.asset, 250, stratify_by=['group'], seed=8)
+        self.assertFalse(np.array_equal(first, other))
+
+    def test_version_falls_back_to_storage_for_remote_paths(self):
+        remote = SimpleNamespace(pk=2, organization_id=None, path='datasets/people.csv', format='csv')
+        modified = datetime(2024, 1, 1, tzinfo=dt_timezone.utc)
+        with patch('ai_governance.datasets.default_storage') as storage:
+            storage.size.return_value = 1024
+            storage.get_modified_time.return_value = modified
+            first = self.store.dataset_version(remote)
+            storage.get_modified_time.return_value = modified + timedelta(seconds=1)
+            second = self.store.dataset_version(remote)
+        storage.size.assert_called_with('datasets/people.csv')
+        self.assertNotEqual(first, second)
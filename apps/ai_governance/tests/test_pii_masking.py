@@ -0,0 +1,59 @@
+# apps/ai_governance/tests/test_pii_masking.py
+
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ai_governance.security import PIIMaskingService
+
+
+class PIIMaskingServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.service = PIIMaskingService()
+
+    def test_replacement_tokens(self):
+        cases = {
+            'mail: jane.doe@example.com.': 'mail: j******e@example.com.',
+            'call: 555-123-4567.': 'call: (***) ***-****.',
+            'ssn: 123-45-6789.': 'ssn: ***-**-****.',
+            'card: 4111 1111 1111 1111.': 'card: ************1111.',
+            'host: 192.168.0.1.': 'host: ***********.',
+            'nic: 00:1A:2B:3C:4D:5E.': 'nic: *****************.',
+            'owner: Jane Doe.': 'owner: ********.',
+        }
+        for text, expected in cases.items():
+            masked, _ = self.service.mask_pii(text)
+            self.assertEqual(masked, expected, text)
+
+    def test_detection_counts(self):
+        text = 'a@b.co, c@d.org; 555-123-4567 / 123-45-6789 / 10.0.0.1 10.0.0.2'
+        _, counts = self.service.mask_pii(text)
+        self.assertEqual(counts, {'email': 2, 'phone': 1, 'ssn': 1, 'ip_address': 2})
+
+    def test_name_does_not_swallow_email_local_part(self):
+        masked, counts = self.service.mask_pii('email jane.doe@example.com')
+        self.assertEqual(masked, 'email j******e@example.com')
+        self.assertEqual(counts, {'email': 1})
+
+    def test_scan_returns_unique_matches(self):
+        _, _, matches = self.service.scan_pii('x@y.com and x@y.com and 1.2.3.4')
+        self.assertEqual(matches, {'email': ['x@y.com'], 'ip_address': ['1.2.3.4']})
+
+    def test_custom_mask_char(self):
+        masked, _ = self.service.mask_pii('ssn 123-45-6789', mask_char='#')
+        self.assertEqual(masked, 'ssn ###-##-####')
+
+    def test_mask_dataframe_matches_per_cell_masking(self):
+        df = pd.DataFrame({
+            'contact': ['a@b.co', 'a@b.co', None, '555-123-4567'],
+            'score': [1.0, 2.0, 3.0, 4.0],
+        })
+        masked, counts = self.service.mask_dataframe(df)
+
+        expected = [self.service.mask_pii(v)[0] if isinstance(v, str) else v for v in df['contact']]
+        self.assertEqual(masked['contact'].tolist()[:2] + masked['contact'].tolist()[3:],
+                         expected[:2] + expected[3:])
+        self.assertTrue(pd.isna(masked['contact'][2]))
+        self.assertEqual(counts, {'contact': {'email': 2, 'phone': 1}})
+        self.assertEqual(masked['score'].tolist(), df['score'].tolist())
+        # The input frame is left untouched
+        self.assertEqual(df['contact'][0], 'a@b.co')
@@ -0,0 +1,120 @@
+# apps/ai_governance/tests/test_sampling.py
+
+import numpy as np
+import pandas as pd
+from django.test import SimpleTestCase
+
+from ai_governance.performance import SamplingService
+
+
+class _Config:
+    def __init__(self, **parameters):
+        self.parameters = parameters
+
+
+class _BoundaryModel:
+    """Predicts p(positive) from the first feature, uncertain around x=0."""
+
+    def predict_proba(self, X):
+        p = 1 / (1 + np.exp(-4 * X.iloc[:, 0].to_numpy()))
+        return np.column_stack([1 - p, p])
+
+
+def _frame(rows=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    return pd.DataFrame({
+        'x': rng.normal(size=rows),
+        'gender': rng.choice(['f', 'm', 'x'], size=rows, p=[0.49, 0.49, 0.02]),
+        'label': rng.integers(0, 2, size=rows),
+    })
+
+
+class SamplingServiceTests(SimpleTestCase):
+    def setUp(self):
+        self.service = SamplingService()
+        self.service.min_stratum_size = 30
+
+    def test_margin_of_error_and_required_size_agree(self):
+        n = self.service.required_sample_size(1_000_000, 0.02)
+        self.assertAlmostEqual(n, 2396, delta=2)
+        self.assertLessEqual(self.service.margin_of_error(n, 1_000_000), 0.02)
+        self.assertEqual(self.service.margin_of_error(100, 100), 0.0)
+
+    def test_random_sample_is_reproducible(self):
+        df = _frame()
+        first = self.service.random_sample(df, 500, seed=7)
+        second = self.service.random_sample(df, 500, seed=7)
+        self.assertEqual(first.data.index.tolist(), second.data.index.tolist())
+        self.assertEqual(first.describe()['strategy'], 'random')
+        self.assertGreater(first.margin_of_error, 0)
+
+    def test_stratified_sample_keeps_small_groups(self):
+        df = _frame()
+        sample = self.service.stratified_sample(df, 600, ['gender'], seed=1)
+
+        self.assertEqual(sample.sample_size, 600)
+        counts = sample.data['gender'].value_counts()
+        self.assertGreaterEqual(counts['x'], 30)
+        self.assertEqual(set(sample.details['strata']), {'f', 'm', 'x'})
+        # Design weights reproduce the stratum populations
+        weighted = sample.weights.groupby(sample.data['gender']).sum()
+        expected = df['gender'].value_counts()
+        for group in ['f', 'm', 'x']:
+            self.assertAlmostEqual(weighted[group], expected[group], places=6)
+
+    def test_fairness_tests_stratify_on_sensitive_attribute_and_label(self):
+        df = _frame()
+        sample = self.service.sample_for_tests(
+            'fairness', df, [_Config(sensitive_attribute='gender')], options={'sample_size': 900}
+        )
+        self.assertEqual(sample.strategy, 'stratified')
+        self.assertEqual(sample.details['stratify_by'], ['gender', 'label'])
+
+    def test_importance_sample_concentrates_on_decision_boundary(self):
+        df = _frame()
+        sample = self.service.importance_sample(df, 1000, model=_BoundaryModel(), seed=3)
+
+        self.assertEqual(sample.details['scoring'], 'decision_boundary')
+        self.assertLess(sample.data['x'].abs().median(), df['x'].abs().median())
+        # Inverse-probability weights keep the population mean estimable
+        estimate = np.average(sample.data['x'] > 0, weights=sample.weights)
+        self.assertAlmostEqual(estimate, (df['x'] > 0).mean(), delta=0.05)
+
+    def test_reservoir_sample_of_stream_is_uniform(self):
+        df = pd.DataFrame({'value': np.arange(100_000)})
+        chunks = (df.iloc[start:start + 7000] for start in range(0, len(df), 7000))
+        sample = self.service.reservoir_sample(chunks, 2000, seed=11)
+
+        self.assertEqual(sample.population_size, 100_000)
+        self.assertEqual(len(sample.data), 2000)
+        self.assertEqual(sample.data['value'].nunique(), 2000)
+        self.assertAlmostEqual(sample.data['value'].mean(), 50_000, delta=2500)
+
+    def test_small_dataset_and_disabled_sampling_run_in_full(self):
+        df = _frame(rows=200)
+        self.assertEqual(self.service.sample_for_tests('robustness', df).strategy, 'full')
+        big = _frame()
+        sample = self.service.sample_for_tests('robustness', big, options={'enabled': False})
+        self.assertEqual(sample.sample_size, len(big))
+
+    def test_stratum_floors_shrink_to_fit_the_sample(self):
+        df = pd.DataFrame({'group': np.repeat(np.arange(100), 100), 'label': 0})
+        sample = self.service.stratified_sample(df, 1000, ['group'], seed=2)
+        self.assertEqual(sample.sample_size, 1000)
+        self.assertEqual(len(sample.data), 1000)
+        self.assertEqual(sample.data['group'].value_counts().tolist(), [10] * 100)
+
+        many = pd.DataFrame({'group': np.arange(5000) % 2500, 'label': 0})
+        sample = self.service.stratified_sample(many, 300, ['group'], seed=2)
+        self.assertEqual(len(sample.data), 300)
+        self.assertEqual(sample.details['unsampled_strata'], 2200)
+
+    def test_continuous_label_is_not_a_stratum(self):
+        df = _frame().rename(columns={'label': 'outcome'})
+        df['score'] = np.random.default_rng(5).random(len(df))
+        sample = self.service.sample_for_tests(
+            'fairness', df, [_Config(sensitive_attribute='gender')],
+            options={'sample_size': 1000, 'strategy': 'stratified'},
+        )
+        self.assertEqual(sample.details['stratify_by'], ['gender'])
+        self.assertEqual(len(sample.data), 1000)
@@ -0,0 +1,234 @@
+# apps/ai_governance/tests/test_webhook_dispatcher.py
+
+import hashlib
+import hmac
+import json
+import threading
+from datetime import timedelta
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import SimpleTestCase, override_settings
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+
+from ai_governance.models import WebhookDelivery, WebhookSubscription
+from ai_governance.tasks import WEBHOOK_DISPATCH_KEY, dispatch_webhook_deliveries, schedule_webhook_dispatch
+from ai_governance.webhook_dispatcher import CircuitBreaker, DeliveryJob, WebhookDispatcher
+from ai_governance.webhook_service import WebhookService
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    """Records requests and answers with the status configured on the server."""
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        self.server.received.append((self.path, dict(self.headers), body))
+        self.send_response(self.server.status_for(self.path))
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+class StubWebhookServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _StubHandler)
+        self.received = []
+        self.failing_paths = set()
+
+    def status_for(self, path):
+        return 500 if path in self.failing_paths else 200
+
+    def url(self, path='/hook'):
+        return f'http://127.0.0.1:{self.server_address[1]}{path}'
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'webhook-tests'}},
+    WEBHOOK_TIMEOUT=5,
+)
+class WebhookDispatcherTests(SimpleTestCase):
+    def setUp(self):
+        self.server = StubWebhookServer()
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.dispatcher = WebhookDispatcher(
+            concurrency=8,
+            circuit_breaker=CircuitBreaker(failure_threshold=2, cooldown=60),
+        )
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.server.server_close()
+        cache.clear()
+
+    def test_concurrent_delivery_to_all_subscribers(self):
+        jobs = [DeliveryJob(i, self.server.url(f'/hook/{i}'), b'{}') for i in range(50)]
+        outcomes = self.dispatcher.deliver(jobs)
+        self.assertEqual([o.delivery_id for o in outcomes], list(range(50)))
+        self.assertTrue(all(o.success for o in outcomes))
+        self.assertEqual(len(self.server.received), 50)
+
+    def test_signature_matches_sent_body(self):
+        payload = {'b': 2, 'a': {'nested': True}}
+        secret = 'top-secret'
+        signature = WebhookService()._generate_signature(payload, secret)
+        body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        headers = {'Content-Type': 'application/json', 'X-Webhook-Signature': f'sha256={signature}'}
+
+        self.dispatcher.deliver([DeliveryJob(1, self.server.url(), body, headers)])
+
+        _, received_headers, received_body = self.server.received[0]
+        expected = hmac.new(secret.encode(), received_body, hashlib.sha256).hexdigest()
+        self.assertEqual(received_headers['X-Webhook-Signature'], f'sha256={expected}')
+
+    def test_circuit_opens_after_consecutive_failures(self):
+        self.server.failing_paths.add('/down')
+        url = self.server.url('/down')
+        for i in range(2):
+            outcome = self.dispatcher.send(DeliveryJob(i, url, b'{}'))
+            self.assertFalse(outcome.success)
+            self.assertEqual(outcome.status_code, 500)
+
+        outcome = self.dispatcher.send(DeliveryJob(3, url, b'{}'))
+        self.assertTrue(outcome.circuit_open)
+        self.assertEqual(len(self.server.received), 2)
+
+        # Other endpoints are unaffected by the open circuit
+        self.assertTrue(self.dispatcher.send(DeliveryJob(4, self.server.url('/up'), b'{}')).success)
+
+    def test_success_resets_failure_count(self):
+        url = self.server.url('/flaky')
+        self.server.failing_paths.add('/flaky')
+        self.dispatcher.send(DeliveryJob(1, url, b'{}'))
+        self.server.failing_paths.clear()
+        self.dispatcher.send(DeliveryJob(2, url, b'{}'))
+        self.assertEqual(self.dispatcher.circuit_breaker.state(url)['failures'], 0)
+
+    def test_backoff_grows_exponentially_with_jitter(self):
+        self.dispatcher.backoff_base = 10
+        self.dispatcher.max_retries = 1
+        self.dispatcher.backoff_max = 1000
+        for attempts, ceiling in [(1, 10), (2, 20), (3, 40), (10, 1000)]:
+            delay = self.dispatcher.backoff_delay(attempts)
+            self.assertGreaterEqual(delay, ceiling / 2)
+            self.assertLessEqual(delay, ceiling)
+
+    def test_half_open_circuit_lets_a_single_probe_through(self):
+        self.server.failing_paths.add('/down')
+        url = self.server.url('/down')
+        breaker = self.dispatcher.circuit_breaker
+        for i in range(2):
+            self.dispatcher.send(DeliveryJob(i, url, b'{}'))
+        self.assertGreater(breaker.retry_after(url), 0)
+
+        # Cooldown over: one delivery probes, the rest keep waiting
+        cache.delete(breaker._key(url, 'opened_at'))
+        outcomes = self.dispatcher.deliver([DeliveryJob(i, url, b'{}') for i in range(10, 20)])
+        self.assertEqual(sum(not outcome.circuit_open for outcome in outcomes), 1)
+        self.assertEqual(len(self.server.received), 3)
+        # The failed probe re-opened the circuit
+        self.assertAlmostEqual(breaker.retry_after(url), 60, delta=2)
+
+        cache.delete(breaker._key(url, 'opened_at'))
+        self.server.failing_paths.clear()
+        self.assertTrue(self.dispatcher.send(DeliveryJob(30, url, b'{}')).success)
+        self.assertEqual(breaker.state(url), {'failures': 0, 'opened_at': 0.0})
+        self.assertTrue(self.dispatcher.send(DeliveryJob(31, url, b'{}')).success)
+
+    def test_concurrent_failures_are_all_counted(self):
+        breaker = CircuitBreaker(failure_threshold=1000, cooldown=60)
+        url = 'http://example.invalid/hook'
+        threads = [threading.Thread(target=lambda: [breaker.record_failure(url) for _ in range(50)]) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(breaker.state(url)['failures'], 400)
+
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'webhook-tests'}},
+    WEBHOOK_TIMEOUT=5,
+)
+class WebhookQueueTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Webhook Org'
+        tenant.code = 'WEBHOOKS'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        self.server = StubWebhookServer()
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        self.addCleanup(self.server.server_close)
+        self.addCleanup(self.server.shutdown)
+        self.addCleanup(cache.clear)
+        # One at a time, so the order of outcomes is deterministic
+        self.dispatcher = WebhookDispatcher(concurrency=1, circuit_breaker=CircuitBreaker(failure_threshold=3, cooldown=60))
+        self.dispatcher.backoff_base = 10
+        self.dispatcher.max_retries = 1
+
+    def _deliveries(self, path, count):
+        subscription = WebhookSubscription.objects.create(
+            organization=self.tenant, url='https://8.8.8.8/hook', events=['test_run.completed'],
+        )
+        # Point at the local stub, which save() validation rejects as a loopback target
+        WebhookSubscription.objects.filter(pk=subscription.pk).update(url=self.server.url(path))
+        return [
+            WebhookDelivery.objects.create(
+                organization=self.tenant, subscription=subscription, event_type='test_run.completed',
+                payload={'n': n},
+            )
+            for n in range(count)
+        ]
+
+    def test_process_due_sends_retries_and_defers(self):
+        sent = self._deliveries('/up', 2)
+        self.server.failing_paths.add('/down')
+        failing = self._deliveries('/down', 4)
+        WebhookDelivery.objects.filter(pk=failing[0].pk).update(attempts=1)
+
+        summary = self.dispatcher.process_due()
+        # The first failure exhausts its retries, three failures open the circuit
+        self.assertEqual(summary, {'sent': 2, 'retried': 2, 'failed': 1, 'deferred': 1})
+        self.assertTrue(all(d.status == 'succeeded' for d in WebhookDelivery.objects.filter(pk__in=[d.pk for d in sent])))
+        failing[0].refresh_from_db()
+        self.assertEqual(failing[0].status, 'failed')
+
+        # Nothing is due until the retry/cooldown times pass
+        self.assertEqual(self.dispatcher.process_due(), {'sent': 0, 'retried': 0, 'failed': 0, 'deferred': 0})
+        self.assertGreater(self.dispatcher.next_due_in(), 0)
+
+        WebhookDelivery.objects.filter(status='pending').update(next_attempt_at=timezone.now() - timedelta(seconds=1))
+        cache.delete(self.dispatcher.circuit_breaker._key(self.server.url('/down'), 'opened_at'))
+        self.server.failing_paths.clear()
+        # Half-open: the first delivery probes, its success closes the circuit for the rest
+        self.assertEqual(self.dispatcher.process_due()['sent'], 3)
+        self.assertFalse(WebhookDelivery.objects.filter(status='pending').exists())
+
+    def test_only_one_dispatcher_chain_is_queued(self):
+        with mock.patch('ai_governance.tasks.dispatch_webhook_deliveries.apply_async') as apply_async:
+            self.assertTrue(schedule_webhook_dispatch(countdown=300))
+            self.assertFalse(schedule_webhook_dispatch(countdown=600))
+            # An earlier run supersedes the queued one
+            self.assertTrue(schedule_webhook_dispatch())
+            self.assertFalse(schedule_webhook_dispatch())
+        self.assertEqual(apply_async.call_count, 2)
+        stale_token = apply_async.call_args_list[0].kwargs['kwargs']['token']
+        self.assertEqual(dispatch_webhook_deliveries(token=stale_token), {'superseded': True})
+
+    def test_failed_run_re_arms_the_chain(self):
+        with mock.patch('ai_governance.tasks.dispatch_webhook_deliveries.apply_async') as apply_async, \
+                mock.patch('ai_governance.webhook_dispatcher.webhook_dispatcher.process_due',
+                           side_effect=RuntimeError('database went away')):
+            with self.assertRaises(RuntimeError):
+                dispatch_webhook_deliveries()
+        apply_async.assert_called_once()
+        self.assertEqual(apply_async.call_args.kwargs['countdown'], 60)
+        self.assertIsNotNone(cache.get(WEBHOOK_DISPATCH_KEY))
@@ -9,6 +9,8 @@ from rest_framework.decorators import action, api_view, permission_classes
 from rest_framework.response import Response
 from django.core.exceptions import PermissionDenied
 
+from core.dashboard import DashboardMetrics
+from core.periods import PeriodFilter
 from core.mixins.organization import OrganizationScopedQuerysetMixin
 from core.mixins.permissions import OrganizationPermissionMixin
 from users.permissions import IsOrgAdmin, IsOrgManagerOrReadOnly, IsOrgStaffOrReadOnly
@@ -69,18 +71,8 @@ class GovernanceDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, T
         if not org:
             raise PermissionDenied("Organization context is required")
         # --- Period Filter Logic (aligned with Audit) ---
-        from django.utils import timezone
-        import calendar
         from django.db.models import Q
-        org_created = getattr(org, 'created_at', timezone.now()).date()
-        today = timezone.now().date()
-        years = list(range(org_created.year, today.year + 1))
-        months = [(i, calendar.month_name[i]) for i in range(1, 13)]
-        selected_years = self.request.GET.getlist('year') or [str(today.year)]
-        selected_months = self.request.GET.getlist('month')
-        filter_all = 'All' in selected_years
-        year_ints = [int(y) for y in selected_years if y.isdigit()]
-        month_ints = [int(m) for m in selected_months if m.isdigit()]
+        period = PeriodFilter.from_request(self.request, org)
         
         # Use performance monitoring for metrics
         from .performance import MetricsCollector
@@ -104,39 +96,22 @@ class GovernanceDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, T
         @performance_monitor.monitor_query_performance('dashboard_recent_test_runs')
         def get_recent_test_runs():
             qs = TestRun.objects.filter(organization=org).select_related('model_asset', 'test_plan')
-            if not filter_all:
-                tq = Q(created_at__year__in=year_ints)
-                if month_ints:
-                    tq &= Q(created_at__month__in=month_ints)
-                qs = qs.filter(tq)
-            return qs.order_by('-created_at')[:10]
+            return period.filter(qs, 'created_at').order_by('-created_at')[:10]
         
         context['recent_test_runs'] = get_recent_test_runs()
         
         # Get test results by category (with performance monitoring)
         @performance_monitor.monitor_query_performance('dashboard_test_categories')
         def get_test_categories():
-            recent_results = TestResult.objects.filter(test_run__organization=org)
-            if not filter_all:
-                rq = Q(test_run__created_at__year__in=year_ints)
-                if month_ints:
-                    rq &= Q(test_run__created_at__month__in=month_ints)
-                recent_results = recent_results.filter(rq)
+            rq = period.q('test_run__created_at', TestResult)
             
-            return {
-                'fairness_passed': recent_results.filter(
-                    test_name__startswith='demographic_parity'
-                ).filter(passed=True).count(),
-                'explainability_passed': recent_results.filter(
-                    test_name__startswith='shap_'
-                ).filter(passed=True).count(),
-                'robustness_passed': recent_results.filter(
-                    test_name__startswith='adversarial_'
-                ).filter(passed=True).count(),
-                'privacy_passed': recent_results.filter(
-                    test_name__startswith='membership_'
-                ).filter(passed=True).count()
-            }
+            categories = DashboardMetrics()
+            categories.source(TestResult.objects.filter(test_run__organization=org)) \
+                .count('fairness_passed', rq & Q(test_name__startswith='demographic_parity', passed=True)) \
+                .count('explainability_passed', rq & Q(test_name__startswith='shap_', passed=True)) \
+                .count('robustness_passed', rq & Q(test_name__startswith='adversarial_', passed=True)) \
+                .count('privacy_passed', rq & Q(test_name__startswith='membership_', passed=True))
+            return categories.evaluate()
         
         test_categories = get_test_categories()
         context.update(test_categories)
@@ -152,17 +127,19 @@ class GovernanceDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, T
         context['available_test_plans'] = TestPlan.objects.filter(organization=org)
 
         # Get counts for dashboard management cards
-        context['total_datasets'] = DatasetAsset.objects.filter(organization=org).count()
-        context['total_test_plans'] = TestPlan.objects.filter(organization=org).count()
-        context['total_test_results'] = TestResult.objects.filter(organization=org).count()
-        context['total_frameworks'] = Framework.objects.filter(organization=org).count()
-        context['total_clauses'] = Clause.objects.filter(organization=org).count()
-        context['total_mappings'] = ComplianceMapping.objects.filter(organization=org).count()
-        context['total_artifacts'] = EvidenceArtifact.objects.filter(organization=org).count()
-        context['total_connectors'] = ConnectorConfig.objects.filter(organization=org).count()
-        context['total_webhooks'] = WebhookSubscription.objects.filter(organization=org).count()
-        context['total_metrics'] = Metric.objects.filter(organization=org).count()
-        context['total_risk_assessments'] = ModelRiskAssessment.objects.filter(organization=org).count()
+        cards = DashboardMetrics()
+        cards.source(DatasetAsset.objects.filter(organization=org)).count('total_datasets')
+        cards.source(TestPlan.objects.filter(organization=org)).count('total_test_plans')
+        cards.source(TestResult.objects.filter(organization=org)).count('total_test_results')
+        cards.source(Framework.objects.filter(organization=org)).count('total_frameworks')
+        cards.source(Clause.objects.filter(organization=org)).count('total_clauses')
+        cards.source(ComplianceMapping.objects.filter(organization=org)).count('total_mappings')
+        cards.source(EvidenceArtifact.objects.filter(organization=org)).count('total_artifacts')
+        cards.source(ConnectorConfig.objects.filter(organization=org)).count('total_connectors')
+        cards.source(WebhookSubscription.objects.filter(organization=org)).count('total_webhooks')
+        cards.source(Metric.objects.filter(organization=org)).count('total_metrics')
+        cards.source(ModelRiskAssessment.objects.filter(organization=org)).count('total_risk_assessments')
+        context.update(cards.evaluate())
 
         # Get recent activity for dashboard
         from django.contrib.contenttypes.models import ContentType
@@ -179,7 +156,7 @@ class GovernanceDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, T
                 })
             
             # Get recent test runs
-            recent_runs = TestRun.objects.filter(organization=org).order_by('-created_at')[:3]
+            recent_runs = TestRun.objects.filter(organization=org).select_related('model_asset').order_by('-created_at')[:3]
             for run in recent_runs:
                 recent_activity.append({
                     'message': f'Test run for "{run.model_asset.name}" was created',
@@ -193,11 +170,7 @@ class GovernanceDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, T
             context['recent_activity'] = []
 
         # Period filter context
-        context['available_years'] = years
-        context['available_months'] = months
-        context['selected_years'] = selected_years
-        context['selected_months'] = selected_months
-        context['filter_all'] = filter_all
+        context.update(period.context())
         
         return context
 
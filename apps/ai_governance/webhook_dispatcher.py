@@ -0,0 +1,305 @@
+"""
+Concurrent webhook delivery for AI governance events.
+
+Deliveries are persisted as WebhookDelivery rows by the webhook service and
+sent by the ``dispatch_webhook_deliveries`` Celery task. The dispatcher fans
+deliveries out over a thread pool sharing one pooled HTTP session, retries
+failures with exponential backoff and jitter, and keeps a per-endpoint
+circuit breaker in the shared cache so a dead subscriber stops consuming
+worker time.
+"""
+
+import json
+import logging
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+import requests
+from requests.adapters import HTTPAdapter
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class DeliveryJob:
+    """A single HTTP delivery, independent of the ORM."""
+    delivery_id: int
+    url: str
+    body: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    attempts: int = 0
+
+
+@dataclass
+class DeliveryOutcome:
+    """Result of attempting a DeliveryJob."""
+    delivery_id: int
+    success: bool
+    status_code: Optional[int] = None
+    error: str = ''
+    elapsed_ms: Optional[int] = None
+    circuit_open: bool = False
+
+
+class CircuitBreaker:
+    """
+    Per-endpoint circuit breaker stored in the shared cache.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    deliveries to that endpoint are deferred for ``cooldown`` seconds. The
+    first delivery after the cooldown is let through as a half-open probe;
+    success closes the circuit, failure re-opens it. Other deliveries wait
+    while the probe is in flight.
+
+    State lives in three cache keys per endpoint, all written with atomic
+    cache operations so concurrent workers do not lose updates: a failure
+    counter (``incr``), the time the circuit opened and a probe token
+    (``add``).
+    """
+
+    def __init__(self, failure_threshold: Optional[int] = None, cooldown: Optional[int] = None,
+                 probe_timeout: Optional[int] = None):
+        self.failure_threshold = failure_threshold or getattr(settings, 'WEBHOOK_CIRCUIT_FAILURE_THRESHOLD', 5)
+        self.cooldown = cooldown or getattr(settings, 'WEBHOOK_CIRCUIT_COOLDOWN', 300)  # 5 minutes
+        # How long one probe may hold the half-open circuit (a request timeout, with margin)
+        self.probe_timeout = probe_timeout or getattr(settings, 'WEBHOOK_TIMEOUT', 30) * 2
+
+    def _key(self, url: str, part: str) -> str:
+        return f'ai_gov_webhook_circuit:{part}:{url}'
+
+    def state(self, url: str) -> Dict[str, float]:
+        return {
+            'failures': cache.get(self._key(url, 'failures')) or 0,
+            'opened_at': cache.get(self._key(url, 'opened_at')) or 0.0,
+        }
+
+    def retry_after(self, url: str) -> float:
+        """Seconds until the endpoint may be called again (0 when closed or ready for a probe)."""
+        if (cache.get(self._key(url, 'failures')) or 0) < self.failure_threshold:
+            return 0.0
+        opened_at = cache.get(self._key(url, 'opened_at'))
+        if opened_at is not None:
+            return max(0.0, opened_at + self.cooldown - time.time())
+        if cache.get(self._key(url, 'probe')) is not None:
+            return float(self.probe_timeout)
+        return 0.0
+
+    def allow_request(self, url: str) -> bool:
+        """
+        Whether a delivery to ``url`` may be sent now. After the cooldown
+        only the caller that takes the probe token gets through.
+        """
+        if self.retry_after(url) > 0:
+            return False
+        if (cache.get(self._key(url, 'failures')) or 0) < self.failure_threshold:
+            return True
+        return cache.add(self._key(url, 'probe'), time.time(), self.probe_timeout)
+
+    def record_success(self, url: str):
+        if cache.get(self._key(url, 'failures')):
+            cache.delete_many([self._key(url, part) for part in ('failures', 'opened_at', 'probe')])
+
+    def record_failure(self, url: str):
+        key = self._key(url, 'failures')
+        cache.add(key, 0, self.cooldown * 4)
+        try:
+            failures = cache.incr(key)
+        except ValueError:
+            # Expired between add() and incr()
+            cache.add(key, 1, self.cooldown * 4)
+            failures = 1
+        if failures >= self.failure_threshold:
+            # Open (or re-open after a failed probe); the first opener's time wins
+            if cache.add(self._key(url, 'opened_at'), time.time(), self.cooldown):
+                logger.warning(f'Webhook circuit opened for {url} after {failures} consecutive failures')
+            cache.delete(self._key(url, 'probe'))
+
+
+class WebhookDispatcher:
+    """
+    Send webhook deliveries concurrently over a pooled HTTP session.
+    """
+
+    def __init__(self, concurrency: Optional[int] = None, circuit_breaker: Optional[CircuitBreaker] = None):
+        self.timeout = getattr(settings, 'WEBHOOK_TIMEOUT', 30)
+        self.max_retries = getattr(settings, 'WEBHOOK_MAX_RETRIES', 3)
+        self.concurrency = concurrency or getattr(settings, 'WEBHOOK_CONCURRENCY', 32)
+        self.backoff_base = getattr(settings, 'WEBHOOK_BACKOFF_BASE', 30)  # seconds
+        self.backoff_max = getattr(settings, 'WEBHOOK_BACKOFF_MAX', 60 * 60)  # 1 hour
+        self.batch_size = getattr(settings, 'WEBHOOK_DISPATCH_BATCH_SIZE', 500)
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self._session = None
+        self._session_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive session whose connection pool matches the fan-out width."""
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=self.concurrency, pool_maxsize=self.concurrency)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    self._session = session
+        return self._session
+
+    # ------------------------------------------------------------------
+    # HTTP fan-out
+    # ------------------------------------------------------------------
+
+    def send(self, job: DeliveryJob) -> DeliveryOutcome:
+        """Attempt a single delivery, honouring the endpoint's circuit breaker."""
+        if not self.circuit_breaker.allow_request(job.url):
+            return DeliveryOutcome(job.delivery_id, False, error='circuit open', circuit_open=True)
+
+        start = time.perf_counter()
+        try:
+            response = self.session.post(
+                job.url,
+                data=job.body,
+                headers=job.headers,
+                timeout=self.timeout,
+                allow_redirects=False,
+            )
+            elapsed_ms = int((time.perf_counter() - start) * 1000)
+            if 200 <= response.status_code < 300:
+                self.circuit_breaker.record_success(job.url)
+                return DeliveryOutcome(job.delivery_id, True, response.status_code, elapsed_ms=elapsed_ms)
+            self.circuit_breaker.record_failure(job.url)
+            return DeliveryOutcome(
+                job.delivery_id, False, response.status_code,
+                error=f'HTTP {response.status_code}: {response.text[:500]}', elapsed_ms=elapsed_ms,
+            )
+        except requests.exceptions.RequestException as e:
+            self.circuit_breaker.record_failure(job.url)
+            return DeliveryOutcome(
+                job.delivery_id, False, error=str(e),
+                elapsed_ms=int((time.perf_counter() - start) * 1000),
+            )
+
+    def deliver(self, jobs: List[DeliveryJob]) -> List[DeliveryOutcome]:
+        """Send all jobs concurrently and return their outcomes in job order."""
+        if not jobs:
+            return []
+        with ThreadPoolExecutor(max_workers=min(self.concurrency, len(jobs))) as pool:
+            return list(pool.map(self.send, jobs))
+
+    def backoff_delay(self, attempts: int) -> float:
+        """Exponential backoff with equal jitter for the given attempt count."""
+        delay = min(self.backoff_max, self.backoff_base * (2 ** max(0, attempts - 1)))
+        return delay / 2 + random.uniform(0, delay / 2)
+
+    # ------------------------------------------------------------------
+    # Persistent queue
+    # ------------------------------------------------------------------
+
+    def build_job(self, delivery) -> DeliveryJob:
+        """Serialise a WebhookDelivery into the exact bytes that are signed and sent."""
+        from .webhook_service import webhook_service
+
+        subscription = delivery.subscription
+        body = json.dumps(delivery.payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        headers = {
+            'Content-Type': 'application/json',
+            'User-Agent': 'Oreno-AI-Governance/1.0',
+            'X-Webhook-Delivery': str(delivery.pk),
+            'X-Webhook-Event': delivery.event_type,
+        }
+        if subscription.secret:
+            signature = webhook_service._generate_signature(delivery.payload, subscription.secret)
+            headers['X-Webhook-Signature'] = f'sha256={signature}'
+        return DeliveryJob(delivery.pk, subscription.url, body, headers, delivery.attempts)
+
+    def process_due(self, limit: Optional[int] = None) -> Dict[str, int]:
+        """
+        Deliver pending deliveries whose retry time has come.
+
+        Returns:
+            Counts of sent, retried, failed and deferred (open circuit) deliveries
+        """
+        from .models import WebhookDelivery
+
+        now = timezone.now()
+        summary = {'sent': 0, 'retried': 0, 'failed': 0, 'deferred': 0}
+
+        # Claim due rows by pushing their next attempt past the request timeout,
+        # so concurrent dispatcher runs never send the same delivery twice.
+        with transaction.atomic():
+            claimed_ids = list(
+                WebhookDelivery.objects.select_for_update(skip_locked=True)
+                .filter(status='pending', next_attempt_at__lte=now, subscription__is_active=True)
+                .order_by('next_attempt_at')
+                .values_list('id', flat=True)[:limit or self.batch_size]
+            )
+            WebhookDelivery.objects.filter(id__in=claimed_ids).update(
+                next_attempt_at=now + timedelta(seconds=self.timeout * 2)
+            )
+        if not claimed_ids:
+            return summary
+
+        deliveries = list(
+            WebhookDelivery.objects.select_related('subscription').filter(id__in=claimed_ids).order_by('pk')
+        )
+
+        by_id = {delivery.pk: delivery for delivery in deliveries}
+        outcomes = self.deliver([self.build_job(delivery) for delivery in deliveries])
+
+        now = timezone.now()
+        for outcome in outcomes:
+            delivery = by_id[outcome.delivery_id]
+            if outcome.circuit_open:
+                wait = self.circuit_breaker.retry_after(delivery.subscription.url)
+                delivery.next_attempt_at = now + timedelta(seconds=wait + random.uniform(0, 5))
+                summary['deferred'] += 1
+                continue
+
+            delivery.attempts += 1
+            delivery.last_attempt_at = now
+            delivery.last_status_code = outcome.status_code
+            delivery.last_error = outcome.error
+            delivery.response_time_ms = outcome.elapsed_ms
+            if outcome.success:
+                delivery.status = 'succeeded'
+                delivery.delivered_at = now
+                summary['sent'] += 1
+            elif delivery.attempts > self.max_retries:
+                delivery.status = 'failed'
+                summary['failed'] += 1
+                logger.error(f'Webhook delivery {delivery.pk} to {delivery.subscription.url} abandoned: {outcome.error}')
+            else:
+                delivery.next_attempt_at = now + timedelta(seconds=self.backoff_delay(delivery.attempts))
+                summary['retried'] += 1
+
+        WebhookDelivery.objects.bulk_update(deliveries, [
+            'status', 'attempts', 'next_attempt_at', 'last_attempt_at', 'delivered_at',
+            'last_status_code', 'last_error', 'response_time_ms',
+        ])
+        return summary
+
+    def next_due_in(self) -> Optional[float]:
+        """Seconds until the next pending delivery is due, or None when the queue is empty."""
+        from .models import WebhookDelivery
+
+        next_at = (
+            WebhookDelivery.objects.filter(status='pending', subscription__is_active=True)
+            .order_by('next_attempt_at')
+            .values_list('next_attempt_at', flat=True)
+            .first()
+        )
+        if next_at is None:
+            return None
+        return max(0.0, (next_at - timezone.now()).total_seconds())
+
+
+# Global dispatcher instance (one pooled session per worker process)
+webhook_dispatcher = WebhookDispatcher()
@@ -6,7 +6,6 @@ Follows the same patterns as other services in the project.
 
 import json
 import logging
-import requests
 import hashlib
 import hmac
 from typing import Dict, Any, List, Optional
@@ -14,7 +13,7 @@ from django.conf import settings
 from django.utils import timezone
 from django.core.exceptions import ValidationError
 
-from .models import WebhookSubscription, TestRun, TestResult
+from .models import WebhookSubscription, WebhookDelivery, TestRun, TestResult
 
 logger = logging.getLogger(__name__)
 
@@ -110,7 +109,12 @@ class WebhookService:
         }
     
     def _send_webhooks(self, event_type: str, payload: Dict[str, Any], organization) -> Dict[str, Any]:
-        """Send webhooks to all active subscriptions for the event type."""
+        """
+        Queue deliveries to all active subscriptions for the event type.
+        
+        Deliveries are persisted and sent concurrently by the
+        ``dispatch_webhook_deliveries`` task, which retries failures.
+        """
         webhooks = WebhookSubscription.objects.filter(
             organization=organization,
             is_active=True,
@@ -118,27 +122,42 @@ class WebhookService:
         )
         
         results = {
+            'queued': 0,
             'sent': 0,
             'failed': 0,
             'errors': []
         }
         
-        for webhook in webhooks:
-            try:
-                success = self._send_webhook(webhook, payload)
-                if success:
-                    results['sent'] += 1
-                else:
-                    results['failed'] += 1
-            except Exception as e:
-                results['failed'] += 1
-                results['errors'].append(f'Webhook {webhook.url}: {str(e)}')
-                logger.error(f'Failed to send webhook to {webhook.url}: {e}')
+        deliveries = [
+            WebhookDelivery(
+                organization=organization,
+                subscription=webhook,
+                event_type=event_type,
+                payload=payload,
+            )
+            for webhook in webhooks
+        ]
+        if not deliveries:
+            return results
+        
+        try:
+            WebhookDelivery.objects.bulk_create(deliveries)
+            results['queued'] = len(deliveries)
+        except Exception as e:
+            results['failed'] = len(deliveries)
+            results['errors'].append(f'Failed to queue {event_type} deliveries: {str(e)}')
+            logger.error(f'Failed to queue webhook deliveries for {event_type}: {e}')
+            return results
+        
+        from .tasks import schedule_webhook_dispatch
+        schedule_webhook_dispatch()
         
         return results
     
     def _send_webhook(self, webhook: WebhookSubscription, payload: Dict[str, Any]) -> bool:
-        """Send webhook to a specific subscription."""
+        """Send webhook to a specific subscription immediately (no queueing)."""
+        from .webhook_dispatcher import DeliveryJob, webhook_dispatcher
+        
         headers = {
             'Content-Type': 'application/json',
             'User-Agent': 'Oreno-AI-Governance/1.0'
@@ -149,26 +168,15 @@ class WebhookService:
             signature = self._generate_signature(payload, webhook.secret)
             headers['X-Webhook-Signature'] = f'sha256={signature}'
         
-        try:
-            response = requests.post(
-                webhook.url,
-                json=payload,
-                headers=headers,
-                timeout=self.timeout,
-                allow_redirects=False,
-            )
-            
-            # Consider 2xx status codes as success
-            if 200 <= response.status_code < 300:
-                logger.info(f'Webhook sent successfully to {webhook.url}')
-                return True
-            else:
-                logger.warning(f'Webhook failed with status {response.status_code}: {response.text}')
-                return False
-                
-        except requests.exceptions.RequestException as e:
-            logger.error(f'Webhook request failed to {webhook.url}: {e}')
-            return False
+        # Send the exact serialisation that was signed
+        body = json.dumps(payload, sort_keys=True, separators=(',', ':')).encode('utf-8')
+        outcome = webhook_dispatcher.send(DeliveryJob(0, webhook.url, body, headers))
+        
+        if outcome.success:
+            logger.info(f'Webhook sent successfully to {webhook.url}')
+        else:
+            logger.warning(f'Webhook to {webhook.url} failed: {outcome.error}')
+        return outcome.success
     
     def _generate_signature(self, payload: Dict[str, Any], secret: str) -> str:
         """Generate HMAC signature for webhook payload."""
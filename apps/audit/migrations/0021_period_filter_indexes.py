@@ -0,0 +1,20 @@
+# Generated by Django 5.1.14 on 2026-10-18 21:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0020_merge_20260624_1553'),
+        ('organizations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='engagement',
+            index=models.Index(fields=['organization', 'project_start_date'], name='audit_engag_organiz_9e7c87_idx'),
+        ),
+    ]
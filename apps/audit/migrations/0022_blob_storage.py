@@ -0,0 +1,20 @@
+# Generated by Django 5.1.14 on 2026-10-18 22:44
+
+import core.blobstore
+import core.models.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audit', '0021_period_filter_indexes'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='issueworkingpaper',
+            name='file',
+            field=models.FileField(storage=core.blobstore.get_blob_storage, upload_to='working_papers/', validators=[core.models.validators.validate_safe_filename, core.models.validators.validate_file_extension, core.models.validators.validate_file_content_signature, core.models.validators.validate_file_size], verbose_name='Working Paper File'),
+        ),
+    ]
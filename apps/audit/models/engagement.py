@@ -214,6 +214,7 @@ class Engagement(ApprovalStateMixin, OrganizationOwnedModel, AuditableModel, Sof
         ]
         indexes = [
             models.Index(fields=['organization']),
+            models.Index(fields=['organization', 'project_start_date']),
             models.Index(fields=['annual_workplan']),
             models.Index(fields=['code']),
             models.Index(fields=['project_status']),
@@ -5,6 +5,7 @@ from simple_history.models import HistoricalRecords
 from core.models.abstract_models import OrganizationOwnedModel, AuditableModel, SoftDeletionModel
 from .issue import Issue
 from core.models.validators import file_upload_validators
+from core.blobstore import get_blob_storage
 
 class IssueWorkingPaper(OrganizationOwnedModel, AuditableModel, SoftDeletionModel):
     """
@@ -18,6 +19,7 @@ class IssueWorkingPaper(OrganizationOwnedModel, AuditableModel, SoftDeletionMode
     )
     file = models.FileField(
         upload_to='working_papers/',
+        storage=get_blob_storage,
         validators=file_upload_validators(),
         verbose_name=_('Working Paper File'),
     )
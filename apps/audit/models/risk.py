@@ -262,9 +262,8 @@ class Risk(SoftDeletionModel):
         if not self.pk or not self.inherent_risk_score:
             self.inherent_risk_score = self.likelihood * self.impact
         # Set residual risk score based on control effectiveness
-        calculated_residual = max(1, round(self.inherent_risk_score / self.control_effectiveness))
         if not self.residual_risk_score or self.residual_risk_score > self.inherent_risk_score:
-            self.residual_risk_score = min(calculated_residual, self.inherent_risk_score)
+            self.residual_risk_score = self.calculate_residual(self.inherent_risk_score, self.control_effectiveness)
         # Only auto-advance status if this is a new risk or status is not set by user
         if not self.pk:
             if self.status == 'identified' and self.inherent_risk_score:
@@ -278,6 +277,11 @@ class Risk(SoftDeletionModel):
             reversion.set_comment(f"Saved risk '{self.title}' (Status: {self.status})")
             super().save(*args, **kwargs)
     
+    @staticmethod
+    def calculate_residual(inherent_risk_score, control_effectiveness):
+        """Residual score left by controls of the given effectiveness (never above the inherent score)"""
+        return min(max(1, round(inherent_risk_score / control_effectiveness)), inherent_risk_score)
+
     @property
     def risk_level(self):
         """Returns the risk level based on the inherent risk score"""
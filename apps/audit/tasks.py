@@ -11,8 +11,11 @@ from .models import AuditWorkplan, Engagement, Issue, Approval, Risk, Objective
 from core.mixins.state import PENDING, APPROVED, REJECTED
 from .models.note import Note
 from .models.issue_working_paper import IssueWorkingPaper
-from core.models.validators import validate_file_virus
+from core.virus_scan import virus_scanner
 from core.signals import log_change
+from core.tasks import tenant_organizations
+from django_tenants.utils import tenant_context
+from risk.scoring import risk_scorer
 from .email_utils import send_risk_status_notification, send_risk_assignment_notification, send_risk_approval_notification
 
 # ─── NOTIFICATION TASKS ──────────────────────────────────────────────────────
@@ -183,43 +186,24 @@ def bulk_update_engagement_states(engagement_ids, new_state):
 
 # ─── RISK MANAGEMENT TASKS ───────────────────────────────────────────────────
 @shared_task
-def recalculate_risk_scores(risk_ids):
+def recalculate_risk_scores(risk_ids=None, organization_id=None):
     """
     Recalculate risk scores for multiple risks asynchronously.
     This is used after control effectiveness changes or when updating multiple risks.
+    Scores are written in bulk (risk.scoring) with one summary audit entry per batch.
     
     Args:
-        risk_ids (list): List of risk IDs to recalculate scores for
+        risk_ids (list): List of risk IDs to recalculate scores for (default: all)
+        organization_id (int): Limit to one organization (default: every tenant);
+            required with ``risk_ids``, which are only unique within a tenant
     """
-    with transaction.atomic():
-        risks = Risk.objects.filter(id__in=risk_ids)
-        
-        for risk in risks:
-            # Log original values for audit trail
-            old_inherent = risk.inherent_risk_score
-            old_residual = risk.residual_risk_score
-            old_status = risk.status
-            
-            # Use save() method which contains the calculation logic
-            risk.save()
-            
-            # Log changes if scores changed
-            if (old_inherent != risk.inherent_risk_score or 
-                old_residual != risk.residual_risk_score or 
-                old_status != risk.status):
-                log_change(
-                    risk, 
-                    'update',
-                    changes={
-                        'inherent_risk_score': (old_inherent, risk.inherent_risk_score),
-                        'residual_risk_score': (old_residual, risk.residual_risk_score),
-                        'status': (old_status, risk.status)
-                    }
-                )
-                
-                # Send notification if status changed
-                if old_status != risk.status:
-                    send_risk_status_notification(risk, old_status, risk.status)
+    if risk_ids is not None and organization_id is None:
+        raise ValueError('risk_ids need an organization_id')
+    results = {}
+    for organization in tenant_organizations(organization_id):
+        with tenant_context(organization):
+            results[organization.pk] = risk_scorer.recalculate_audit_risks(organization, risk_ids)
+    return results
 
 @shared_task
 def process_risk_approval(risk_id, approval_status, approver_id=None):
@@ -349,12 +333,16 @@ def process_issue_working_paper_upload(issue_working_paper_id):
         working_paper = IssueWorkingPaper.objects.get(pk=issue_working_paper_id)
         file = working_paper.file
         user = getattr(working_paper, 'created_by', None)
-        # Virus scan
-        try:
-            validate_file_virus(file)
-            scan_result = 'clean'
-        except Exception as e:
-            scan_result = f'virus_detected: {str(e)}'
+        # Virus scan; content already scanned with the current signatures is not sent to clamd again
+        scan_result = 'clean'
+        if virus_scanner.enabled():
+            try:
+                verdict = virus_scanner.scan_file(file)
+                if verdict.infected:
+                    scan_result = f'virus_detected: {verdict.signature}'
+            except Exception as e:
+                scan_result = f'virus_detected: {str(e)}'
+        if scan_result != 'clean':
             # Log virus detection
             log_change(working_paper, 'update', changes={'virus_scan': scan_result}, user=user)
             # Optionally notify admin or security team
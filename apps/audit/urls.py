@@ -24,8 +24,8 @@ from .views import (
     NotificationListView, NoteListView,
     RecommendationListView, RecommendationCreateView, RecommendationUpdateView, RecommendationDetailView,
     IssueWorkingPaperListView, IssueWorkingPaperCreateView, IssueWorkingPaperUpdateView, IssueWorkingPaperDeleteView, IssueWorkingPaperDetailView,
-    IssueWorkingPaperViewSet,
-    EngagementDocumentListView, EngagementDocumentCreateView, EngagementDocumentDeleteView,
+    IssueWorkingPaperViewSet, IssueWorkingPaperDownloadView,
+    EngagementDocumentListView, EngagementDocumentCreateView, EngagementDocumentDeleteView, EngagementDocumentDownloadView,
 )
 
 # ─── REST API ROUTERS ────────────────────────────────────────────────────────
@@ -95,6 +95,7 @@ urlpatterns = [
     path('engagements/<int:pk>/reject/', views.reject_engagement, name='engagement-reject'),
     path('engagements/<int:engagement_pk>/documents/', EngagementDocumentListView.as_view(), name='engagement-document-list'),
     path('engagements/<int:engagement_pk>/documents/add/', EngagementDocumentCreateView.as_view(), name='engagement-document-add'),
+    path('engagements/<int:engagement_pk>/documents/<int:pk>/download/', EngagementDocumentDownloadView.as_view(), name='engagement-document-download'),
     path('engagements/<int:engagement_pk>/documents/<int:pk>/delete/', EngagementDocumentDeleteView.as_view(), name='engagement-document-delete'),
     
     # ─── ISSUE URLS ─────────────────────────────────────────────────────────
@@ -224,6 +225,7 @@ urlpatterns = [
     path('issues/<int:issue_pk>/working-papers/<int:pk>/delete/', views.IssueWorkingPaperDeleteView.as_view(), name='issueworkingpaper-modal-delete'),
     path('working-papers/<int:pk>/', IssueWorkingPaperDetailView.as_view(), name='issueworkingpaper-detail'),
     path('issues/<int:issue_pk>/working-papers/add/', views.IssueWorkingPaperCreateView.as_view(), name='issueworkingpaper-add'),
+    path('working-papers/<int:pk>/download/', IssueWorkingPaperDownloadView.as_view(), name='issueworkingpaper-download'),
     path('working-papers/<int:pk>/edit/', views.IssueWorkingPaperUpdateView.as_view(), name='issueworkingpaper-update'),
     path('working-papers/<int:pk>/delete/', views.IssueWorkingPaperDeleteView.as_view(), name='issueworkingpaper-delete'),
     path('api/engagement-status-data/', views.api_engagement_status_data, name='api_engagement_status_data'),
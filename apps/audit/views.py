@@ -87,7 +87,7 @@ from django.contrib.auth.mixins import LoginRequiredMixin
 from django.contrib.messages.views import SuccessMessageMixin
 from django.core.exceptions import PermissionDenied
 from django.db import transaction, DatabaseError, NotSupportedError
-from django.db.models import Q, F, Case, When
+from django.db.models import Q, F, Case, When, Avg, DurationField, ExpressionWrapper
 from django.shortcuts import get_object_or_404, redirect
 from django.contrib import messages
 from django.utils.translation import gettext as _
@@ -109,6 +109,10 @@ from django_fsm import can_proceed
 
 from core.mixins import OrganizationMixin, OrganizationPermissionMixin
 from core.decorators import skip_org_check
+from core.dashboard import DashboardMetrics
+from core.chart_cache import chart_cache
+from core.periods import PeriodFilter
+from core.downloads import ProtectedFileView
 from organizations.models import Organization
 
 from .models import AuditWorkplan, Engagement, Issue, Approval, Notification, IssueWorkingPaper, EngagementDocument, Note, FollowUpAction, IssueRetest, Objective, Procedure
@@ -1350,7 +1354,7 @@ class AuditDashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         organization = self.request.organization
-        from collections import Counter, defaultdict
+        from collections import defaultdict
         from django.utils import timezone
         from .models.objective import Objective
         from .models.procedure import Procedure
@@ -1361,67 +1365,63 @@ class AuditDashboardView(LoginRequiredMixin, TemplateView):
         from .models.issue import Issue
         from django.contrib.auth import get_user_model
         User = get_user_model()
-        import calendar
         # --- Period Filter Logic ---
-        org_created = organization.created_at.date()
+        period = PeriodFilter.from_request(self.request, organization)
+        filter_all = period.filter_all
         today = timezone.now().date()
-        years = list(range(org_created.year, today.year + 1))
-        months = [(i, calendar.month_name[i]) for i in range(1, 13)]
-        selected_years = self.request.GET.getlist('year') or [str(today.year)]
-        selected_months = self.request.GET.getlist('month')
-        filter_all = 'All' in selected_years
-        from django.db.models import Q
-        period_q = Q()
-        if not filter_all:
-            year_ints = [int(y) for y in selected_years if y.isdigit()]
-            if selected_months:
-                month_ints = [int(m) for m in selected_months if m.isdigit()]
-                period_q &= Q(project_start_date__year__in=year_ints, project_start_date__month__in=month_ints)
-            else:
-                period_q &= Q(project_start_date__year__in=year_ints)
-        engagement_qs = Engagement.objects.filter(organization=organization)
-        if not filter_all:
-            engagement_qs = engagement_qs.filter(period_q)
-        context['engagement_count'] = engagement_qs.count()
-        context['recent_engagements'] = engagement_qs.order_by('-project_start_date')[:8]
-        context['engagement_status_dist'] = dict(Counter(engagement_qs.values_list('project_status', flat=True))) or {}
-        durations = [(e.target_end_date - e.project_start_date).days for e in engagement_qs if e.target_end_date and e.project_start_date]
-        context['avg_engagement_duration'] = sum(durations) / len(durations) if durations else 0
-
+        engagement_qs = period.filter(
+            Engagement.objects.filter(organization=organization), 'project_start_date'
+        )
         # Issues: filter by procedure__risk__objective__engagement__in=engagement_qs
         issue_qs = Issue.objects.filter(
             organization=organization,
             procedure__risk__objective__engagement__in=engagement_qs
         )
-        context['issue_count'] = issue_qs.count()
-        context['recent_issues'] = issue_qs.order_by('-date_identified')[:8]
-        context['overdue_issues'] = issue_qs.filter(issue_status__in=['open', 'in_progress'], target_date__lt=today).count()
-        context['issue_risk_dist'] = dict(Counter(issue_qs.values_list('risk_level', flat=True))) or {}
         # Workplans filtered by period (if engagement_qs is filtered)
         workplan_ids = engagement_qs.values_list('annual_workplan_id', flat=True).distinct()
         workplan_qs = AuditWorkplan.objects.filter(organization=organization)
         if not filter_all:
             workplan_qs = workplan_qs.filter(id__in=workplan_ids)
-        context['workplan_count'] = workplan_qs.count()
-        context['recent_workplans'] = workplan_qs.order_by('-creation_date')[:8]
-        completed_workplans = workplan_qs.filter(approval_status='approved').count()
-        context['workplan_completion_rate'] = {'Completed': completed_workplans, 'Total': workplan_qs.count()}
         # Approvals filtered by period
         approval_qs = Approval.objects.filter(organization=organization)
         if not filter_all:
             approval_qs = approval_qs.filter(
                 Q(workplan__in=workplan_qs) | Q(engagement__in=engagement_qs) | Q(issue__in=issue_qs)
             )
-        context['approval_count'] = approval_qs.count()
+
+        metrics = DashboardMetrics()
+        engagements = metrics.source(engagement_qs)
+        engagements.count('engagement_count')
+        engagements.aggregate('avg_engagement_duration', Avg(
+            ExpressionWrapper(F('target_end_date') - F('project_start_date'), output_field=DurationField()),
+            filter=Q(target_end_date__isnull=False, project_start_date__isnull=False),
+        ))
+        engagements.histogram('engagement_status_dist', 'project_status')
+        issues = metrics.source(issue_qs)
+        issues.count('issue_count')
+        issues.count('overdue_issues', Q(issue_status__in=['open', 'in_progress'], target_date__lt=today))
+        issues.histogram('issue_risk_dist', 'risk_level')
+        workplans = metrics.source(workplan_qs)
+        workplans.count('workplan_count')
+        workplans.count('completed_workplans', Q(approval_status='approved'))
+        approvals = metrics.source(approval_qs)
+        approvals.count('approval_count')
+        approvals.histogram('approval_status_dist', 'status')
+        results = metrics.evaluate()
+
+        average_duration = results.pop('avg_engagement_duration')
+        completed_workplans = results.pop('completed_workplans')
+        context.update(results)
+        context['avg_engagement_duration'] = average_duration.total_seconds() / 86400 if average_duration else 0
+        context['workplan_completion_rate'] = {'Completed': completed_workplans, 'Total': results['workplan_count']}
+
+        context['recent_engagements'] = engagement_qs.order_by('-project_start_date')[:8]
+        context['recent_issues'] = issue_qs.order_by('-date_identified')[:8]
+        context['recent_workplans'] = workplan_qs.order_by('-creation_date')[:8]
         context['pending_approvals'] = approval_qs.filter(status='pending').order_by('-created_at')[:8]
-        context['approval_status_dist'] = dict(Counter(approval_qs.values_list('status', flat=True))) or {}
         
         # Period filter context
-        context['available_years'] = years
-        context['available_months'] = months
-        context['selected_years'] = selected_years
-        context['selected_months'] = selected_months
-        context['filter_all'] = filter_all
+        context.update(period.context())
         
         # Engagement names for reports
         context['engagement_names'] = list(engagement_qs.values_list('title', flat=True).distinct())
@@ -3991,6 +3991,9 @@ class IssueWorkingPaperDetailView(AuditPermissionMixin, DetailView):
     template_name = 'audit/issueworkingpaper_detail.html'
     context_object_name = 'working_paper'
 
+class IssueWorkingPaperDownloadView(AuditPermissionMixin, ProtectedFileView):
+    model = IssueWorkingPaper
+
 # ─── ENGAGEMENT DOCUMENT VIEWS ────────────────────────────────────────────────
 class EngagementDocumentListView(AuditPermissionMixin, ListView):
     model = EngagementDocument
@@ -4054,6 +4057,12 @@ class EngagementDocumentCreateView(AuditPermissionMixin, SuccessMessageMixin, Cr
     def get_success_url(self):
         return reverse_lazy('audit:engagement-detail', kwargs={'pk': self.object.engagement.pk})
 
+class EngagementDocumentDownloadView(AuditPermissionMixin, ProtectedFileView):
+    model = EngagementDocument
+
+    def get_queryset(self):
+        return super().get_queryset().filter(engagement_id=self.kwargs['engagement_pk'])
+
 class EngagementDocumentDeleteView(AuditPermissionMixin, DeleteView):
     model = EngagementDocument
     template_name = 'audit/engagementdocument_confirm_delete.html'
@@ -4192,6 +4201,7 @@ from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 
 @login_required
+@chart_cache(Issue)
 def api_issue_risk_data(request):
     org = request.user.organization
     from .models.issue import Issue
@@ -4201,6 +4211,7 @@ def api_issue_risk_data(request):
     return JsonResponse(risk_data, safe=False)
 
 @login_required
+@chart_cache(Approval)
 def api_approval_status_data(request):
     org = request.user.organization
     from .models.approval import Approval
@@ -4210,6 +4221,7 @@ def api_approval_status_data(request):
     return JsonResponse(status_data, safe=False)
 
 @login_required
+@chart_cache(Engagement)
 def api_engagement_status_data(request):
     org = request.user.organization
     from .models.engagement import Engagement
@@ -4218,6 +4230,7 @@ def api_engagement_status_data(request):
     return JsonResponse(status_data, safe=False)
 
 @login_required
+@chart_cache(Engagement)
 def api_engagement_data(request):
     org = request.user.organization
     from .models.engagement import Engagement
@@ -4227,6 +4240,7 @@ def api_engagement_data(request):
     return JsonResponse(engagement_data, safe=False)
 
 @login_required
+@chart_cache(Issue)
 def api_issue_data(request):
     """API endpoint for issue data used in dashboards."""
     issues = Issue.objects.filter(organization=request.user.organization)
@@ -9,6 +9,9 @@ from .models import (
     ComplianceRequirement,
     ComplianceObligation,
     ComplianceEvidence,
+    SegregationOfDuties,
+    SoDRuleSet,
+    SoDRule,
 )
 
 @admin.register(ComplianceFramework)
@@ -50,3 +53,22 @@ class ComplianceEvidenceAdmin(reversion.admin.VersionAdmin):
     search_fields = ("obligation__obligation_id", "document__title")
     list_filter = ("validity_start", "validity_end")
     date_hierarchy = "validity_start"
+
+@admin.register(SoDRuleSet)
+class SoDRuleSetAdmin(reversion.admin.VersionAdmin):
+    list_display = ("name", "is_active")
+    search_fields = ("name",)
+    list_filter = ("is_active",)
+
+@admin.register(SoDRule)
+class SoDRuleAdmin(reversion.admin.VersionAdmin):
+    list_display = ("code", "name", "rule_set", "violation_type", "severity", "is_active")
+    search_fields = ("code", "name")
+    list_filter = ("rule_set", "severity", "is_active")
+
+@admin.register(SegregationOfDuties)
+class SegregationOfDutiesAdmin(reversion.admin.VersionAdmin):
+    list_display = ("user", "rule", "conflicting_role", "violation_type", "severity", "detected_at", "resolved_at")
+    search_fields = ("user__email", "conflicting_role", "rule__name", "rule__code")
+    list_filter = ("severity", "violation_type", "resolved_at")
+    raw_id_fields = ("user", "rule")
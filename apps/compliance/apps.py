@@ -6,3 +6,7 @@ class ComplianceConfig(AppConfig):
     verbose_name = "Compliance"
     # …or…
     # name = 'apps.core'  # if you prefer fully qualified imports without altering sys.path
+
+    def ready(self):
+        # Policy re-indexing on upload and SoD re-evaluation on access changes
+        import compliance.signals  # noqa
@@ -0,0 +1,132 @@
+"""
+Management command to benchmark policy document ingestion.
+
+Generates two versions of a ``--pages`` page policy PDF (default 500) in
+which every ``--changed-every``-th clause is reworded, and measures:
+
+- text extraction with pypdfium2 (pages/s) and section splitting/hashing
+- how many sections a new version actually has to parse and index, compared
+  with re-indexing the whole document
+
+With ``--organization`` both versions are also run through
+``PolicyIngestor.process`` in that tenant (sections written, search vectors
+built) inside a transaction that is rolled back.
+"""
+
+import os
+import shutil
+import tempfile
+import time
+from datetime import date
+
+from django.core.files import File
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.test import override_settings
+from django_tenants.utils import tenant_context
+
+from compliance.ingestion import extract_pages, policy_ingestor, split_sections
+from compliance.sample_policies import policy_clauses, write_policy_pdf
+from organizations.models import Organization
+
+LINES_PER_PAGE = 48
+LINES_PER_CLAUSE = 6
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark incremental parsing and indexing of large policy PDFs'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--pages',
+            type=int,
+            default=500,
+            help='Pages per generated policy (default: 500)'
+        )
+        parser.add_argument(
+            '--changed-every',
+            type=int,
+            default=25,
+            help='Reword every n-th clause in the second version (default: 25)'
+        )
+        parser.add_argument(
+            '--organization',
+            type=int,
+            help='Also run full ingestion in this tenant (rolled back)'
+        )
+
+    def handle(self, *args, **options):
+        clause_count = options['pages'] * LINES_PER_PAGE // LINES_PER_CLAUSE
+        workdir = tempfile.mkdtemp(prefix='policy-benchmark-')
+        try:
+            paths = []
+            for revision in (1, 2):
+                path = os.path.join(workdir, f'policy-v{revision}.pdf')
+                clauses = policy_clauses(clause_count, revision=revision, changed_every=options['changed_every'])
+                pages = write_policy_pdf(path, clauses, lines_per_page=LINES_PER_PAGE)
+                paths.append(path)
+            self.stdout.write(f'{pages} pages, {clause_count} clauses, {os.path.getsize(paths[0]) / 1024 / 1024:.1f} MB')
+
+            versions = []
+            for path in paths:
+                started = time.perf_counter()
+                page_texts = list(extract_pages(path))
+                extracted = time.perf_counter() - started
+                started = time.perf_counter()
+                sections = split_sections(page_texts)
+                split = time.perf_counter() - started
+                versions.append(sections)
+                self.stdout.write(
+                    f'{os.path.basename(path)}: extract {extracted:.2f}s ({len(page_texts) / extracted:.0f} pages/s), '
+                    f'split+hash {split:.3f}s, {len(sections)} sections'
+                )
+
+            previous = {section.sha256 for section in versions[0]}
+            changed = sum(1 for section in versions[1] if section.sha256 not in previous)
+            self.stdout.write(
+                f'new version: {changed} of {len(versions[1])} sections to parse and index '
+                f'({changed / len(versions[1]):.1%}); unchanged sections keep their rows'
+            )
+
+            if options['organization']:
+                self._ingest(options['organization'], paths, workdir)
+        finally:
+            shutil.rmtree(workdir)
+
+    def _ingest(self, organization_id, paths, workdir):
+        from compliance.models import PolicyDocument
+
+        organization = Organization.objects.filter(pk=organization_id).first()
+        if organization is None:
+            raise CommandError(f'Organization with ID {organization_id} not found')
+
+        with override_settings(MEDIA_ROOT=os.path.join(workdir, 'media')), tenant_context(organization):
+            try:
+                with transaction.atomic():
+                    document = None
+                    for path in paths:
+                        with open(path, 'rb') as f:
+                            if document is None:
+                                document = PolicyDocument.objects.create(
+                                    organization=organization, title='Ingestion benchmark',
+                                    effective_date=date.today(), file=File(f, name='benchmark-policy.pdf'),
+                                )
+                            else:
+                                document.file = File(f, name='benchmark-policy.pdf')
+                                document.save()
+                        started = time.perf_counter()
+                        run = policy_ingestor.process(document)
+                        elapsed = time.perf_counter() - started
+                        if run.status != 'completed':
+                            raise CommandError(f'Ingestion failed: {run.error_message}')
+                        self.stdout.write(
+                            f'process {os.path.basename(path)}: {elapsed:.2f}s ({run.page_count / elapsed:.0f} pages/s), '
+                            f'{run.sections_changed} sections written, {run.sections_removed} removed'
+                        )
+                    raise Rollback
+            except Rollback:
+                pass
@@ -0,0 +1,107 @@
+"""
+Management command to benchmark the segregation of duties analysis.
+
+Generates a synthetic organization of ``--users`` users (default 50,000)
+with a role, a few of ``--groups`` groups each granting permissions, and
+some direct permissions, plus ``--rules`` toxic-combination rules (default
+500) over those entitlements, and measures ``compliance.sod.RuleMatrix``:
+
+- compiling the rules and loading the grants into bitsets
+- evaluating every rule for every user in one vectorised pass
+- re-evaluating a single user, as after a role change
+- with ``--compare-naive``, a per-user, per-rule set comparison on a sample
+  of users, extrapolated to the whole organization
+
+No database access: the grants are the ``(user_id, entitlement)`` pairs
+``SoDEngine.load_grants`` would return.
+"""
+
+import time
+
+import numpy as np
+from django.core.management.base import BaseCommand
+
+from compliance.sod import RuleMatrix
+
+ROLES = ('admin', 'head_of_unit', 'risk_champion', 'manager', 'staff')
+
+
+class Command(BaseCommand):
+    help = 'Benchmark vectorised segregation of duties evaluation on synthetic users and rules'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=50000, help='Number of users (default: 50000)')
+        parser.add_argument('--rules', type=int, default=500, help='Number of rules (default: 500)')
+        parser.add_argument('--groups', type=int, default=300, help='Number of groups (default: 300)')
+        parser.add_argument('--permissions', type=int, default=2000, help='Number of permissions (default: 2000)')
+        parser.add_argument('--seed', type=int, default=7, help='Random seed (default: 7)')
+        parser.add_argument(
+            '--compare-naive',
+            action='store_true',
+            help='Also time a per-user, per-rule set comparison on a sample of users'
+        )
+
+    def handle(self, *args, **options):
+        rng = np.random.default_rng(options['seed'])
+        permissions = [f'perm:app.permission_{n}' for n in range(options['permissions'])]
+        groups = [f'group:Group {n}' for n in range(options['groups'])]
+        group_permissions = [
+            [permissions[p] for p in rng.choice(len(permissions), size=rng.integers(5, 30), replace=False)]
+            for _ in groups
+        ]
+
+        user_ids = list(range(1, options['users'] + 1))
+        grants = []
+        for user_id in user_ids:
+            grants.append((user_id, f'role:{ROLES[rng.integers(len(ROLES))]}'))
+            for g in rng.choice(len(groups), size=rng.integers(1, 5), replace=False):
+                grants.append((user_id, groups[g]))
+                grants.extend((user_id, permission) for permission in group_permissions[g])
+            grants.extend((user_id, permissions[p]) for p in rng.integers(len(permissions), size=rng.integers(0, 4)))
+
+        pool = permissions + groups + [f'role:{role}' for role in ROLES]
+        rules = []
+        for rule_id in range(1, options['rules'] + 1):
+            duties = [
+                [pool[e] for e in rng.choice(len(pool), size=rng.integers(1, 4), replace=False)]
+                for _ in range(3 if rng.random() < 0.2 else 2)
+            ]
+            rules.append((rule_id, duties))
+        self.stdout.write(f'{len(user_ids):,} users, {len(grants):,} grants, {len(rules)} rules')
+
+        started = time.perf_counter()
+        matrix = RuleMatrix(rules)
+        compiled = time.perf_counter()
+        words = matrix.user_words(user_ids, grants)
+        loaded = time.perf_counter()
+        rows, positions, profiles, _ = matrix.evaluate(words)
+        evaluated = time.perf_counter()
+        self.stdout.write(
+            f'compile {compiled - started:.3f}s ({len(matrix.index)} entitlements, {matrix.width} words/user), '
+            f'load {loaded - compiled:.3f}s, evaluate {evaluated - loaded:.3f}s '
+            f'({len(profiles):,} distinct profiles, {len(rows):,} violations, '
+            f'{len(user_ids) * len(rules) / (evaluated - loaded) / 1e6:.1f}M user-rule checks/s)'
+        )
+
+        entitlements = {user_id: set() for user_id in user_ids[:1000]}
+        for user_id, entitlement in grants:
+            if user_id in entitlements:
+                entitlements[user_id].add(entitlement)
+        started = time.perf_counter()
+        for user_entitlements in entitlements.values():
+            matrix.evaluate_bits(matrix.bits(user_entitlements))
+        single = (time.perf_counter() - started) / len(entitlements)
+        self.stdout.write(f'single user re-evaluation: {single * 1000:.3f} ms')
+
+        if options['compare_naive']:
+            rule_sets = [[set(duty) for duty in duties] for _, duties in rules]
+            started = time.perf_counter()
+            naive = sum(
+                1 for held in entitlements.values() for duties in rule_sets
+                if all(held & duty for duty in duties)
+            )
+            elapsed = (time.perf_counter() - started) * len(user_ids) / len(entitlements)
+            self.stdout.write(
+                f'naive set comparison: ~{elapsed:.2f}s for all users (extrapolated from {len(entitlements)}, '
+                f'{naive} violations in the sample), {elapsed / (evaluated - loaded):.0f}x the vectorised pass'
+            )
@@ -0,0 +1,20 @@
+# Generated by Django 5.1.14 on 2026-10-18 22:44
+
+import core.blobstore
+import core.models.validators
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0004_alter_policydocument_file'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='policydocument',
+            name='file',
+            field=models.FileField(storage=core.blobstore.get_blob_storage, upload_to='policy_documents/', validators=[core.models.validators.validate_safe_filename, core.models.validators.validate_file_extension, core.models.validators.validate_file_content_signature, core.models.validators.validate_file_size]),
+        ),
+    ]
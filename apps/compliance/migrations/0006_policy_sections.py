@@ -0,0 +1,97 @@
+# Generated by Django 5.1.14 on 2026-10-18 23:00
+
+import django.contrib.postgres.indexes
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0005_blob_storage'),
+        ('organizations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PolicySection',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Timestamp when the record was first created', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, help_text='Timestamp when the record was last updated', verbose_name='updated at')),
+                ('position', models.PositiveIntegerField()),
+                ('clause', models.CharField(blank=True, help_text='Clause number, e.g. "4.2.1" or "A.5.1"', max_length=50)),
+                ('heading', models.CharField(blank=True, max_length=512)),
+                ('text', models.TextField(blank=True)),
+                ('sha256', models.CharField(max_length=64)),
+                ('page_start', models.PositiveIntegerField(default=1)),
+                ('page_end', models.PositiveIntegerField(default=1)),
+                ('search_vector', django.contrib.postgres.search.SearchVectorField(editable=False, null=True)),
+            ],
+            options={
+                'ordering': ['document', 'position'],
+            },
+        ),
+        migrations.AddField(
+            model_name='documentprocessing',
+            name='content_sha256',
+            field=models.CharField(blank=True, db_index=True, max_length=64),
+        ),
+        migrations.AddField(
+            model_name='documentprocessing',
+            name='page_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='documentprocessing',
+            name='section_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='documentprocessing',
+            name='sections_changed',
+            field=models.PositiveIntegerField(default=0, help_text='Sections parsed and indexed by this run'),
+        ),
+        migrations.AddField(
+            model_name='documentprocessing',
+            name='sections_removed',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddIndex(
+            model_name='compliancerequirement',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['tags'], name='compliance_req_tags_gin', opclasses=['jsonb_path_ops']),
+        ),
+        migrations.AddField(
+            model_name='policysection',
+            name='document',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='sections', to='compliance.policydocument'),
+        ),
+        migrations.AddField(
+            model_name='policysection',
+            name='organization',
+            field=models.ForeignKey(help_text='Organization that owns this record', on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='organization'),
+        ),
+        migrations.AddIndex(
+            model_name='policysection',
+            index=models.Index(fields=['document', 'position'], name='compliance__documen_dc65be_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policysection',
+            index=models.Index(fields=['document', 'sha256'], name='compliance__documen_3e3471_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policysection',
+            index=models.Index(fields=['organization', 'clause'], name='compliance__organiz_b2f9b7_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='policysection',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='compliance_section_search_gin'),
+        ),
+        migrations.AddConstraint(
+            model_name='policysection',
+            constraint=models.CheckConstraint(condition=models.Q(('organization__isnull', False)), name='organization_required_policysection'),
+        ),
+    ]
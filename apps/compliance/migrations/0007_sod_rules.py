@@ -0,0 +1,108 @@
+# Generated by Django 5.1.14 on 2026-10-18 23:02
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0006_policy_sections'),
+        ('organizations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SoDRuleSet',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Timestamp when the record was first created', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, help_text='Timestamp when the record was last updated', verbose_name='updated at')),
+                ('name', models.CharField(max_length=255)),
+                ('description', models.TextField(blank=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'SoD Rule Set',
+                'verbose_name_plural': 'SoD Rule Sets',
+            },
+        ),
+        migrations.AddField(
+            model_name='segregationofduties',
+            name='detected_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='segregationofduties',
+            name='resolved_at',
+            field=models.DateTimeField(blank=True, help_text='When the user stopped holding the conflicting duties', null=True),
+        ),
+        migrations.CreateModel(
+            name='SoDRule',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Timestamp when the record was first created', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, help_text='Timestamp when the record was last updated', verbose_name='updated at')),
+                ('code', models.CharField(blank=True, max_length=50)),
+                ('name', models.CharField(max_length=255)),
+                ('duties', models.JSONField(default=list, help_text='e.g. [["perm:contracts.add_vendor"], ["perm:contracts.approve_payment", "role:manager"]]')),
+                ('violation_type', models.CharField(choices=[('authorization_execution', 'Authorization and Execution'), ('authorization_custody', 'Authorization and Custody'), ('authorization_recording', 'Authorization and Recording'), ('execution_custody', 'Execution and Custody'), ('execution_recording', 'Execution and Recording'), ('custody_recording', 'Custody and Recording')], max_length=30)),
+                ('severity', models.CharField(choices=[('low', 'Low Risk'), ('medium', 'Medium Risk'), ('high', 'High Risk'), ('critical', 'Critical Risk')], default='high', max_length=20)),
+                ('is_active', models.BooleanField(default=True)),
+                ('created_by', models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='created by')),
+                ('organization', models.ForeignKey(help_text='Organization that owns this record', on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='organization')),
+                ('updated_by', models.ForeignKey(blank=True, help_text='User who last modified this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='updated by')),
+            ],
+            options={
+                'verbose_name': 'SoD Rule',
+                'verbose_name_plural': 'SoD Rules',
+            },
+        ),
+        migrations.AddField(
+            model_name='segregationofduties',
+            name='rule',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='violations', to='compliance.sodrule'),
+        ),
+        migrations.AddIndex(
+            model_name='segregationofduties',
+            index=models.Index(fields=['organization', 'resolved_at'], name='compliance__organiz_ca02e3_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='segregationofduties',
+            constraint=models.UniqueConstraint(condition=models.Q(('rule__isnull', False)), fields=('rule', 'user'), name='unique_sod_violation_per_rule_user'),
+        ),
+        migrations.AddField(
+            model_name='sodruleset',
+            name='created_by',
+            field=models.ForeignKey(blank=True, help_text='User who created this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_created', to=settings.AUTH_USER_MODEL, verbose_name='created by'),
+        ),
+        migrations.AddField(
+            model_name='sodruleset',
+            name='organization',
+            field=models.ForeignKey(help_text='Organization that owns this record', on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='organization'),
+        ),
+        migrations.AddField(
+            model_name='sodruleset',
+            name='updated_by',
+            field=models.ForeignKey(blank=True, help_text='User who last modified this record', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='%(class)s_updated', to=settings.AUTH_USER_MODEL, verbose_name='updated by'),
+        ),
+        migrations.AddField(
+            model_name='sodrule',
+            name='rule_set',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='rules', to='compliance.sodruleset'),
+        ),
+        migrations.AddConstraint(
+            model_name='sodruleset',
+            constraint=models.CheckConstraint(condition=models.Q(('organization__isnull', False)), name='organization_required_sodruleset'),
+        ),
+        migrations.AddIndex(
+            model_name='sodrule',
+            index=models.Index(fields=['organization', 'is_active'], name='compliance__organiz_0226ee_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='sodrule',
+            constraint=models.CheckConstraint(condition=models.Q(('organization__isnull', False)), name='organization_required_sodrule'),
+        ),
+    ]
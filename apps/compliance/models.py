@@ -1,11 +1,14 @@
 # oreno\apps\compliance\models.py
 
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVectorField
 from django.db import models
 from django.core.exceptions import ValidationError
 from django.core.validators import MinValueValidator, MaxValueValidator
 from django_ckeditor_5.fields import CKEditor5Field
 from django.utils import timezone
 from core.models.validators import file_upload_validators
+from core.blobstore import get_blob_storage
 from organizations.models import Organization
 from core.models.abstract_models import TimeStampedModel, OrganizationOwnedModel, AuditableModel
 from django.contrib.auth import get_user_model
@@ -39,6 +42,7 @@ class PolicyDocument(OrganizationOwnedModel, AuditableModel):
     title = models.CharField(max_length=512, db_index=True)
     file = models.FileField(
         upload_to='policy_documents/',
+        storage=get_blob_storage,
         validators=file_upload_validators()
     )
     version = models.CharField(max_length=50, default='1.0')
@@ -76,6 +80,12 @@ class DocumentProcessing(OrganizationOwnedModel):
     error_message = models.TextField(blank=True, null=True)
     completed_at = models.DateTimeField(null=True, blank=True)
     confidence_score = models.FloatField(default=0.0)  # 0.0 to 1.0
+    # Filled by compliance.ingestion
+    content_sha256 = models.CharField(max_length=64, blank=True, db_index=True)
+    page_count = models.PositiveIntegerField(default=0)
+    section_count = models.PositiveIntegerField(default=0)
+    sections_changed = models.PositiveIntegerField(default=0, help_text='Sections parsed and indexed by this run')
+    sections_removed = models.PositiveIntegerField(default=0)
     
     def __str__(self):
         return f"Processing {self.document.title} ({self.status})"
@@ -88,6 +98,46 @@ class DocumentProcessing(OrganizationOwnedModel):
             )
         ]
 
+class PolicySection(OrganizationOwnedModel):
+    """
+    One clause of a policy document's current file (one page for documents
+    without numbered headings), with its text indexed for full-text search.
+    Rows are identified by a hash of their content, so a section that is
+    unchanged in a new version keeps its row and index entry.
+    """
+    document = models.ForeignKey(PolicyDocument, on_delete=models.CASCADE, related_name='sections')
+    position = models.PositiveIntegerField()
+    clause = models.CharField(max_length=50, blank=True, help_text='Clause number, e.g. "4.2.1" or "A.5.1"')
+    heading = models.CharField(max_length=512, blank=True)
+    text = models.TextField(blank=True)
+    sha256 = models.CharField(max_length=64)
+    page_start = models.PositiveIntegerField(default=1)
+    page_end = models.PositiveIntegerField(default=1)
+    search_vector = SearchVectorField(null=True, editable=False)
+
+    class Meta:
+        ordering = ['document', 'position']
+        indexes = [
+            models.Index(fields=['document', 'position']),
+            models.Index(fields=['document', 'sha256']),
+            models.Index(fields=['organization', 'clause']),
+            GinIndex(fields=['search_vector'], name='compliance_section_search_gin'),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(organization__isnull=False),
+                name='organization_required_policysection'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.document.title} § {self.clause or self.position}"
+
+    def requirements(self):
+        """Requirements whose tags reference this section's clause"""
+        from .ingestion import requirements_for_clause
+        return requirements_for_clause(self.organization, self.clause)
+
 class ComplianceRequirement(OrganizationOwnedModel, AuditableModel):
     requirement_id = models.CharField(max_length=50, unique=True, db_index=True)
     title = models.CharField(max_length=512, db_index=True)
@@ -108,13 +158,15 @@ class ComplianceRequirement(OrganizationOwnedModel, AuditableModel):
     
     jurisdiction = models.CharField(max_length=100)
     mandatory = models.BooleanField(default=True)
-    tags = models.JSONField(default=dict, blank=True)  # e.g., {"category": "data privacy", "risk_level": "high"}
+    tags = models.JSONField(default=dict, blank=True)  # e.g., {"category": "data privacy", "risk_level": "high", "clauses": ["4.2"]}
     
     class Meta:
         ordering = ['requirement_id']
         indexes = [
             models.Index(fields=['regulatory_framework']),
             models.Index(fields=['policy_document']),
+            # tags @> {"clauses": [...]} lookups (compliance.ingestion.requirements_for_clause)
+            GinIndex(fields=['tags'], name='compliance_req_tags_gin', opclasses=['jsonb_path_ops']),
         ]
         app_label = "compliance"
         constraints = [
@@ -625,13 +677,96 @@ class SegregationOfDuties(OrganizationOwnedModel, AuditableModel):
     )
     last_review_date = models.DateField(null=True, blank=True)
     next_review_date = models.DateField(null=True, blank=True)
+    # Set on conflicts found by the SoD analysis (compliance.sod); manual entries have no rule
+    rule = models.ForeignKey('SoDRule', on_delete=models.CASCADE, null=True, blank=True, related_name='violations')
+    detected_at = models.DateTimeField(null=True, blank=True)
+    resolved_at = models.DateTimeField(null=True, blank=True, help_text='When the user stopped holding the conflicting duties')
     
     class Meta:
         verbose_name = "Segregation of Duties"
         verbose_name_plural = "Segregation of Duties"
+        indexes = [
+            models.Index(fields=['organization', 'resolved_at']),
+        ]
         constraints = [
             models.CheckConstraint(
                 check=models.Q(organization__isnull=False),
                 name='organization_required_segregationofduties'
+            ),
+            models.UniqueConstraint(
+                fields=['rule', 'user'],
+                condition=models.Q(rule__isnull=False),
+                name='unique_sod_violation_per_rule_user'
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user} – {self.conflicting_role}"
+
+
+class SoDRuleSet(OrganizationOwnedModel, AuditableModel):
+    """
+    A named collection of toxic-combination rules, e.g. "Procure to pay".
+    """
+    name = models.CharField(max_length=255)
+    description = models.TextField(blank=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "SoD Rule Set"
+        verbose_name_plural = "SoD Rule Sets"
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(organization__isnull=False),
+                name='organization_required_sodruleset'
             )
-        ]
\ No newline at end of file
+        ]
+
+    def __str__(self):
+        return self.name
+
+
+class SoDRule(OrganizationOwnedModel, AuditableModel):
+    """
+    A toxic combination of duties. ``duties`` is a list of at least two
+    duties, each a list of entitlements of which holding any one grants the
+    duty; a user holding every duty violates the rule. Entitlements are
+    ``"role:<role>"`` (user or organization role), ``"group:<group name>"``
+    or ``"perm:<app_label>.<codename>"`` (direct or through a group).
+    """
+    ENTITLEMENT_PREFIXES = ('role:', 'group:', 'perm:')
+
+    rule_set = models.ForeignKey(SoDRuleSet, on_delete=models.CASCADE, related_name='rules')
+    code = models.CharField(max_length=50, blank=True)
+    name = models.CharField(max_length=255)
+    duties = models.JSONField(default=list, help_text='e.g. [["perm:contracts.add_vendor"], ["perm:contracts.approve_payment", "role:manager"]]')
+    violation_type = models.CharField(max_length=30, choices=SegregationOfDuties.VIOLATION_TYPE_CHOICES)
+    severity = models.CharField(max_length=20, choices=SegregationOfDuties.SEVERITY_CHOICES, default='high')
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        verbose_name = "SoD Rule"
+        verbose_name_plural = "SoD Rules"
+        indexes = [
+            models.Index(fields=['organization', 'is_active']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(organization__isnull=False),
+                name='organization_required_sodrule'
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.code} {self.name}".strip()
+
+    def clean(self):
+        super().clean()
+        if not isinstance(self.duties, list) or len(self.duties) < 2:
+            raise ValidationError({'duties': 'A rule needs at least two conflicting duties.'})
+        for duty in self.duties:
+            if not isinstance(duty, list) or not duty or not all(
+                isinstance(entitlement, str) and entitlement.startswith(self.ENTITLEMENT_PREFIXES)
+                for entitlement in duty
+            ):
+                raise ValidationError({'duties': 'Each duty is a non-empty list of "role:", "group:" or "perm:" entitlements.'})
@@ -0,0 +1,72 @@
+# apps/compliance/sample_policies.py
+
+"""
+Generated policy PDFs for the policy ingestion tests and benchmark.
+
+``policy_clauses`` produces numbered clauses ("4.2 Access reviews" and a
+few sentences each); ``write_policy_pdf`` lays them out on A4-ish pages
+with pypdfium2, so the text comes back out through the same extraction
+path real uploads take.
+"""
+
+import ctypes
+
+PAGE_WIDTH, PAGE_HEIGHT = 612, 792
+MARGIN, LINE_HEIGHT, FONT_SIZE = 56, 14, 10
+
+TOPICS = (
+    'Access control', 'Asset management', 'Cryptography', 'Supplier relationships', 'Incident management',
+    'Business continuity', 'Logging and monitoring', 'Change management', 'Data retention', 'Physical security',
+)
+
+
+def policy_clauses(count, revision=0, changed_every=0):
+    """
+    ``count`` clauses as ``(clause, heading, paragraph lines)``. With
+    ``changed_every=n`` every n-th clause's wording depends on ``revision``,
+    i.e. differs between revisions while the others stay identical.
+    """
+    clauses = []
+    for n in range(count):
+        chapter, number = divmod(n, 10)
+        topic = TOPICS[number]
+        version = revision if changed_every and n % changed_every == 0 else 0
+        lines = [
+            f'The organization shall maintain {topic.lower()} controls appropriate to clause {chapter + 1}.{number + 1}.',
+            f'Owners review the {topic.lower()} procedures at least annually (revision {version}).',
+            'Exceptions require written approval from the information security officer',
+            'and are recorded in the risk register with a review date.',
+        ]
+        clauses.append((f'{chapter + 1}.{number + 1}', topic, lines))
+    return clauses
+
+
+def write_policy_pdf(path, clauses, lines_per_page=48):
+    import pypdfium2 as pdfium
+    import pypdfium2.raw as pdfium_c
+
+    pdf = pdfium.PdfDocument.new()
+    lines = []
+    for clause, heading, paragraph in clauses:
+        lines.append(f'{clause} {heading}')
+        lines.extend(paragraph)
+        lines.append('')
+
+    for start in range(0, len(lines), lines_per_page):
+        page = pdf.new_page(PAGE_WIDTH, PAGE_HEIGHT)
+        y = PAGE_HEIGHT - MARGIN
+        for line in lines[start:start + lines_per_page]:
+            if line:
+                text = pdfium_c.FPDFPageObj_NewTextObj(pdf, b'Helvetica', FONT_SIZE)
+                encoded = (line + '\0').encode('utf-16-le')
+                buffer = ctypes.create_string_buffer(encoded, len(encoded))
+                pdfium_c.FPDFText_SetText(text, ctypes.cast(buffer, ctypes.POINTER(pdfium_c.FPDF_WCHAR)))
+                pdfium_c.FPDFPageObj_Transform(text, 1, 0, 0, 1, MARGIN, y)
+                pdfium_c.FPDFPage_InsertObject(page, text)
+            y -= LINE_HEIGHT
+        pdfium_c.FPDFPage_GenerateContent(page)
+        page.close()
+    pdf.save(path)
+    page_count = len(pdf)
+    pdf.close()
+    return page_count
@@ -1,5 +1,12 @@
-from django.db.models.signals import post_save, post_delete
+import threading
+import weakref
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models.signals import m2m_changed, post_init, post_save, post_delete
 from django.dispatch import receiver
+from users.models import OrganizationRole
 from .models import (
     ComplianceFramework,
     PolicyDocument,
@@ -22,11 +29,26 @@ def complianceframework_post_delete(sender, instance, **kwargs):
     pass
 
 # PolicyDocument signals
+def _loaded_file_name(instance):
+    # Read the raw value so a deferred file field is not fetched per instance
+    value = instance.__dict__.get('file')
+    return getattr(value, 'name', value)
+
+@receiver(post_init, sender=PolicyDocument)
+def policydocument_post_init(sender, instance, **kwargs):
+    instance._processed_file_name = _loaded_file_name(instance)
+
 @receiver(post_save, sender=PolicyDocument)
-def policydocument_post_save(sender, instance, created, **kwargs):
-    if created:
-        # TODO: Add audit log or notification logic here
-        pass
+def policydocument_post_save(sender, instance, created, update_fields=None, **kwargs):
+    if update_fields is not None and 'file' not in update_fields:
+        return  # e.g. saving an instance loaded with the file deferred
+    # (Re)index the sections whenever a new file is stored
+    file_name = _loaded_file_name(instance)
+    if file_name and (created or file_name != instance._processed_file_name):
+        from .tasks import process_policy_document
+        document_id, organization_id = instance.pk, instance.organization_id
+        transaction.on_commit(lambda: process_policy_document.delay(document_id, organization_id), robust=True)
+    instance._processed_file_name = file_name
 
 @receiver(post_delete, sender=PolicyDocument)
 def policydocument_post_delete(sender, instance, **kwargs):
@@ -79,4 +101,86 @@ def complianceevidence_post_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=ComplianceEvidence)
 def complianceevidence_post_delete(sender, instance, **kwargs):
     # TODO: Add cleanup or audit logic here
-    pass 
\ No newline at end of file
+    pass
+
+# Segregation of duties: re-evaluate a user whose access changed
+User = get_user_model()
+
+
+_sod_pending = threading.local()
+
+
+def _queue_sod_user(user_id, organization_id):
+    if organization_id is None:
+        return
+    # A group change also rewrites the user's permissions; queue the user once per transaction.
+    # The pending set lives on the on_commit callback and is only weakly referenced here, so a
+    # rollback, which discards the callback, discards the set with it.
+    pending = getattr(_sod_pending, 'flush', None)
+    flush = pending() if pending is not None else None
+    if flush is not None:
+        flush.users.add((user_id, organization_id))
+        return
+    from .tasks import evaluate_user_sod
+
+    users = {(user_id, organization_id)}
+
+    def flush():
+        _sod_pending.flush = None
+        for key in users:
+            evaluate_user_sod.delay(*key)
+    flush.users = users  # not read inside flush: a reference cycle would outlive a rollback
+    _sod_pending.flush = weakref.ref(flush)
+    # Never fail the access change itself; the next full analysis catches up
+    transaction.on_commit(flush, robust=True)
+
+
+def _queue_sod_analysis():
+    from .tasks import run_sod_analysis
+    transaction.on_commit(lambda: run_sod_analysis.delay(), robust=True)
+
+
+SOD_USER_FIELDS = ('role', 'organization_id', 'is_active')
+
+
+def _sod_access(user):
+    # Read from __dict__ so deferred fields are not loaded for every user instance
+    return tuple(user.__dict__.get(field) for field in SOD_USER_FIELDS)
+
+@receiver(post_init, sender=User)
+def user_post_init_sod(sender, instance, **kwargs):
+    instance._sod_access = _sod_access(instance)
+
+@receiver(post_save, sender=User)
+def user_post_save_sod(sender, instance, created, **kwargs):
+    previous, access = instance._sod_access, _sod_access(instance)
+    if created or access != previous:
+        _queue_sod_user(instance.pk, instance.organization_id)
+        if previous[1] not in (None, instance.organization_id):
+            _queue_sod_user(instance.pk, previous[1])
+    instance._sod_access = access
+
+@receiver(post_save, sender=OrganizationRole)
+@receiver(post_delete, sender=OrganizationRole)
+def organizationrole_changed_sod(sender, instance, **kwargs):
+    _queue_sod_user(instance.user_id, instance.organization_id)
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def user_access_changed_sod(sender, instance, action, reverse, pk_set, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if not reverse:
+        _queue_sod_user(instance.pk, instance.organization_id)
+    elif pk_set:
+        for user_id, organization_id in User.objects.filter(pk__in=pk_set).values_list('pk', 'organization_id'):
+            _queue_sod_user(user_id, organization_id)
+    else:
+        # A group was cleared of all its members
+        _queue_sod_analysis()
+
+@receiver(m2m_changed, sender=Group.permissions.through)
+def group_permissions_changed_sod(sender, action, **kwargs):
+    # Affects every member in every tenant
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        _queue_sod_analysis()
@@ -0,0 +1,318 @@
+"""
+Segregation of duties analysis.
+
+Active ``SoDRule`` rows are compiled into a ``RuleMatrix``: every
+entitlement a rule references ("role:manager", "group:AP clerks",
+"perm:contracts.approve_payment") gets a bit, and every duty becomes a mask
+of the entitlements that grant it. Each user's entitlements (user role,
+organization role, groups, and permissions held directly or through a
+group) are loaded into a row of 64-bit words, so the organization becomes a
+``users x words`` numpy array.
+
+A full analysis evaluates every rule in one pass: users with identical
+entitlements are collapsed into one profile, the profiles' bits are
+unpacked into columns, and two array reductions over all profiles give
+which duties are held (any of their entitlements) and which rules are
+violated (all of their duties). The resulting ``(user, rule)`` pairs are reconciled with the
+stored ``SegregationOfDuties`` rows: new conflicts are written with
+``bulk_create``, conflicts that came back are reopened, and those no
+longer present are marked resolved (rows are kept for their review
+history). Manually entered rows (no rule) are never touched.
+
+When one user's roles, groups or permissions change only that user is
+re-evaluated (``evaluate_user``), with Python integers as bitsets.
+"""
+
+import logging
+import time
+from collections import defaultdict
+
+import numpy as np
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+WORD_BITS = 64
+
+
+class RuleMatrix:
+    """Rules compiled into entitlement bit masks"""
+
+    def __init__(self, rules):
+        """``rules`` is an iterable of ``(rule_id, duties)``"""
+        self.index = {}
+        self.rule_ids, self.duties, self.masks = [], [], []
+        offsets, duty_offsets, duty_bits = [], [], []
+        for rule_id, duties in rules:
+            offsets.append(len(duty_offsets))
+            rule_masks = []
+            for duty in duties:
+                duty_offsets.append(len(duty_bits))
+                mask = 0
+                for entitlement in duty:
+                    bit = self.index.setdefault(entitlement, len(self.index))
+                    duty_bits.append(bit)
+                    mask |= 1 << bit
+                rule_masks.append(mask)
+            self.rule_ids.append(rule_id)
+            self.duties.append(duties)
+            self.masks.append(rule_masks)
+
+        self.width = max(1, -(-len(self.index) // WORD_BITS))
+        self.offsets = np.array(offsets, dtype=np.intp)
+        self.duty_offsets = np.array(duty_offsets, dtype=np.intp)
+        self.duty_bits = np.array(duty_bits, dtype=np.intp)
+
+    def __len__(self):
+        return len(self.rule_ids)
+
+    def bits(self, entitlements):
+        """A Python integer bitset of ``entitlements``"""
+        value = 0
+        for entitlement in entitlements:
+            bit = self.index.get(entitlement)
+            if bit is not None:
+                value |= 1 << bit
+        return value
+
+    def user_words(self, user_ids, grants):
+        """
+        ``len(user_ids) x width`` array of the users' entitlement bits from
+        ``(user_id, entitlement)`` pairs; entitlements no rule uses are dropped.
+        """
+        rows = {user_id: row for row, user_id in enumerate(user_ids)}
+        pairs = [
+            (rows[user_id], self.index[entitlement]) for user_id, entitlement in grants
+            if entitlement in self.index and user_id in rows
+        ]
+        words = np.zeros((len(user_ids), self.width), dtype=np.uint64)
+        if pairs:
+            row, bit = np.array(pairs, dtype=np.int64).T
+            np.bitwise_or.at(words, (row, bit // WORD_BITS), np.left_shift(np.uint64(1), (bit % WORD_BITS).astype(np.uint64)))
+        return words
+
+    def evaluate(self, words, chunk_size=None):
+        """
+        Every rule against every user row of ``words``; returns
+        ``(rows, rule_positions, profiles, profile_of_row)`` where ``rows``
+        and ``rule_positions`` index the violations.
+        """
+        if not len(self) or not len(words):
+            empty = np.zeros(0, dtype=np.intp)
+            return empty, empty, words, np.zeros(len(words), dtype=np.intp)
+
+        profiles, profile_of_row = np.unique(words, axis=0, return_inverse=True)
+        profile_of_row = profile_of_row.reshape(-1)
+        chunk_size = chunk_size or max(1, (16 * 1024 * 1024) // (self.width * WORD_BITS + len(self.duty_bits)))
+        violated = np.empty((len(profiles), len(self)), dtype=bool)
+        for start in range(0, len(profiles), chunk_size):
+            # Bit b of a row becomes column b; a duty is held if any of its columns is set
+            chunk = profiles[start:start + chunk_size].astype('<u8').view(np.uint8)
+            bits = np.unpackbits(chunk, axis=1, bitorder='little').view(bool)
+            held = np.logical_or.reduceat(bits[:, self.duty_bits], self.duty_offsets, axis=1)
+            violated[start:start + chunk_size] = np.logical_and.reduceat(held, self.offsets, axis=1)
+
+        rows, rule_positions = np.nonzero(violated[profile_of_row])
+        return rows, rule_positions, profiles, profile_of_row
+
+    def evaluate_bits(self, bits):
+        """Positions of the rules violated by one user's bitset"""
+        return [
+            position for position, masks in enumerate(self.masks)
+            if all(bits & mask for mask in masks)
+        ]
+
+    def held_entitlements(self, position, has):
+        """The entitlements behind each duty of rule ``position``, for ``has(entitlement)``"""
+        return [[entitlement for entitlement in duty if has(entitlement)] for duty in self.duties[position]]
+
+
+def describe_conflict(held):
+    text = ' + '.join(', '.join(entitlements) for entitlements in held)
+    return text if len(text) <= 255 else text[:252] + '...'
+
+
+class SoDEngine:
+    """
+    Finds users holding toxic combinations of duties and keeps their
+    ``SegregationOfDuties`` rows up to date.
+    """
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or getattr(settings, 'SOD_BATCH_SIZE', 1000)
+
+    def compile_rules(self, organization):
+        from .models import SoDRule
+
+        rules = SoDRule.objects.filter(
+            organization=organization, is_active=True, rule_set__is_active=True,
+        ).order_by('pk')
+        details = {}
+        compiled = []
+        for rule_id, duties, violation_type, severity in rules.values_list('pk', 'duties', 'violation_type', 'severity'):
+            if isinstance(duties, list) and len(duties) >= 2 and all(duties):
+                compiled.append((rule_id, duties))
+                details[rule_id] = (violation_type, severity)
+        return RuleMatrix(compiled), details
+
+    def load_grants(self, organization, matrix, user_id=None):
+        """
+        ``(user_ids, grants)`` for the organization's active users (or just
+        ``user_id``), keeping only entitlements ``matrix`` references.
+        """
+        from users.models import OrganizationRole
+
+        User = get_user_model()
+        users = User.objects.filter(
+            Q(organization=organization) | Q(user_roles__organization=organization), is_active=True,
+        )
+        if user_id is not None:
+            users = users.filter(pk=user_id)
+        used = matrix.index
+        grants = []
+        user_ids = set()
+        for pk, role in users.values_list('pk', 'role').distinct():
+            user_ids.add(pk)
+            grants.append((pk, f'role:{role}'))
+        roles = OrganizationRole.objects.filter(organization=organization)
+        if user_id is not None:
+            roles = roles.filter(user_id=user_id)
+        grants.extend((pk, f'role:{role}') for pk, role in roles.values_list('user_id', 'role') if pk in user_ids)
+
+        if any(entitlement.startswith(('group:', 'perm:')) for entitlement in used):
+            user_field = User.groups.field.m2m_field_name()
+            user_pks = users.values('pk')
+            memberships = (
+                User.groups.through.objects.filter(**{f'{user_field}__in': user_pks})
+                .values_list(f'{user_field}_id', 'group_id', 'group__name')
+            )
+            group_grants = defaultdict(list)
+            members = []
+            for pk, group_id, name in memberships:
+                members.append((pk, group_id))
+                if f'group:{name}' in used:
+                    group_grants[group_id].append(f'group:{name}')
+            group_permissions = (
+                Group.permissions.through.objects.filter(group_id__in={group_id for _, group_id in members})
+                .values_list('group_id', 'permission__content_type__app_label', 'permission__codename')
+            )
+            for group_id, app_label, codename in group_permissions:
+                if f'perm:{app_label}.{codename}' in used:
+                    group_grants[group_id].append(f'perm:{app_label}.{codename}')
+            for pk, group_id in members:
+                grants.extend((pk, entitlement) for entitlement in group_grants.get(group_id, ()))
+
+            direct = (
+                User.user_permissions.through.objects.filter(**{f'{user_field}__in': user_pks})
+                .values_list(f'{user_field}_id', 'permission__content_type__app_label', 'permission__codename')
+            )
+            grants.extend(
+                (pk, f'perm:{app_label}.{codename}') for pk, app_label, codename in direct
+                if f'perm:{app_label}.{codename}' in used
+            )
+        return sorted(user_ids), grants
+
+    def analyze(self, organization):
+        """Evaluate every active rule for every user of ``organization``; returns run statistics"""
+        started = time.monotonic()
+        matrix, details = self.compile_rules(organization)
+        user_ids, grants = self.load_grants(organization, matrix)
+        words = matrix.user_words(user_ids, grants)
+        loaded = time.monotonic()
+        rows, positions, profiles, profile_of_row = matrix.evaluate(words)
+        evaluated = time.monotonic()
+
+        descriptions = {}
+
+        def conflict(pair):
+            row, position = pair
+            key = (profile_of_row[row], position)
+            if key not in descriptions:
+                profile = profiles[key[0]]
+                descriptions[key] = describe_conflict(matrix.held_entitlements(
+                    position, lambda e: bool(int(profile[matrix.index[e] // WORD_BITS]) >> (matrix.index[e] % WORD_BITS) & 1),
+                ))
+            return descriptions[key]
+
+        found = {
+            (user_ids[row], matrix.rule_ids[position]): (row, position)
+            for row, position in zip(rows.tolist(), positions.tolist())
+        }
+        stats = self.reconcile(organization, found, lambda pair: conflict(found[pair]), details)
+        stats.update(
+            users=len(user_ids), rules=len(matrix), entitlements=len(matrix.index), profiles=len(profiles),
+            violations=len(found), load_seconds=round(loaded - started, 3),
+            evaluate_seconds=round(evaluated - loaded, 3), seconds=round(time.monotonic() - started, 3),
+        )
+        logger.info(f"SoD analysis for {organization}: {stats}")
+        return stats
+
+    def evaluate_user(self, organization, user_id):
+        """Re-evaluate one user after their roles, groups or permissions changed"""
+        matrix, details = self.compile_rules(organization)
+        user_ids, grants = self.load_grants(organization, matrix, user_id=user_id)
+        entitlements = {entitlement for _, entitlement in grants}
+        found = {}
+        if user_ids:
+            for position in matrix.evaluate_bits(matrix.bits(entitlements)):
+                found[(user_id, matrix.rule_ids[position])] = position
+        return self.reconcile(
+            organization, found,
+            lambda pair: describe_conflict(matrix.held_entitlements(found[pair], entitlements.__contains__)),
+            details, user_id=user_id,
+        )
+
+    def reconcile(self, organization, found, describe, details, user_id=None):
+        """
+        Make the stored rule violations (of ``user_id``, or everyone) match
+        ``found``, a collection of ``(user_id, rule_id)`` pairs.
+        """
+        from core.signals import log_change
+        from .models import SegregationOfDuties
+
+        now = timezone.now()
+        with transaction.atomic():
+            stored = SegregationOfDuties.objects.filter(organization=organization, rule__isnull=False)
+            if user_id is not None:
+                stored = stored.filter(user_id=user_id)
+            reopen, resolve, existing = [], [], set()
+            for pk, pair_user, rule_id, resolved_at in stored.values_list('pk', 'user_id', 'rule_id', 'resolved_at'):
+                pair = (pair_user, rule_id)
+                existing.add(pair)
+                if pair in found and resolved_at is not None:
+                    reopen.append(pk)
+                elif pair not in found and resolved_at is None:
+                    resolve.append(pk)
+
+            new = [
+                SegregationOfDuties(
+                    organization=organization, user_id=pair[0], rule_id=pair[1], conflicting_role=describe(pair),
+                    violation_type=details[pair[1]][0], severity=details[pair[1]][1], detected_at=now,
+                )
+                for pair in found if pair not in existing
+            ]
+            SegregationOfDuties.objects.bulk_create(new, batch_size=self.batch_size, ignore_conflicts=True)
+            for start in range(0, len(reopen), self.batch_size):
+                SegregationOfDuties.objects.filter(pk__in=reopen[start:start + self.batch_size]).update(
+                    resolved_at=None, detected_at=now, updated_at=now,
+                )
+            for start in range(0, len(resolve), self.batch_size):
+                SegregationOfDuties.objects.filter(pk__in=resolve[start:start + self.batch_size]).update(
+                    resolved_at=now, updated_at=now,
+                )
+
+            stats = {'created': len(new), 'reopened': len(reopen), 'resolved': len(resolve)}
+            if new or reopen or resolve:
+                # One consolidated audit entry replaces the per-row post_save logging
+                log_change(organization, 'update', changes={
+                    'sod_analysis': {**stats, 'user_id': user_id},
+                })
+        return stats
+
+
+sod_engine = SoDEngine()
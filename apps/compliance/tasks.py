@@ -5,10 +5,11 @@ from django.utils import timezone
 from django.template.loader import render_to_string
 from django.urls import reverse
 from django.conf import settings
+from django_tenants.utils import tenant_context
 from datetime import timedelta
 import logging
 
-from .models import ComplianceObligation
+from .models import ComplianceObligation, PolicyDocument
 from core.utils import send_tenant_email
 
 logger = logging.getLogger(__name__)
@@ -156,39 +157,31 @@ def check_and_send_obligation_notifications():
     Check all active obligations and send notifications for due/overdue items
     This task should be run daily via cron
     """
+    from django.db.models import Q
+    from core.deadlines import deadline_calendar
+    from core.tasks import tenant_organizations
+
     try:
         today = timezone.now().date()
         seven_days_from_now = today + timedelta(days=7)
         one_day_ago = today - timedelta(days=1)
-        
-        # Get obligations due in 7 days (for reminders)
-        due_obligations = ComplianceObligation.objects.filter(
-            is_active=True,
-            status__in=['open', 'in_progress'],
-            due_date=seven_days_from_now
-        ).select_related('requirement', 'owner', 'organization')
-        
-        # Get obligations overdue by 1 day (for alerts)
-        overdue_obligations = ComplianceObligation.objects.filter(
-            is_active=True,
-            status__in=['open', 'in_progress'],
-            due_date=one_day_ago
-        ).select_related('requirement', 'owner', 'organization')
-        
-        # Send due reminders
+        has_owner = Q(owner__isnull=False) | ~Q(owner_email='')
+
         due_count = 0
-        for obligation in due_obligations:
-            if obligation.owner or obligation.owner_email:
-                send_obligation_due_reminder.delay(obligation.id, obligation.organization.id)
-                due_count += 1
-        
-        # Send overdue alerts
         overdue_count = 0
-        for obligation in overdue_obligations:
-            if obligation.owner or obligation.owner_email:
-                send_obligation_overdue_alert.delay(obligation.id, obligation.organization.id)
-                overdue_count += 1
-        
+        for organization in tenant_organizations():
+            with tenant_context(organization):
+                # Obligations due in 7 days (reminders) and overdue by 1 day (alerts), from the deadline calendar
+                due = deadline_calendar.due_on('obligation', seven_days_from_now, organization).filter(has_owner)
+                for obligation_id in due.values_list('object_id', flat=True):
+                    send_obligation_due_reminder.delay(obligation_id, organization.id)
+                    due_count += 1
+
+                overdue = deadline_calendar.due_on('obligation', one_day_ago, organization).filter(has_owner)
+                for obligation_id in overdue.values_list('object_id', flat=True):
+                    send_obligation_overdue_alert.delay(obligation_id, organization.id)
+                    overdue_count += 1
+
         logger.info(f"Obligation notifications: {due_count} due reminders, {overdue_count} overdue alerts queued")
         
         return {
@@ -200,3 +193,62 @@ def check_and_send_obligation_notifications():
     except Exception as e:
         logger.error(f"Error in check_and_send_obligation_notifications: {e}")
         return False
+
+
+@shared_task
+def process_policy_document(document_id, organization_id):
+    """
+    Split a policy document's current file into sections and index them;
+    only sections changed since the last version are parsed again.
+    """
+    from organizations.models import Organization
+    from .ingestion import policy_ingestor
+
+    organization = Organization.objects.filter(pk=organization_id).first()
+    if organization is None:
+        logger.error(f"Cannot process policy document {document_id}: organization {organization_id} not found")
+        return None
+
+    with tenant_context(organization):
+        document = PolicyDocument.objects.filter(pk=document_id, organization=organization).first()
+        if document is None or not document.file:
+            return None
+        run = policy_ingestor.process(document)
+        return {'status': run.status, 'sections': run.section_count, 'changed': run.sections_changed}
+
+
+@shared_task
+def run_sod_analysis(organization_id=None):
+    """
+    Evaluate every active segregation of duties rule for all users of an
+    organization (every tenant when ``organization_id`` is None).
+    """
+    from django_tenants.utils import get_public_schema_name
+    from organizations.models import Organization
+    from .models import SoDRule
+    from .sod import sod_engine
+
+    organizations = Organization.objects.exclude(schema_name=get_public_schema_name())
+    if organization_id is not None:
+        organizations = organizations.filter(pk=organization_id)
+    results = {}
+    for organization in organizations:
+        with tenant_context(organization):
+            if SoDRule.objects.filter(organization=organization, is_active=True).exists():
+                results[organization.pk] = sod_engine.analyze(organization)
+    return results
+
+
+@shared_task
+def evaluate_user_sod(user_id, organization_id):
+    """Re-evaluate one user's segregation of duties conflicts after an access change"""
+    from organizations.models import Organization
+    from .sod import sod_engine
+
+    organization = Organization.objects.filter(pk=organization_id).first()
+    if organization is None:
+        logger.error(f"Cannot evaluate SoD for user {user_id}: organization {organization_id} not found")
+        return None
+
+    with tenant_context(organization):
+        return sod_engine.evaluate_user(organization, user_id)
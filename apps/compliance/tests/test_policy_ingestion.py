@@ -0,0 +1,104 @@
+# apps/compliance/tests/test_policy_ingestion.py
+
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.core.files import File
+from django.test import override_settings
+from django_tenants.test.cases import TenantTestCase
+
+from compliance.ingestion import policy_ingestor, requirements_for_clause
+from compliance.models import ComplianceRequirement, PolicyDocument
+from compliance.sample_policies import policy_clauses, write_policy_pdf
+
+
+class PolicyIngestionTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Policy Ingestion Org'
+        tenant.code = 'POLICIES'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        self.workdir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.workdir)
+        settings_override = override_settings(MEDIA_ROOT=os.path.join(self.workdir, 'media'))
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def _store(self, revision, document=None):
+        path = os.path.join(self.workdir, f'policy-v{revision}.pdf')
+        write_policy_pdf(path, policy_clauses(40, revision=revision, changed_every=10), lines_per_page=24)
+        with open(path, 'rb') as f:
+            if document is None:
+                return PolicyDocument.objects.create(
+                    organization=self.tenant, title='Information Security Policy',
+                    effective_date=date(2026, 1, 1), file=File(f, name='isp.pdf'),
+                )
+            document.file = File(f, name='isp.pdf')
+            document.save()
+            return document
+
+    def test_storing_a_new_file_queues_processing(self):
+        with mock.patch('compliance.tasks.process_policy_document.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                document = self._store(revision=1)
+            delay.assert_called_once_with(document.pk, self.tenant.pk)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                document.title = 'Information Security Policy v1'
+                document.save()
+                self._store(revision=2, document=document)
+            self.assertEqual(delay.call_count, 2)
+
+            with self.captureOnCommitCallbacks(execute=True):
+                with self.assertNumQueries(1):
+                    deferred = list(PolicyDocument.objects.defer('file'))
+                deferred[0].title = 'Renamed'
+                deferred[0].save()
+            self.assertEqual(delay.call_count, 2)
+
+    def test_new_versions_only_reparse_changed_sections(self):
+        document = self._store(revision=1)
+        run = policy_ingestor.process(document)
+        self.assertEqual((run.status, run.page_count), ('completed', 10))
+        self.assertEqual((run.section_count, run.sections_changed, run.sections_removed), (40, 40, 0))
+        section = document.sections.get(clause='2.3')
+        self.assertEqual(section.heading, 'Cryptography')
+        unchanged_pks = set(document.sections.exclude(clause__in=['1.1', '2.1', '3.1', '4.1']).values_list('pk', flat=True))
+
+        # The same file again is not read at all
+        self.assertEqual(policy_ingestor.process(document).sections_changed, 0)
+
+        document = self._store(revision=2, document=document)
+        run = policy_ingestor.process(document)
+        self.assertEqual((run.section_count, run.sections_changed, run.sections_removed), (40, 4, 4))
+        self.assertEqual(list(document.sections.values_list('clause', flat=True)[:3]), ['1.1', '1.2', '1.3'])
+        self.assertTrue(unchanged_pks <= set(document.sections.values_list('pk', flat=True)))
+        self.assertIn('(revision 2)', document.sections.get(clause='1.1').text)
+
+        results = policy_ingestor.search(self.tenant, 'cryptography annually', document=document)
+        self.assertEqual({section.heading for section in results}, {'Cryptography'})
+
+    def test_requirements_referencing_a_clause(self):
+        document = self._store(revision=1)
+        policy_ingestor.process(document)
+        tagged = ComplianceRequirement.objects.create(
+            organization=self.tenant, requirement_id='REQ-ENC-1', title='Encrypt data at rest',
+            jurisdiction='EU', policy_document=document, tags={'category': 'crypto', 'clauses': ['2.3', '3.3']},
+        )
+        single = ComplianceRequirement.objects.create(
+            organization=self.tenant, requirement_id='REQ-ENC-2', title='Key rotation',
+            jurisdiction='EU', tags={'clause': '2.3'},
+        )
+        ComplianceRequirement.objects.create(
+            organization=self.tenant, requirement_id='REQ-ACC-1', title='Access reviews',
+            jurisdiction='EU', tags={'clauses': ['1.1']},
+        )
+
+        section = document.sections.get(clause='2.3')
+        self.assertEqual(set(section.requirements()), {tagged, single})
+        self.assertEqual(list(requirements_for_clause(self.tenant, '2.3', document=document)), [tagged])
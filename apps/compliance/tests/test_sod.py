@@ -0,0 +1,147 @@
+# apps/compliance/tests/test_sod.py
+
+import random
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.models import Group, Permission
+from django.db import connection, transaction
+from django.test import SimpleTestCase
+from django_tenants.test.cases import TenantTestCase
+
+from compliance.models import SegregationOfDuties, SoDRule, SoDRuleSet
+from compliance.sod import RuleMatrix, sod_engine
+from users.models import OrganizationRole
+
+User = get_user_model()
+
+
+class RuleMatrixTests(SimpleTestCase):
+    def test_vectorised_pass_matches_per_user_evaluation(self):
+        rng = random.Random(3)
+        pool = [f'perm:app.p{n}' for n in range(150)] + ['role:manager', 'role:staff', 'group:AP']
+        rules = [
+            (rule_id, [rng.sample(pool, rng.randint(1, 3)) for _ in range(rng.choice((2, 2, 3)))])
+            for rule_id in range(1, 80)
+        ]
+        user_ids = list(range(1, 400))
+        grants = [(user_id, entitlement) for user_id in user_ids for entitlement in rng.sample(pool, 25)]
+        grants.append((1, 'perm:not.used_by_any_rule'))
+        matrix = RuleMatrix(rules)
+
+        rows, positions, profiles, _ = matrix.evaluate(matrix.user_words(user_ids, grants), chunk_size=7)
+        vectorised = {(user_ids[row], matrix.rule_ids[position]) for row, position in zip(rows, positions)}
+
+        held = {user_id: set() for user_id in user_ids}
+        for user_id, entitlement in grants:
+            held[user_id].add(entitlement)
+        expected = {
+            (user_id, rule_id) for user_id in user_ids for rule_id, duties in rules
+            if all(held[user_id] & set(duty) for duty in duties)
+        }
+        self.assertTrue(expected)
+        self.assertEqual(vectorised, expected)
+        self.assertEqual(
+            {(user_id, matrix.rule_ids[p]) for user_id in user_ids for p in matrix.evaluate_bits(matrix.bits(held[user_id]))},
+            expected,
+        )
+
+
+class SoDEngineTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'SoD Org'
+        tenant.code = 'SOD'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.clerk = User.objects.create_user(
+                username='clerk', email='clerk@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='staff',
+            )
+            self.manager = User.objects.create_user(
+                username='manager', email='manager@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='manager',
+            )
+        self.preparers = Group.objects.create(name='Policy preparers')
+        self.preparers.permissions.add(Permission.objects.get(
+            content_type__app_label='compliance', codename='add_policydocument',
+        ))
+        rule_set = SoDRuleSet.objects.create(organization=self.tenant, name='Policy lifecycle')
+        self.rule = SoDRule.objects.create(
+            organization=self.tenant, rule_set=rule_set, code='POL-01', name='Prepare and approve policies',
+            duties=[['perm:compliance.add_policydocument'], ['role:manager', 'role:admin']],
+            violation_type='authorization_execution', severity='high',
+        )
+        self.manual = SegregationOfDuties.objects.create(
+            organization=self.tenant, user=self.clerk, conflicting_role='Legacy finding',
+            violation_type='custody_recording', severity='low',
+        )
+
+    def test_full_analysis_and_incremental_reevaluation(self):
+        self.clerk.groups.add(self.preparers)
+        self.manager.groups.add(self.preparers)
+
+        stats = sod_engine.analyze(self.tenant)
+        self.assertEqual((stats['violations'], stats['created']), (1, 1))
+        violation = SegregationOfDuties.objects.get(rule=self.rule)
+        self.assertEqual(violation.user, self.manager)
+        self.assertEqual(violation.conflicting_role, 'perm:compliance.add_policydocument + role:manager')
+        self.assertEqual(sod_engine.analyze(self.tenant)['created'], 0)
+
+        # The clerk is promoted through an organization role
+        with mock.patch('users.signals.send_mail'):
+            OrganizationRole.objects.create(organization=self.tenant, user=self.clerk, role='admin')
+        self.assertEqual(sod_engine.evaluate_user(self.tenant, self.clerk.pk)['created'], 1)
+
+        self.manager.groups.remove(self.preparers)
+        self.assertEqual(sod_engine.evaluate_user(self.tenant, self.manager.pk)['resolved'], 1)
+        violation.refresh_from_db()
+        self.assertIsNotNone(violation.resolved_at)
+
+        self.manager.groups.add(self.preparers)
+        self.assertEqual(sod_engine.analyze(self.tenant)['reopened'], 1)
+        violation.refresh_from_db()
+        self.assertIsNone(violation.resolved_at)
+        self.assertEqual(SegregationOfDuties.objects.filter(rule__isnull=False, resolved_at__isnull=True).count(), 2)
+        self.assertTrue(SegregationOfDuties.objects.filter(pk=self.manual.pk, resolved_at__isnull=True).exists())
+
+    def test_access_changes_queue_a_single_user_reevaluation(self):
+        connection.run_on_commit.clear()  # callbacks queued by setUp
+        with mock.patch('compliance.tasks.evaluate_user_sod.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                # Also rewrites the clerk's permissions (users.signals)
+                self.clerk.groups.add(self.preparers)
+            delay.assert_called_once_with(self.clerk.pk, self.tenant.pk)
+
+            delay.reset_mock()
+            with self.captureOnCommitCallbacks(execute=True):
+                self.clerk.last_name = 'Clerk'
+                self.clerk.save()
+            delay.assert_not_called()
+
+            with self.captureOnCommitCallbacks(execute=True):
+                self.clerk.role = 'manager'
+                self.clerk.save()
+                self.manager.role = 'staff'
+                self.manager.save()
+                self.clerk.groups.remove(self.preparers)
+            self.assertEqual(sorted(call.args for call in delay.call_args_list), sorted([
+                (self.clerk.pk, self.tenant.pk), (self.manager.pk, self.tenant.pk),
+            ]))
+
+    def test_rolled_back_access_changes_are_not_queued(self):
+        connection.run_on_commit.clear()  # callbacks queued by setUp
+        with mock.patch('compliance.tasks.evaluate_user_sod.delay') as delay:
+            try:
+                with transaction.atomic():
+                    self.clerk.groups.add(self.preparers)
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+            with self.captureOnCommitCallbacks(execute=True):
+                self.clerk.role = 'manager'
+                self.clerk.save()
+        delay.assert_called_once_with(self.clerk.pk, self.tenant.pk)
@@ -83,6 +83,7 @@ urlpatterns = [
     path('policydocuments/', views.PolicyDocumentListView.as_view(), name='policydocument_list'),
     path('policydocuments/create/', views.PolicyDocumentCreateView.as_view(), name='policydocument_create'),
     path('policydocuments/<int:pk>/', views.PolicyDocumentDetailView.as_view(), name='policydocument_detail'),
+    path('policydocuments/<int:pk>/download/', views.PolicyDocumentDownloadView.as_view(), name='policydocument_download'),
     path('policydocuments/<int:pk>/update/', views.PolicyDocumentUpdateView.as_view(), name='policydocument_update'),
     path('policydocuments/<int:pk>/delete/', views.PolicyDocumentDeleteView.as_view(), name='policydocument_delete'),
 
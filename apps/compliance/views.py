@@ -24,7 +24,9 @@ from .forms import (
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.utils import timezone
 from django.db.models import Q
-from collections import Counter
+from core.dashboard import DashboardMetrics
+from core.periods import PeriodFilter
+from core.downloads import ProtectedFileView
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
 from datetime import timedelta
@@ -136,6 +138,9 @@ class PolicyDocumentDetailView(OrganizationPermissionMixin, LoginRequiredMixin,
     def get_queryset(self):
         return super().get_queryset().filter(organization=self.request.organization)
 
+class PolicyDocumentDownloadView(OrganizationPermissionMixin, LoginRequiredMixin, ProtectedFileView):
+    model = PolicyDocument
+
 class PolicyDocumentCreateView(OrganizationPermissionMixin, LoginRequiredMixin, CreateView):
     model = PolicyDocument
     form_class = PolicyDocumentForm
@@ -420,109 +425,75 @@ class ComplianceDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, T
         context = super().get_context_data(**kwargs)
         org = self.request.organization
         # --- Period Filter Logic (aligned with Audit) ---
-        from django.utils import timezone
-        import calendar
-        from django.db.models import Q
-        org_created = getattr(org, 'created_at', timezone.now()).date()
+        period = PeriodFilter.from_request(self.request, org)
+        requirement_period_q = period.q('updated_at', ComplianceRequirement)
+        policy_period_q = period.q('updated_at', PolicyDocument)
+        obligation_period_q = (
+            period.q('updated_at', ComplianceObligation) | period.q('due_date', ComplianceObligation)
+        )
         today = timezone.now().date()
-        years = list(range(org_created.year, today.year + 1))
-        months = [(i, calendar.month_name[i]) for i in range(1, 13)]
-        selected_years = self.request.GET.getlist('year') or [str(today.year)]
-        selected_months = self.request.GET.getlist('month')
-        filter_all = 'All' in selected_years
-        year_ints = [int(y) for y in selected_years if y.isdigit()]
-        month_ints = [int(m) for m in selected_months if m.isdigit()]
         
-        # Basic counts
-        context['framework_count'] = ComplianceFramework.objects.filter(organization=org).count()
-        context['requirement_count'] = ComplianceRequirement.objects.filter(organization=org).count()
-        context['obligation_count'] = ComplianceObligation.objects.filter(organization=org).count()
-        context['evidence_count'] = ComplianceEvidence.objects.filter(organization=org).count()
-        context['policydocument_count'] = PolicyDocument.objects.filter(organization=org).count()
-
-        # Advanced analytics: Requirement counts by framework, jurisdiction, mandatory
-        req_qs = ComplianceRequirement.objects.filter(organization=org)
-        if not filter_all:
-            rq = Q(updated_at__year__in=year_ints)
-            if month_ints:
-                rq &= Q(updated_at__month__in=month_ints)
-            req_qs = req_qs.filter(rq)
-        framework_dist = req_qs.values_list('regulatory_framework__name', flat=True)
-        framework_counter = Counter(framework_dist)
-        context['requirement_framework_dist'] = dict(framework_counter) or {'General': 0}
+        metrics = DashboardMetrics()
+        metrics.source(ComplianceFramework.objects.filter(organization=org)).count('framework_count')
+        metrics.source(ComplianceEvidence.objects.filter(organization=org)).count('evidence_count')
         
-        # Jurisdiction distribution
-        jurisdiction_qs = req_qs.values_list('jurisdiction', flat=True)
-        jurisdiction_counter = Counter(jurisdiction_qs)
-        context['requirement_jurisdiction_chart'] = dict(jurisdiction_counter) or {'General': 0}
+        # Requirement counts by framework, jurisdiction, mandatory
+        requirements = metrics.source(ComplianceRequirement.objects.filter(organization=org))
+        requirements.count('requirement_count')
+        requirements.count('mandatory_requirements', requirement_period_q & Q(mandatory=True))
+        requirements.count('optional_requirements', requirement_period_q & ~Q(mandatory=True))
+        requirements.histogram(
+            'requirement_framework_dist', 'regulatory_framework__name', filter=requirement_period_q, default={'General': 0},
+        )
+        requirements.histogram(
+            'requirement_jurisdiction_chart', 'jurisdiction', filter=requirement_period_q, default={'General': 0},
+        )
         
-        # Mandatory vs Optional distribution
-        mandatory_dist = req_qs.values_list('mandatory', flat=True)
-        mandatory_count = sum(1 for m in mandatory_dist if m)
-        optional_count = sum(1 for m in mandatory_dist if not m)
-        context['requirement_mandatory_dist'] = {'Mandatory': mandatory_count, 'Optional': optional_count}
-
         # Obligation overdue vs. on-time, completion rates, owner workload
-        obligations = ComplianceObligation.objects.filter(organization=org)
-        if not filter_all:
-            oq = Q(updated_at__year__in=year_ints) | Q(due_date__year__in=year_ints)
-            if month_ints:
-                oq &= Q(updated_at__month__in=month_ints) | Q(due_date__month__in=month_ints)
-            obligations = obligations.filter(oq)
-        today = timezone.now().date()
+        obligations = metrics.source(ComplianceObligation.objects.filter(organization=org))
+        obligations.count('obligation_count')
+        # Overdue: open/in_progress and past due; on time: completed with due date today or later
+        obligations.count(
+            'overdue_obligations', obligation_period_q & Q(status__in=['open', 'in_progress'], due_date__lt=today)
+        )
+        obligations.count('ontime_obligations', obligation_period_q & Q(status='completed', due_date__gte=today))
+        obligations.count('completed_obligations', obligation_period_q & Q(status='completed'))
+        obligations.count('total_obligations', obligation_period_q)
+        obligations.histogram(
+            'obligation_owner_workload', 'owner__email', filter=obligation_period_q, default={'No Owner': 0},
+        )
         
-        # Overdue obligations (status is open/in_progress and due_date is past)
-        overdue_count = obligations.filter(
-            status__in=['open', 'in_progress'], 
-            due_date__lt=today
-        ).count()
-        
-        # On-time obligations (status is completed and due_date is in future or today)
-        ontime_count = obligations.filter(
-            status='completed', 
-            due_date__gte=today
-        ).count()
+        # Policy document expiry distribution
+        policies = metrics.source(PolicyDocument.objects.filter(organization=org))
+        policies.count('policydocument_count')
+        policies.count(
+            'policies_expiring_soon',
+            policy_period_q & Q(expiration_date__gte=today, expiration_date__lte=today.replace(year=today.year + 1)),
+        )
+        policies.count('policies_expired', policy_period_q & Q(expiration_date__lt=today))
+        policies.count('policies_no_expiry', policy_period_q & Q(expiration_date__isnull=True))
         
+        results = metrics.evaluate()
+        for key in ('framework_count', 'requirement_count', 'obligation_count', 'evidence_count',
+                    'policydocument_count', 'requirement_framework_dist', 'requirement_jurisdiction_chart',
+                    'obligation_owner_workload'):
+            context[key] = results[key]
+        context['requirement_mandatory_dist'] = {
+            'Mandatory': results['mandatory_requirements'],
+            'Optional': results['optional_requirements'],
+        }
         context['obligation_overdue_ontime'] = {
-            'Overdue': overdue_count, 
-            'On Time': ontime_count
-        } if (overdue_count or ontime_count) else {'Overdue': 0, 'On Time': 0}
-        
-        # Completion rates
-        completed_count = obligations.filter(status='completed').count()
-        total_obligations = obligations.count()
+            'Overdue': results['overdue_obligations'],
+            'On Time': results['ontime_obligations'],
+        }
         context['obligation_completion_rate'] = {
-            'Completed': completed_count, 
-            'Total': total_obligations
+            'Completed': results['completed_obligations'],
+            'Total': results['total_obligations'],
         }
-        
-        # Owner workload
-        owner_workload = obligations.values_list('owner__email', flat=True)
-        owner_counter = Counter(owner_workload)
-        context['obligation_owner_workload'] = dict(owner_counter) or {'No Owner': 0}
-
-        # Policy document expiry distribution
-        pol_qs = PolicyDocument.objects.filter(organization=org)
-        if not filter_all:
-            pq = Q(updated_at__year__in=year_ints)
-            if month_ints:
-                pq &= Q(updated_at__month__in=month_ints)
-            pol_qs = pol_qs.filter(pq)
-        expiring_soon = pol_qs.filter(
-            expiration_date__gte=today, 
-            expiration_date__lte=today.replace(year=today.year+1)
-        ).count()
-        expired = pol_qs.filter(expiration_date__lt=today).count()
-        no_expiry = pol_qs.filter(expiration_date__isnull=True).count()
-        
         context['policy_expiry_dist'] = {
-            'Expiring Soon': expiring_soon, 
-            'Expired': expired, 
-            'No Expiry': no_expiry
-        } if (expiring_soon or expired or no_expiry) else {
-            'Expiring Soon': 0, 
-            'Expired': 0, 
-            'No Expiry': 0
+            'Expiring Soon': results['policies_expiring_soon'],
+            'Expired': results['policies_expired'],
+            'No Expiry': results['policies_no_expiry'],
         }
 
         # Recent activity: last 10 created/updated items from all main models
@@ -535,11 +506,8 @@ class ComplianceDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, T
             (PolicyDocument, 'Policy Document', 'bi-file-earmark-text'),
         ]:
             base_qs = model.objects.filter(organization=org)
-            if not filter_all and hasattr(model, 'updated_at'):
-                bq = Q(updated_at__year__in=year_ints)
-                if month_ints:
-                    bq &= Q(updated_at__month__in=month_ints)
-                base_qs = base_qs.filter(bq)
+            if hasattr(model, 'updated_at'):
+                base_qs = period.filter(base_qs, 'updated_at')
             for obj in base_qs.order_by('-updated_at')[:3]:
                 recent.append({
                     'message': f"{label}: {getattr(obj, 'title', getattr(obj, 'name', getattr(obj, 'requirement_id', getattr(obj, 'obligation_id', ''))))}",
@@ -551,11 +519,7 @@ class ComplianceDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, T
         context['recent_activity'] = sorted(recent, key=lambda x: x['timestamp'], reverse=True)[:10]
         
         # Period filter context
-        context['available_years'] = years
-        context['available_months'] = months
-        context['selected_years'] = selected_years
-        context['selected_months'] = selected_months
-        context['filter_all'] = filter_all
+        context.update(period.context())
 
         return context
 
@@ -188,47 +188,35 @@ def check_and_send_milestone_notifications():
     Check all active milestones and send notifications for due/overdue items
     This task should be run daily via cron
     """
+    from django_tenants.utils import tenant_context
+    from core.deadlines import deadline_calendar
+    from core.tasks import tenant_organizations
+
     try:
         today = timezone.now().date()
         seven_days_from_now = today + timedelta(days=7)
         one_day_ago = today - timedelta(days=1)
-        
-        # Get milestones due in 7 days (for reminders)
-        due_milestones = ContractMilestone.objects.filter(
-            is_completed=False,
-            due_date=seven_days_from_now
-        ).select_related('contract', 'organization')
-        
-        # Get milestones overdue by 1 day (for alerts)
-        overdue_milestones = ContractMilestone.objects.filter(
-            is_completed=False,
-            due_date=one_day_ago
-        ).select_related('contract', 'organization')
-        
-        # Send due reminders
+
+        def with_contact(deadlines):
+            # Milestones whose contract has a party with a contact email
+            return ContractMilestone.objects.filter(
+                pk__in=deadlines.values('object_id'),
+                contract__parties__contact_email__isnull=False,
+            ).exclude(contract__parties__contact_email='').values_list('pk', flat=True).distinct()
+
         due_count = 0
-        for milestone in due_milestones:
-            # Check if milestone has contact email
-            has_contact = milestone.contract.parties.filter(
-                contact_email__isnull=False
-            ).exclude(contact_email='').exists()
-            
-            if has_contact:
-                send_milestone_due_reminder.delay(milestone.id, milestone.organization.id)
-                due_count += 1
-        
-        # Send overdue alerts
         overdue_count = 0
-        for milestone in overdue_milestones:
-            # Check if milestone has contact email
-            has_contact = milestone.contract.parties.filter(
-                contact_email__isnull=False
-            ).exclude(contact_email='').exists()
-            
-            if has_contact:
-                send_milestone_overdue_alert.delay(milestone.id, milestone.organization.id)
-                overdue_count += 1
-        
+        for organization in tenant_organizations():
+            with tenant_context(organization):
+                # Milestones due in 7 days (reminders) and overdue by 1 day (alerts), from the deadline calendar
+                for milestone_id in with_contact(deadline_calendar.due_on('milestone', seven_days_from_now, organization)):
+                    send_milestone_due_reminder.delay(milestone_id, organization.id)
+                    due_count += 1
+
+                for milestone_id in with_contact(deadline_calendar.due_on('milestone', one_day_ago, organization)):
+                    send_milestone_overdue_alert.delay(milestone_id, organization.id)
+                    overdue_count += 1
+
         logger.info(f"Milestone notifications: {due_count} due reminders, {overdue_count} overdue alerts queued")
         
         return {
@@ -16,6 +16,18 @@ from django.utils import timezone
 from datetime import timedelta
 from django.db import models
 from collections import Counter
+from core.dashboard import DashboardMetrics
+from core.chart_cache import chart_cache
+from core.periods import PeriodFilter
+
+# Map status values to display names for the dashboard charts
+CONTRACT_STATUS_LABELS = {
+    'draft': 'Draft',
+    'active': 'Active',
+    'expired': 'Expired',
+    'terminated': 'Terminated',
+    'pending': 'Pending',
+}
 
 # --- Dashboard View ---
 class ContractsDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, TemplateView):
@@ -44,122 +56,57 @@ class ContractsDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, Te
             })
             return context
         
-        from contracts.models import Contract, ContractMilestone, Party, ContractType
-        from django.db.models import Count, Q
-        from django.db.models.functions import ExtractYear
-        
-        # Summary counts with explicit organization filtering
-        contract_count = Contract.objects.filter(organization=org).count()
-        party_count = Party.objects.filter(organization=org).count()
-        milestone_count = ContractMilestone.objects.filter(organization=org).count()
-        
-        context['contract_count'] = contract_count
-        context['party_count'] = party_count
-        context['milestone_count'] = milestone_count
-        
-        # Additional counts for dashboard cards
-        context['status_count'] = Contract.objects.filter(organization=org).values('status').distinct().count()
-        context['type_count'] = ContractType.objects.filter(organization=org).count()
-        context['milestone_type_count'] = ContractMilestone.objects.filter(organization=org).values('milestone_type').distinct().count()
-        context['milestone_status_count'] = ContractMilestone.objects.filter(organization=org).values('is_completed').distinct().count()
-        context['expiry_year_count'] = Contract.objects.filter(organization=org, end_date__isnull=False).values('end_date__year').distinct().count()
-        
-        # Debugging: Print counts for verification
-        print(f"ContractsDashboardView: Organization: {org.name} (ID: {org.id})")
-        print(f"ContractsDashboardView: Contract count: {contract_count}")
-        print(f"ContractsDashboardView: Party count: {party_count}")
-        print(f"ContractsDashboardView: Milestone count: {milestone_count}")
-        
         # --- Period Filter Logic (aligned with Audit) ---
-        from django.utils import timezone
-        import calendar
-        from django.db.models import Q
-        org_created = getattr(org, 'created_at', timezone.now()).date()
-        today = timezone.now().date()
-        years = list(range(org_created.year, today.year + 1))
-        months = [(i, calendar.month_name[i]) for i in range(1, 13)]
-        selected_years = self.request.GET.getlist('year') or [str(today.year)]
-        selected_months = self.request.GET.getlist('month')
-        filter_all = 'All' in selected_years
-        year_ints = [int(y) for y in selected_years if y.isdigit()]
-        month_ints = [int(m) for m in selected_months if m.isdigit()]
+        # A contract belongs to a period when it starts or ends in it
+        period = PeriodFilter.from_request(self.request, org)
+        contract_period_q = period.q('start_date', Contract) | period.q('end_date', Contract)
+        milestone_period_q = period.q('due_date', ContractMilestone)
 
         contract_qs = Contract.objects.filter(organization=org)
-        if not filter_all:
-            cq = Q(start_date__year__in=year_ints) | Q(end_date__year__in=year_ints)
-            if month_ints:
-                cq &= (Q(start_date__month__in=month_ints) | Q(end_date__month__in=month_ints))
-            contract_qs = contract_qs.filter(cq)
+        metrics = DashboardMetrics()
+        contracts = metrics.source(contract_qs)
+        contracts.count('contract_count')
+        contracts.distinct('status_count', 'status')
+        contracts.distinct('expiry_year_count', ExtractYear('end_date'))
+        contracts.histogram(
+            'contract_status_dist', 'status', filter=contract_period_q,
+            labels=CONTRACT_STATUS_LABELS, default={'Draft': 0, 'Active': 0, 'Expired': 0},
+        )
+        contracts.histogram(
+            'contract_type_dist', 'contract_type__name', filter=contract_period_q, default={'General': 0},
+        )
+        contracts.histogram(
+            'contract_expiry_dist', ExtractYear('end_date'),
+            filter=contract_period_q & Q(end_date__isnull=False),
+            key=str, order_by='value', default={'2024': 0, '2025': 0},
+        )
+        metrics.source(Party.objects.filter(organization=org)).count('party_count')
+        metrics.source(ContractType.objects.filter(organization=org)).count('type_count')
+        milestones = metrics.source(ContractMilestone.objects.filter(organization=org))
+        milestones.count('milestone_count')
+        milestones.distinct('milestone_type_count', 'milestone_type')
+        milestones.distinct('milestone_status_count', 'is_completed')
+        milestones.histogram(
+            'milestone_type_dist', 'milestone_type', filter=milestone_period_q,
+            default={'Payment': 0, 'Delivery': 0},
+        )
+        milestones.histogram(
+            'milestone_status_dist', 'is_completed', filter=milestone_period_q,
+            labels=lambda completed: 'Completed' if completed else 'Pending', default={'Pending': 0},
+        )
+        context.update(metrics.evaluate())
 
         # Recent contracts
-        context['recent_contracts'] = contract_qs.order_by('-start_date')[:8]
-        
-        # Contract status distribution
-        status_dist = contract_qs.values_list('status', flat=True)
-        status_counter = Counter(status_dist)
-        # Map status values to display names
-        status_mapping = {
-            'draft': 'Draft',
-            'active': 'Active',
-            'expired': 'Expired',
-            'terminated': 'Terminated',
-            'pending': 'Pending'
-        }
-        contract_status_chart = {}
-        for status, count in status_counter.items():
-            display_name = status_mapping.get(status, status.title())
-            contract_status_chart[display_name] = count
-        context['contract_status_dist'] = contract_status_chart or {'Draft': 0, 'Active': 0, 'Expired': 0}
-        
-        # Contract type distribution
-        type_dist = contract_qs.values_list('contract_type__name', flat=True)
-        type_counter = Counter(type_dist)
-        context['contract_type_dist'] = dict(type_counter) or {'General': 0}
-        
-        # Milestone type distribution - with explicit organization filtering
-        milestone_qs = ContractMilestone.objects.filter(organization=org)
-        if not filter_all:
-            mq = Q(due_date__year__in=year_ints)
-            if month_ints:
-                mq &= Q(due_date__month__in=month_ints)
-            milestone_qs = milestone_qs.filter(mq)
-        milestone_type_dist = milestone_qs.values_list('milestone_type', flat=True)
-        milestone_type_counter = Counter(milestone_type_dist)
-        context['milestone_type_dist'] = dict(milestone_type_counter) or {'Payment': 0, 'Delivery': 0}
-        
-        # Milestone status distribution (using is_completed) - with explicit organization filtering
-        milestone_status_dist = milestone_qs.values_list('is_completed', flat=True)
-        # Convert boolean values to human-readable strings for charting
-        milestone_status_mapped = [
-            'Completed' if status else 'Pending' for status in milestone_status_dist
-        ]
-        milestone_status_counter = Counter(milestone_status_mapped)
-        context['milestone_status_dist'] = dict(milestone_status_counter) or {'Pending': 0}
-        
-        # Debugging: Print milestone status distribution
-        print(f"ContractsDashboardView: Milestone status distribution: {context['milestone_status_dist']}")
+        context['recent_contracts'] = contract_qs.filter(contract_period_q).order_by('-start_date')[:8]
         
         # Contracts by party (all parties with contracts)
         party_dist = Party.objects.filter(organization=org).annotate(
             num_contracts=Count('contracts', filter=Q(contracts__organization=org))
-        ).filter(num_contracts__gt=0).order_by('-num_contracts')
-        contract_party_chart = {party.name: party.num_contracts for party in party_dist}
-        context['contract_party_dist'] = contract_party_chart or {'No Parties': 0}
-        
-        # Contract expiry distribution (by year)
-        expiry_base = contract_qs.filter(end_date__isnull=False)
-        expiry_dist = expiry_base.annotate(
-            expiry_year=ExtractYear('end_date')
-        ).values('expiry_year').annotate(count=Count('id')).order_by('expiry_year')
-        contract_expiry_chart = {str(item['expiry_year']): item['count'] for item in expiry_dist}
-        context['contract_expiry_dist'] = contract_expiry_chart or {'2024': 0, '2025': 0}
+        ).filter(num_contracts__gt=0).order_by('-num_contracts').values_list('name', 'num_contracts')
+        context['contract_party_dist'] = dict(party_dist) or {'No Parties': 0}
 
         # Period filter context
-        context['available_years'] = years
-        context['available_months'] = months
-        context['selected_years'] = selected_years
-        context['selected_months'] = selected_months
-        context['filter_all'] = filter_all
+        context.update(period.context())
         
         return context
 
@@ -535,6 +482,7 @@ class ContractMilestoneDeleteView(OrganizationPermissionMixin, LoginRequiredMixi
         return super().get_queryset().filter(organization=self.request.organization)
 
 @login_required
+@chart_cache(Contract)
 def api_status_data(request):
     # Ensure we have the correct organization
     org = request.organization
@@ -549,6 +497,7 @@ def api_status_data(request):
     return JsonResponse(status_data, safe=False)
 
 @login_required
+@chart_cache(Contract)
 def api_type_data(request):
     # Ensure we have the correct organization
     org = request.organization
@@ -563,6 +512,7 @@ def api_type_data(request):
     return JsonResponse(type_data, safe=False)
 
 @login_required
+@chart_cache(Party)
 def api_party_data(request):
     # Ensure we have the correct organization
     org = request.organization
@@ -577,6 +527,7 @@ def api_party_data(request):
     return JsonResponse(party_data, safe=False)
 
 @login_required
+@chart_cache(ContractMilestone)
 def api_milestone_type_data(request):
     """API endpoint for milestone type data used in dashboards."""
     # Ensure we have the correct organization
@@ -595,6 +546,7 @@ def api_milestone_type_data(request):
     return JsonResponse(data)
 
 @login_required
+@chart_cache(Contract, daily=True)
 def api_expiry_data(request):
     """API endpoint for contract expiry data used in dashboards."""
     # Ensure we have the correct organization
@@ -622,6 +574,7 @@ def api_expiry_data(request):
     return JsonResponse(data)
 
 @login_required
+@chart_cache(ContractMilestone)
 def api_milestone_status_data(request):
     """API endpoint for milestone status data used in dashboards."""
     # Ensure we have the correct organization
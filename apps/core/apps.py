@@ -9,3 +9,9 @@ class CoreConfig(AppConfig):
 
     def ready(self):
         import core.signals  # noqa
+        from core.chart_cache import track_models
+        track_models()
+        from core.blobstore import blob_store
+        blob_store.track_file_fields()
+        from core.deadlines import deadline_calendar
+        deadline_calendar.track_sources()
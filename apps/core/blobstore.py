@@ -0,0 +1,544 @@
+# apps/core/blobstore.py
+
+"""
+Content-addressed, reference-counted file storage on top of ``default_storage``.
+
+Uploads to a ``FileField`` declared with ``storage=get_blob_storage`` are
+hashed before anything is written. Content the tenant has stored before is
+not written again: the new file name becomes a hard link to the existing
+blob (``blobs/<schema>/<sha[:2]>/<sha>``), so file names, URLs and every
+reader of ``default_storage`` keep working while the bytes exist once. The
+blob keeps its virus-scan verdict (see ``core.virus_scan``), so repeated
+uploads are not scanned again either.
+
+- ``Blob.refcount`` counts the names linked to a blob; deleting a model
+  instance or replacing its file releases the old name
+- blobs left without references are deleted by ``collect_blob_garbage``
+  once ``BLOB_STORE_GC_GRACE_HOURS`` have passed
+- uploads, deduplicated uploads, bytes written/saved and upload latency are
+  counted in the cache and reported by ``blob_store_stats``
+
+Blobs live in the tenant schema, so content is never shared across tenants.
+Deduplication needs a storage with local paths; on other storages files are
+saved as before.
+"""
+
+import errno
+import hashlib
+import logging
+import os
+import shutil
+import time
+import uuid
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import SuspiciousFileOperation
+from django.core.files.storage import Storage, default_storage
+from django.db import connection, models, transaction
+from django.db.models import Case, Count, F, Q, Sum, Value, When
+from django.db.models.signals import post_delete, post_init, post_save
+from django.utils import timezone
+
+from .models import Blob, BlobReference
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'blobstore'
+STAT_FIELDS = (
+    'uploads', 'deduplicated', 'bytes_written', 'bytes_deduplicated',
+    'upload_us', 'deduplicated_upload_us',
+)
+READ_SIZE = 1024 * 1024
+
+
+def _digest(content):
+    hasher = hashlib.sha256()
+    size = 0
+    for chunk in content.chunks(READ_SIZE):
+        hasher.update(chunk)
+        size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def file_digest(path):
+    """``(sha256, size)`` of a local file"""
+    hasher = hashlib.sha256()
+    size = 0
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(READ_SIZE), b''):
+            hasher.update(chunk)
+            size += len(chunk)
+    return hasher.hexdigest(), size
+
+
+def _unlink(path):
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+def _intact(path, size):
+    try:
+        return os.path.getsize(path) == size
+    except OSError:
+        return False
+
+
+def _stat_key(field):
+    return f'{KEY_PREFIX}:stats:{field}'
+
+
+def _count(field, delta=1):
+    key = _stat_key(field)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+def _name(value):
+    if value is None:
+        return ''
+    return getattr(value, 'name', value) or ''
+
+
+class BlobStore:
+    def __init__(self, storage=None, prefix=None):
+        self._storage = storage
+        self.prefix = prefix or getattr(settings, 'BLOB_STORE_PREFIX', 'blobs')
+        self.tracked = {}
+
+    @property
+    def storage(self):
+        return self._storage or default_storage
+
+    def is_local(self):
+        try:
+            self.storage.path('')
+        except NotImplementedError:
+            return False
+        return True
+
+    def schema_dir(self):
+        return f'{self.prefix}/{getattr(connection, "schema_name", "public")}'
+
+    def blob_name(self, sha256):
+        return f'{self.schema_dir()}/{sha256[:2]}/{sha256}'
+
+    # Storing -----------------------------------------------------------------
+
+    def put(self, content, name):
+        """Store ``content`` under ``name`` (or the next free name); returns the name used"""
+        if not self.is_local():
+            return self.storage.save(name, content)
+        started = time.monotonic()
+        sha256, size = _digest(content)
+        with transaction.atomic():
+            blob, written = self._acquire(sha256, size, content=content)
+            name = self._link(blob, name)
+        self._record_upload(size, written, started)
+        return name
+
+    def put_file(self, path, name, sha256=None):
+        """
+        Like ``put`` for a local file, which is moved (linked) into the store
+        instead of copied; pass ``sha256`` when it is already known.
+        """
+        if not self.is_local():
+            from django.core.files import File
+            with open(path, 'rb') as f:
+                name = self.storage.save(name, File(f))
+            _unlink(path)
+            return name
+        started = time.monotonic()
+        if sha256 is None:
+            sha256, size = file_digest(path)
+        else:
+            size = os.path.getsize(path)
+        with transaction.atomic():
+            blob, written = self._acquire(sha256, size, path=path)
+            name = self._link(blob, name)
+        _unlink(path)
+        self._record_upload(size, written, started)
+        return name
+
+    def adopt(self, name):
+        """
+        Move an existing storage file into the store in place: a duplicate is
+        replaced by a link to the stored blob. Returns the blob, or None for
+        names that are not local storage files.
+        """
+        if not name or os.path.isabs(name) or name.startswith(f'{self.prefix}/') or not self.is_local():
+            return None
+        try:
+            path = self.storage.path(name)
+        except SuspiciousFileOperation:
+            return None
+        if not os.path.isfile(path):
+            return None
+        reference = BlobReference.objects.select_related('blob').filter(name=name).first()
+        if reference is not None:
+            return reference.blob
+
+        started = time.monotonic()
+        sha256, size = file_digest(path)
+        with transaction.atomic():
+            blob, written = self._acquire(sha256, size, path=path)
+            if not written:
+                self._replace_with_link(self.storage.path(blob.name), path)
+            BlobReference.objects.create(name=name, blob=blob)
+        self._record_upload(size, written, started)
+        return blob
+
+    def _acquire(self, sha256, size, content=None, path=None):
+        """Lock (or create) the blob for ``sha256`` and take a reference; returns ``(blob, bytes written)``"""
+        blob, created = Blob.objects.select_for_update().get_or_create(
+            sha256=sha256, defaults={'name': self.blob_name(sha256), 'size': size, 'refcount': 1},
+        )
+        if not created:
+            Blob.objects.filter(pk=blob.pk).update(refcount=F('refcount') + 1, released_at=None)
+            blob.refcount += 1
+        target = self.storage.path(blob.name)
+        if created or not _intact(target, blob.size):
+            self._write(target, content=content, path=path)
+            return blob, size
+        return blob, 0
+
+    def _write(self, target, content=None, path=None):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        temp = f'{target}.{uuid.uuid4().hex}.tmp'
+        try:
+            source = path or (content.temporary_file_path() if hasattr(content, 'temporary_file_path') else None)
+            if source:
+                self._link_or_copy(source, temp)
+            else:
+                with open(temp, 'wb') as f:
+                    for chunk in content.chunks(READ_SIZE):
+                        f.write(chunk)
+            mode = getattr(self.storage, 'file_permissions_mode', None)
+            if mode is not None:
+                os.chmod(temp, mode)
+            # Readers never see a partly written blob
+            os.replace(temp, target)
+        except BaseException:
+            _unlink(temp)
+            raise
+
+    @staticmethod
+    def _link_or_copy(source, target):
+        try:
+            os.link(source, target)
+        except OSError as e:
+            # Other filesystem, or the blob has as many links as it can take
+            if e.errno not in (errno.EXDEV, errno.EMLINK):
+                raise
+            shutil.copyfile(source, target)
+
+    def _replace_with_link(self, source, target):
+        temp = f'{target}.{uuid.uuid4().hex}.tmp'
+        try:
+            self._link_or_copy(source, temp)
+            os.replace(temp, target)
+        except BaseException:
+            _unlink(temp)
+            raise
+
+    def _link(self, blob, name):
+        source = self.storage.path(blob.name)
+        while True:
+            target = self.storage.path(name)
+            os.makedirs(os.path.dirname(target), exist_ok=True)
+            try:
+                # link() fails instead of replacing a file another upload just took
+                os.link(source, target)
+                break
+            except FileExistsError:
+                name = self.storage.get_available_name(name)
+            except OSError as e:
+                if e.errno not in (errno.EXDEV, errno.EMLINK):
+                    raise
+                self._link_or_copy(source, target)
+                break
+        BlobReference.objects.create(name=name, blob=blob)
+        return name
+
+    def _record_upload(self, size, written, started):
+        elapsed_us = int((time.monotonic() - started) * 1_000_000)
+        _count('uploads')
+        if written:
+            _count('bytes_written', written)
+            _count('upload_us', elapsed_us)
+        else:
+            _count('deduplicated')
+            _count('bytes_deduplicated', size)
+            _count('deduplicated_upload_us', elapsed_us)
+
+    # Releasing ---------------------------------------------------------------
+
+    def release(self, name):
+        """Drop the reference ``name`` and delete its link; False if ``name`` is not in the store"""
+        with transaction.atomic():
+            reference = BlobReference.objects.select_for_update().filter(name=name).first()
+            if reference is None:
+                return False
+            reference.delete()
+            Blob.objects.filter(pk=reference.blob_id).update(
+                refcount=F('refcount') - 1,
+                released_at=Case(When(refcount__lte=1, then=Value(timezone.now())), default=F('released_at')),
+            )
+            path = self.storage.path(name)
+            # A rolled back delete keeps its file
+            transaction.on_commit(lambda: _unlink(path))
+        return True
+
+    def track(self, model, field_name):
+        """Release names of ``model.field_name`` when instances are deleted or the value is replaced"""
+        fields = self.tracked.setdefault(model, [])
+        if field_name in fields:
+            return
+        fields.append(field_name)
+        if len(fields) == 1:
+            uid = f'blobstore:{model._meta.label}'
+            post_init.connect(self._remember_names, sender=model, weak=False, dispatch_uid=uid)
+            post_save.connect(self._saved, sender=model, weak=False, dispatch_uid=uid)
+            post_delete.connect(self._deleted, sender=model, weak=False, dispatch_uid=uid)
+
+    def track_file_fields(self):
+        """Track every ``FileField`` that stores through ``BlobStorage``"""
+        from django.apps import apps
+        for model in apps.get_models():
+            for field in model._meta.concrete_fields:
+                if isinstance(field, models.FileField) and isinstance(field.storage, BlobStorage):
+                    self.track(model, field.attname)
+
+    def _remember_names(self, sender, instance, **kwargs):
+        # __dict__: reading a deferred field here would cost a query per instance
+        instance._blob_names = {field: _name(instance.__dict__.get(field)) for field in self.tracked[sender]}
+
+    def _saved(self, sender, instance, created, raw=False, **kwargs):
+        if raw:
+            return
+        previous = getattr(instance, '_blob_names', {})
+        for field_name in self.tracked[sender]:
+            old, new = previous.get(field_name, ''), _name(getattr(instance, field_name))
+            if old == new:
+                continue
+            if old:
+                self._release_unused(sender, field_name, old)
+            if new and not isinstance(sender._meta.get_field(field_name), models.FileField):
+                # Plain path fields: files written elsewhere are taken in as they are
+                try:
+                    self.adopt(new)
+                except OSError as e:
+                    logger.warning(f'Could not deduplicate {new}: {e}')
+        instance._blob_names = {field: _name(getattr(instance, field)) for field in self.tracked[sender]}
+
+    def _deleted(self, sender, instance, **kwargs):
+        for field_name in self.tracked[sender]:
+            name = _name(instance.__dict__.get(field_name))
+            if name:
+                self._release_unused(sender, field_name, name)
+
+    def _release_unused(self, model, field_name, name):
+        if model._base_manager.filter(**{field_name: name}).exists():
+            return False
+        return self.release(name)
+
+    # Virus scan verdicts -----------------------------------------------------
+
+    def blob_for(self, name):
+        return Blob.objects.filter(references__name=name).first() if name else None
+
+    def verdict(self, name, signature_version):
+        """``(scan_status, scan_result)`` recorded for ``name``'s content with that signature database, or None"""
+        if not name:
+            return None
+        return Blob.objects.filter(references__name=name, scan_signature_version=signature_version) \
+            .exclude(scan_status='').values_list('scan_status', 'scan_result').first()
+
+    def record_verdict(self, name, status, result, signature_version):
+        if name:
+            Blob.objects.filter(references__name=name).update(
+                scan_status=status, scan_result=result[:255], scan_signature_version=signature_version,
+                scanned_at=timezone.now(),
+            )
+
+    # Maintenance -------------------------------------------------------------
+
+    def grace_period(self):
+        return timedelta(hours=getattr(settings, 'BLOB_STORE_GC_GRACE_HOURS', 24))
+
+    def verify_references(self, grace=None, dry_run=False):
+        """
+        Release references that no tracked field uses any more (rows removed
+        without signals) and correct drifted reference counts.
+        Returns ``(released, corrected)``.
+        """
+        cutoff = timezone.now() - (grace if grace is not None else self.grace_period())
+        used = set()
+        for model, fields in self.tracked.items():
+            for field_name in fields:
+                used.update(model._base_manager.exclude(**{field_name: ''}).exclude(**{f'{field_name}__isnull': True})
+                            .values_list(field_name, flat=True).distinct())
+
+        released = 0
+        stale = BlobReference.objects.filter(created_at__lt=cutoff).values_list('name', flat=True)
+        for name in list(stale.iterator()):
+            if name not in used:
+                released += 1
+                if not dry_run:
+                    self.release(name)
+
+        corrected = 0
+        drifted = Blob.objects.annotate(actual=Count('references')).exclude(refcount=F('actual'))
+        for pk in list(drifted.values_list('pk', flat=True)):
+            corrected += 1
+            if dry_run:
+                continue
+            with transaction.atomic():
+                blob = Blob.objects.select_for_update().get(pk=pk)
+                actual = blob.references.count()
+                blob.refcount = actual
+                if not actual and blob.released_at is None:
+                    blob.released_at = timezone.now()
+                blob.save(update_fields=['refcount', 'released_at'])
+        return released, corrected
+
+    def collect_garbage(self, grace=None, dry_run=False):
+        """Delete unreferenced blobs and stray files in the blob directory; returns ``(blobs, bytes)``"""
+        cutoff = timezone.now() - (grace if grace is not None else self.grace_period())
+        removed = freed = 0
+        candidates = Blob.objects.filter(refcount__lte=0).filter(
+            Q(released_at__lt=cutoff) | Q(released_at__isnull=True, created_at__lt=cutoff)
+        )
+        for pk in list(candidates.values_list('pk', flat=True)):
+            # The row lock makes a concurrent upload of the same content wait, then write it anew
+            with transaction.atomic():
+                blob = Blob.objects.select_for_update(skip_locked=True).filter(pk=pk, refcount__lte=0).first()
+                if blob is None:
+                    continue
+                if not dry_run:
+                    _unlink(self.storage.path(blob.name))
+                    blob.delete()
+                removed += 1
+                freed += blob.size
+
+        if self.is_local():
+            stray, stray_bytes = self._collect_stray_files(cutoff.timestamp(), dry_run)
+            removed += stray
+            freed += stray_bytes
+        return removed, freed
+
+    def _collect_stray_files(self, cutoff, dry_run):
+        """Files without a ``Blob`` row: writes whose transaction rolled back, interrupted temp files"""
+        root = self.storage.path(self.schema_dir())
+        removed = freed = 0
+        for directory, _, files in os.walk(root):
+            candidates = {}
+            for filename in files:
+                path = os.path.join(directory, filename)
+                try:
+                    stat = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                if stat.st_mtime < cutoff:
+                    candidates[os.path.relpath(path, self.storage.path('')).replace(os.sep, '/')] = (path, stat.st_size)
+            known = set(Blob.objects.filter(name__in=list(candidates)).values_list('name', flat=True))
+            for name, (path, size) in candidates.items():
+                if name in known:
+                    continue
+                if not dry_run:
+                    _unlink(path)
+                removed += 1
+                freed += size
+        return removed, freed
+
+    # Metrics -----------------------------------------------------------------
+
+    def stats(self):
+        """Storage totals of the current tenant plus the process-wide upload counters"""
+        totals = Blob.objects.aggregate(
+            blobs=Count('pk'),
+            stored_bytes=Sum('size'),
+            referenced_bytes=Sum(F('size') * F('refcount'), output_field=models.BigIntegerField()),
+            unreferenced=Count('pk', filter=Q(refcount__lte=0)),
+            unreferenced_bytes=Sum('size', filter=Q(refcount__lte=0)),
+        )
+        stats = {key: value or 0 for key, value in totals.items()}
+        stats['references'] = BlobReference.objects.count()
+        stats['saved_bytes'] = max(stats['referenced_bytes'] - stats['stored_bytes'], 0)
+        return stats
+
+    def counters(self):
+        found = cache.get_many([_stat_key(field) for field in STAT_FIELDS])
+        counters = {field: found.get(_stat_key(field), 0) for field in STAT_FIELDS}
+        written = counters['uploads'] - counters['deduplicated']
+        counters['avg_upload_ms'] = counters['upload_us'] / written / 1000 if written else 0.0
+        counters['avg_deduplicated_upload_ms'] = (
+            counters['deduplicated_upload_us'] / counters['deduplicated'] / 1000 if counters['deduplicated'] else 0.0
+        )
+        return counters
+
+    def reset_counters(self):
+        cache.delete_many([_stat_key(field) for field in STAT_FIELDS])
+
+
+class BlobStorage(Storage):
+    """``default_storage``, with files saved through the blob store"""
+
+    def __init__(self, store):
+        self.store = store
+
+    @property
+    def base(self):
+        return self.store.storage
+
+    def _open(self, name, mode='rb'):
+        return self.base.open(name, mode)
+
+    def _save(self, name, content):
+        return self.store.put(content, name)
+
+    def delete(self, name):
+        if not self.store.is_local() or not self.store.release(name):
+            self.base.delete(name)
+
+    def get_available_name(self, name, max_length=None):
+        return self.base.get_available_name(name, max_length=max_length)
+
+    def exists(self, name):
+        return self.base.exists(name)
+
+    def listdir(self, path):
+        return self.base.listdir(path)
+
+    def size(self, name):
+        return self.base.size(name)
+
+    def url(self, name):
+        return self.base.url(name)
+
+    def path(self, name):
+        return self.base.path(name)
+
+    def get_accessed_time(self, name):
+        return self.base.get_accessed_time(name)
+
+    def get_created_time(self, name):
+        return self.base.get_created_time(name)
+
+    def get_modified_time(self, name):
+        return self.base.get_modified_time(name)
+
+
+blob_store = BlobStore()
+blob_storage = BlobStorage(blob_store)
+
+
+def get_blob_storage():
+    """``FileField(storage=get_blob_storage)``; a callable keeps the storage out of migrations"""
+    return blob_storage
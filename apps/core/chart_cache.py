@@ -0,0 +1,280 @@
+# apps/core/chart_cache.py
+
+"""
+Response caching for the dashboards' chart-data endpoints.
+
+Chart endpoints re-run the same aggregates on every dashboard load although
+their data only changes when the underlying rows do. ``chart_cache`` stores
+the rendered JSON per tenant, endpoint and normalized query string, and tags
+each entry with the models it was computed from:
+
+- every save or delete of a tagged model (from any process, including
+  Celery workers) replaces that model's version token for the tenant once
+  the transaction commits, so entries computed from older data are never
+  served again; tagged models are listed in ``TRACKED_MODELS``, writes to
+  other models touch no cache
+- each entry carries a strong ``ETag``; a request whose ``If-None-Match``
+  matches gets a ``304`` without the view running at all
+- hits, misses and 304s are counted per endpoint, see :func:`chart_cache_stats`
+
+Usage::
+
+    @login_required
+    @chart_cache(Contract)
+    def api_status_data(request):
+        ...
+
+The decorator must sit below the authentication/permission decorators so
+they still run on every request. ``QuerySet.update()`` and ``bulk_create()``
+send no model signals; call :func:`invalidate` after using them on a tagged
+model.
+"""
+
+import hashlib
+import logging
+import time
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.db.models.signals import post_delete, post_save
+from django.http import HttpResponse, HttpResponseNotModified
+from django.utils import timezone
+from django.utils.http import parse_etags
+
+logger = logging.getLogger(__name__)
+
+KEY_PREFIX = 'chart-cache'
+STAT_FIELDS = ('hits', 'misses', 'not_modified')
+
+# Endpoint name -> tagged model labels, filled in by the decorator
+ENDPOINTS = {}
+
+# Models some chart or data_version() is computed from; writes to any other
+# model leave the version tokens alone. Listed here rather than collected from
+# the decorators because Celery workers never import the views.
+TRACKED_MODELS = {
+    'audit.approval', 'audit.auditworkplan', 'audit.engagement', 'audit.issue',
+    'compliance.complianceobligation',
+    'contracts.contract', 'contracts.contractmilestone', 'contracts.party',
+    'document_management.document', 'document_management.documentrequest',
+    'risk.cobitcapability', 'risk.cobitcontrol', 'risk.cobitdomain', 'risk.cobitprocess', 'risk.control',
+    'risk.kri', 'risk.nistcategory', 'risk.nistfunction', 'risk.nistincident', 'risk.nistthreat',
+    'risk.risk', 'risk.riskassessment', 'risk.riskmatrixconfig',
+}
+
+
+def _label(model):
+    if isinstance(model, str):
+        return model.lower()
+    return model._meta.label_lower
+
+
+def _tracked(labels):
+    untracked = sorted(set(labels) - TRACKED_MODELS)
+    if untracked:
+        raise ImproperlyConfigured(f"Add {', '.join(untracked)} to core.chart_cache.TRACKED_MODELS")
+    return labels
+
+
+def _version_key(schema, organization_id, label):
+    return f'{KEY_PREFIX}:v:{schema}:{organization_id}:{label}'
+
+
+def _stat_key(endpoint, field):
+    return f'{KEY_PREFIX}:stats:{endpoint}:{field}'
+
+
+def _organization_id(request):
+    organization = getattr(request, 'organization', None)
+    if organization is None:
+        organization = getattr(getattr(request, 'user', None), 'organization', None)
+    return getattr(organization, 'pk', None)
+
+
+def normalized_filters(request):
+    """Query parameters as a canonical string: sorted, repeat values sorted, cache busters dropped."""
+    ignored = set(getattr(settings, 'CHART_CACHE_IGNORED_PARAMS', ('_',)))
+    items = []
+    for name in sorted(request.GET):
+        if name in ignored:
+            continue
+        values = sorted(value.strip() for value in request.GET.getlist(name))
+        items.extend(f'{name}={value}' for value in values if value)
+    return '&'.join(items)
+
+
+def _versions(schema, organization_id, labels):
+    """Current version tokens of ``labels`` for the tenant and for tenant-less writes."""
+    keys = []
+    for label in labels:
+        keys.append(_version_key(schema, organization_id, label))
+        keys.append(_version_key(schema, '*', label))
+    found = cache.get_many(keys)
+    return [str(found.get(key, 0)) for key in keys]
+
+
+def data_version(models, organization_id, schema=None):
+    """
+    Token that changes whenever any of ``models`` is written for the organization.
+
+    Lets other caches (e.g. the assistant's answers) reuse the version tokens
+    maintained for chart entries.
+    """
+    schema = schema or connection.schema_name
+    versions = _versions(schema, organization_id, _tracked([_label(model) for model in models]))
+    return hashlib.sha256(':'.join(versions).encode()).hexdigest()[:16]
+
+
+def invalidate(model, organization_id=None, schema=None):
+    """
+    Expire cached chart data computed from ``model``.
+
+    With ``organization_id`` only that organization's entries are affected;
+    without it, every organization in the schema. Inside a transaction the
+    token is replaced when it commits: a request reading the old rows until
+    then caches them under the old token, not the new one.
+    """
+    key = _version_key(schema or connection.schema_name, '*' if organization_id is None else organization_id,
+                       _label(model))
+    # A fresh token instead of incr(): one write, no read, nothing to initialise
+    transaction.on_commit(lambda: cache.set(key, time.time_ns(), None), robust=True)
+
+
+def invalidate_instance(instance):
+    """Expire entries computed from ``instance``'s model for its organization."""
+    if instance._meta.label_lower not in TRACKED_MODELS:
+        return
+    try:
+        invalidate(type(instance), getattr(instance, 'organization_id', None))
+    except Exception as e:
+        # An unreachable cache must not fail the write; its entries are unreachable too
+        logger.warning(f"Failed to expire chart cache for {instance._meta.label}: {e}")
+
+
+def _expire(sender, instance, raw=False, **kwargs):
+    if not raw:
+        invalidate_instance(instance)
+
+
+def track_models():
+    """Connect the save/delete signals of every tracked model"""
+    from django.apps import apps
+
+    for label in TRACKED_MODELS:
+        model = apps.get_model(label)
+        uid = f'chart_cache:{label}'
+        post_save.connect(_expire, sender=model, weak=False, dispatch_uid=uid)
+        post_delete.connect(_expire, sender=model, weak=False, dispatch_uid=uid)
+
+
+def _count(endpoint, field):
+    key = _stat_key(endpoint, field)
+    try:
+        cache.incr(key)
+    except ValueError:
+        # First event for this endpoint; add() keeps a concurrent first event
+        if not cache.add(key, 1, None):
+            cache.incr(key)
+
+
+def chart_cache_stats():
+    """``{endpoint: {hits, misses, not_modified, hit_rate}}`` for every cached endpoint."""
+    keys = [_stat_key(endpoint, field) for endpoint in ENDPOINTS for field in STAT_FIELDS]
+    found = cache.get_many(keys)
+    stats = {}
+    for endpoint in ENDPOINTS:
+        counts = {field: found.get(_stat_key(endpoint, field), 0) for field in STAT_FIELDS}
+        served = counts['hits'] + counts['not_modified']
+        total = served + counts['misses']
+        counts['hit_rate'] = served / total if total else 0.0
+        stats[endpoint] = counts
+    return stats
+
+
+def reset_chart_cache_stats():
+    cache.delete_many([_stat_key(endpoint, field) for endpoint in ENDPOINTS for field in STAT_FIELDS])
+
+
+def _etag(content):
+    return '"%s"' % hashlib.sha256(content).hexdigest()[:32]
+
+
+def _matches(request, etag):
+    header = request.META.get('HTTP_IF_NONE_MATCH')
+    if not header:
+        return False
+    etags = parse_etags(header)
+    return '*' in etags or etag in etags
+
+
+def _not_modified(etag):
+    response = HttpResponseNotModified()
+    response['ETag'] = etag
+    response['Cache-Control'] = 'private, no-cache'
+    return response
+
+
+def chart_cache(*models, timeout=None, daily=False):
+    """
+    Cache a GET chart endpoint's ``200`` JSON response.
+
+    Args:
+        models: Models (or ``'app_label.Model'`` labels) the response is
+            computed from; a write to any of them expires the entry
+        timeout: Seconds to keep an entry (``CHART_CACHE_TIMEOUT``, default 300)
+        daily: The response depends on today's date (e.g. "expiring in 30
+            days"), so entries also expire at midnight
+    """
+    labels = _tracked(sorted({_label(model) for model in models}))
+
+    def decorator(view_func):
+        endpoint = f'{view_func.__module__}.{view_func.__qualname__}'
+        ENDPOINTS[endpoint] = labels
+
+        @wraps(view_func)
+        def _wrapped_view(request, *args, **kwargs):
+            organization_id = _organization_id(request)
+            if request.method not in ('GET', 'HEAD') or organization_id is None:
+                return view_func(request, *args, **kwargs)
+
+            schema = connection.schema_name
+            parts = [endpoint, schema, str(organization_id), normalized_filters(request), repr(sorted(kwargs.items()))]
+            parts += _versions(schema, organization_id, labels)
+            if daily:
+                parts.append(timezone.localdate().isoformat())
+            key = f'{KEY_PREFIX}:r:' + hashlib.sha256('\x1f'.join(parts).encode()).hexdigest()
+
+            entry = cache.get(key)
+            if entry is not None:
+                content, content_type, etag = entry
+                if _matches(request, etag):
+                    _count(endpoint, 'not_modified')
+                    return _not_modified(etag)
+                _count(endpoint, 'hits')
+                response = HttpResponse(content, content_type=content_type)
+            else:
+                _count(endpoint, 'misses')
+                response = view_func(request, *args, **kwargs)
+                # Only rendered 200s; DRF Responses render later, errors stay uncached
+                if response.status_code != 200 or response.streaming or not getattr(response, 'is_rendered', True):
+                    return response
+                etag = _etag(response.content)
+                cache.set(
+                    key,
+                    (response.content, response['Content-Type'], etag),
+                    timeout if timeout is not None else getattr(settings, 'CHART_CACHE_TIMEOUT', 300),
+                )
+                if _matches(request, etag):
+                    return _not_modified(etag)
+
+            response['ETag'] = etag
+            # Tenant data: browsers may keep it but must revalidate every time
+            response['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return _wrapped_view
+
+    return decorator
@@ -0,0 +1,186 @@
+# apps/core/clamd_stub.py
+
+"""
+Local stand-in for clamd, used by the upload/virus-scan tests and benchmarks.
+
+Listens on a unix socket (or TCP with ``tcp=True``) and answers ``PING``,
+``VERSION`` and ``INSTREAM`` like clamd does, on their own or inside an
+``IDSESSION``. A stream is reported infected when it contains the EICAR test
+string or any of ``signatures`` (bytes -> signature name); each scan can be
+slowed down by ``delay`` seconds to model a real engine. Counts connections,
+scans and scanned bytes; ``drop_connections()`` closes every open session
+the way clamd's idle timeout does.
+"""
+
+import os
+import socket
+import struct
+import tempfile
+import threading
+import time
+
+EICAR = rb'X5O!P%@AP[4\PZX54(P^)7CC)7}$EICAR-STANDARD-ANTIVIRUS-TEST-FILE!$H+H*'
+
+
+class StubClamd:
+    def __init__(self, signatures=None, delay=0.0, version='ClamAV 1.3.1/27391/Stub', tcp=False):
+        self.signatures = {EICAR: 'Eicar-Test-Signature', **(signatures or {})}
+        self.delay = delay
+        self.version = version
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.scans = 0
+        self.scanned_bytes = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.tcp = tcp
+        self._dir = None
+        self._sock = None
+        self._thread = None
+        self._open = set()
+        self._stopped = threading.Event()
+
+    @property
+    def socket_path(self):
+        return None if self.tcp else os.path.join(self._dir, 'clamd.sock')
+
+    @property
+    def address(self):
+        return self._sock.getsockname()
+
+    def settings(self):
+        """Settings that point ``ClamdClient`` at this stub"""
+        if self.tcp:
+            host, port = self.address
+            return {'CLAMD_SOCKET': None, 'CLAMD_HOST': host, 'CLAMD_PORT': port}
+        return {'CLAMD_SOCKET': self.socket_path}
+
+    def start(self):
+        if self.tcp:
+            self._sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._sock.bind(('127.0.0.1', 0))
+        else:
+            self._dir = tempfile.mkdtemp(prefix='clamd-stub-')
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.bind(self.socket_path)
+        self._sock.listen(64)
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self
+
+    def drop_connections(self):
+        with self.lock:
+            for conn in list(self._open):
+                try:
+                    conn.shutdown(socket.SHUT_RDWR)
+                except OSError:
+                    pass
+
+    def stop(self):
+        self._stopped.set()
+        self.drop_connections()
+        self._sock.close()
+        if self._dir:
+            try:
+                os.unlink(self.socket_path)
+                os.rmdir(self._dir)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _serve(self):
+        while not self._stopped.is_set():
+            try:
+                conn, _ = self._sock.accept()
+            except OSError:
+                return
+            threading.Thread(target=self._handle, args=(conn,), daemon=True).start()
+
+    def _handle(self, conn):
+        with self.lock:
+            self.connections += 1
+            self._open.add(conn)
+        try:
+            with conn:
+                command = self._read_command(conn)
+                if command != b'IDSESSION':
+                    conn.sendall(self._reply(conn, command) + b'\0')
+                    return
+                # Replies in a session are prefixed with the command's number
+                request_id = 0
+                while True:
+                    command = self._read_command(conn)
+                    if command in (b'', b'END'):
+                        return
+                    request_id += 1
+                    conn.sendall(f'{request_id}: '.encode() + self._reply(conn, command) + b'\0')
+        except OSError:
+            pass
+        finally:
+            with self.lock:
+                self._open.discard(conn)
+
+    def _reply(self, conn, command):
+        if command == b'PING':
+            return b'PONG'
+        if command == b'VERSION':
+            return self.version.encode()
+        if command == b'INSTREAM':
+            return self._instream(conn).encode()
+        return b'UNKNOWN COMMAND'
+
+    @staticmethod
+    def _read_command(conn):
+        data = b''
+        while not data.endswith(b'\0'):
+            byte = conn.recv(1)
+            if not byte:
+                break
+            data += byte
+        return data.rstrip(b'\0').lstrip(b'zn')
+
+    def _instream(self, conn):
+        # Keep a tail across chunks so signatures spanning a boundary are found
+        found, tail, size = None, b'', 0
+        longest = max(len(signature) for signature in self.signatures)
+        while True:
+            length = struct.unpack('>I', self._read_exactly(conn, 4))[0]
+            if not length:
+                break
+            chunk = self._read_exactly(conn, length)
+            size += length
+            window = tail + chunk
+            if found is None:
+                for signature, name in self.signatures.items():
+                    if signature in window:
+                        found = name
+                        break
+            tail = window[-longest:]
+
+        with self.lock:
+            self.scans += 1
+            self.scanned_bytes += size
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            if self.delay:
+                time.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        return f'stream: {found} FOUND' if found else 'stream: OK'
+
+    @staticmethod
+    def _read_exactly(conn, count):
+        data = bytearray()
+        while len(data) < count:
+            chunk = conn.recv(min(count - len(data), 1 << 20))
+            if not chunk:
+                raise ConnectionError('client closed the stream')
+            data += chunk
+        return bytes(data)
@@ -0,0 +1,158 @@
+# apps/core/dashboard.py
+
+"""
+Declarative metrics for module dashboards.
+
+A dashboard declares what it shows against one base queryset per model and
+the builder compiles the declarations into as few queries as possible:
+
+- every filtered count, distinct count and scalar aggregate of a source is
+  folded into a single ``aggregate()`` call using ``Count(..., filter=Q(...))``
+- every histogram (grouped count, optionally bucketed by date) is one
+  ``values().annotate()`` query
+
+Usage::
+
+    metrics = DashboardMetrics()
+    cases = metrics.source(LegalCase.objects.filter(organization=org))
+    cases.count('case_count', period_q)
+    cases.count('closed_cases', period_q & Q(status='closed'))
+    cases.histogram('case_status_chart', 'status', filter=period_q, labels=CASE_STATUS_LABELS)
+    context.update(metrics.evaluate())
+"""
+
+from django.db.models import Count
+from django.db.models.functions import Trunc
+
+
+class _Histogram:
+    def __init__(self, name, field, filter=None, labels=None, default=None, key=None, order_by=None):
+        self.name = name
+        self.field = field
+        self.filter = filter
+        self.labels = labels
+        self.default = default
+        self.key = key
+        self.order_by = order_by
+
+    def label_for(self, value):
+        if self.labels is None:
+            label = value
+        elif callable(self.labels):
+            label = self.labels(value)
+        else:
+            label = self.labels.get(value, value.title() if isinstance(value, str) else value)
+        return self.key(label) if self.key else label
+
+
+class MetricSource:
+    """
+    Metrics computed over one base queryset.
+
+    Filters passed to the metric methods are ``Q`` objects applied on top of
+    the base queryset, so metrics with different filters still share a
+    single aggregate query.
+    """
+
+    def __init__(self, queryset):
+        self.queryset = queryset
+        self.aggregates = {}
+        self.histograms = []
+
+    def count(self, name, filter=None, distinct=False):
+        """Number of rows matching ``filter`` (all rows when omitted)."""
+        self.aggregates[name] = Count('pk', filter=filter, distinct=distinct)
+        return self
+
+    def distinct(self, name, expression, filter=None):
+        """Number of distinct non-null values of a field or expression."""
+        self.aggregates[name] = Count(expression, filter=filter, distinct=True)
+        return self
+
+    def aggregate(self, name, expression):
+        """Any other aggregate expression, e.g. ``Sum('amount', filter=Q(...))``."""
+        self.aggregates[name] = expression
+        return self
+
+    def histogram(self, name, field, filter=None, labels=None, default=None, key=None, order_by=None):
+        """
+        Row counts grouped by a field or expression.
+
+        Args:
+            name: Result key
+            field: Field name (may span relations) or expression to group by
+            filter: Optional ``Q`` restricting the rows counted
+            labels: Mapping or callable turning raw values into display
+                labels; values mapping to the same label are summed. Unmapped
+                strings are title-cased, like the dashboards' status charts.
+            default: Value returned when there are no rows
+            key: Optional callable applied to each label (e.g. ``str``)
+            order_by: Order buckets by the grouped value (``'value'``) or by
+                count descending (``'-count'``); database order otherwise
+        """
+        self.histograms.append(_Histogram(name, field, filter, labels, default, key, order_by))
+        return self
+
+    def date_histogram(self, name, field, kind='month', filter=None, format=None, default=None):
+        """Row counts per ``kind`` bucket (day, week, month, year) of a date field, in date order."""
+        key = (lambda value: value.strftime(format) if value else '') if format else None
+        self.histograms.append(_Histogram(
+            name, Trunc(field, kind), filter, key=key, default=default, order_by='value',
+        ))
+        return self
+
+    def evaluate(self):
+        results = {}
+        if self.aggregates:
+            results.update(self.queryset.aggregate(**self.aggregates))
+        for histogram in self.histograms:
+            results[histogram.name] = self._evaluate_histogram(histogram)
+        return results
+
+    def _evaluate_histogram(self, histogram):
+        queryset = self.queryset.order_by()
+        if histogram.filter is not None:
+            queryset = queryset.filter(histogram.filter)
+        if isinstance(histogram.field, str):
+            group_by = histogram.field
+        else:
+            group_by = '_bucket'
+            queryset = queryset.annotate(_bucket=histogram.field)
+        rows = queryset.values(group_by).annotate(_count=Count('pk'))
+        if histogram.order_by == 'value':
+            rows = rows.order_by(group_by)
+        elif histogram.order_by == '-count':
+            rows = rows.order_by('-_count')
+
+        data = {}
+        for row in rows:
+            label = histogram.label_for(row[group_by])
+            data[label] = data.get(label, 0) + row['_count']
+        if not data and histogram.default is not None:
+            return dict(histogram.default)
+        return data
+
+
+class DashboardMetrics:
+    """Collects metric sources for a dashboard and evaluates them together."""
+
+    def __init__(self):
+        self.sources = []
+
+    def source(self, queryset):
+        """Register a base queryset (usually ``Model.objects.filter(organization=org)``)."""
+        source = MetricSource(queryset)
+        self.sources.append(source)
+        return source
+
+    def evaluate(self):
+        """Run the compiled queries and return ``{metric name: value}``."""
+        results = {}
+        for source in self.sources:
+            results.update(source.evaluate())
+        return results
+
+
+def bucket_counts(counts, buckets, default=0):
+    """Return counts for every bucket in ``buckets`` order, filling gaps with ``default``."""
+    return {bucket: counts.get(bucket, default) for bucket in buckets}
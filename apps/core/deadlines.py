@@ -0,0 +1,369 @@
+"""
+Unified deadline calendar.
+
+Compliance obligations, contract milestones, legal tasks, audit issues and
+follow-up actions each have a due date and their own notion of "done".
+Every registered ``DeadlineSource`` mirrors its rows into the ``Deadline``
+table through post_save/post_delete signals, so reminders, overdue counts
+and the calendar view are range queries on one
+``(organization, due_date, status)`` index.
+
+``DeadlineCalendar.flip_overdue`` runs daily: one ``UPDATE`` per source
+moves rows whose deadline has passed to the source's overdue status
+(obligations and legal tasks to "overdue", follow-up actions to "overdue",
+open issues to "escalated" once any revised date has passed too, as in
+``Issue.save``, with ``days_overdue`` refreshed), and one ``UPDATE`` marks the deadlines themselves, instead of loading and saving
+each row. The set-based updates skip the per-row signals, so the chart
+cache is expired once per source instead.
+"""
+
+import logging
+from datetime import timedelta
+
+from django.apps import apps
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.contrib.contenttypes.models import ContentType
+from django.db import models, transaction
+from django.db.models import Case, Count, F, Func, Q, Value, When
+from django.db.models.signals import post_delete, post_save
+from django.http import JsonResponse
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+from django.views import View
+
+logger = logging.getLogger(__name__)
+
+
+class DaysBetween(Func):
+    """``end - start`` in days (PostgreSQL ``date - date``)"""
+    template = '(%(expressions)s)'
+    arg_joiner = ' - '
+    output_field = models.IntegerField()
+
+    def __init__(self, end, start, **extra):
+        super().__init__(end, start, **extra)
+
+
+class DeadlineSource:
+    """
+    How one model's rows map to deadlines. Rows whose status is in
+    ``done`` or ``cancelled`` are closed; the others are open or overdue
+    by date. ``overdue_status`` is written to the source row's
+    ``status_field`` by ``flip_overdue`` when its status is in ``flippable``.
+    """
+
+    def __init__(self, kind, model, title_field, due_field='due_date', status_field='status', done=(),
+                 cancelled=(), flippable=(), overdue_status=None, owner_field=None, owner_email_field=None,
+                 active_field=None):
+        self.kind = kind
+        self.label = model
+        self.title_field = title_field
+        self.due_field = due_field
+        self.status_field = status_field
+        self.done = set(done)
+        self.cancelled = set(cancelled)
+        self.flippable = set(flippable)
+        self.overdue_status = overdue_status
+        self.owner_field = owner_field
+        self.owner_email_field = owner_email_field
+        self.active_field = active_field
+
+    @property
+    def model(self):
+        return apps.get_model(self.label)
+
+    def due_date(self, instance):
+        return getattr(instance, self.due_field)
+
+    def source_status(self, instance):
+        return getattr(instance, self.status_field) if self.status_field else ''
+
+    def is_tracked(self, instance):
+        """Soft-deleted rows have no deadline"""
+        return getattr(instance, 'deleted_at', None) is None
+
+    def status(self, instance, due_date, today):
+        from core.models import Deadline
+
+        source_status = self.source_status(instance)
+        if self.active_field and not getattr(instance, self.active_field):
+            return Deadline.STATUS_CANCELLED
+        if source_status in self.done:
+            return Deadline.STATUS_DONE
+        if source_status in self.cancelled:
+            return Deadline.STATUS_CANCELLED
+        return Deadline.STATUS_OVERDUE if due_date < today else Deadline.STATUS_OPEN
+
+    def values(self, instance, today):
+        """The deadline fields for ``instance``, or None when it has no deadline"""
+        due_date = self.due_date(instance)
+        if due_date is None or not self.is_tracked(instance):
+            return None
+        return {
+            'organization_id': instance.organization_id,
+            'source': self.kind,
+            'title': str(getattr(instance, self.title_field) or '')[:512],
+            'due_date': due_date,
+            'status': self.status(instance, due_date, today),
+            'source_status': str(self.source_status(instance) or ''),
+            'owner_id': getattr(instance, self.owner_field) if self.owner_field else None,
+            'owner_email': (getattr(instance, self.owner_email_field) if self.owner_email_field else None) or '',
+        }
+
+    def held(self, today):
+        """Q of the source rows that keep their status past the deadline, or None"""
+        return None
+
+    def flip_overdue(self, organization, object_ids, today):
+        """Set the overdue status on the source rows whose deadline just passed; returns the rows changed"""
+        if not self.overdue_status:
+            return 0
+        rows = self.model._base_manager.filter(pk__in=object_ids, **{f'{self.status_field}__in': self.flippable})
+        held = self.held(today)
+        if held is not None:
+            rows = rows.exclude(held)
+        return rows.update(**{self.status_field: self.overdue_status})
+
+
+class MilestoneDeadlineSource(DeadlineSource):
+    """Contract milestones are done when ``is_completed``; they have no status of their own"""
+
+    def source_status(self, instance):
+        return 'completed' if instance.is_completed else 'pending'
+
+
+class IssueDeadlineSource(DeadlineSource):
+    """
+    An issue is due on its revised date once the extension is approved,
+    otherwise on its target date (as in ``Issue.save``).
+    """
+
+    def due_date(self, instance):
+        if instance.revised_date and instance.extension_approved_by_id:
+            return instance.revised_date
+        return instance.target_date
+
+    def held(self, today):
+        # Issue.save only escalates once a revised date has passed as well, approved or not
+        return Q(revised_date__gte=today)
+
+    def flip_overdue(self, organization, object_ids, today):
+        flipped = super().flip_overdue(organization, object_ids, today)
+        # Keep days_overdue current for every pending overdue issue, not only the newly flipped ones
+        due = Case(
+            When(revised_date__isnull=False, extension_approved_by__isnull=False, then=F('revised_date')),
+            default=F('target_date'),
+        )
+        overdue = deadline_calendar.pending(self.kind, organization).filter(due_date__lt=today).values('object_id')
+        refreshed = self.model._base_manager.filter(pk__in=overdue).update(
+            days_overdue=DaysBetween(Value(today, output_field=models.DateField()), due),
+        )
+        return max(flipped, refreshed)
+
+
+class DeadlineCalendar:
+    """Keeps ``Deadline`` rows in step with their source records and queries them"""
+
+    def __init__(self):
+        self.sources = {}
+
+    def register(self, source):
+        self.sources[source.kind] = source
+
+    def track_sources(self):
+        """Connect the save/delete signals of every registered source model"""
+        for source in self.sources.values():
+            model = source.model
+            uid = f'deadlines:{model._meta.label}'
+            post_save.connect(self._saved, sender=model, weak=False, dispatch_uid=uid)
+            post_delete.connect(self._deleted, sender=model, weak=False, dispatch_uid=uid)
+
+    def source_for(self, model):
+        for source in self.sources.values():
+            if source.model is model:
+                return source
+        return None
+
+    def _saved(self, sender, instance, raw=False, **kwargs):
+        if raw:
+            return
+        self.sync(instance)
+
+    def _deleted(self, sender, instance, **kwargs):
+        from core.models import Deadline
+
+        Deadline.objects.filter(
+            content_type=ContentType.objects.get_for_model(sender), object_id=instance.pk,
+        ).delete()
+
+    def sync(self, instance, today=None):
+        """Write (or remove) ``instance``'s deadline"""
+        from core.models import Deadline
+
+        source = self.source_for(type(instance))
+        content_type = ContentType.objects.get_for_model(type(instance))
+        values = source.values(instance, today or timezone.localdate())
+        deadlines = Deadline.objects.filter(content_type=content_type, object_id=instance.pk)
+        if values is None:
+            deadlines.delete()
+        elif not deadlines.update(**values, updated_at=timezone.now()):
+            Deadline.objects.create(content_type=content_type, object_id=instance.pk, **values)
+
+    def rebuild(self, organization, batch_size=1000):
+        """Recreate every deadline of ``organization`` from the source tables; returns counts per source"""
+        from core.models import Deadline
+
+        today = timezone.localdate()
+        counts = {}
+        with transaction.atomic():
+            Deadline.objects.filter(organization=organization).delete()
+            for source in self.sources.values():
+                model = source.model
+                content_type = ContentType.objects.get_for_model(model)
+                rows = []
+                for instance in model._base_manager.filter(organization=organization).iterator(chunk_size=batch_size):
+                    values = source.values(instance, today)
+                    if values is not None:
+                        rows.append(Deadline(content_type=content_type, object_id=instance.pk, **values))
+                Deadline.objects.bulk_create(rows, batch_size=batch_size)
+                counts[source.kind] = len(rows)
+        return counts
+
+    def pending(self, kind=None, organization=None):
+        from core.models import Deadline
+
+        deadlines = Deadline.objects.filter(status__in=Deadline.PENDING_STATUSES)
+        if organization is not None:
+            deadlines = deadlines.filter(organization=organization)
+        if kind is not None:
+            deadlines = deadlines.filter(source=kind)
+        return deadlines
+
+    def due_on(self, kind, day, organization=None):
+        """Pending deadlines of ``kind`` due on ``day``"""
+        return self.pending(kind, organization).filter(due_date=day)
+
+    def in_range(self, organization, start, end, sources=None, statuses=None):
+        """Deadlines of ``organization`` due between ``start`` and ``end`` (inclusive)"""
+        from core.models import Deadline
+
+        deadlines = Deadline.objects.filter(organization=organization, due_date__range=(start, end))
+        if sources:
+            deadlines = deadlines.filter(source__in=sources)
+        if statuses:
+            deadlines = deadlines.filter(status__in=statuses)
+        return deadlines
+
+    def counts(self, organization, today=None, window_days=7):
+        """``{source: {overdue, due_soon}}`` for ``organization`` in one query"""
+        today = today or timezone.localdate()
+        rows = (
+            self.pending(organization=organization).filter(due_date__lte=today + timedelta(days=window_days))
+            .values('source')
+            .annotate(
+                overdue=Count('pk', filter=Q(due_date__lt=today)),
+                due_soon=Count('pk', filter=Q(due_date__gte=today)),
+            )
+        )
+        counts = {kind: {'overdue': 0, 'due_soon': 0} for kind in self.sources}
+        for row in rows:
+            counts[row['source']] = {'overdue': row['overdue'], 'due_soon': row['due_soon']}
+        return counts
+
+    def flip_overdue(self, organization, today=None):
+        """
+        Move everything of ``organization`` due before ``today`` that is
+        still pending to its overdue status; returns the number of
+        deadlines updated.
+        """
+        from core.chart_cache import invalidate
+        from core.models import Deadline
+
+        today = today or timezone.localdate()
+        flippable = [source for source in self.sources.values() if source.overdue_status]
+        with transaction.atomic():
+            past_due = self.pending(organization=organization).filter(due_date__lt=today)
+            for source in self.sources.values():
+                # Sources only flip rows still in a flippable status, so this is idempotent
+                object_ids = past_due.filter(source=source.kind).values('object_id')
+                if source.flip_overdue(organization, object_ids, today):
+                    invalidate(source.model, organization.pk)
+            flips = {}
+            for source in flippable:
+                flips[source] = Q(source=source.kind, source_status__in=source.flippable)
+                held = source.held(today)
+                if held is not None:
+                    flips[source] &= ~Q(object_id__in=source.model._base_manager.filter(held).values('pk'))
+            stale = Q(status=Deadline.STATUS_OPEN)
+            for flip in flips.values():
+                stale |= flip
+            source_status = Case(
+                *(When(flip, then=Value(source.overdue_status)) for source, flip in flips.items()),
+                default=F('source_status'),
+            )
+            flipped = past_due.filter(stale).update(
+                status=Deadline.STATUS_OVERDUE, source_status=source_status, updated_at=timezone.now(),
+            )
+        logger.info(f"Deadlines for {organization}: {flipped} became overdue")
+        return flipped
+
+
+deadline_calendar = DeadlineCalendar()
+deadline_calendar.register(DeadlineSource(
+    'obligation', 'compliance.ComplianceObligation', title_field='obligation_id',
+    done=('completed',), cancelled=('cancelled',), flippable=('open', 'in_progress'), overdue_status='overdue',
+    owner_field='owner_id', owner_email_field='owner_email', active_field='is_active',
+))
+deadline_calendar.register(MilestoneDeadlineSource(
+    'milestone', 'contracts.ContractMilestone', title_field='title', done=('completed',),
+))
+deadline_calendar.register(DeadlineSource(
+    'legal_task', 'legal.LegalTask', title_field='title',
+    done=('completed',), flippable=('pending', 'in_progress'), overdue_status='overdue',
+    owner_field='assigned_to_id',
+))
+deadline_calendar.register(DeadlineSource(
+    'follow_up', 'audit.FollowUpAction', title_field='title',
+    done=('completed',), cancelled=('cancelled',),
+    flippable=('not_started', 'in_progress', 'deferred'), overdue_status='overdue',
+    owner_field='assigned_to_id',
+))
+deadline_calendar.register(IssueDeadlineSource(
+    'issue', 'audit.Issue', title_field='issue_title', due_field='target_date', status_field='issue_status',
+    done=('closed', 'accepted_risk'), flippable=('open', 'in_progress'), overdue_status='escalated',
+    owner_field='issue_owner_id', owner_email_field='issue_owner_email',
+))
+
+
+class DeadlineCalendarView(LoginRequiredMixin, View):
+    """
+    JSON feed of the organization's deadlines between ``start`` and ``end``
+    (ISO dates, default: this month), optionally filtered by ``source``
+    and ``status`` (comma separated).
+    """
+
+    def get(self, request):
+        today = timezone.localdate()
+        try:
+            start = parse_date(request.GET.get('start', '')[:10]) or today.replace(day=1)
+            end = parse_date(request.GET.get('end', '')[:10]) or (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+        except ValueError:
+            # Well formed but impossible, e.g. 2026-02-30
+            return JsonResponse({'error': 'Invalid date'}, status=400)
+        if end < start or (end - start).days > 366:
+            return JsonResponse({'error': 'Invalid date range'}, status=400)
+        sources = [s for s in request.GET.get('source', '').split(',') if s]
+        statuses = [s for s in request.GET.get('status', '').split(',') if s]
+
+        deadlines = deadline_calendar.in_range(request.organization, start, end, sources, statuses)
+        return JsonResponse({'deadlines': [
+            {
+                'id': deadline['pk'],
+                'title': deadline['title'],
+                'start': deadline['due_date'].isoformat(),
+                'source': deadline['source'],
+                'status': deadline['status'],
+                'object_id': deadline['object_id'],
+            }
+            for deadline in deadlines.values('pk', 'title', 'due_date', 'source', 'status', 'object_id')
+        ]})
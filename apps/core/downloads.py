@@ -0,0 +1,245 @@
+# apps/core/downloads.py
+
+"""
+Protected file downloads.
+
+Stored files are not linked to by their ``MEDIA_URL``; views check the
+user's organization and permissions in Django and then call
+``serve_file``, which hands the transfer itself to whatever can do it
+cheapest:
+
+- ``PROTECTED_DOWNLOADS_BACKEND = 'nginx'``: an ``X-Accel-Redirect`` to
+  ``PROTECTED_DOWNLOADS_INTERNAL_URL`` plus the path below ``MEDIA_ROOT``;
+  nginx serves the file (ranges, conditional requests, sendfile) from an
+  ``internal`` location, see ``deploy/nginx-protected-downloads.conf``
+- ``'sendfile'``: an ``X-Sendfile`` header with the absolute path, for
+  Apache mod_xsendfile or lighttpd
+- unset: a ``FileResponse`` streamed from the worker in
+  ``PROTECTED_DOWNLOADS_CHUNK_SIZE`` blocks (``wsgi.file_wrapper`` when the
+  server has one), with single ``Range`` requests, ``ETag`` /
+  ``Last-Modified`` and conditional GET; the worker never holds more than
+  one block of the file
+
+``signed_url`` makes an expiring link to a stored file that works without a
+session (API clients, e-mailed links). The signature is salted with the
+tenant schema, so a link only works on the tenant that issued it.
+"""
+
+import mimetypes
+import os
+import time
+from urllib.parse import quote
+
+from django.conf import settings
+from django.core import signing
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.http import FileResponse, Http404, HttpResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response
+from django.utils.http import content_disposition_header, http_date, quote_etag
+from django.views import View
+from django.views.generic.detail import SingleObjectMixin
+
+SIGNING_SALT = 'core.downloads'
+
+
+def _backend():
+    return getattr(settings, 'PROTECTED_DOWNLOADS_BACKEND', None)
+
+
+def _chunk_size():
+    return getattr(settings, 'PROTECTED_DOWNLOADS_CHUNK_SIZE', 1024 * 1024)
+
+
+def _file_path(storage, name):
+    try:
+        return storage.path(name)
+    except NotImplementedError:
+        return None
+
+
+def parse_range(header, size):
+    """
+    ``(start, end)`` (inclusive) for a single ``bytes=`` range, None to send
+    the whole file (no range, several ranges, another unit or an unparsable
+    header, which clients must accept), or ``False`` when the range starts
+    past the end of the file.
+    """
+    if not header:
+        return None
+    unit, _, spec = header.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    first, sep, last = spec.strip().partition('-')
+    if not sep:
+        return None
+    try:
+        if not first:
+            # bytes=-500: the last 500 bytes
+            length = int(last)
+            if length <= 0:
+                return False
+            return max(size - length, 0), size - 1
+        start = int(first)
+        end = int(last) if last else None
+    except ValueError:
+        return None
+    if end is not None and end < start:
+        return None
+    if start >= size:
+        return False
+    return start, size - 1 if end is None else min(end, size - 1)
+
+
+class _RangeFile:
+    """File object limited to ``length`` bytes from ``start``."""
+
+    def __init__(self, f, start, length):
+        f.seek(start)
+        self.f = f
+        self.remaining = length
+
+    def read(self, size=-1):
+        if self.remaining <= 0:
+            return b''
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.f.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.f.close()
+
+
+def serve_file(request, name, storage=None, filename=None, as_attachment=True, content_type=None):
+    """
+    Response sending the stored file ``name``; the caller has authorized the
+    request. Raises ``Http404`` when the file is missing.
+    """
+    storage = storage or default_storage
+    filename = filename or os.path.basename(name)
+    content_type = content_type or mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+    path = _file_path(storage, name)
+    backend = _backend()
+
+    if backend and path:
+        if not os.path.exists(path):
+            raise Http404('File not found')
+        response = HttpResponse(content_type=content_type)
+        if backend == 'nginx':
+            relative = os.path.relpath(path, settings.MEDIA_ROOT)
+            if relative.startswith('..'):
+                raise Http404('File not found')
+            internal_url = getattr(settings, 'PROTECTED_DOWNLOADS_INTERNAL_URL', '/protected/')
+            response['X-Accel-Redirect'] = internal_url.rstrip('/') + '/' + quote(relative.replace(os.sep, '/'))
+        else:
+            response['X-Sendfile'] = path
+        response['Content-Disposition'] = content_disposition_header(as_attachment, filename)
+        return response
+
+    try:
+        if path:
+            stat = os.stat(path)
+            size, modified = stat.st_size, stat.st_mtime
+        else:
+            size, modified = storage.size(name), storage.get_modified_time(name).timestamp()
+    except (FileNotFoundError, NotImplementedError) as e:
+        raise Http404('File not found') from e
+
+    etag = quote_etag(f'{size:x}-{int(modified * 1000):x}')
+    last_modified = int(modified)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is not None:
+        return response
+
+    byte_range = None
+    if_range = request.headers.get('If-Range')
+    if request.method == 'GET' and (not if_range or if_range in (etag, http_date(last_modified))):
+        byte_range = parse_range(request.headers.get('Range'), size)
+    if byte_range is False:
+        response = HttpResponse(status=416)
+        response['Content-Range'] = f'bytes */{size}'
+        return response
+
+    f = open(path, 'rb') if path else storage.open(name, 'rb')
+    if byte_range is None:
+        response = FileResponse(f, as_attachment=as_attachment, filename=filename, content_type=content_type)
+        response['Content-Length'] = size
+    else:
+        start, end = byte_range
+        response = FileResponse(
+            _RangeFile(f, start, end - start + 1), status=206, as_attachment=as_attachment,
+            filename=filename, content_type=content_type,
+        )
+        response['Content-Length'] = end - start + 1
+        response['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.block_size = _chunk_size()
+    response['Accept-Ranges'] = 'bytes'
+    response['ETag'] = etag
+    response['Last-Modified'] = http_date(last_modified)
+    return response
+
+
+def _signer():
+    return signing.Signer(salt=f'{SIGNING_SALT}:{connection.schema_name}')
+
+
+def signed_url(field_file, filename=None, expires_in=None, as_attachment=True):
+    """
+    Relative URL downloading ``field_file`` (or a storage name) for the next
+    ``expires_in`` seconds (default ``SIGNED_DOWNLOAD_EXPIRY_SECONDS``)
+    without a login, valid on the current tenant only.
+    """
+    name = getattr(field_file, 'name', field_file)
+    expires_in = expires_in or getattr(settings, 'SIGNED_DOWNLOAD_EXPIRY_SECONDS', 3600)
+    token = _signer().sign_object({
+        'n': name,
+        'f': filename or os.path.basename(name),
+        'e': int(time.time() + expires_in),
+        'a': as_attachment,
+    }, compress=True)
+    return reverse('signed-download', kwargs={'token': token})
+
+
+def unsign(token):
+    """``(name, filename, as_attachment)`` for a valid, unexpired token; raises ``Http404`` otherwise"""
+    try:
+        payload = _signer().unsign_object(token)
+    except signing.BadSignature as e:
+        raise Http404('Invalid download link') from e
+    if payload['e'] < time.time():
+        raise Http404('Download link expired')
+    return payload['n'], payload['f'], payload['a']
+
+
+class SignedDownloadView(View):
+    """Serves ``signed_url`` links; the signature is the authorization."""
+
+    def get(self, request, token):
+        name, filename, as_attachment = unsign(token)
+        return serve_file(request, name, filename=filename, as_attachment=as_attachment)
+
+
+class ProtectedFileView(SingleObjectMixin, View):
+    """
+    Download of one object's file. Put the app's permission mixin first;
+    the object is looked up within ``request.organization`` and
+    ``is_downloadable`` can refuse it (e.g. while quarantined).
+    """
+    file_field = 'file'
+    as_attachment = True
+
+    def get_queryset(self):
+        return super().get_queryset().filter(organization=self.request.organization)
+
+    def is_downloadable(self, obj):
+        return True
+
+    def get(self, request, *args, **kwargs):
+        obj = self.get_object()
+        field_file = getattr(obj, self.file_field)
+        if not field_file or not self.is_downloadable(obj):
+            raise Http404('File not available')
+        return serve_file(request, field_file.name, storage=field_file.storage, as_attachment=self.as_attachment)
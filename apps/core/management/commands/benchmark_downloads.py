@@ -0,0 +1,107 @@
+"""
+Management command to benchmark protected downloads of a large file.
+
+Writes a file of ``--size-mb`` (default 1 GB) to a temporary media root and
+measures, per delivery mode, the wall time, throughput and the worker's
+peak Python memory (``tracemalloc``) while the response body is consumed:
+
+- ``streamed``: ``serve_file`` without a front proxy (``FileResponse``)
+- ``range``: the last ``--range-mb`` of the file as a 206 response
+- ``x-accel``: ``serve_file`` with ``PROTECTED_DOWNLOADS_BACKEND='nginx'``;
+  the worker only builds the headers, nginx sends the bytes
+- ``buffered`` (with ``--compare-buffered``): the previous
+  ``HttpResponse(file_obj.read())`` export download, for comparison
+
+The body is consumed in-process the way a WSGI server without
+``wsgi.file_wrapper`` would, so the numbers are the worker's share of the
+transfer, not network throughput.
+"""
+
+import os
+import resource
+import shutil
+import tempfile
+import time
+import tracemalloc
+
+from django.core.files.storage import FileSystemStorage
+from django.core.management.base import BaseCommand
+from django.http import HttpResponse
+from django.test import RequestFactory, override_settings
+
+from core.downloads import serve_file
+
+BLOCK = os.urandom(1024 * 1024)
+
+
+class Command(BaseCommand):
+    help = 'Benchmark memory and throughput of protected downloads for a large file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--size-mb',
+            type=int,
+            default=1024,
+            help='Size of the test file in MB (default: 1024)'
+        )
+        parser.add_argument(
+            '--range-mb',
+            type=int,
+            default=64,
+            help='Size of the range request in MB (default: 64)'
+        )
+        parser.add_argument(
+            '--compare-buffered',
+            action='store_true',
+            help='Also measure the old read-everything download (needs --size-mb of free memory)'
+        )
+
+    def handle(self, *args, **options):
+        size = options['size_mb'] * 1024 * 1024
+        media_root = tempfile.mkdtemp(prefix='download-benchmark-')
+        try:
+            name = 'exports/benchmark.bin'
+            os.makedirs(os.path.join(media_root, 'exports'))
+            with open(os.path.join(media_root, name), 'wb') as f:
+                for _ in range(options['size_mb']):
+                    f.write(BLOCK)
+            storage = FileSystemStorage(location=media_root)
+            factory = RequestFactory()
+            range_bytes = min(options['range_mb'] * 1024 * 1024, size)
+
+            self.stdout.write(f'{"mode":<10} {"status":>6} {"bytes":>14} {"seconds":>9} {"MB/s":>9} {"peak MB":>9}')
+            with override_settings(MEDIA_ROOT=media_root, PROTECTED_DOWNLOADS_BACKEND=None):
+                self._run('streamed', lambda: serve_file(factory.get('/'), name, storage=storage))
+                self._run('range', lambda: serve_file(
+                    factory.get('/', HTTP_RANGE=f'bytes=-{range_bytes}'), name, storage=storage,
+                ))
+            with override_settings(MEDIA_ROOT=media_root, PROTECTED_DOWNLOADS_BACKEND='nginx'):
+                self._run('x-accel', lambda: serve_file(factory.get('/'), name, storage=storage))
+            if options['compare_buffered']:
+                def buffered():
+                    with storage.open(name, 'rb') as f:
+                        return HttpResponse(f.read(), content_type='application/octet-stream')
+                self._run('buffered', buffered)
+        finally:
+            shutil.rmtree(media_root)
+
+        self.stdout.write(f'max RSS of this process: {resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024:.0f} MB')
+
+    def _run(self, mode, respond):
+        tracemalloc.start()
+        started = time.perf_counter()
+        response = respond()
+        sent = 0
+        if response.streaming:
+            for chunk in response.streaming_content:
+                sent += len(chunk)
+            response.close()
+        else:
+            sent = len(response.content)
+        elapsed = time.perf_counter() - started
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        rate = sent / elapsed / 1024 / 1024 if sent else 0.0
+        self.stdout.write(
+            f'{mode:<10} {response.status_code:>6} {sent:>14,} {elapsed:>9.3f} {rate:>9.0f} {peak / 1024 / 1024:>9.1f}'
+        )
@@ -0,0 +1,132 @@
+"""
+Management command to benchmark dashboard period filtering on PostgreSQL.
+
+Loads a temporary table shaped like an organization-owned model with an
+``(organization_id, created_at)`` index and compares the previous
+``EXTRACT(YEAR/MONTH ...) IN (...)`` predicates with the half-open ranges
+produced by ``core.periods``. Nothing is written to application tables.
+"""
+
+import statistics
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from core.periods import month_ranges
+
+TABLE = 'period_filter_benchmark'
+
+
+class Command(BaseCommand):
+    help = 'Benchmark EXTRACT-based vs range-based year/month filters on a temporary table'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rows',
+            type=int,
+            default=1_000_000,
+            help='Rows in the temporary table (default: 1000000)'
+        )
+        parser.add_argument(
+            '--organizations',
+            type=int,
+            default=50,
+            help='Distinct organizations the rows are spread over (default: 50)'
+        )
+        parser.add_argument(
+            '--years',
+            type=int,
+            default=5,
+            help='Years of history ending now (default: 5)'
+        )
+        parser.add_argument(
+            '--repeat',
+            type=int,
+            default=5,
+            help='Timed runs per query; the median is reported (default: 5)'
+        )
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            raise CommandError('This benchmark needs PostgreSQL.')
+
+        with transaction.atomic(), connection.cursor() as cursor:
+            self._load(cursor, options['rows'], options['organizations'], options['years'])
+            cursor.execute('SELECT EXTRACT(YEAR FROM now())::int')
+            this_year = cursor.fetchone()[0]
+
+            scenarios = [
+                ('current year', [this_year], []),
+                ('last two years', [this_year - 1, this_year], []),
+                ('Q1 of two years', [this_year - 1, this_year], [1, 2, 3]),
+                ('Jan + Dec, two years', [this_year - 1, this_year], [1, 12]),
+            ]
+            for label, years, months in scenarios:
+                self.stdout.write(f'{label} (years={years}, months={months or "all"})')
+                for name, sql, params in [
+                    ('extract', *self._extract_predicate(years, months)),
+                    ('ranges ', *self._range_predicate(years, months)),
+                ]:
+                    query = f'SELECT count(*) FROM {TABLE} WHERE organization_id = %s AND ({sql})'
+                    query_params = [1, *params]
+                    count, elapsed = self._time(cursor, query, query_params, options['repeat'])
+                    plan = self._plan(cursor, query, query_params)
+                    self.stdout.write(f'  {name}: {elapsed * 1000:9.2f} ms  rows={count:<8} {plan}')
+
+            # Leave the database as we found it
+            transaction.set_rollback(True)
+
+    def _load(self, cursor, rows, organizations, years):
+        self.stdout.write(f'Loading {rows} rows over {organizations} organizations and {years} years...')
+        started = time.perf_counter()
+        cursor.execute(
+            f'CREATE TEMPORARY TABLE {TABLE} '
+            '(id bigserial PRIMARY KEY, organization_id bigint NOT NULL, created_at timestamptz NOT NULL)'
+        )
+        cursor.execute(
+            f'INSERT INTO {TABLE} (organization_id, created_at) '
+            'SELECT 1 + (i %% %s), now() - random() * make_interval(days => %s) '
+            'FROM generate_series(1, %s) AS i',
+            [organizations, years * 365, rows],
+        )
+        cursor.execute(f'CREATE INDEX ON {TABLE} (organization_id, created_at)')
+        cursor.execute(f'ANALYZE {TABLE}')
+        self.stdout.write(f'  loaded in {time.perf_counter() - started:.1f}s')
+
+    def _extract_predicate(self, years, months):
+        """The SQL Django emits for ``created_at__year__in`` / ``__month__in``."""
+        local = "created_at AT TIME ZONE %s"
+        sql = f'EXTRACT(YEAR FROM {local}) IN ({", ".join(["%s"] * len(years))})'
+        params = [settings.TIME_ZONE, *years]
+        if months:
+            sql += f' AND EXTRACT(MONTH FROM {local}) IN ({", ".join(["%s"] * len(months))})'
+            params += [settings.TIME_ZONE, *months]
+        return sql, params
+
+    def _range_predicate(self, years, months):
+        """The SQL ``core.periods.ranges_q`` produces for the same selection."""
+        clauses, params = [], []
+        for start, end in month_ranges(years, months):
+            clauses.append(
+                "(created_at >= %s::date::timestamp AT TIME ZONE %s "
+                "AND created_at < %s::date::timestamp AT TIME ZONE %s)"
+            )
+            params += [start, settings.TIME_ZONE, end, settings.TIME_ZONE]
+        return ' OR '.join(clauses), params
+
+    def _time(self, cursor, query, params, repeat):
+        timings = []
+        for _ in range(repeat):
+            started = time.perf_counter()
+            cursor.execute(query, params)
+            count = cursor.fetchone()[0]
+            timings.append(time.perf_counter() - started)
+        return count, statistics.median(timings)
+
+    def _plan(self, cursor, query, params):
+        cursor.execute(f'EXPLAIN {query}', params)
+        nodes = [row[0].strip().lstrip('-> ') for row in cursor.fetchall()]
+        scans = [node.split('  ')[0] for node in nodes if 'Scan' in node]
+        return ', '.join(scans)
@@ -0,0 +1,56 @@
+"""
+Management command to report blob store effectiveness.
+
+Per tenant: stored bytes (each blob once), referenced bytes (what the files
+would take without deduplication) and unreferenced blobs awaiting
+``collect_blob_garbage``. Process-wide counters: uploads, deduplicated
+uploads, bytes written and saved, and the average upload latency with
+and without a storage write.
+"""
+
+from django.core.management.base import BaseCommand
+from django.template.defaultfilters import filesizeformat
+from django_tenants.utils import get_public_schema_name, tenant_context
+
+from core.blobstore import blob_store
+from organizations.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Report storage savings and upload latency of the blob store'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the upload counters after reporting'
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f'{"tenant":<24} {"blobs":>8} {"refs":>8} {"stored":>10} {"referenced":>11} '
+                          f'{"saved":>10} {"unreferenced":>13}')
+        for organization in Organization.objects.exclude(schema_name=get_public_schema_name()):
+            with tenant_context(organization):
+                stats = blob_store.stats()
+            if not stats['blobs']:
+                continue
+            self.stdout.write(
+                f'{organization.schema_name:<24} {stats["blobs"]:>8} {stats["references"]:>8} '
+                f'{filesizeformat(stats["stored_bytes"]):>10} {filesizeformat(stats["referenced_bytes"]):>11} '
+                f'{filesizeformat(stats["saved_bytes"]):>10} '
+                f'{stats["unreferenced"]:>4} ({filesizeformat(stats["unreferenced_bytes"])})'
+            )
+
+        counters = blob_store.counters()
+        uploads = counters['uploads']
+        rate = counters['deduplicated'] / uploads if uploads else 0.0
+        self.stdout.write('')
+        self.stdout.write(f'uploads:            {uploads} ({counters["deduplicated"]} deduplicated, {rate:.1%})')
+        self.stdout.write(f'bytes written:      {filesizeformat(counters["bytes_written"])}')
+        self.stdout.write(f'bytes not written:  {filesizeformat(counters["bytes_deduplicated"])}')
+        self.stdout.write(f'avg upload latency: {counters["avg_upload_ms"]:.1f} ms written, '
+                          f'{counters["avg_deduplicated_upload_ms"]:.1f} ms deduplicated')
+
+        if options['reset']:
+            blob_store.reset_counters()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,39 @@
+"""
+Management command to report chart-data cache effectiveness.
+
+Prints hits, misses, 304 responses and the hit rate of every endpoint
+decorated with ``core.chart_cache.chart_cache``.
+"""
+
+from django.core.management.base import BaseCommand
+from django.urls import get_resolver
+
+from core.chart_cache import chart_cache_stats, reset_chart_cache_stats
+
+
+class Command(BaseCommand):
+    help = 'Report hit rates of the cached chart-data endpoints'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Reset the counters after reporting'
+        )
+
+    def handle(self, *args, **options):
+        # Importing the URLconf imports the views, which registers the endpoints
+        get_resolver().url_patterns
+
+        stats = chart_cache_stats()
+        width = max((len(endpoint) for endpoint in stats), default=8)
+        self.stdout.write(f'{"endpoint":<{width}}  {"hits":>8} {"304":>8} {"misses":>8} {"hit rate":>9}')
+        for endpoint, counts in sorted(stats.items(), key=lambda item: -item[1]['hit_rate']):
+            self.stdout.write(
+                f'{endpoint:<{width}}  {counts["hits"]:>8} {counts["not_modified"]:>8} '
+                f'{counts["misses"]:>8} {counts["hit_rate"]:>8.1%}'
+            )
+
+        if options['reset']:
+            reset_chart_cache_stats()
+            self.stdout.write(self.style.SUCCESS('Counters reset.'))
@@ -0,0 +1,72 @@
+"""
+Management command to delete unreferenced blobs from the content-addressed store.
+
+Runs per tenant schema. Blobs whose last reference was released more than
+``--grace-hours`` ago are deleted, as are stray files in the tenant's blob
+directory (writes whose transaction rolled back). With ``--verify``,
+references that no tracked field uses any more are released first and
+drifted reference counts are corrected.
+"""
+
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.template.defaultfilters import filesizeformat
+from django_tenants.utils import get_public_schema_name, tenant_context
+
+from core.blobstore import blob_store
+from organizations.models import Organization
+
+
+class Command(BaseCommand):
+    help = 'Delete blobs that no file references any more'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            type=int,
+            help='Only collect in this organization (default: all tenants)'
+        )
+        parser.add_argument(
+            '--grace-hours',
+            type=float,
+            help='Keep released blobs for this long (default: BLOB_STORE_GC_GRACE_HOURS)'
+        )
+        parser.add_argument(
+            '--verify',
+            action='store_true',
+            help='Release orphaned references and correct reference counts first'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report what would be deleted without deleting it'
+        )
+
+    def handle(self, *args, **options):
+        organizations = Organization.objects.exclude(schema_name=get_public_schema_name())
+        if options['organization']:
+            organizations = organizations.filter(pk=options['organization'])
+            if not organizations.exists():
+                raise CommandError(f"Organization with ID {options['organization']} not found")
+        grace = timedelta(hours=options['grace_hours']) if options['grace_hours'] is not None else None
+        dry_run = options['dry_run']
+
+        total_blobs = total_bytes = 0
+        for organization in organizations:
+            with tenant_context(organization):
+                if options['verify']:
+                    released, corrected = blob_store.verify_references(grace=grace, dry_run=dry_run)
+                    if released or corrected:
+                        self.stdout.write(
+                            f'{organization.schema_name}: released {released} orphaned references, '
+                            f'corrected {corrected} reference counts'
+                        )
+                blobs, freed = blob_store.collect_garbage(grace=grace, dry_run=dry_run)
+            if blobs:
+                self.stdout.write(f'{organization.schema_name}: {blobs} blobs, {filesizeformat(freed)}')
+            total_blobs += blobs
+            total_bytes += freed
+
+        verb = 'Would delete' if dry_run else 'Deleted'
+        self.stdout.write(self.style.SUCCESS(f'{verb} {total_blobs} blobs ({filesizeformat(total_bytes)}).'))
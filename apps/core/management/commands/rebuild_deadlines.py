@@ -0,0 +1,46 @@
+"""
+Management command to rebuild the deadline calendar.
+
+Recreates the ``Deadline`` rows of one organization (``--organization``)
+or of every tenant from the source tables: compliance obligations, contract
+milestones, legal tasks, audit issues and follow-up actions. Rows are kept
+up to date by signals afterwards; run this once after deploying the
+calendar, or after bulk imports that bypass ``save()``. With
+``--flip-overdue`` the daily overdue update is run afterwards.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import tenant_context
+
+from core.deadlines import deadline_calendar
+from core.tasks import tenant_organizations
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the deadline calendar from obligations, milestones, legal tasks, issues and follow-ups'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            type=int,
+            help='Only rebuild this organization (ID)'
+        )
+        parser.add_argument(
+            '--flip-overdue',
+            action='store_true',
+            help='Also move records whose due date has passed to their overdue status'
+        )
+
+    def handle(self, *args, **options):
+        organizations = tenant_organizations(options['organization'])
+        if options['organization'] is not None and not organizations.exists():
+            raise CommandError(f'Organization with ID {options["organization"]} not found')
+
+        for organization in organizations:
+            with tenant_context(organization):
+                counts = deadline_calendar.rebuild(organization)
+                summary = ', '.join(f'{count} {kind}' for kind, count in counts.items())
+                self.stdout.write(self.style.SUCCESS(f'{organization.name}: {summary}'))
+                if options['flip_overdue']:
+                    flipped = deadline_calendar.flip_overdue(organization)
+                    self.stdout.write(f'  {flipped} became overdue')
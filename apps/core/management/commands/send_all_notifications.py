@@ -2,6 +2,7 @@
 
 from django.core.management.base import BaseCommand
 from django.utils import timezone
+from django_tenants.utils import get_public_schema_name, tenant_context
 from datetime import timedelta
 import logging
 
@@ -10,6 +11,7 @@ from compliance.models import ComplianceObligation
 from contracts.models import ContractMilestone
 from compliance.tasks import send_obligation_due_reminder, send_obligation_overdue_alert
 from contracts.tasks import send_milestone_due_reminder, send_milestone_overdue_alert
+from core.deadlines import deadline_calendar
 
 logger = logging.getLogger(__name__)
 
@@ -51,7 +53,7 @@ class Command(BaseCommand):
                 )
                 return
         else:
-            organizations = Organization.objects.all()
+            organizations = Organization.objects.exclude(schema_name=get_public_schema_name())
         
         try:
             # Check compliance obligations
@@ -64,36 +66,32 @@ class Command(BaseCommand):
             
             for organization in organizations:
                 self.stdout.write(f"  Checking organization: {organization.name}")
+                with tenant_context(organization):
+                    # Due reminders (7 days before)
+                    upcoming_obligations = ComplianceObligation.objects.filter(
+                        pk__in=deadline_calendar.due_on('obligation', due_in_7_days, organization).values('object_id')
+                    )
                 
-                # Due reminders (7 days before)
-                upcoming_obligations = ComplianceObligation.objects.filter(
-                    organization=organization,
-                    due_date=due_in_7_days,
-                    status__in=['open', 'in_progress']
-                )
-                
-                for obligation in upcoming_obligations:
-                    if options['dry_run']:
-                        self.stdout.write(f"    [DRY RUN] Would send 7-day reminder for: {obligation.obligation_id}")
-                    else:
-                        send_obligation_due_reminder.delay(obligation.id, organization.id)
-                        self.stdout.write(f"    Sent 7-day reminder for: {obligation.obligation_id}")
-                    obligation_due_reminders += 1
+                    for obligation in upcoming_obligations:
+                        if options['dry_run']:
+                            self.stdout.write(f"    [DRY RUN] Would send 7-day reminder for: {obligation.obligation_id}")
+                        else:
+                            send_obligation_due_reminder.delay(obligation.id, organization.id)
+                            self.stdout.write(f"    Sent 7-day reminder for: {obligation.obligation_id}")
+                        obligation_due_reminders += 1
                 
-                # Overdue alerts (1 day after due date)
-                overdue_obligations = ComplianceObligation.objects.filter(
-                    organization=organization,
-                    due_date=overdue_1_day,
-                    status__in=['open', 'in_progress']
-                )
+                    # Overdue alerts (1 day after due date)
+                    overdue_obligations = ComplianceObligation.objects.filter(
+                        pk__in=deadline_calendar.due_on('obligation', overdue_1_day, organization).values('object_id')
+                    )
                 
-                for obligation in overdue_obligations:
-                    if options['dry_run']:
-                        self.stdout.write(f"    [DRY RUN] Would send overdue alert for: {obligation.obligation_id}")
-                    else:
-                        send_obligation_overdue_alert.delay(obligation.id, organization.id)
-                        self.stdout.write(f"    Sent overdue alert for: {obligation.obligation_id}")
-                    obligation_overdue_alerts += 1
+                    for obligation in overdue_obligations:
+                        if options['dry_run']:
+                            self.stdout.write(f"    [DRY RUN] Would send overdue alert for: {obligation.obligation_id}")
+                        else:
+                            send_obligation_overdue_alert.delay(obligation.id, organization.id)
+                            self.stdout.write(f"    Sent overdue alert for: {obligation.obligation_id}")
+                        obligation_overdue_alerts += 1
             
             total_due_reminders += obligation_due_reminders
             total_overdue_alerts += obligation_overdue_alerts
@@ -115,36 +113,32 @@ class Command(BaseCommand):
             
             for organization in organizations:
                 self.stdout.write(f"  Checking organization: {organization.name}")
+                with tenant_context(organization):
+                    # Due reminders (7 days before)
+                    upcoming_milestones = ContractMilestone.objects.filter(
+                        pk__in=deadline_calendar.due_on('milestone', due_in_7_days, organization).values('object_id')
+                    )
                 
-                # Due reminders (7 days before)
-                upcoming_milestones = ContractMilestone.objects.filter(
-                    organization=organization,
-                    due_date=due_in_7_days,
-                    is_completed=False
-                )
-                
-                for milestone in upcoming_milestones:
-                    if options['dry_run']:
-                        self.stdout.write(f"    [DRY RUN] Would send 7-day reminder for: {milestone.title}")
-                    else:
-                        send_milestone_due_reminder.delay(milestone.id, organization.id)
-                        self.stdout.write(f"    Sent 7-day reminder for: {milestone.title}")
-                    milestone_due_reminders += 1
+                    for milestone in upcoming_milestones:
+                        if options['dry_run']:
+                            self.stdout.write(f"    [DRY RUN] Would send 7-day reminder for: {milestone.title}")
+                        else:
+                            send_milestone_due_reminder.delay(milestone.id, organization.id)
+                            self.stdout.write(f"    Sent 7-day reminder for: {milestone.title}")
+                        milestone_due_reminders += 1
                 
-                # Overdue alerts (1 day after due date)
-                overdue_milestones = ContractMilestone.objects.filter(
-                    organization=organization,
-                    due_date=overdue_1_day,
-                    is_completed=False
-                )
+                    # Overdue alerts (1 day after due date)
+                    overdue_milestones = ContractMilestone.objects.filter(
+                        pk__in=deadline_calendar.due_on('milestone', overdue_1_day, organization).values('object_id')
+                    )
                 
-                for milestone in overdue_milestones:
-                    if options['dry_run']:
-                        self.stdout.write(f"    [DRY RUN] Would send overdue alert for: {milestone.title}")
-                    else:
-                        send_milestone_overdue_alert.delay(milestone.id, organization.id)
-                        self.stdout.write(f"    Sent overdue alert for: {milestone.title}")
-                    milestone_overdue_alerts += 1
+                    for milestone in overdue_milestones:
+                        if options['dry_run']:
+                            self.stdout.write(f"    [DRY RUN] Would send overdue alert for: {milestone.title}")
+                        else:
+                            send_milestone_overdue_alert.delay(milestone.id, organization.id)
+                            self.stdout.write(f"    Sent overdue alert for: {milestone.title}")
+                        milestone_overdue_alerts += 1
             
             total_due_reminders += milestone_due_reminders
             total_overdue_alerts += milestone_overdue_alerts
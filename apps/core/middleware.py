@@ -64,6 +64,7 @@ class OrganizationMiddleware:
         '/service_paused/',
         '/service_info/',
         '/document_management/upload/',  # token-based external uploads (no login)
+        '/files/',  # signed download links (core.downloads)
     )
 
     def __init__(self, get_response):
@@ -0,0 +1,47 @@
+# Generated by Django 5.1.14 on 2026-10-18 22:44
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Blob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('sha256', models.CharField(max_length=64, unique=True, verbose_name='SHA-256')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='storage name')),
+                ('size', models.PositiveBigIntegerField(verbose_name='size')),
+                ('refcount', models.IntegerField(db_index=True, default=0, verbose_name='reference count')),
+                ('scan_status', models.CharField(blank=True, choices=[('', 'Not scanned'), ('clean', 'Clean'), ('infected', 'Infected')], max_length=10, verbose_name='scan status')),
+                ('scan_result', models.CharField(blank=True, max_length=255, verbose_name='scan result')),
+                ('scanned_at', models.DateTimeField(blank=True, null=True, verbose_name='scanned at')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('released_at', models.DateTimeField(blank=True, help_text='When the last reference was removed', null=True, verbose_name='released at')),
+            ],
+            options={
+                'verbose_name': 'blob',
+                'verbose_name_plural': 'blobs',
+                'indexes': [models.Index(fields=['refcount', 'released_at'], name='core_blob_refcoun_8b99c8_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='BlobReference',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='storage name')),
+                ('created_at', models.DateTimeField(auto_now_add=True, verbose_name='created at')),
+                ('blob', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='references', to='core.blob', verbose_name='blob')),
+            ],
+            options={
+                'verbose_name': 'blob reference',
+                'verbose_name_plural': 'blob references',
+            },
+        ),
+    ]
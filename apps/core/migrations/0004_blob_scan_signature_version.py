@@ -0,0 +1,18 @@
+# Generated by Django 5.1.14 on 2026-10-18 22:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_blob_store'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='blob',
+            name='scan_signature_version',
+            field=models.CharField(blank=True, max_length=32, verbose_name='signature database version'),
+        ),
+    ]
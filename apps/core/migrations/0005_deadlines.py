@@ -0,0 +1,43 @@
+# Generated by Django 5.1.14 on 2026-10-18 23:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('contenttypes', '0002_remove_content_type_name'),
+        ('core', '0004_blob_scan_signature_version'),
+        ('organizations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Deadline',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Timestamp when the record was first created', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, help_text='Timestamp when the record was last updated', verbose_name='updated at')),
+                ('source', models.CharField(help_text='Kind of record, e.g. "obligation"', max_length=30, verbose_name='source')),
+                ('object_id', models.PositiveBigIntegerField(verbose_name='object id')),
+                ('title', models.CharField(max_length=512, verbose_name='title')),
+                ('due_date', models.DateField(verbose_name='due date')),
+                ('status', models.CharField(choices=[('open', 'Open'), ('overdue', 'Overdue'), ('done', 'Done'), ('cancelled', 'Cancelled')], default='open', max_length=10, verbose_name='status')),
+                ('source_status', models.CharField(blank=True, max_length=30, verbose_name='source status')),
+                ('owner_email', models.EmailField(blank=True, max_length=254, verbose_name='owner email')),
+                ('content_type', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='contenttypes.contenttype', verbose_name='content type')),
+                ('organization', models.ForeignKey(help_text='Organization that owns this record', on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='organization')),
+                ('owner', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='deadlines', to=settings.AUTH_USER_MODEL, verbose_name='owner')),
+            ],
+            options={
+                'verbose_name': 'deadline',
+                'verbose_name_plural': 'deadlines',
+                'ordering': ['due_date', 'pk'],
+                'indexes': [models.Index(fields=['organization', 'due_date', 'status'], name='core_deadline_calendar_idx'), models.Index(fields=['owner', 'due_date'], name='core_deadli_owner_i_28512e_idx')],
+                'constraints': [models.CheckConstraint(condition=models.Q(('organization__isnull', False)), name='organization_required_deadline'), models.UniqueConstraint(fields=('content_type', 'object_id'), name='unique_deadline_per_object')],
+            },
+        ),
+    ]
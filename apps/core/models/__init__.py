@@ -1,6 +1,8 @@
 from .audit import AuditLog
 from .abstract_models import AuditableModel, TimeStampedModel
 from .base_models import BaseModel
+from .blob import Blob, BlobReference
+from .deadline import Deadline
 from .validators import *
 
-__all__ = ['AuditLog', 'AuditableModel', 'TimeStampedModel', 'BaseModel']
\ No newline at end of file
+__all__ = ['AuditLog', 'AuditableModel', 'TimeStampedModel', 'BaseModel', 'Blob', 'BlobReference', 'Deadline']
\ No newline at end of file
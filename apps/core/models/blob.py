@@ -0,0 +1,57 @@
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+
+class Blob(models.Model):
+    """
+    One stored copy of a file's content, keyed by its SHA-256.
+
+    Lives in each tenant schema, so content is only shared within a tenant.
+    ``refcount`` counts the ``BlobReference`` names linked to it; blobs
+    that drop to zero are removed by ``collect_blob_garbage``.
+    """
+    SCAN_CLEAN = 'clean'
+    SCAN_INFECTED = 'infected'
+    SCAN_STATUS_CHOICES = (
+        ('', _('Not scanned')),
+        (SCAN_CLEAN, _('Clean')),
+        (SCAN_INFECTED, _('Infected')),
+    )
+
+    sha256 = models.CharField(_('SHA-256'), max_length=64, unique=True)
+    name = models.CharField(_('storage name'), max_length=255, unique=True)
+    size = models.PositiveBigIntegerField(_('size'))
+    refcount = models.IntegerField(_('reference count'), default=0, db_index=True)
+    scan_status = models.CharField(_('scan status'), max_length=10, choices=SCAN_STATUS_CHOICES, blank=True)
+    scan_result = models.CharField(_('scan result'), max_length=255, blank=True)
+    scan_signature_version = models.CharField(_('signature database version'), max_length=32, blank=True)
+    scanned_at = models.DateTimeField(_('scanned at'), null=True, blank=True)
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+    released_at = models.DateTimeField(
+        _('released at'), null=True, blank=True,
+        help_text=_('When the last reference was removed')
+    )
+
+    class Meta:
+        verbose_name = _('blob')
+        verbose_name_plural = _('blobs')
+        indexes = [
+            models.Index(fields=['refcount', 'released_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.sha256} ({self.size} bytes, {self.refcount} refs)'
+
+
+class BlobReference(models.Model):
+    """A storage name (e.g. a ``FileField`` value) that is a hard link to a blob."""
+    name = models.CharField(_('storage name'), max_length=255, unique=True)
+    blob = models.ForeignKey(Blob, on_delete=models.CASCADE, related_name='references', verbose_name=_('blob'))
+    created_at = models.DateTimeField(_('created at'), auto_now_add=True)
+
+    class Meta:
+        verbose_name = _('blob reference')
+        verbose_name_plural = _('blob references')
+
+    def __str__(self):
+        return self.name
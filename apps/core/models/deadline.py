@@ -0,0 +1,64 @@
+from django.conf import settings
+from django.contrib.contenttypes.fields import GenericForeignKey
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.utils.translation import gettext_lazy as _
+
+from .abstract_models import OrganizationOwnedModel
+
+
+class Deadline(OrganizationOwnedModel):
+    """
+    One dated commitment from any module (compliance obligation, contract
+    milestone, legal task, audit issue or follow-up action), denormalized
+    into a single calendar.
+
+    Rows are written by ``core.deadlines.DeadlineCalendar`` whenever the
+    source row is saved or deleted, so due-soon, overdue and calendar
+    queries are range scans of the ``(organization, due_date, status)``
+    index instead of one scan per source table.
+    """
+    STATUS_OPEN = 'open'
+    STATUS_OVERDUE = 'overdue'
+    STATUS_DONE = 'done'
+    STATUS_CANCELLED = 'cancelled'
+    STATUS_CHOICES = (
+        (STATUS_OPEN, _('Open')),
+        (STATUS_OVERDUE, _('Overdue')),
+        (STATUS_DONE, _('Done')),
+        (STATUS_CANCELLED, _('Cancelled')),
+    )
+    PENDING_STATUSES = (STATUS_OPEN, STATUS_OVERDUE)
+
+    source = models.CharField(_('source'), max_length=30, help_text=_('Kind of record, e.g. "obligation"'))
+    content_type = models.ForeignKey(ContentType, on_delete=models.CASCADE, verbose_name=_('content type'))
+    object_id = models.PositiveBigIntegerField(_('object id'))
+    content_object = GenericForeignKey('content_type', 'object_id')
+    title = models.CharField(_('title'), max_length=512)
+    due_date = models.DateField(_('due date'))
+    status = models.CharField(_('status'), max_length=10, choices=STATUS_CHOICES, default=STATUS_OPEN)
+    source_status = models.CharField(_('source status'), max_length=30, blank=True)
+    owner = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='deadlines', verbose_name=_('owner')
+    )
+    owner_email = models.EmailField(_('owner email'), blank=True)
+
+    class Meta:
+        verbose_name = _('deadline')
+        verbose_name_plural = _('deadlines')
+        ordering = ['due_date', 'pk']
+        indexes = [
+            models.Index(fields=['organization', 'due_date', 'status'], name='core_deadline_calendar_idx'),
+            models.Index(fields=['owner', 'due_date']),
+        ]
+        constraints = [
+            models.CheckConstraint(
+                check=models.Q(organization__isnull=False),
+                name='organization_required_deadline'
+            ),
+            models.UniqueConstraint(fields=['content_type', 'object_id'], name='unique_deadline_per_object'),
+        ]
+
+    def __str__(self):
+        return f'{self.title} ({self.due_date}, {self.status})'
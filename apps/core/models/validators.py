@@ -80,44 +80,30 @@ def validate_file_virus(value):
     if not value:
         return
 
-    # 3. Attempt connection to ClamAV with circuit breaker pattern
-    clamd_available = False
+    # 3. Stream the upload to clamd (INSTREAM) unless this content was already scanned
+    from core.virus_scan import ScannerUnavailable, virus_scanner
     try:
-        import pyclamd
-        cd = pyclamd.ClamdNetworkSocket()
-        cd.ping()
-        clamd_available = True
-    except Exception as e:
+        result = virus_scanner.scan_upload(value).signature
+    except ScannerUnavailable as e:
         logger.warning(f"ClamAV unavailable: {str(e)}")
         if getattr(settings, 'FAIL_IF_SCANNER_UNAVAILABLE', False):
             raise ValidationError(_('Virus scanning service is currently unavailable'))
-
-    # 4. Perform scan if available
-    if clamd_available:
-        try:
-            # Avoid buffering whole uploads in memory: write to a temp file and scan by path.
-            import tempfile
-            value.seek(0)
-            with tempfile.NamedTemporaryFile(prefix="oreno-upload-", suffix=".bin", delete=True) as tmp:
-                for chunk in iter(lambda: value.read(1024 * 1024), b""):
-                    tmp.write(chunk)
-                tmp.flush()
-                result = cd.scan_file(tmp.name)
-
-            # Reset the file pointer for further processing
-            value.seek(0)
-            if result:
-                raise ValidationError(
-                    _('The uploaded file appears to be infected: %(result)s'),
-                    params={'result': result},
-                )
-                
-        except Exception as e:
-            logger.error(f"Virus scan failed: {str(e)}")
-            if getattr(settings, 'FAIL_ON_SCAN_ERROR', True):
-                raise ValidationError(_('Virus scan failed during processing'))
-
-    value.seek(0)
+        result = None
+    except Exception as e:
+        logger.error(f"Virus scan failed: {str(e)}")
+        if getattr(settings, 'FAIL_ON_SCAN_ERROR', True):
+            raise ValidationError(_('Virus scan failed during processing'))
+        result = None
+    finally:
+        # Reset the file pointer for further processing
+        value.seek(0)
+
+    # 4. Reject infected files
+    if result:
+        raise ValidationError(
+            _('The uploaded file appears to be infected: %(result)s'),
+            params={'result': result},
+        )
 
 
 def file_upload_validators(*, virus_scan: bool = False):
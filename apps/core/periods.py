@@ -0,0 +1,155 @@
+# apps/core/periods.py
+
+"""
+Year/month period filters that stay index friendly.
+
+``created_at__year__in`` and ``__month__in`` wrap the column in ``EXTRACT()``,
+so PostgreSQL cannot use a B-tree index on it. The helpers here turn the
+selected years and months into the smallest set of half-open
+``[start, end)`` ranges and filter with plain ``>=`` / ``<`` comparisons,
+which an ``(organization, <date field>)`` index can serve directly.
+
+Usage::
+
+    period = PeriodFilter.from_request(request, org)
+    period_q = period.q('created_at', LegalCase)
+    cases = LegalCase.objects.filter(organization=org).filter(period_q)
+    context.update(period.context())
+"""
+
+import calendar
+from datetime import date, datetime, time
+
+from django.db import models
+from django.db.models import Q
+from django.utils import timezone
+
+
+def month_ranges(years, months=None):
+    """
+    Return the minimal list of half-open ``(start, end)`` date ranges covering
+    every selected month of every selected year.
+
+    Adjacent months merge, including across year boundaries, so selecting
+    every month of 2023 and 2024 yields a single range.
+    """
+    months = sorted({int(m) for m in months or range(1, 13) if 1 <= int(m) <= 12})
+    units = sorted({int(year) * 12 + month - 1 for year in years for month in months})
+
+    ranges = []
+    for unit in units:
+        if ranges and ranges[-1][1] == unit:
+            ranges[-1][1] = unit + 1
+        else:
+            ranges.append([unit, unit + 1])
+    return [(_unit_start(start), _unit_start(end)) for start, end in ranges]
+
+
+def _unit_start(unit):
+    return date(unit // 12, unit % 12 + 1, 1)
+
+
+def resolve_field(model, path):
+    """Return the model field at the end of a ``__``-separated lookup path."""
+    field = None
+    for name in path.split('__'):
+        field = model._meta.get_field(name)
+        if field.is_relation:
+            model = field.related_model
+    return field
+
+
+def _bound(value, field):
+    """Convert a date bound into the type the field compares against."""
+    if isinstance(field, models.DateTimeField):
+        if isinstance(value, datetime):
+            return value
+        return timezone.make_aware(datetime.combine(value, time.min))
+    if isinstance(value, datetime):
+        return timezone.localtime(value).date() if timezone.is_aware(value) else value.date()
+    return value
+
+
+def range_q(field_name, model, start=None, end=None):
+    """
+    Sargable ``start <= field < end`` predicate; either bound may be omitted.
+
+    Dates are expanded to midnight in the current time zone for
+    ``DateTimeField`` columns, matching what ``__year``/``__month`` used.
+    """
+    field = resolve_field(model, field_name)
+    q = Q()
+    if start is not None:
+        q &= Q(**{f'{field_name}__gte': _bound(start, field)})
+    if end is not None:
+        q &= Q(**{f'{field_name}__lt': _bound(end, field)})
+    return q
+
+
+def ranges_q(field_name, model, ranges):
+    """OR of :func:`range_q` over ``ranges``; matches nothing when empty."""
+    if not ranges:
+        return Q(pk__in=[])
+    q = Q()
+    for start, end in ranges:
+        q |= range_q(field_name, model, start, end)
+    return q
+
+
+class PeriodFilter:
+    """
+    The dashboards' year/month selection.
+
+    ``filter_all`` disables filtering. Otherwise rows must fall into one of the
+    selected months (every month when none are selected) of a selected year.
+    """
+
+    def __init__(self, years, months=None, filter_all=False):
+        self.years = sorted({int(y) for y in years})
+        self.months = sorted({int(m) for m in months or []})
+        self.filter_all = filter_all
+        self.ranges = [] if filter_all else month_ranges(self.years, self.months)
+        self.selected_years = [str(y) for y in self.years]
+        self.selected_months = [str(m) for m in self.months]
+        self.available_years = self.selected_years
+
+    @classmethod
+    def from_request(cls, request, organization=None):
+        """
+        Read ``?year=`` / ``?month=`` (repeatable, ``year=All`` for no filter),
+        defaulting to the current year.
+        """
+        today = timezone.now().date()
+        selected_years = request.GET.getlist('year') or [str(today.year)]
+        selected_months = request.GET.getlist('month')
+        period = cls(
+            [y for y in selected_years if y.isdigit()],
+            [m for m in selected_months if m.isdigit()],
+            filter_all='All' in selected_years,
+        )
+        period.selected_years = selected_years
+        period.selected_months = selected_months
+        org_created = getattr(organization, 'created_at', None) or timezone.now()
+        period.available_years = list(range(org_created.date().year, today.year + 1))
+        return period
+
+    def q(self, field_name, model):
+        """Predicate for ``field_name`` (may span relations) on ``model``."""
+        if self.filter_all:
+            return Q()
+        return ranges_q(field_name, model, self.ranges)
+
+    def filter(self, queryset, field_name):
+        """Apply :meth:`q` to ``queryset``."""
+        return queryset.filter(self.q(field_name, queryset.model))
+
+    def context(self):
+        """Template context for the dashboards' period selector."""
+        return {
+            'available_years': self.available_years,
+            'available_months': [(i, calendar.month_name[i]) for i in range(1, 13)],
+            'selected_years': self.selected_years,
+            'selected_months': self.selected_months,
+            'filter_all': self.filter_all,
+        }
+
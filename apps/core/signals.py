@@ -45,4 +45,4 @@ def log_save(sender, instance, created, **kwargs):
 def log_delete(sender, instance, **kwargs):
     """Log model deletion."""
     if sender._meta.app_label in settings.AUDIT_ENABLED_APPS:
-        log_change(instance, 'delete') 
\ No newline at end of file
+        log_change(instance, 'delete') 
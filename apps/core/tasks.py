@@ -0,0 +1,31 @@
+# apps/core/tasks.py
+
+from celery import shared_task
+from django_tenants.utils import get_public_schema_name, tenant_context
+import logging
+
+from organizations.models import Organization
+from .deadlines import deadline_calendar
+
+logger = logging.getLogger(__name__)
+
+
+def tenant_organizations(organization_id=None):
+    organizations = Organization.objects.exclude(schema_name=get_public_schema_name())
+    if organization_id is not None:
+        organizations = organizations.filter(pk=organization_id)
+    return organizations
+
+
+@shared_task
+def update_overdue_deadlines(organization_id=None):
+    """
+    Flip every deadline (and its source record) whose due date has passed
+    to overdue, with one UPDATE per source per tenant.
+    This task should be run daily, before the notification tasks.
+    """
+    results = {}
+    for organization in tenant_organizations(organization_id):
+        with tenant_context(organization):
+            results[organization.pk] = deadline_calendar.flip_overdue(organization)
+    return results
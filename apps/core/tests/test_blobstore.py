@@ -0,0 +1,130 @@
+# apps/core/tests/test_blobstore.py
+
+import os
+import shutil
+import tempfile
+from datetime import date, timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import override_settings
+from django_tenants.test.cases import TenantTestCase
+
+from core.blobstore import blob_store
+from core.clamd_stub import StubClamd
+from core.models import Blob, BlobReference
+from core.virus_scan import virus_scanner
+from document_management.models import Document, DocumentRequest
+from document_management.tasks import scan_document
+
+User = get_user_model()
+
+POLICY = b'%PDF-1.7\n' + b'Information security policy, version 3\n' * 5000
+
+
+class BlobStoreTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Blob Store Org'
+        tenant.code = 'BLOBS'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        blob_store.reset_counters()
+        virus_scanner.reset_stats()
+
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            user = User.objects.create_user(
+                username='blobs', email='blobs@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='admin',
+            )
+        self.doc_request = DocumentRequest.objects.create(
+            organization=self.tenant, request_name='Policies', due_date=date(2030, 1, 1),
+            request_owner=user, requestee_identifier='IT',
+        )
+
+    def _document(self, content=POLICY, name='policy.pdf'):
+        return Document.objects.create(
+            organization=self.tenant, document_request=self.doc_request, file=ContentFile(content, name=name),
+        )
+
+    @mock.patch('document_management.tasks.scan_document.delay')
+    def test_repeated_upload_is_linked_and_not_rescanned(self, delay):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = self._document()
+        with StubClamd() as clamd, override_settings(ENABLE_VIRUS_SCANNING=True, **clamd.settings()):
+            scan_document(first.pk, self.tenant.pk)
+            with self.captureOnCommitCallbacks(execute=True):
+                second = self._document(name='policy-copy.pdf')
+        self.assertEqual(clamd.scans, 1)
+        delay.assert_called_once_with(first.pk, self.tenant.pk)
+
+        second.refresh_from_db()
+        self.assertEqual(second.scan_status, Document.SCAN_CLEAN)
+        self.assertNotEqual(first.file.name, second.file.name)
+        blob = Blob.objects.get()
+        self.assertEqual(blob.refcount, 2)
+        self.assertEqual(os.stat(first.file.path).st_ino, os.stat(default_storage.path(blob.name)).st_ino)
+        with second.file.open('rb') as f:
+            self.assertEqual(f.read(), POLICY)
+
+        counters = blob_store.counters()
+        self.assertEqual((counters['uploads'], counters['deduplicated']), (2, 1))
+        self.assertEqual(counters['bytes_written'], len(POLICY))
+        self.assertEqual(virus_scanner.stats()['avoided'], 1)
+        self.assertEqual(blob_store.stats()['saved_bytes'], len(POLICY))
+
+    @mock.patch('document_management.tasks.scan_document.delay')
+    def test_unreferenced_blobs_are_collected_after_the_grace_period(self, delay):
+        first, second = self._document(), self._document()
+        blob_path = default_storage.path(Blob.objects.get().name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            first.delete()
+        self.assertFalse(os.path.exists(first.file.path))
+        self.assertEqual(Blob.objects.get().refcount, 1)
+
+        # Replacing the file releases the old content too
+        with self.captureOnCommitCallbacks(execute=True):
+            second.file = ContentFile(b'%PDF-1.7\nrevised', name='revised.pdf')
+            second.save()
+        released = Blob.objects.get(refcount=0)
+
+        self.assertEqual(blob_store.collect_garbage(), (0, 0))
+        self.assertEqual(blob_store.collect_garbage(grace=timedelta(0), dry_run=True), (1, len(POLICY)))
+        self.assertTrue(os.path.exists(blob_path))
+        self.assertEqual(blob_store.collect_garbage(grace=timedelta(0)), (1, len(POLICY)))
+        self.assertFalse(os.path.exists(blob_path))
+        self.assertFalse(Blob.objects.filter(pk=released.pk).exists())
+
+        # A stray file from a rolled back write goes too; the live blob stays
+        stray = default_storage.path(f'{blob_store.schema_dir()}/ab/{"ab" * 32}')
+        os.makedirs(os.path.dirname(stray))
+        with open(stray, 'wb') as f:
+            f.write(b'x')
+        self.assertEqual(blob_store.collect_garbage(grace=timedelta(0)), (1, 1))
+        with second.file.open('rb') as f:
+            self.assertEqual(f.read(), b'%PDF-1.7\nrevised')
+
+    @mock.patch('document_management.tasks.scan_document.delay')
+    def test_existing_files_are_adopted_and_orphans_released(self, delay):
+        document = self._document()
+        copy = default_storage.save('evidence/run-1/policy.pdf', ContentFile(POLICY))
+
+        blob = blob_store.adopt(copy)
+        self.assertEqual(blob.refcount, 2)
+        self.assertEqual(os.stat(default_storage.path(copy)).st_ino, os.stat(document.file.path).st_ino)
+
+        # Nothing tracked uses the adopted name; rows removed without signals leave the same state
+        Document.objects.filter(pk=document.pk).update(file='')
+        self.assertEqual(blob_store.verify_references(grace=timedelta(0)), (2, 0))
+        self.assertFalse(BlobReference.objects.exists())
+        self.assertEqual(Blob.objects.get().refcount, 0)
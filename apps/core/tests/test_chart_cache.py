@@ -0,0 +1,170 @@
+# apps/core/tests/test_chart_cache.py
+
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection
+from django.http import JsonResponse
+from django.test import RequestFactory, SimpleTestCase
+from django.test.utils import CaptureQueriesContext
+from django_tenants.test.cases import TenantTestCase
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from core.chart_cache import chart_cache, chart_cache_stats, invalidate, normalized_filters
+from document_management.models import DocumentRequest
+from document_management.views import api_status_data
+from organizations.models import Organization
+
+User = get_user_model()
+
+calls = []
+
+
+@chart_cache(DocumentRequest)
+def request_counts(request):
+    calls.append(request)
+    return JsonResponse({'total': DocumentRequest.objects.filter(organization=request.organization).count()})
+
+
+@chart_cache('document_management.documentrequest')
+def failing_chart(request):
+    calls.append(request)
+    return JsonResponse({'error': 'No organization found'}, status=400)
+
+
+class NormalizedFiltersTests(SimpleTestCase):
+    def test_order_repeats_and_cache_busters_do_not_matter(self):
+        factory = RequestFactory()
+        self.assertEqual(
+            normalized_filters(factory.get('/', {'year': ['2024', '2023'], 'register': '3', '_': '1712'})),
+            normalized_filters(factory.get('/', {'register': '3', 'year': ['2023', '2024']})),
+        )
+        self.assertNotEqual(
+            normalized_filters(factory.get('/', {'register': '3'})),
+            normalized_filters(factory.get('/', {'register': '4'})),
+        )
+
+
+class ChartCacheTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Chart Cache Org'
+        tenant.code = 'CHARTCACHE'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        cache.clear()
+        calls.clear()
+        # User creation queues welcome/OTP tasks, which would need a broker
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.user = User.objects.create_user(
+                username='chart_cache', email='chart_cache@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='admin',
+            )
+
+    def _get(self, view, organization=None, **headers):
+        request = RequestFactory().get('/api/chart/', {'year': '2024'}, **headers)
+        request.user = self.user
+        request.organization = organization or self.tenant
+        return view(request)
+
+    def _document_request(self, status='pending'):
+        return DocumentRequest.objects.create(
+            organization=self.tenant, request_name='Evidence', status=status,
+            due_date=date(2024, 6, 1), request_owner=self.user,
+        )
+
+    def test_second_request_is_served_from_cache(self):
+        first = self._get(request_counts)
+        second = self._get(request_counts)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(second.content, first.content)
+        self.assertEqual(second['ETag'], first['ETag'])
+        self.assertTrue(first['ETag'].startswith('"'))
+
+        stats = chart_cache_stats()[f'{__name__}.request_counts']
+        self.assertEqual((stats['hits'], stats['misses']), (1, 1))
+        self.assertEqual(stats['hit_rate'], 0.5)
+
+    def test_matching_if_none_match_skips_the_view(self):
+        etag = self._get(request_counts)['ETag']
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self._get(request_counts, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response['ETag'], etag)
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(len(queries), 0)
+        self.assertEqual(self._get(request_counts, HTTP_IF_NONE_MATCH='"stale"').status_code, 200)
+
+    def test_writes_to_tagged_models_expire_entries(self):
+        self.assertEqual(self._get(request_counts).content, b'{"total": 0}')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            document_request = self._document_request()
+            # Until the write commits, readers keep the entry of the old rows
+            self.assertEqual(self._get(request_counts).content, b'{"total": 0}')
+        self.assertEqual(self._get(request_counts).content, b'{"total": 1}')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            document_request.delete()
+        self.assertEqual(self._get(request_counts).content, b'{"total": 0}')
+
+        # Bulk writes send no signals and invalidate explicitly
+        self._get(request_counts)
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate(DocumentRequest, self.tenant.pk)
+        self._get(request_counts)
+        self.assertEqual(len(calls), 4)
+
+    def test_writes_to_untracked_models_touch_no_cache(self):
+        self._get(request_counts)
+        with mock.patch('core.chart_cache.cache', wraps=cache) as shared, \
+                self.captureOnCommitCallbacks(execute=True) as callbacks:
+            self.user.first_name = 'Charts'
+            self.user.save()
+        self.assertEqual(callbacks, [])
+        self.assertFalse(shared.set.called)
+        with self.assertRaises(ImproperlyConfigured):
+            chart_cache(User)
+
+    def test_entries_are_per_organization(self):
+        with schema_context(get_public_schema_name()):
+            other = Organization(name='Other Chart Org', code='CHARTCACHE_OTHER', schema_name='chartcache_other')
+            other.auto_create_schema = False
+            other.save()
+        self._get(request_counts)
+        self._get(request_counts, organization=other)
+        self.assertEqual(len(calls), 2)
+
+        # The other organization's writes leave this organization's entry alone
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate(DocumentRequest, other.pk)
+        self._get(request_counts)
+        self.assertEqual(len(calls), 2)
+
+    def test_error_responses_are_not_cached(self):
+        self._get(failing_chart)
+        response = self._get(failing_chart)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(len(calls), 2)
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_module_endpoint_is_cached_and_invalidated(self):
+        self._document_request(status='accepted')
+        first = self._get(api_status_data)
+        self.assertEqual(first.content, b'{"accepted": 1}')
+
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(self._get(api_status_data, HTTP_IF_NONE_MATCH=first['ETag']).status_code, 304)
+        self.assertEqual(len(queries), 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self._document_request()
+        self.assertEqual(self._get(api_status_data).content, b'{"accepted": 1, "pending": 1}')
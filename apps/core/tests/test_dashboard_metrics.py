@@ -0,0 +1,136 @@
+# apps/core/tests/test_dashboard_metrics.py
+
+import copy
+import uuid
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils.module_loading import import_string
+from django_tenants.test.cases import TenantTestCase
+
+from core.dashboard import DashboardMetrics, bucket_counts
+from organizations.models import Organization
+
+User = get_user_model()
+
+# Render like production: development settings flag missing template variables
+PRODUCTION_TEMPLATES = copy.deepcopy(settings.TEMPLATES)
+PRODUCTION_TEMPLATES[0]['OPTIONS']['string_if_invalid'] = ''
+
+
+def _create_user(**fields):
+    # User creation queues welcome/OTP tasks, which would need a broker
+    with mock.patch('users.signals.send_welcome_email.delay'), \
+            mock.patch('users.signals.cleanup_old_otps.delay'):
+        return User.objects.create_user(**fields)
+
+
+class DashboardMetricsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Organization.auto_create_schema = False
+        unique = uuid.uuid4().hex[:8]
+        cls.organization = Organization.objects.create(
+            name=f"Dashboard Org {unique}",
+            code=f"DASH_{unique}",
+            schema_name=f"dash_{unique}",
+            is_active=True,
+        )
+        for index, role in enumerate(['admin', 'staff', 'staff', 'manager']):
+            _create_user(
+                username=f"user{index}_{unique}",
+                email=f"user{index}_{unique}@example.com",
+                password="Sup3r-Secret-Pass!",
+                organization=cls.organization,
+                role=role,
+                is_active=index != 3,
+            )
+
+    def test_counts_of_one_source_share_a_single_query(self):
+        metrics = DashboardMetrics()
+        metrics.source(User.objects.filter(organization=self.organization)) \
+            .count('total') \
+            .count('active', Q(is_active=True)) \
+            .count('admins', Q(role='admin')) \
+            .distinct('roles', 'role')
+
+        with CaptureQueriesContext(connection) as queries:
+            results = metrics.evaluate()
+
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(results, {'total': 4, 'active': 3, 'admins': 1, 'roles': 3})
+
+    def test_histogram_labels_merge_and_default(self):
+        metrics = DashboardMetrics()
+        users = metrics.source(User.objects.filter(organization=self.organization))
+        users.histogram('by_role', 'role', labels={'admin': 'Admins', 'manager': 'Admins'}, order_by='-count')
+        users.histogram('none', 'role', filter=Q(role='auditor'), default={'Auditor': 0})
+
+        results = metrics.evaluate()
+
+        self.assertEqual(results['by_role'], {'Staff': 2, 'Admins': 2})
+        self.assertEqual(results['none'], {'Auditor': 0})
+        self.assertEqual(bucket_counts({'b': 2}, ['a', 'b']), {'a': 0, 'b': 2})
+
+
+class DashboardQueryBudgetTests(TenantTestCase):
+    """Each module dashboard renders within a fixed number of queries."""
+
+    # One aggregate per source model, one query per histogram, plus the
+    # recent-item lists. Adding a metric to an existing source is free;
+    # a budget bump means a new model or chart.
+    BUDGETS = {
+        'legal.views.LegalDashboardView': 12,
+        'contracts.views.ContractsDashboardView': 13,
+        'document_management.views.DocumentManagementDashboardView': 7,
+        'audit.views.AuditDashboardView': 16,
+        'compliance.views.ComplianceDashboardView': 15,
+        'risk.views.RiskDashboardView': 42,
+        'ai_governance.views.GovernanceDashboardView': 30,
+    }
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Dashboard Budget Org'
+        tenant.code = 'DASHBUDGET'
+        tenant.auto_create_schema = True
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = _create_user(
+            username='dashboard_budget',
+            email='dashboard_budget@example.com',
+            password='Sup3r-Secret-Pass!',
+            organization=cls.tenant,
+            role='admin',
+        )
+
+    def setUp(self):
+        # Dashboards cache some of their metrics; measure the cold path
+        cache.clear()
+
+    def _render(self, view_path):
+        request = RequestFactory().get('/dashboard/')
+        request.user = self.user
+        request.organization = self.tenant
+        request.tenant = self.tenant
+        response = import_string(view_path).as_view()(request)
+        if hasattr(response, 'render'):
+            response.render()
+        return response
+
+    @override_settings(TEMPLATES=PRODUCTION_TEMPLATES)
+    def test_dashboards_render_within_query_budget(self):
+        for view_path, budget in self.BUDGETS.items():
+            with self.subTest(view=view_path):
+                with CaptureQueriesContext(connection) as queries:
+                    response = self._render(view_path)
+                self.assertEqual(response.status_code, 200)
+                self.assertLessEqual(len(queries), budget)
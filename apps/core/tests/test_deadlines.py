@@ -0,0 +1,158 @@
+# apps/core/tests/test_deadlines.py
+
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.contenttypes.models import ContentType
+from django.db import models
+from django.db.models import F, Value
+from django.test import RequestFactory
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+
+from audit.models import AuditWorkplan, Engagement, Issue, Objective, Procedure, Risk
+from compliance.models import ComplianceObligation, ComplianceRequirement
+from contracts.models import Contract, ContractMilestone, ContractType
+from core.deadlines import DaysBetween, DeadlineCalendarView, deadline_calendar
+from core.models import Deadline
+from legal.models import CaseType, LegalCase, LegalTask
+
+User = get_user_model()
+
+
+class DeadlineCalendarTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Deadlines Org'
+        tenant.code = 'DEADLINES'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        self.today = timezone.localdate()
+        requirement = ComplianceRequirement.objects.create(
+            organization=self.tenant, requirement_id='REQ-1', title='Annual access review', jurisdiction='EU',
+        )
+        self.obligation = ComplianceObligation.objects.create(
+            organization=self.tenant, obligation_id='OBL-1', requirement=requirement, due_period='annual',
+            owner_email='owner@example.com', due_date=self.today + timedelta(days=7),
+        )
+        case = LegalCase.objects.create(
+            organization=self.tenant, title='Supplier dispute',
+            case_type=CaseType.objects.create(organization=self.tenant, name='Commercial'),
+        )
+        self.late_task = LegalTask.objects.create(
+            organization=self.tenant, case=case, title='File defence', due_date=self.today - timedelta(days=3),
+        )
+        self.done_task = LegalTask.objects.create(
+            organization=self.tenant, case=case, title='Collect evidence', status='completed',
+            due_date=self.today - timedelta(days=10),
+        )
+        contract = Contract.objects.create(
+            organization=self.tenant, contract_type=ContractType.objects.create(organization=self.tenant, name='MSA'),
+            code='C-1', title='Hosting', start_date=self.today, end_date=self.today + timedelta(days=365),
+            governing_law='English law', jurisdiction='England',
+        )
+        self.milestone = ContractMilestone.objects.create(
+            organization=self.tenant, contract=contract, title='First payment', milestone_type='payment',
+            due_date=self.today - timedelta(days=1),
+        )
+
+    def _deadline(self, instance):
+        return Deadline.objects.get(content_type=ContentType.objects.get_for_model(instance), object_id=instance.pk)
+
+    def test_sources_are_mirrored_and_overdue_is_flipped_in_bulk(self):
+        self.assertEqual(self._deadline(self.obligation).status, Deadline.STATUS_OPEN)
+        self.assertEqual(self._deadline(self.obligation).owner_email, 'owner@example.com')
+        self.assertEqual(self._deadline(self.done_task).status, Deadline.STATUS_DONE)
+        self.assertEqual(self._deadline(self.milestone).status, Deadline.STATUS_OVERDUE)
+
+        with self.assertNumQueries(8):
+            # One UPDATE per flipping source, days_overdue, the deadlines, savepoint
+            deadline_calendar.flip_overdue(self.tenant)
+        self.late_task.refresh_from_db()
+        self.assertEqual(self.late_task.status, 'overdue')
+        self.assertEqual(self._deadline(self.late_task).source_status, 'overdue')
+        self.assertEqual(deadline_calendar.flip_overdue(self.tenant), 0)
+
+        self.milestone.is_completed = True
+        self.milestone.save()
+        self.assertEqual(self._deadline(self.milestone).status, Deadline.STATUS_DONE)
+        self.obligation.is_active = False
+        self.obligation.save()
+        self.assertEqual(self._deadline(self.obligation).status, Deadline.STATUS_CANCELLED)
+
+        self.late_task.delete()
+        self.assertEqual(Deadline.objects.count(), 3)
+        self.assertEqual(deadline_calendar.rebuild(self.tenant)['legal_task'], 1)
+        self.assertEqual(Deadline.objects.count(), 3)
+
+    def test_reminders_counts_and_calendar_feed_read_the_index(self):
+        self.assertEqual(
+            list(deadline_calendar.due_on('obligation', self.today + timedelta(days=7), self.tenant)
+                 .values_list('object_id', flat=True)),
+            [self.obligation.pk],
+        )
+        counts = deadline_calendar.counts(self.tenant)
+        self.assertEqual(counts['obligation'], {'overdue': 0, 'due_soon': 1})
+        self.assertEqual(counts['legal_task'], {'overdue': 1, 'due_soon': 0})
+        self.assertEqual(counts['milestone'], {'overdue': 1, 'due_soon': 0})
+
+        request = RequestFactory().get('/', {
+            'start': (self.today - timedelta(days=5)).isoformat(),
+            'end': (self.today + timedelta(days=30)).isoformat(),
+            'status': 'open,overdue',
+        })
+        request.user = User(pk=1)
+        request.organization = self.tenant
+        response = DeadlineCalendarView.as_view()(request)
+        self.assertEqual(
+            [event['title'] for event in json.loads(response.content)['deadlines']],
+            ['File defence', 'First payment', 'OBL-1'],
+        )
+
+        days = Deadline.objects.annotate(
+            late=DaysBetween(Value(self.today, output_field=models.DateField()), F('due_date')),
+        ).get(object_id=self.late_task.pk, source='legal_task').late
+        self.assertEqual(days, 3)
+
+    def test_impossible_calendar_date_is_rejected(self):
+        request = RequestFactory().get('/', {'start': '2026-02-30'})
+        request.user = User(pk=1)
+        request.organization = self.tenant
+        self.assertEqual(DeadlineCalendarView.as_view()(request).status_code, 400)
+
+    def test_issues_escalate_like_issue_save(self):
+        workplan = AuditWorkplan.objects.create(organization=self.tenant, code='WP-1', name='Plan', fiscal_year=2025)
+        engagement = Engagement.objects.create(
+            organization=self.tenant, code='ENG-1', annual_workplan=workplan, title='Payroll',
+            project_start_date=self.today - timedelta(days=60),
+        )
+        objective = Objective.objects.create(organization=self.tenant, engagement=engagement, title='Payroll accuracy')
+        risk = Risk.objects.create(organization=self.tenant, objective=objective, title='Ghost employees')
+        procedure = Procedure.objects.create(organization=self.tenant, risk=risk, title='Headcount reconciliation')
+
+        def issue(code, **dates):
+            return Issue.objects.create(
+                organization=self.tenant, procedure=procedure, code=code, issue_title=code, issue_status='open',
+                date_identified=self.today - timedelta(days=30), **dates,
+            )
+
+        # Saving past the target date already escalates; flip_overdue catches issues that lapse later
+        late = issue('ISS-1', target_date=self.today + timedelta(days=1))
+        revised = issue('ISS-2', target_date=self.today + timedelta(days=1), revised_date=self.today + timedelta(days=10))
+        Issue.objects.update(target_date=self.today - timedelta(days=4))
+        deadline_calendar.rebuild(self.tenant)
+        self.assertEqual(self._deadline(revised).status, Deadline.STATUS_OVERDUE)
+
+        deadline_calendar.flip_overdue(self.tenant)
+        late.refresh_from_db()
+        revised.refresh_from_db()
+        self.assertEqual((late.issue_status, late.days_overdue), ('escalated', 4))
+        self.assertEqual(self._deadline(late).source_status, 'escalated')
+        # The revised date has not passed, so the unapproved extension keeps the issue open
+        self.assertEqual(revised.issue_status, 'open')
+        self.assertEqual(self._deadline(revised).source_status, 'open')
+        revised.save()
+        self.assertEqual(revised.issue_status, 'open')
+        self.assertEqual(deadline_calendar.flip_overdue(self.tenant), 0)
@@ -0,0 +1,135 @@
+# apps/core/tests/test_downloads.py
+
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.http import Http404
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django_tenants.test.cases import TenantTestCase
+
+from core.downloads import SignedDownloadView, serve_file, signed_url
+from document_management.models import Document, DocumentRequest
+from document_management.views import DocumentDownloadView
+
+User = get_user_model()
+
+CONTENT = bytes(range(256)) * 4096  # 1 MB
+
+
+def _body(response):
+    return b''.join(response.streaming_content) if response.streaming else response.content
+
+
+class ServeFileTests(SimpleTestCase):
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media, PROTECTED_DOWNLOADS_CHUNK_SIZE=64 * 1024)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.name = default_storage.save('exports/org/report.xlsx', ContentFile(CONTENT))
+        self.factory = RequestFactory()
+
+    def test_streams_ranges_and_answers_conditional_requests(self):
+        response = serve_file(self.factory.get('/'), self.name)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Length'], str(len(CONTENT)))
+        self.assertIn('attachment; filename="report.xlsx"', response['Content-Disposition'])
+        self.assertEqual(_body(response), CONTENT)
+        etag = response['ETag']
+
+        response = serve_file(self.factory.get('/', HTTP_RANGE='bytes=1000-1999'), self.name)
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(response['Content-Range'], f'bytes 1000-1999/{len(CONTENT)}')
+        self.assertEqual(_body(response), CONTENT[1000:2000])
+
+        # Resuming the last bytes; a stale If-Range gets the whole file instead
+        response = serve_file(self.factory.get('/', HTTP_RANGE='bytes=-10', HTTP_IF_RANGE=etag), self.name)
+        self.assertEqual(_body(response), CONTENT[-10:])
+        response = serve_file(self.factory.get('/', HTTP_RANGE='bytes=-10', HTTP_IF_RANGE='"stale"'), self.name)
+        self.assertEqual((response.status_code, _body(response)), (200, CONTENT))
+
+        response = serve_file(self.factory.get('/', HTTP_RANGE=f'bytes={len(CONTENT)}-'), self.name)
+        self.assertEqual((response.status_code, response['Content-Range']), (416, f'bytes */{len(CONTENT)}'))
+        self.assertEqual(serve_file(self.factory.get('/', HTTP_IF_NONE_MATCH=etag), self.name).status_code, 304)
+
+        with self.assertRaises(Http404):
+            serve_file(self.factory.get('/'), 'exports/org/missing.xlsx')
+
+    def test_hands_transfer_to_the_front_proxy(self):
+        with override_settings(PROTECTED_DOWNLOADS_BACKEND='nginx'):
+            response = serve_file(self.factory.get('/'), self.name)
+        self.assertEqual(response['X-Accel-Redirect'], '/protected/exports/org/report.xlsx')
+        self.assertEqual(response.content, b'')
+
+        with override_settings(PROTECTED_DOWNLOADS_BACKEND='sendfile'):
+            response = serve_file(self.factory.get('/'), self.name)
+        self.assertEqual(response['X-Sendfile'], default_storage.path(self.name))
+
+
+class ProtectedDownloadTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Downloads Org'
+        tenant.code = 'DOWNLOADS'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.user = User.objects.create_user(
+                username='downloads', email='downloads@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='admin',
+            )
+        doc_request = DocumentRequest.objects.create(
+            organization=self.tenant, request_name='Evidence', due_date=date(2030, 1, 1),
+            request_owner=self.user, requestee_identifier='IT',
+        )
+        with mock.patch('document_management.tasks.scan_document.delay'):
+            self.document = Document.objects.create(
+                organization=self.tenant, document_request=doc_request,
+                file=ContentFile(CONTENT, name='evidence.pdf'),
+            )
+
+    def _download(self, **headers):
+        request = RequestFactory().get('/', **headers)
+        request.user = self.user
+        request.organization = self.tenant
+        return DocumentDownloadView.as_view()(request, pk=self.document.pk)
+
+    def test_quarantined_documents_are_not_served(self):
+        self.assertEqual(self.document.scan_status, Document.SCAN_PENDING)
+        with self.assertRaises(Http404):
+            self._download()
+
+        Document.objects.filter(pk=self.document.pk).update(scan_status=Document.SCAN_CLEAN)
+        response = self._download(HTTP_RANGE='bytes=0-99')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(_body(response), CONTENT[:100])
+
+    def test_signed_links_expire_and_only_work_on_their_tenant(self):
+        url = signed_url(self.document.file, filename='evidence.pdf')
+        token = url.rstrip('/').rsplit('/', 1)[-1]
+        view = SignedDownloadView.as_view()
+
+        response = view(RequestFactory().get(url), token=token)
+        self.assertEqual(_body(response), CONTENT)
+
+        with self.assertRaises(Http404):
+            view(RequestFactory().get(url), token=token[:-2] + 'xx')
+        with mock.patch.object(connection, 'schema_name', 'another_tenant'), self.assertRaises(Http404):
+            view(RequestFactory().get(url), token=token)
+        with mock.patch('core.downloads.time.time', return_value=4_000_000_000), self.assertRaises(Http404):
+            view(RequestFactory().get(url), token=token)
@@ -0,0 +1,130 @@
+# apps/core/tests/test_periods.py
+
+from datetime import date, datetime
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import Q
+from django.test import RequestFactory, SimpleTestCase
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+from django_tenants.utils import get_public_schema_name, schema_context
+
+from ai_governance.models import ModelAsset, TestResult, TestRun
+from contracts.models import ContractMilestone
+from core.periods import PeriodFilter, month_ranges, range_q
+from organizations.models import Organization
+
+
+class MonthRangesTests(SimpleTestCase):
+    def test_whole_years_merge_into_one_range(self):
+        self.assertEqual(month_ranges([2023, 2024]), [(date(2023, 1, 1), date(2025, 1, 1))])
+
+    def test_adjacent_months_merge_across_year_boundary(self):
+        self.assertEqual(
+            month_ranges([2023, 2024], [12, 1, 2]),
+            [
+                (date(2023, 1, 1), date(2023, 3, 1)),
+                (date(2023, 12, 1), date(2024, 3, 1)),
+                (date(2024, 12, 1), date(2025, 1, 1)),
+            ],
+        )
+
+    def test_gaps_stay_separate_and_invalid_months_are_ignored(self):
+        self.assertEqual(
+            month_ranges([2024], [3, 5, 13]),
+            [(date(2024, 3, 1), date(2024, 4, 1)), (date(2024, 5, 1), date(2024, 6, 1))],
+        )
+        self.assertEqual(month_ranges([], [1]), [])
+
+    def test_bounds_follow_the_field_type(self):
+        q = range_q('due_date', ContractMilestone, date(2024, 1, 1), date(2024, 2, 1))
+        self.assertEqual(dict(q.children), {'due_date__gte': date(2024, 1, 1), 'due_date__lt': date(2024, 2, 1)})
+
+        q = range_q('test_run__created_at', TestResult, date(2024, 1, 1))
+        start = dict(q.children)['test_run__created_at__gte']
+        self.assertTrue(timezone.is_aware(start))
+        self.assertEqual(timezone.localtime(start).replace(tzinfo=None), datetime(2024, 1, 1))
+
+    def test_from_request(self):
+        request = RequestFactory().get('/', {'year': ['2024', 'x'], 'month': ['2', '3']})
+        period = PeriodFilter.from_request(request)
+        self.assertEqual(period.ranges, [(date(2024, 2, 1), date(2024, 4, 1))])
+        self.assertEqual(period.context()['selected_years'], ['2024', 'x'])
+
+        period = PeriodFilter.from_request(RequestFactory().get('/', {'year': 'All'}))
+        self.assertTrue(period.filter_all)
+        self.assertEqual(period.q('due_date', ContractMilestone), Q())
+
+
+class PeriodFilterDatabaseTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Period Filter Org'
+        tenant.code = 'PERIODS'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        self.organization = self.tenant
+        model = ModelAsset.objects.bulk_create([
+            ModelAsset(organization=self.organization, name='m', model_type='tabular', uri='s3://m'),
+        ])[0]
+        runs = TestRun.objects.bulk_create([TestRun(organization=self.organization, model_asset=model) for _ in range(6)])
+        # Month edges in local time, where __year/__month used to evaluate
+        moments = [
+            datetime(2023, 12, 31, 23, 59), datetime(2024, 1, 1, 0, 0), datetime(2024, 1, 31, 23, 59),
+            datetime(2024, 2, 1, 0, 0), datetime(2024, 12, 31, 23, 59), datetime(2025, 1, 1, 0, 0),
+        ]
+        for run, moment in zip(runs, moments):
+            TestRun.objects.filter(pk=run.pk).update(created_at=timezone.make_aware(moment))
+
+    def _runs(self, q):
+        return set(TestRun.objects.filter(organization=self.organization).filter(q).values_list('created_at', flat=True))
+
+    def test_ranges_select_the_same_rows_as_extract_lookups(self):
+        for years, months in [([2024], []), ([2024], [1]), ([2023, 2024], [12, 1]), ([2025], [2])]:
+            with self.subTest(years=years, months=months):
+                legacy = Q(created_at__year__in=years)
+                if months:
+                    legacy &= Q(created_at__month__in=months)
+                period = PeriodFilter(years, months)
+                self.assertEqual(self._runs(period.q('created_at', TestRun)), self._runs(legacy))
+
+    @skipUnless(connection.vendor == 'postgresql', 'EXPLAIN output is PostgreSQL specific')
+    def test_range_predicates_use_the_organization_created_at_index(self):
+        period = PeriodFilter([2023, 2024], [12, 1])
+        queryset = TestRun.objects.filter(organization=self.organization).filter(period.q('created_at', TestRun))
+        legacy = TestRun.objects.filter(
+            organization=self.organization, created_at__year__in=[2023, 2024], created_at__month__in=[12, 1],
+        )
+        # Several years of history for this and another organization, so
+        # only the composite index narrows the scan to the selected months
+        with schema_context(get_public_schema_name()):
+            other = Organization(name='Other Org', code='PERIODS_OTHER', schema_name='periods_other')
+            other.auto_create_schema = False
+            other.save()
+        edges = list(TestRun.objects.values_list('pk', flat=True))
+        for organization in (self.organization, other):
+            model = ModelAsset.objects.bulk_create([
+                ModelAsset(organization=organization, name='history', model_type='tabular', uri='s3://h'),
+            ])[0]
+            TestRun.objects.bulk_create([TestRun(organization=organization, model_asset=model) for _ in range(3000)])
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "UPDATE ai_governance_testrun SET created_at = '2018-01-01'::timestamptz + (id %% 2900) * interval '1 day' "
+                "WHERE NOT (id = ANY(%s))",
+                [edges],
+            )
+            cursor.execute('ANALYZE ai_governance_testrun')
+        plan = queryset.explain()
+        index_conditions = [line for line in plan.splitlines() if 'Index Cond' in line]
+        legacy_conditions = [line for line in legacy.explain().splitlines() if 'Index Cond' in line]
+
+        index_name = next(
+            index.name for index in TestRun._meta.indexes if index.fields == ['organization', 'created_at']
+        )
+        self.assertIn(index_name, plan)
+        self.assertEqual(len(index_conditions), 3)
+        self.assertTrue(all('organization_id' in line and 'created_at' in line for line in index_conditions))
+        # EXTRACT() predicates can only ever narrow by organization
+        self.assertFalse(any('created_at' in line for line in legacy_conditions))
@@ -0,0 +1,170 @@
+# apps/core/tests/test_virus_scan.py
+
+import os
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.core.files.base import ContentFile
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import SimpleTestCase, override_settings
+from django_tenants.test.cases import TenantTestCase
+
+from core.clamd_stub import EICAR, StubClamd
+from core.models.validators import validate_file_virus
+from core.virus_scan import SIGNATURE_VERSION_KEY, ClamdClient, ScanError, get_clamd_client, virus_scanner
+from document_management.models import Document, DocumentRequest
+from document_management.tasks import scan_pending_documents
+
+User = get_user_model()
+
+REPORT = b'%PDF-1.7\n' + b'Quarterly access review\n' * 4000
+
+
+class StubClamdTestMixin:
+    def start_clamd(self, **kwargs):
+        clamd = StubClamd(**kwargs).start()
+        self.addCleanup(clamd.stop)
+        settings_override = override_settings(ENABLE_VIRUS_SCANNING=True, **clamd.settings())
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        self.addCleanup(lambda: get_clamd_client().close())
+        return clamd
+
+
+class ClamdClientTests(StubClamdTestMixin, SimpleTestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_sessions_are_reused_and_replaced_when_dropped(self):
+        clamd = self.start_clamd()
+        client = get_clamd_client()
+
+        for n in range(5):
+            self.assertIsNone(client.scan_stream(ContentFile(REPORT + str(n).encode())))
+        self.assertEqual(client.signature_version(), '27391')
+        self.assertEqual((clamd.scans, clamd.connections), (5, 1))
+
+        # clamd closed the idle session: the scan is retried on a new one
+        clamd.drop_connections()
+        self.assertEqual(client.scan_stream(ContentFile(b'x' + EICAR)), 'Eicar-Test-Signature')
+        self.assertEqual((clamd.scans, clamd.connections), (6, 2))
+
+    def test_session_is_closed_when_the_file_changes_mid_scan(self):
+        clamd = self.start_clamd()
+        client = get_clamd_client()
+        self.assertIsNone(client.scan_stream(ContentFile(REPORT)))
+        session = client._idle[0]
+
+        path = os.path.join(tempfile.mkdtemp(), 'report.pdf')
+        self.addCleanup(shutil.rmtree, os.path.dirname(path))
+        with open(path, 'wb') as f:
+            f.write(REPORT)
+        changed = ScanError('File changed while it was being scanned')
+        with mock.patch.object(client, '_send_file', side_effect=changed):
+            with self.assertRaises(ScanError):
+                client.scan_path(path)
+        self.assertEqual(session.sock.fileno(), -1)
+        self.assertFalse(client._idle)
+
+        self.assertIsNone(client.scan_path(path))
+        self.assertEqual(clamd.connections, 2)
+
+    def test_uploads_are_not_rescanned_until_the_signatures_change(self):
+        clamd = self.start_clamd()
+        infected = SimpleUploadedFile('invoice.pdf', b'%PDF-1.7\n' + EICAR)
+
+        for _ in range(3):
+            validate_file_virus(SimpleUploadedFile('report.pdf', REPORT))
+            with self.assertRaises(ValidationError):
+                validate_file_virus(infected)
+        self.assertEqual(clamd.scans, 2)
+
+        clamd.version = 'ClamAV 1.3.1/27392/Stub'
+        with override_settings(CLAMD_VERSION_TTL=0):
+            validate_file_virus(SimpleUploadedFile('report.pdf', REPORT))
+        self.assertEqual(clamd.scans, 3)
+
+
+class BulkScanTests(StubClamdTestMixin, TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Virus Scan Org'
+        tenant.code = 'SCANS'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        cache.clear()
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        virus_scanner.reset_stats()
+
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            user = User.objects.create_user(
+                username='scans', email='scans@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='admin',
+            )
+        self.doc_request = DocumentRequest.objects.create(
+            organization=self.tenant, request_name='Evidence', due_date=date(2030, 1, 1),
+            request_owner=user, requestee_identifier='IT',
+        )
+
+    @mock.patch('document_management.tasks.scan_document.delay')
+    def test_pending_documents_are_scanned_concurrently_once_per_content(self, delay):
+        contents = [REPORT + str(n).encode() for n in range(6)] + [REPORT + b'0', b'%PDF-1.7\n' + EICAR]
+        documents = [
+            Document.objects.create(
+                organization=self.tenant, document_request=self.doc_request,
+                file=ContentFile(content, name=f'evidence-{n}.pdf'),
+            )
+            for n, content in enumerate(contents)
+        ]
+        clamd = self.start_clamd(delay=0.05)
+
+        self.assertEqual(scan_pending_documents(self.tenant.pk), {Document.SCAN_CLEAN: 7, Document.SCAN_INFECTED: 1})
+        self.assertEqual(clamd.scans, 7)
+        self.assertGreater(clamd.peak_in_flight, 1)
+        self.assertLessEqual(clamd.connections, 5)  # the pool, plus one for VERSION
+        self.assertEqual(Document.objects.get(pk=documents[-1].pk).scan_result, 'Eicar-Test-Signature')
+
+        stats = virus_scanner.stats()
+        self.assertEqual((stats['scans'], stats['batch_duplicates']), (7, 1))
+
+        # Already scanned content is answered from the blob store / cache
+        Document.objects.update(scan_status=Document.SCAN_PENDING)
+        scan_pending_documents(self.tenant.pk)
+        self.assertEqual(clamd.scans, 7)
+        self.assertEqual(virus_scanner.stats()['avoided'], 9)
+
+    @mock.patch('document_management.tasks.scan_document.delay')
+    def test_saving_a_document_reuses_verdicts_without_asking_clamd(self, delay):
+        clamd = self.start_clamd()
+        Document.objects.create(
+            organization=self.tenant, document_request=self.doc_request, file=ContentFile(REPORT, name='first.pdf'),
+        )
+        scan_pending_documents(self.tenant.pk)
+
+        with mock.patch.object(ClamdClient, 'version', side_effect=AssertionError('clamd asked while saving')):
+            again = Document.objects.create(
+                organization=self.tenant, document_request=self.doc_request, file=ContentFile(REPORT, name='again.pdf'),
+            )
+            self.assertEqual(again.scan_status, Document.SCAN_CLEAN)
+
+            # Without a recently published signature version the scan task decides
+            cache.delete(SIGNATURE_VERSION_KEY)
+            with self.captureOnCommitCallbacks(execute=True):
+                later = Document.objects.create(
+                    organization=self.tenant, document_request=self.doc_request,
+                    file=ContentFile(REPORT, name='later.pdf'),
+                )
+        self.assertEqual(later.scan_status, Document.SCAN_PENDING)
+        delay.assert_called_with(later.pk, self.tenant.pk)
+        self.assertEqual(clamd.scans, 1)
@@ -0,0 +1,500 @@
+# apps/core/virus_scan.py
+
+"""
+Virus scanning through clamd's INSTREAM protocol.
+
+Files are streamed to clamd straight from where they already are: a path is
+sent with ``socket.sendfile`` (no copy through Python), an upload is read
+from its buffer in ``CLAMD_CHUNK_SIZE`` chunks. Nothing is written to a
+temporary file first, so clamd does not need access to the application's
+filesystem.
+
+- ``ClamdClient`` keeps a per-process pool of up to ``CLAMD_POOL_SIZE``
+  ``IDSESSION`` connections, so consecutive scans do not reconnect; a pooled
+  connection clamd has meanwhile closed is replaced and the scan retried
+- ``VirusScanner`` remembers verdicts by SHA-256 and signature database
+  version (in the cache, and on the tenant's ``Blob``), so content is
+  scanned again only after a signature update; ``scan_many`` scans a batch
+  concurrently, each distinct content once
+- the signature version last read from clamd is shared in the cache for
+  ``CLAMD_VERSION_TTL`` seconds, so ``known_verdict`` (run on save) never
+  waits on clamd
+- scans, scans avoided, bytes scanned, scan time and connections opened are
+  counted in the cache and reported by ``virus_scan_stats``
+
+Connection settings: ``CLAMD_SOCKET`` (a unix socket path) or
+``CLAMD_HOST``/``CLAMD_PORT`` (default ``127.0.0.1:3310``), and
+``CLAMD_TIMEOUT`` seconds per operation.
+"""
+
+import hashlib
+import logging
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import NamedTuple, Optional
+
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+END_OF_STREAM = struct.pack('>I', 0)
+KEY_PREFIX = 'virus_scan'
+STAT_FIELDS = ('scans', 'bytes_scanned', 'scan_us', 'cache_hits', 'blob_hits', 'batch_duplicates', 'connections')
+READ_SIZE = 1024 * 1024
+SIGNATURE_VERSION_KEY = f'{KEY_PREFIX}:signature_version'
+
+
+class ScannerUnavailable(Exception):
+    """clamd could not be reached"""
+
+
+class ScanError(Exception):
+    """clamd was reached but did not return a verdict"""
+
+
+def _stat_key(field):
+    return f'{KEY_PREFIX}:stats:{field}'
+
+
+def _count(field, delta=1):
+    key = _stat_key(field)
+    try:
+        cache.incr(key, delta)
+    except ValueError:
+        if not cache.add(key, delta, None):
+            cache.incr(key, delta)
+
+
+class ClamdSession:
+    """One ``IDSESSION`` connection; used by one thread at a time."""
+
+    def __init__(self, sock):
+        self.sock = sock
+        self.next_id = 1
+        self.last_used = time.monotonic()
+
+    def request(self, send):
+        """Run one command (``send`` writes it) and return clamd's reply"""
+        request_id = self.next_id
+        self.next_id += 1
+        send(self.sock)
+        reply = _read_reply(self.sock)
+        self.last_used = time.monotonic()
+        prefix = f'{request_id}: '
+        if not reply.startswith(prefix):
+            raise ConnectionError(f'unexpected reply in clamd session: {reply[:100]!r}')
+        return reply[len(prefix):]
+
+    def close(self):
+        try:
+            self.sock.sendall(b'zEND\0')
+        except OSError:
+            pass
+        self.sock.close()
+
+
+def _read_reply(sock):
+    data = b''
+    while not data.endswith(b'\0'):
+        chunk = sock.recv(4096)
+        if not chunk:
+            if not data:
+                raise ConnectionError('clamd closed the connection')
+            break
+        data += chunk
+    return data.rstrip(b'\0').decode('utf-8', 'replace').strip()
+
+
+class ClamdClient:
+    """
+    Pooled clamd client. Up to ``pool_size`` commands run at once; idle
+    sessions are reused until ``idle_timeout`` (keep it below clamd's
+    ``IdleTimeout``, 30s by default).
+    """
+
+    def __init__(self, socket_path=None, host=None, port=None, timeout=None, chunk_size=None,
+                 pool_size=None, idle_timeout=None):
+        self.socket_path = socket_path if socket_path is not None else getattr(settings, 'CLAMD_SOCKET', None)
+        self.host = host or getattr(settings, 'CLAMD_HOST', '127.0.0.1')
+        self.port = port or getattr(settings, 'CLAMD_PORT', 3310)
+        self.timeout = timeout or getattr(settings, 'CLAMD_TIMEOUT', 30)
+        self.chunk_size = chunk_size or getattr(settings, 'CLAMD_CHUNK_SIZE', 1024 * 1024)
+        self.pool_size = pool_size or getattr(settings, 'CLAMD_POOL_SIZE', 4)
+        self.idle_timeout = idle_timeout or getattr(settings, 'CLAMD_IDLE_TIMEOUT', 20)
+        self._slots = threading.BoundedSemaphore(self.pool_size)
+        self._idle = deque()
+        self._lock = threading.Lock()
+        self._version = (None, 0.0)
+
+    def connect(self):
+        try:
+            if self.socket_path:
+                sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+                sock.settimeout(self.timeout)
+                sock.connect(self.socket_path)
+            else:
+                sock = socket.create_connection((self.host, self.port), timeout=self.timeout)
+        except OSError as e:
+            raise ScannerUnavailable(f'clamd unreachable: {e}') from e
+        _count('connections')
+        return sock
+
+    def close(self):
+        """Close the idle sessions; sessions in use are closed when returned"""
+        with self._lock:
+            sessions, self._idle = list(self._idle), deque()
+        for session in sessions:
+            session.close()
+
+    def ping(self):
+        return self._command(b'zPING\0') == 'PONG'
+
+    def version(self):
+        """e.g. ``ClamAV 1.3.1/27391/Mon Aug 26 08:35:32 2024`` (engine/signature DB version/date)"""
+        return self._command(b'zVERSION\0')
+
+    def signature_version(self):
+        """Signature database version (``27391`` above), asked for at most every ``CLAMD_VERSION_TTL`` seconds"""
+        version, fetched = self._version
+        if version is None or time.monotonic() - fetched > getattr(settings, 'CLAMD_VERSION_TTL', 300):
+            parts = self.version().split('/')
+            version = parts[1] if len(parts) > 1 else parts[0]
+            self._version = (version, time.monotonic())
+            cache.set(SIGNATURE_VERSION_KEY, version, getattr(settings, 'CLAMD_VERSION_TTL', 300))
+        return version
+
+    def scan_path(self, path):
+        """Signature name if the file at ``path`` is infected, else None"""
+        with open(path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            return self._instream(lambda sock: self._send_file(sock, f, size))
+
+    def scan_stream(self, fileobj):
+        """Like ``scan_path`` for an open file-like object, read from its current position"""
+        try:
+            start = fileobj.tell()
+        except (AttributeError, OSError):
+            start = None
+
+        def send(sock):
+            if start is not None:
+                fileobj.seek(start)
+            self._send_chunks(sock, fileobj)
+        return self._instream(send, retryable=start is not None)
+
+    def _send_file(self, sock, f, size):
+        offset = 0
+        while offset < size:
+            count = min(self.chunk_size, size - offset)
+            sock.sendall(struct.pack('>I', count))
+            sent = sock.sendfile(f, offset, count)
+            if sent != count:
+                raise ScanError('File changed while it was being scanned')
+            offset += count
+
+    def _send_chunks(self, sock, fileobj):
+        while chunk := fileobj.read(self.chunk_size):
+            sock.sendall(struct.pack('>I', len(chunk)))
+            sock.sendall(chunk)
+
+    def _instream(self, send, retryable=True):
+        def command(sock):
+            sock.sendall(b'zINSTREAM\0')
+            send(sock)
+            sock.sendall(END_OF_STREAM)
+        reply = self._request(command, retryable)
+        # "stream: OK", "stream: <signature> FOUND" or "<message> ERROR"
+        if reply.endswith('FOUND'):
+            return reply.split(':', 1)[-1][:-len('FOUND')].strip()
+        if reply.endswith('OK'):
+            return None
+        raise ScanError(f'clamd error: {reply}')
+
+    def _command(self, command):
+        return self._request(lambda sock: sock.sendall(command))
+
+    def _request(self, send, retryable=True):
+        with self._slots:
+            session, reused = self._checkout()
+            try:
+                reply = session.request(send)
+            except (OSError, ConnectionError) as e:
+                session.sock.close()
+                if not (reused and retryable):
+                    raise ScanError(f'clamd connection failed: {e}') from e
+                # clamd dropped the pooled session (idle timeout, restart); once more on a new one
+                session = self._open_session()
+                try:
+                    reply = session.request(send)
+                except (OSError, ConnectionError) as e:
+                    session.sock.close()
+                    raise ScanError(f'clamd connection failed: {e}') from e
+                except BaseException:
+                    session.sock.close()
+                    raise
+            except BaseException:
+                # e.g. the file changed mid-stream: the session is stuck inside a command
+                session.sock.close()
+                raise
+            if reply.endswith('ERROR'):
+                # clamd ends the session after an error (e.g. StreamMaxLength exceeded)
+                session.sock.close()
+            else:
+                with self._lock:
+                    self._idle.append(session)
+            return reply
+
+    def _checkout(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._idle:
+                session = self._idle.pop()
+                if now - session.last_used < self.idle_timeout:
+                    return session, True
+                session.sock.close()
+        return self._open_session(), False
+
+    def _open_session(self):
+        sock = self.connect()
+        try:
+            sock.sendall(b'zIDSESSION\0')
+        except OSError as e:
+            sock.close()
+            raise ScannerUnavailable(f'clamd unreachable: {e}') from e
+        return ClamdSession(sock)
+
+
+_clients = {}
+_clients_lock = threading.Lock()
+
+
+def get_clamd_client():
+    """The calling process's pooled client for the current settings"""
+    key = (
+        os.getpid(),
+        getattr(settings, 'CLAMD_SOCKET', None), getattr(settings, 'CLAMD_HOST', '127.0.0.1'),
+        getattr(settings, 'CLAMD_PORT', 3310), getattr(settings, 'CLAMD_POOL_SIZE', 4),
+    )
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            # Settings changed, or this is a forked worker: the old pools are never used again
+            for stale in list(_clients):
+                stale_client = _clients.pop(stale)
+                if stale[0] == key[0]:
+                    stale_client.close()
+            client = _clients[key] = ClamdClient()
+        return client
+
+
+class ScanVerdict(NamedTuple):
+    sha256: str
+    signature: Optional[str]
+    signature_version: str
+    source: str  # 'scan', 'cache', 'blob' or 'batch' (same content earlier in a scan_many batch)
+
+    @property
+    def infected(self):
+        return bool(self.signature)
+
+    @property
+    def cached(self):
+        return self.source != 'scan'
+
+
+def _digest_stream(fileobj):
+    hasher = hashlib.sha256()
+    for chunk in fileobj.chunks(READ_SIZE) if hasattr(fileobj, 'chunks') else iter(lambda: fileobj.read(READ_SIZE), b''):
+        hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _verdict_key(signature_version, sha256):
+    return f'{KEY_PREFIX}:verdict:{signature_version}:{sha256}'
+
+
+class VirusScanner:
+    """
+    clamd scans with verdicts remembered per content hash and signature
+    database version. Database lookups stay in the calling thread (tenant
+    schema); only clamd I/O runs in ``scan_many``'s threads.
+    """
+
+    def __init__(self, client_factory=get_clamd_client):
+        self.client_factory = client_factory
+
+    @staticmethod
+    def enabled():
+        return getattr(settings, 'ENABLE_VIRUS_SCANNING', False)
+
+    def signature_version(self):
+        return self.client_factory().signature_version()
+
+    def lookup(self, sha256, name=None, signature_version=None):
+        """Remembered verdict for the content, or None; ``name`` also checks the stored blob"""
+        from core.blobstore import blob_store
+
+        version = signature_version or self.signature_version()
+        signature = cache.get(_verdict_key(version, sha256))
+        if signature is not None:
+            _count('cache_hits')
+            return ScanVerdict(sha256, signature or None, version, 'cache')
+        stored = blob_store.verdict(name, version) if name else None
+        if stored is not None:
+            _count('blob_hits')
+            signature = stored[1] if stored[0] == 'infected' else ''
+            self._cache(version, sha256, signature)
+            return ScanVerdict(sha256, signature or None, version, 'blob')
+        return None
+
+    def known_verdict(self, field_file):
+        """
+        Verdict for stored content without hashing or scanning it, or None
+        (unknown content, scanning disabled or no recent scan). Called while
+        saving, so clamd is not asked: the signature version is the one the
+        scan workers last published.
+        """
+        from core.blobstore import blob_store
+
+        if not self.enabled() or not field_file:
+            return None
+        version = cache.get(SIGNATURE_VERSION_KEY)
+        if version is None:
+            return None
+        blob = blob_store.blob_for(field_file.name)
+        if blob is None:
+            return None
+        return self.lookup(blob.sha256, field_file.name, version)
+
+    def scan_upload(self, fileobj):
+        """Verdict for an upload, streamed to clamd from its own buffer (memory or temp file)"""
+        fileobj.seek(0)
+        sha256 = _digest_stream(fileobj)
+        verdict = self.lookup(sha256)
+        if verdict is None:
+            fileobj.seek(0)
+            size = getattr(fileobj, 'size', None) or 0
+            signature = self._timed(lambda client: client.scan_stream(fileobj), size)
+            verdict = self._remember(sha256, signature, self.signature_version())
+        fileobj.seek(0)
+        return verdict
+
+    def scan_file(self, field_file, sha256=None):
+        """Verdict for a stored file (``FieldFile``); pass ``sha256`` when it is known"""
+        sha256 = sha256 or self._sha256_for(field_file)
+        version = self.signature_version()
+        verdict = self.lookup(sha256, field_file.name, version)
+        if verdict is None:
+            signature = self._timed(lambda client: self._scan_stored(client, field_file), field_file.size)
+            verdict = self._remember(sha256, signature, version, [field_file.name])
+        return verdict
+
+    def scan_many(self, field_files, workers=None):
+        """
+        Verdicts for stored files, in order; an exception instead of a
+        verdict where that file could not be scanned. Each distinct content
+        not scanned before is sent to clamd once, up to ``workers`` (default
+        ``CLAMD_POOL_SIZE``) at a time.
+        """
+        field_files = list(field_files)
+        version = self.signature_version()
+        results = [None] * len(field_files)
+        pending = {}
+        for index, field_file in enumerate(field_files):
+            try:
+                sha256 = self._sha256_for(field_file)
+            except OSError as e:
+                results[index] = e
+                continue
+            verdict = self.lookup(sha256, field_file.name, version)
+            if verdict is not None:
+                results[index] = verdict
+            else:
+                pending.setdefault(sha256, []).append(index)
+
+        workers = workers or getattr(settings, 'CLAMD_POOL_SIZE', 4)
+        with ThreadPoolExecutor(max_workers=max(1, min(workers, len(pending) or 1))) as executor:
+            futures = {
+                sha256: executor.submit(
+                    self._timed, lambda client, f=field_files[indexes[0]]: self._scan_stored(client, f),
+                    field_files[indexes[0]].size,
+                )
+                for sha256, indexes in pending.items()
+            }
+        for sha256, future in futures.items():
+            indexes = pending[sha256]
+            try:
+                signature = future.result()
+            except Exception as e:
+                for index in indexes:
+                    results[index] = e
+                continue
+            verdict = self._remember(sha256, signature, version, [field_files[i].name for i in indexes])
+            results[indexes[0]] = verdict
+            for index in indexes[1:]:
+                results[index] = verdict._replace(source='batch')
+            if len(indexes) > 1:
+                _count('batch_duplicates', len(indexes) - 1)
+        return results
+
+    @staticmethod
+    def _sha256_for(field_file):
+        from core.blobstore import blob_store
+
+        blob = blob_store.blob_for(field_file.name)
+        if blob is not None:
+            return blob.sha256
+        with field_file.open('rb') as f:
+            return _digest_stream(f)
+
+    @staticmethod
+    def _scan_stored(client, field_file):
+        try:
+            path = field_file.path
+        except NotImplementedError:
+            with field_file.storage.open(field_file.name, 'rb') as f:
+                return client.scan_stream(f)
+        return client.scan_path(path)
+
+    def _timed(self, scan, size):
+        started = time.monotonic()
+        signature = scan(self.client_factory())
+        _count('scans')
+        _count('bytes_scanned', size or 0)
+        _count('scan_us', int((time.monotonic() - started) * 1_000_000))
+        return signature
+
+    def _remember(self, sha256, signature, version, names=()):
+        from core.blobstore import blob_store
+
+        self._cache(version, sha256, signature or '')
+        for name in names:
+            blob_store.record_verdict(name, 'infected' if signature else 'clean', signature or '', version)
+        return ScanVerdict(sha256, signature, version, 'scan')
+
+    @staticmethod
+    def _cache(version, sha256, signature):
+        cache.set(_verdict_key(version, sha256), signature, getattr(settings, 'VIRUS_SCAN_VERDICT_TIMEOUT', 7 * 24 * 3600))
+
+    # Metrics -----------------------------------------------------------------
+
+    def stats(self):
+        found = cache.get_many([_stat_key(field) for field in STAT_FIELDS])
+        stats = {field: found.get(_stat_key(field), 0) for field in STAT_FIELDS}
+        stats['avoided'] = stats['cache_hits'] + stats['blob_hits'] + stats['batch_duplicates']
+        requested = stats['scans'] + stats['avoided']
+        stats['avoided_rate'] = stats['avoided'] / requested if requested else 0.0
+        stats['avg_scan_ms'] = stats['scan_us'] / stats['scans'] / 1000 if stats['scans'] else 0.0
+        return stats
+
+    def reset_stats(self):
+        cache.delete_many([_stat_key(field) for field in STAT_FIELDS])
+
+
+virus_scanner = VirusScanner()
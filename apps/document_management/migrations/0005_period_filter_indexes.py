@@ -0,0 +1,24 @@
+# Generated by Django 5.1.14 on 2026-10-18 21:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_management', '0004_alter_document_file_alter_documentrequest_file'),
+        ('organizations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='document',
+            index=models.Index(fields=['organization', 'uploaded_at'], name='document_ma_organiz_e0535d_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='documentrequest',
+            index=models.Index(fields=['organization', 'created_at'], name='document_ma_organiz_4d10ba_idx'),
+        ),
+    ]
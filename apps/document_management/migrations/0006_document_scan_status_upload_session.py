@@ -0,0 +1,69 @@
+# Generated by Django 5.1.14 on 2026-10-18 22:37
+
+import django.db.models.deletion
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('document_management', '0005_period_filter_indexes'),
+        ('organizations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='document',
+            name='scan_result',
+            field=models.CharField(blank=True, editable=False, max_length=255, verbose_name='Scan Result'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='scan_status',
+            field=models.CharField(choices=[('pending', 'Pending Scan'), ('clean', 'Clean'), ('infected', 'Infected'), ('failed', 'Scan Failed'), ('skipped', 'Not Scanned')], db_index=True, default='skipped', editable=False, max_length=10, verbose_name='Scan Status'),
+        ),
+        # Documents uploaded before scanning existed stay downloadable
+        migrations.AlterField(
+            model_name='document',
+            name='scan_status',
+            field=models.CharField(choices=[('pending', 'Pending Scan'), ('clean', 'Clean'), ('infected', 'Infected'), ('failed', 'Scan Failed'), ('skipped', 'Not Scanned')], db_index=True, default='pending', editable=False, max_length=10, verbose_name='Scan Status'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='scanned_at',
+            field=models.DateTimeField(blank=True, editable=False, null=True, verbose_name='Scanned At'),
+        ),
+        migrations.AddField(
+            model_name='document',
+            name='sha256',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=64, verbose_name='SHA-256'),
+        ),
+        migrations.CreateModel(
+            name='UploadSession',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True, db_index=True, help_text='Timestamp when the record was first created', verbose_name='created at')),
+                ('updated_at', models.DateTimeField(auto_now=True, db_index=True, help_text='Timestamp when the record was last updated', verbose_name='updated at')),
+                ('key', models.UUIDField(default=uuid.uuid4, editable=False, unique=True)),
+                ('is_public', models.BooleanField(default=False, verbose_name='Uploaded Through Request Link')),
+                ('filename', models.CharField(max_length=255, verbose_name='File Name')),
+                ('length', models.PositiveBigIntegerField(verbose_name='Length')),
+                ('offset', models.PositiveBigIntegerField(default=0, verbose_name='Offset')),
+                ('sha256', models.CharField(blank=True, max_length=64, verbose_name='SHA-256')),
+                ('expires_at', models.DateTimeField(verbose_name='Expires At')),
+                ('document', models.OneToOneField(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_session', to='document_management.document', verbose_name='Document')),
+                ('document_request', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='upload_sessions', to='document_management.documentrequest', verbose_name='Document Request')),
+                ('organization', models.ForeignKey(help_text='Organization that owns this record', on_delete=django.db.models.deletion.CASCADE, related_name='%(class)s_set', to='organizations.organization', verbose_name='organization')),
+                ('uploaded_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='upload_sessions', to=settings.AUTH_USER_MODEL, verbose_name='Uploaded By')),
+            ],
+            options={
+                'verbose_name': 'Upload Session',
+                'verbose_name_plural': 'Upload Sessions',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['organization', 'created_at'], name='document_ma_organiz_3becd0_idx'), models.Index(fields=['expires_at'], name='document_ma_expires_572f3d_idx')],
+            },
+        ),
+    ]
@@ -8,6 +8,7 @@ from django.contrib.auth import get_user_model
 from organizations.models import Organization
 from core.models.abstract_models import TimeStampedModel, OrganizationOwnedModel, AuditableModel
 from core.models.validators import file_upload_validators
+from core.blobstore import get_blob_storage
 import secrets
 from datetime import timedelta
 import uuid
@@ -72,6 +73,7 @@ class DocumentRequest(OrganizationOwnedModel, AuditableModel):
         ordering = ['-date_of_request', 'request_name']
         indexes = [
             models.Index(fields=['organization']),
+            models.Index(fields=['organization', 'created_at']),
             models.Index(fields=['request_name']),
             models.Index(fields=['status']),
             models.Index(fields=['due_date']),
@@ -140,6 +142,19 @@ class DocumentRequest(OrganizationOwnedModel, AuditableModel):
 
 class Document(OrganizationOwnedModel, AuditableModel):
     """Model for documents."""
+    SCAN_PENDING = 'pending'
+    SCAN_CLEAN = 'clean'
+    SCAN_INFECTED = 'infected'
+    SCAN_FAILED = 'failed'
+    SCAN_SKIPPED = 'skipped'
+    SCAN_STATUS_CHOICES = [
+        (SCAN_PENDING, 'Pending Scan'),
+        (SCAN_CLEAN, 'Clean'),
+        (SCAN_INFECTED, 'Infected'),
+        (SCAN_FAILED, 'Scan Failed'),
+        (SCAN_SKIPPED, 'Not Scanned'),
+    ]
+
     document_request = models.ForeignKey(
         DocumentRequest,
         related_name='documents',
@@ -148,6 +163,7 @@ class Document(OrganizationOwnedModel, AuditableModel):
     )
     file = models.FileField(
         upload_to='media/', 
+        storage=get_blob_storage,
         validators=file_upload_validators(),
         verbose_name="File"
     )
@@ -160,6 +176,18 @@ class Document(OrganizationOwnedModel, AuditableModel):
         blank=True,
         verbose_name="Uploaded By"
     )
+    # Files are quarantined (not downloadable) until the virus scan clears them
+    scan_status = models.CharField(
+        max_length=10,
+        choices=SCAN_STATUS_CHOICES,
+        default=SCAN_PENDING,
+        db_index=True,
+        editable=False,
+        verbose_name="Scan Status"
+    )
+    scan_result = models.CharField(max_length=255, blank=True, editable=False, verbose_name="Scan Result")
+    scanned_at = models.DateTimeField(null=True, blank=True, editable=False, verbose_name="Scanned At")
+    sha256 = models.CharField(max_length=64, blank=True, db_index=True, editable=False, verbose_name="SHA-256")
     
     class Meta:
         verbose_name = "Document"
@@ -167,6 +195,7 @@ class Document(OrganizationOwnedModel, AuditableModel):
         ordering = ['-uploaded_at']
         indexes = [
             models.Index(fields=['organization']),
+            models.Index(fields=['organization', 'uploaded_at']),
             models.Index(fields=['document_request']),
             models.Index(fields=['uploaded_by']),
         ]
@@ -180,7 +209,68 @@ class Document(OrganizationOwnedModel, AuditableModel):
 
     def __str__(self):
         return f'Document for {self.document_request.request_name}'
+
+    @property
+    def is_available(self):
+        """Whether the file may be downloaded (not waiting for or failing a virus scan)."""
+        return self.scan_status in (self.SCAN_CLEAN, self.SCAN_SKIPPED)
     
     def get_absolute_url(self):
         """Return the URL to access a particular document instance."""
         return reverse('document_detail', args=[str(self.id)])
+
+
+
+class UploadSession(OrganizationOwnedModel):
+    """
+    Resumable (tus) upload of a document. The bytes live in a partial file
+    until ``offset`` reaches ``length``; the file is then moved into storage
+    as a ``Document``.
+    """
+    # Unguessable id used in upload URLs
+    key = models.UUIDField(default=uuid.uuid4, unique=True, editable=False)
+    document_request = models.ForeignKey(
+        DocumentRequest,
+        related_name='upload_sessions',
+        on_delete=models.CASCADE,
+        verbose_name="Document Request"
+    )
+    uploaded_by = models.ForeignKey(
+        get_user_model(),
+        related_name='upload_sessions',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Uploaded By"
+    )
+    is_public = models.BooleanField(default=False, verbose_name="Uploaded Through Request Link")
+    filename = models.CharField(max_length=255, verbose_name="File Name")
+    length = models.PositiveBigIntegerField(verbose_name="Length")
+    offset = models.PositiveBigIntegerField(default=0, verbose_name="Offset")
+    sha256 = models.CharField(max_length=64, blank=True, verbose_name="SHA-256")
+    document = models.OneToOneField(
+        Document,
+        related_name='upload_session',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        verbose_name="Document"
+    )
+    expires_at = models.DateTimeField(verbose_name="Expires At")
+
+    class Meta:
+        verbose_name = "Upload Session"
+        verbose_name_plural = "Upload Sessions"
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['organization', 'created_at']),
+            models.Index(fields=['expires_at']),
+        ]
+        app_label = "document_management"
+
+    def __str__(self):
+        return f'Upload of {self.filename} ({self.offset}/{self.length} bytes)'
+
+    @property
+    def is_complete(self):
+        return self.offset >= self.length
@@ -15,6 +15,7 @@ class DocumentSerializer(serializers.ModelSerializer):
     class Meta:
         model = Document
         fields = [
-            'id', 'document_request', 'file', 'uploaded_at', 'uploaded_by', 'organization'
+            'id', 'document_request', 'file', 'uploaded_at', 'uploaded_by', 'organization',
+            'scan_status', 'scan_result', 'sha256'
         ]
-        read_only_fields = ('uploaded_at', 'organization') 
\ No newline at end of file
+        read_only_fields = ('uploaded_at', 'organization', 'scan_status', 'scan_result', 'sha256') 
\ No newline at end of file
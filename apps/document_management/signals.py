@@ -1,6 +1,12 @@
 from django.db.models.signals import post_save, post_delete
+from django.db import transaction
 from django.dispatch import receiver
+from django.utils import timezone
+from core.virus_scan import virus_scanner
 from .models import DocumentRequest, Document
+import logging
+
+logger = logging.getLogger(__name__)
 
 @receiver(post_save, sender=DocumentRequest)
 def log_documentrequest_save(sender, instance, created, **kwargs):
@@ -22,4 +28,31 @@ def log_document_save(sender, instance, created, **kwargs):
 
 @receiver(post_delete, sender=Document)
 def log_document_delete(sender, instance, **kwargs):
-    print(f"[Audit] Document deleted: {instance}") 
\ No newline at end of file
+    print(f"[Audit] Document deleted: {instance}") 
+
+@receiver(post_save, sender=Document)
+def queue_document_scan(sender, instance, created, **kwargs):
+    """New documents are quarantined until the virus scan (after commit) clears them."""
+    if not created or instance.scan_status != Document.SCAN_PENDING:
+        return
+
+    # Content already stored (and scanned) for this tenant keeps its verdict
+    verdict = virus_scanner.known_verdict(instance.file)
+    if verdict is not None:
+        instance.scan_status = Document.SCAN_INFECTED if verdict.infected else Document.SCAN_CLEAN
+        instance.scan_result = verdict.signature or ''
+        instance.sha256 = verdict.sha256
+        Document.objects.filter(pk=instance.pk).update(
+            scan_status=instance.scan_status, scan_result=instance.scan_result, sha256=instance.sha256,
+            scanned_at=timezone.now(),
+        )
+        return
+
+    def queue():
+        try:
+            from .tasks import scan_document
+            scan_document.delay(instance.pk, instance.organization_id)
+        except Exception as e:
+            logger.error(f"Failed to queue virus scan for document {instance.pk}: {e}")
+
+    transaction.on_commit(queue)
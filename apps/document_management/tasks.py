@@ -0,0 +1,135 @@
+# apps/document_management/tasks.py
+
+from celery import shared_task
+from django.conf import settings
+from django.utils import timezone
+from django_tenants.utils import tenant_context
+import hashlib
+import logging
+
+from core.blobstore import blob_store
+from core.virus_scan import ScannerUnavailable, virus_scanner
+
+logger = logging.getLogger(__name__)
+
+
+@shared_task(bind=True, max_retries=5, default_retry_delay=60)
+def scan_document(self, document_id, organization_id):
+    """
+    Virus-scan an uploaded document and release it from quarantine.
+
+    Documents stay ``pending`` (not downloadable) until clamd reports them
+    clean. An unreachable scanner is retried; once retries run out the
+    document is released unscanned, or marked failed when
+    ``FAIL_IF_SCANNER_UNAVAILABLE`` is set.
+    """
+    from organizations.models import Organization
+    from .models import Document
+
+    organization = Organization.objects.filter(pk=organization_id).first()
+    if organization is None:
+        logger.error(f"Cannot scan document {document_id}: organization {organization_id} not found")
+        return None
+
+    with tenant_context(organization):
+        document = Document.objects.filter(pk=document_id, organization=organization).first()
+        if document is None or document.scan_status != Document.SCAN_PENDING:
+            return None
+
+        if not virus_scanner.enabled():
+            if not document.sha256:
+                blob = blob_store.blob_for(document.file.name)
+                document.sha256 = blob.sha256 if blob else file_sha256(document.file)
+            return _record_verdict(document, Document.SCAN_SKIPPED, 'Virus scanning disabled')
+
+        try:
+            verdict = virus_scanner.scan_file(document.file, sha256=document.sha256 or None)
+        except ScannerUnavailable as e:
+            if self.request.retries < self.max_retries:
+                raise self.retry(exc=e)
+            logger.error(f"Virus scanner unavailable, giving up on document {document_id}: {e}")
+            status = Document.SCAN_FAILED if getattr(settings, 'FAIL_IF_SCANNER_UNAVAILABLE', False) else Document.SCAN_SKIPPED
+            return _record_verdict(document, status, 'Scanner unavailable')
+        except Exception as e:
+            if self.request.retries < self.max_retries:
+                raise self.retry(exc=e)
+            logger.error(f"Virus scan of document {document_id} failed: {e}")
+            return _record_verdict(document, Document.SCAN_FAILED, str(e)[:255])
+
+        document.sha256 = verdict.sha256
+        if verdict.infected:
+            logger.warning(
+                f"Document {document_id} ({document.file.name}) is infected: {verdict.signature}; kept in quarantine"
+            )
+            return _record_verdict(document, Document.SCAN_INFECTED, verdict.signature)
+        return _record_verdict(document, Document.SCAN_CLEAN, '')
+
+
+def file_sha256(field_file):
+    digest = hashlib.sha256()
+    with field_file.open('rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _record_verdict(document, status, result):
+    document.scan_status = status
+    document.scan_result = result
+    document.scanned_at = timezone.now()
+    document.save(update_fields=['scan_status', 'scan_result', 'scanned_at', 'sha256', 'updated_at'])
+    return status
+
+
+@shared_task
+def scan_pending_documents(organization_id, batch_size=None):
+    """
+    Scan every document of an organization still waiting in quarantine,
+    e.g. the backlog left by a clamd outage or a bulk import.
+
+    Documents go to clamd in batches of ``batch_size`` (default
+    ``VIRUS_SCAN_BATCH_SIZE``), scanned concurrently over the pooled
+    connections; identical content within a batch is scanned once.
+    Returns the number of documents per resulting status.
+    """
+    from organizations.models import Organization
+    from .models import Document
+
+    organization = Organization.objects.filter(pk=organization_id).first()
+    if organization is None or not virus_scanner.enabled():
+        return {}
+
+    batch_size = batch_size or getattr(settings, 'VIRUS_SCAN_BATCH_SIZE', 50)
+    counts = {}
+    with tenant_context(organization):
+        pending = Document.objects.filter(organization=organization, scan_status=Document.SCAN_PENDING).order_by('pk')
+        last_pk = 0
+        while batch := list(pending.filter(pk__gt=last_pk)[:batch_size]):
+            last_pk = batch[-1].pk
+            for document, verdict in zip(batch, virus_scanner.scan_many([document.file for document in batch])):
+                if isinstance(verdict, Exception):
+                    # Left pending; scan_document retries it
+                    logger.warning(f"Virus scan of document {document.pk} failed: {verdict}")
+                    status = 'error'
+                else:
+                    document.sha256 = verdict.sha256
+                    if verdict.infected:
+                        logger.warning(
+                            f"Document {document.pk} ({document.file.name}) is infected: {verdict.signature}; "
+                            f"kept in quarantine"
+                        )
+                        status = _record_verdict(document, Document.SCAN_INFECTED, verdict.signature)
+                    else:
+                        status = _record_verdict(document, Document.SCAN_CLEAN, '')
+                counts[status] = counts.get(status, 0) + 1
+    return counts
+
+
+@shared_task
+def cleanup_stale_uploads():
+    """Delete partial files of resumable uploads that were abandoned."""
+    from .uploads import cleanup_expired_partials
+    removed = cleanup_expired_partials()
+    if removed:
+        logger.info(f"Removed {removed} abandoned partial uploads")
+    return removed
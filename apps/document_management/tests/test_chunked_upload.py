@@ -0,0 +1,186 @@
+# apps/document_management/tests/test_chunked_upload.py
+
+import base64
+import hashlib
+import shutil
+import tempfile
+from datetime import date
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django_tenants.test.cases import TenantTestCase
+
+from core.clamd_stub import EICAR, StubClamd
+from core.models.validators import validate_file_virus
+from document_management import uploads
+from document_management.models import Document, DocumentRequest, UploadSession
+from document_management.tasks import scan_document
+from document_management.views import ChunkedUploadView, PublicChunkedUploadView
+
+User = get_user_model()
+
+CONTENT = b'%PDF-1.7\n' + bytes(range(256)) * 4000
+
+
+def _b64(value):
+    return base64.b64encode(value if isinstance(value, bytes) else value.encode()).decode()
+
+
+class DroppedConnection:
+    """Request body that fails after ``size`` bytes, like a client going away mid-chunk"""
+
+    def __init__(self, data, size):
+        self.data, self.size = data, size
+
+    def read(self, n):
+        if not self.size:
+            raise OSError('connection reset by peer')
+        chunk, self.data = self.data[:min(n, self.size)], self.data[min(n, self.size):]
+        self.size -= len(chunk)
+        return chunk
+
+
+class ChunkedUploadTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Chunked Upload Org'
+        tenant.code = 'CHUNKUP'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        media = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, media)
+        settings_override = override_settings(MEDIA_ROOT=media, CHUNKED_UPLOAD_DIR=f'{media}/partial')
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.user = User.objects.create_user(
+                username='uploader', email='uploader@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='admin',
+            )
+        self.doc_request = DocumentRequest.objects.create(
+            organization=self.tenant, request_name='Bank statements', due_date=date(2030, 1, 1),
+            request_owner=self.user, requestee_identifier='Finance',
+        )
+        self.factory = RequestFactory()
+
+    def _call(self, view, method, path='/uploads/', data=b'', headers=None, **kwargs):
+        request = self.factory.generic(
+            method, path, data=data, content_type=uploads.OFFSET_CONTENT_TYPE if method == 'PATCH' else '',
+            headers={'Tus-Resumable': '1.0.0', **(headers or {})},
+        )
+        request.user = self.user
+        request.organization = self.tenant
+        request._dont_enforce_csrf_checks = True
+        return view.as_view()(request, **kwargs)
+
+    def _create(self, view=ChunkedUploadView, filename='statement.pdf', length=len(CONTENT), **kwargs):
+        metadata = f'filename {_b64(filename)},document_request {_b64(str(self.doc_request.pk))}'
+        response = self._call(view, 'POST', headers={'Upload-Length': str(length), 'Upload-Metadata': metadata},
+                              **kwargs)
+        self.assertEqual(response.status_code, 201, response.content)
+        return UploadSession.objects.get(key=response['Location'].rstrip('/').rsplit('/', 1)[-1])
+
+    def _patch(self, session, data, offset, view=ChunkedUploadView, checksum=None, **kwargs):
+        headers = {'Upload-Offset': str(offset)}
+        if checksum:
+            headers['Upload-Checksum'] = f'sha256 {checksum}'
+        return self._call(view, 'PATCH', data=data, headers=headers, upload_id=session.key, **kwargs)
+
+    @mock.patch('document_management.tasks.scan_document.delay')
+    def test_resumed_upload_is_assembled_and_quarantined(self, delay):
+        session = self._create()
+        first = CONTENT[:300000]
+        response = self._patch(session, first, 0, checksum=_b64(hashlib.sha256(first).digest()))
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['Upload-Offset'], '300000')
+
+        # The connection drops 200000 bytes into the next chunk; those bytes are kept
+        session.refresh_from_db()
+        with self.assertRaises(uploads.UploadError):
+            uploads.write_chunk(session, DroppedConnection(CONTENT[300000:], 200000), 300000)
+        head = self._call(ChunkedUploadView, 'HEAD', upload_id=session.key)
+        self.assertEqual(head['Upload-Offset'], '500000')
+
+        # The rest arrives at another worker, which never saw the earlier bytes
+        uploads._HASHERS.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self._patch(session, CONTENT[500000:], 500000)
+        self.assertEqual(response.status_code, 204)
+        self.assertEqual(response['Upload-Sha256'], hashlib.sha256(CONTENT).hexdigest())
+
+        document = Document.objects.get(pk=response['Upload-Document'])
+        self.assertEqual(document.sha256, hashlib.sha256(CONTENT).hexdigest())
+        self.assertEqual(document.scan_status, Document.SCAN_PENDING)
+        self.assertFalse(document.is_available)
+        with document.file.open('rb') as f:
+            self.assertEqual(f.read(), CONTENT)
+        self.assertFalse(uploads.partial_path(session).exists())
+        delay.assert_called_once_with(document.pk, self.tenant.pk)
+
+    def test_chunk_with_wrong_checksum_is_discarded(self):
+        session = self._create()
+        response = self._patch(session, CONTENT[:1000], 0, checksum=_b64(hashlib.sha256(b'other').digest()))
+        self.assertEqual(response.status_code, 460)
+        self.assertEqual(self._call(ChunkedUploadView, 'HEAD', upload_id=session.key)['Upload-Offset'], '0')
+
+        self.assertEqual(self._patch(session, CONTENT[:1000], 5).status_code, 409)
+        self.assertEqual(self._call(ChunkedUploadView, 'POST', headers={
+            'Upload-Length': '10', 'Upload-Metadata': f'filename {_b64("run.exe")}',
+        }).status_code, 400)
+
+    def test_upload_with_mismatched_content_is_discarded(self):
+        content = b'not a pdf at all'
+        session = self._create(length=len(content))
+        response = self._patch(session, content, 0)
+        self.assertEqual(response.status_code, 400)
+        # The session goes with its partial file instead of being restored by the rollback
+        self.assertFalse(UploadSession.objects.filter(pk=session.pk).exists())
+        self.assertFalse(uploads.partial_path(session).exists())
+        self.assertFalse(Document.objects.exists())
+
+    @mock.patch('document_management.tasks.scan_document.delay')
+    def test_public_link_upload_submits_the_request(self, delay):
+        token = self.doc_request.upload_token
+        session = self._create(view=PublicChunkedUploadView, token=token)
+        response = self._patch(session, CONTENT, 0, view=PublicChunkedUploadView, token=token)
+        self.assertEqual(response.status_code, 204)
+
+        self.doc_request.refresh_from_db()
+        self.assertEqual(self.doc_request.status, 'submitted')
+        self.assertNotEqual(self.doc_request.upload_token, token)
+        self.assertIsNone(Document.objects.get().uploaded_by)
+
+    @mock.patch('document_management.tasks.scan_document.delay')
+    def test_scan_releases_clean_files_and_keeps_infected_ones(self, delay):
+        documents = {}
+        for name, content in (('clean.txt', b'quarterly numbers'), ('eicar.txt', b'attached: ' + EICAR)):
+            session = self._create(filename=name, length=len(content))
+            response = self._patch(session, content, 0)
+            documents[name] = Document.objects.get(pk=response['Upload-Document'])
+
+        with StubClamd() as clamd, override_settings(ENABLE_VIRUS_SCANNING=True, **clamd.settings()):
+            for document in documents.values():
+                scan_document(document.pk, self.tenant.pk)
+        self.assertEqual(clamd.scans, 2)
+
+        clean, infected = (Document.objects.get(pk=documents[name].pk) for name in ('clean.txt', 'eicar.txt'))
+        self.assertEqual(clean.scan_status, Document.SCAN_CLEAN)
+        self.assertTrue(clean.is_available)
+        self.assertEqual(infected.scan_status, Document.SCAN_INFECTED)
+        self.assertEqual(infected.scan_result, 'Eicar-Test-Signature')
+        self.assertFalse(infected.is_available)
+
+
+class StreamedVirusValidationTests(SimpleTestCase):
+    def test_uploads_are_streamed_to_clamd(self):
+        with StubClamd(tcp=True) as clamd, override_settings(ENABLE_VIRUS_SCANNING=True, **clamd.settings()):
+            validate_file_virus(SimpleUploadedFile('notes.txt', b'nothing to see' * 100000))
+            with self.assertRaisesMessage(ValidationError, 'Eicar-Test-Signature'):
+                validate_file_virus(SimpleUploadedFile('notes.txt', b'x' * 3000000 + EICAR))
+        self.assertEqual(clamd.scanned_bytes, 1400000 + 3000000 + len(EICAR))
@@ -0,0 +1,419 @@
+"""
+Resumable chunked document uploads (tus 1.0 core protocol).
+
+A client creates an upload with ``POST`` (``Upload-Length`` and a
+``filename`` in ``Upload-Metadata``), then sends the file in any number of
+``PATCH`` requests, each starting at the current ``Upload-Offset``. After a
+dropped connection, ``HEAD`` tells it where to resume. Supported extensions:
+creation, checksum (``Upload-Checksum: sha256 <base64>`` per chunk),
+termination (``DELETE``) and expiration.
+
+- chunks are streamed from the request straight into a partial file at their
+  offset, never buffered whole in memory
+- a SHA-256 of the whole file is updated as bytes arrive; the hash state is
+  kept per process and caught up from the partial file when a chunk lands in
+  another worker, so each byte is normally hashed once
+- the finished file is hard-linked into the blob store (``core.blobstore``),
+  not copied; content the tenant already has is not stored twice
+- the ``Document`` starts quarantined (``scan_status='pending'``) and is
+  virus-scanned asynchronously, unless the same content was scanned before
+
+Partial files live in ``CHUNKED_UPLOAD_DIR`` (which should be on the same
+filesystem as ``MEDIA_ROOT``); unfinished uploads expire after
+``CHUNKED_UPLOAD_EXPIRY_HOURS``.
+"""
+import base64
+import binascii
+import fcntl
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.core.files import File
+from django.db import connection, transaction
+from django.http import HttpResponse
+from django.utils import timezone
+from django.utils.http import http_date
+from django.views import View
+
+from core.blobstore import blob_store
+from core.models.validators import validate_file_content_signature, validate_file_extension, validate_safe_filename
+
+from .models import Document, UploadSession
+
+logger = logging.getLogger(__name__)
+
+TUS_VERSION = '1.0.0'
+TUS_EXTENSIONS = 'creation,checksum,termination,expiration'
+OFFSET_CONTENT_TYPE = 'application/offset+octet-stream'
+READ_SIZE = 1024 * 1024
+
+# upload id -> (offset, sha256 state) for uploads recently written by this process
+_HASHERS = OrderedDict()
+_HASHERS_LOCK = threading.Lock()
+_HASHERS_MAX = 256
+
+
+class UploadError(Exception):
+    """Protocol error, answered with ``status`` and ``message``"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def max_upload_size():
+    return getattr(settings, 'CHUNKED_UPLOAD_MAX_SIZE_MB', getattr(settings, 'MAX_UPLOAD_SIZE_MB', 10)) * 1024 * 1024
+
+
+def upload_dir():
+    root = Path(getattr(settings, 'CHUNKED_UPLOAD_DIR', Path(settings.MEDIA_ROOT) / 'uploads' / 'partial'))
+    return root / connection.schema_name
+
+
+def partial_path(session):
+    return upload_dir() / f'{session.key}.part'
+
+
+def parse_metadata(header):
+    """``Upload-Metadata`` (``key base64value,key2 base64value``) as a dict of strings"""
+    metadata = {}
+    for item in filter(None, (part.strip() for part in (header or '').split(','))):
+        key, _, value = item.partition(' ')
+        try:
+            metadata[key] = base64.b64decode(value, validate=True).decode('utf-8') if value else ''
+        except (binascii.Error, UnicodeDecodeError):
+            raise UploadError(400, f'Invalid Upload-Metadata value for "{key}"')
+    return metadata
+
+
+def create_session(document_request, filename, length, uploaded_by=None, is_public=False):
+    """New upload of ``length`` bytes for ``document_request``, with an empty partial file"""
+    if length < 0:
+        raise UploadError(400, 'Invalid Upload-Length')
+    if length > max_upload_size():
+        raise UploadError(413, f'Upload-Length exceeds the maximum of {max_upload_size()} bytes')
+    named = File(None, name=filename)
+    try:
+        validate_safe_filename(named)
+        validate_file_extension(named)
+    except ValidationError as e:
+        raise UploadError(400, ' '.join(e.messages))
+
+    session = UploadSession.objects.create(
+        organization=document_request.organization,
+        document_request=document_request,
+        uploaded_by=uploaded_by,
+        is_public=is_public,
+        filename=os.path.basename(filename),
+        length=length,
+        expires_at=timezone.now() + timedelta(hours=getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', 24)),
+    )
+    path = partial_path(session)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.touch()
+    return session
+
+
+def write_chunk(session, stream, offset, checksum=None):
+    """
+    Append the bytes of ``stream`` at ``offset`` and return the new offset.
+
+    ``checksum`` is an ``Upload-Checksum`` header value; a chunk that does
+    not match it is discarded. Without one, the bytes received before a
+    dropped connection are kept so the client can resume after them.
+    """
+    if session.expires_at <= timezone.now():
+        raise UploadError(410, 'Upload expired')
+    if session.document_id:
+        raise UploadError(409, 'Upload already complete')
+    if offset != session.offset:
+        raise UploadError(409, f'Upload-Offset {offset} does not match the current offset {session.offset}')
+    chunk_hash, expected = _parse_checksum(checksum)
+
+    try:
+        fd = os.open(partial_path(session), os.O_RDWR)
+    except FileNotFoundError:
+        raise UploadError(410, 'Upload expired')
+    try:
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            raise UploadError(423, 'Another request is writing to this upload')
+        # Another request may have written since the session was loaded
+        session.refresh_from_db(fields=['offset'])
+        if offset != session.offset:
+            raise UploadError(409, f'Upload-Offset {offset} does not match the current offset {session.offset}')
+        # Bytes past the offset are left over from a write that never got recorded
+        os.ftruncate(fd, offset)
+
+        hasher = _hasher(session, fd, offset)
+        before = hasher.copy()
+        remaining = session.length - offset
+        written = 0
+        interrupted = None
+        try:
+            while True:
+                data = stream.read(min(READ_SIZE, remaining - written + 1))
+                if not data:
+                    break
+                if written + len(data) > remaining:
+                    os.ftruncate(fd, offset)
+                    _forget(session.pk)
+                    raise UploadError(413, 'Chunk extends past Upload-Length')
+                _pwrite_all(fd, data, offset + written)
+                hasher.update(data)
+                if chunk_hash is not None:
+                    chunk_hash.update(data)
+                written += len(data)
+        except UploadError:
+            raise
+        except Exception as e:
+            interrupted = e
+
+        if chunk_hash is not None and (interrupted or chunk_hash.digest() != expected):
+            os.ftruncate(fd, offset)
+            _remember(session.pk, offset, before)
+            if interrupted:
+                raise _interrupted(session, interrupted)
+            raise UploadError(460, 'Checksum mismatch')
+
+        new_offset = offset + written
+        _remember(session.pk, new_offset, hasher)
+        UploadSession.objects.filter(pk=session.pk).update(offset=new_offset, updated_at=timezone.now())
+        session.offset = new_offset
+        if session.is_complete:
+            session.sha256 = hasher.hexdigest()
+            _forget(session.pk)
+        if interrupted:
+            raise _interrupted(session, interrupted)
+        return new_offset
+    finally:
+        os.close(fd)
+
+
+def complete_upload(session):
+    """Turn a finished upload into a quarantined ``Document``; returns it"""
+    with transaction.atomic():
+        # Serializes retried final PATCHes: only one of them moves the file
+        locked = UploadSession.objects.select_for_update(of=('self',)).select_related('document').get(pk=session.pk)
+        if locked.document is not None:
+            return locked.document
+        path = partial_path(session)
+        try:
+            with open(path, 'rb') as f:
+                validate_file_content_signature(File(f, name=session.filename))
+        except FileNotFoundError:
+            raise UploadError(410, 'Upload expired')
+        except ValidationError as e:
+            rejected = ' '.join(e.messages)
+        else:
+            rejected = None
+            document = Document(
+                document_request=session.document_request,
+                organization=session.organization,
+                uploaded_by=session.uploaded_by,
+                sha256=session.sha256,
+                scan_status=Document.SCAN_PENDING,
+            )
+            document.file.name = blob_store.put_file(
+                path, document.file.field.generate_filename(document, session.filename), sha256=session.sha256,
+            )
+            document.save()
+            UploadSession.objects.filter(pk=session.pk).update(sha256=session.sha256, document=document)
+    if rejected is not None:
+        # Outside the block: rolling it back would restore the session but not the unlinked file
+        discard(session)
+        raise UploadError(400, rejected)
+    session.document = document
+    logger.info(f'Upload {session.key} complete: {document.file.name} ({session.length} bytes, sha256 {session.sha256})')
+    return document
+
+
+def discard(session):
+    """Terminate an upload and delete its partial file"""
+    _forget(session.pk)
+    try:
+        os.unlink(partial_path(session))
+    except FileNotFoundError:
+        pass
+    session.delete()
+
+
+def cleanup_expired_partials(max_age_hours=None):
+    """Delete partial files of every schema not written to for ``max_age_hours``; returns how many"""
+    max_age_hours = max_age_hours or getattr(settings, 'CHUNKED_UPLOAD_EXPIRY_HOURS', 24)
+    root = upload_dir().parent
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for path in root.glob('*/*.part'):
+        try:
+            if path.stat().st_mtime < cutoff:
+                path.unlink()
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def _interrupted(session, error):
+    logger.warning(f'Upload {session.key} interrupted at offset {session.offset}: {error}')
+    return UploadError(400, f'Upload interrupted; resume from offset {session.offset}')
+
+
+def _parse_checksum(header):
+    if not header:
+        return None, None
+    algorithm, _, value = header.partition(' ')
+    if algorithm.lower() != 'sha256':
+        raise UploadError(400, 'Unsupported checksum algorithm')
+    try:
+        return hashlib.sha256(), base64.b64decode(value, validate=True)
+    except binascii.Error:
+        raise UploadError(400, 'Invalid Upload-Checksum')
+
+
+def _pwrite_all(fd, data, position):
+    view = memoryview(data)
+    while view:
+        written = os.pwrite(fd, view, position)
+        view = view[written:]
+        position += written
+
+
+def _hasher(session, fd, offset):
+    """SHA-256 state after the first ``offset`` bytes, hashing only what this process has not seen"""
+    with _HASHERS_LOCK:
+        known = _HASHERS.pop(session.pk, None)
+    seen, hasher = known if known and known[0] <= offset else (0, hashlib.sha256())
+    while seen < offset:
+        data = os.pread(fd, min(READ_SIZE, offset - seen), seen)
+        if not data:
+            raise UploadError(409, 'Partial upload is shorter than its offset')
+        hasher.update(data)
+        seen += len(data)
+    return hasher
+
+
+def _remember(upload_id, offset, hasher):
+    with _HASHERS_LOCK:
+        _HASHERS[upload_id] = (offset, hasher)
+        _HASHERS.move_to_end(upload_id)
+        while len(_HASHERS) > _HASHERS_MAX:
+            _HASHERS.popitem(last=False)
+
+
+def _forget(upload_id):
+    with _HASHERS_LOCK:
+        _HASHERS.pop(upload_id, None)
+
+
+def tus_response(status=204, **headers):
+    response = HttpResponse(status=status)
+    response['Tus-Resumable'] = TUS_VERSION
+    response['Cache-Control'] = 'no-store'
+    for header, value in headers.items():
+        response[header.replace('_', '-')] = str(value)
+    return response
+
+
+class ChunkedUploadViewBase(View):
+    """
+    tus endpoint: ``POST`` on the collection URL, ``HEAD``/``PATCH``/``DELETE``
+    on an upload's URL. Subclasses decide which document requests and uploads
+    the caller may use.
+    """
+    http_method_names = ['options', 'post', 'head', 'patch', 'delete']
+
+    def get_document_request(self, request, metadata, **kwargs):
+        raise NotImplementedError
+
+    def get_sessions(self, request, **kwargs):
+        raise NotImplementedError
+
+    def upload_url(self, request, session, **kwargs):
+        raise NotImplementedError
+
+    def create_session(self, request, document_request, filename, length, **kwargs):
+        return create_session(document_request, filename, length, uploaded_by=request.user)
+
+    def on_complete(self, request, session, document, **kwargs):
+        pass
+
+    def dispatch(self, request, *args, **kwargs):
+        if request.method != 'OPTIONS' and request.headers.get('Tus-Resumable') != TUS_VERSION:
+            return tus_response(412, Tus_Version=TUS_VERSION)
+        try:
+            return super().dispatch(request, *args, **kwargs)
+        except UploadError as e:
+            response = tus_response(e.status)
+            response.content = e.message.encode()
+            response['Content-Type'] = 'text/plain; charset=utf-8'
+            return response
+
+    def options(self, request, *args, **kwargs):
+        return tus_response(
+            Tus_Version=TUS_VERSION, Tus_Extension=TUS_EXTENSIONS, Tus_Max_Size=max_upload_size(),
+            Tus_Checksum_Algorithm='sha256',
+        )
+
+    def post(self, request, upload_id=None, **kwargs):
+        if upload_id is not None:
+            raise UploadError(405, 'Create uploads on the collection URL')
+        try:
+            length = int(request.headers.get('Upload-Length', ''))
+        except ValueError:
+            raise UploadError(400, 'Upload-Length is required')
+        metadata = parse_metadata(request.headers.get('Upload-Metadata'))
+        if not metadata.get('filename'):
+            raise UploadError(400, 'Upload-Metadata must include a filename')
+        document_request = self.get_document_request(request, metadata, **kwargs)
+        session = self.create_session(request, document_request, metadata['filename'], length, **kwargs)
+        return tus_response(
+            201, Location=self.upload_url(request, session, **kwargs), Upload_Offset=0,
+            Upload_Expires=http_date(session.expires_at.timestamp()),
+        )
+
+    def head(self, request, upload_id=None, **kwargs):
+        session = self._session(request, upload_id, **kwargs)
+        return tus_response(
+            200, Upload_Offset=session.offset, Upload_Length=session.length,
+            Upload_Expires=http_date(session.expires_at.timestamp()),
+        )
+
+    def patch(self, request, upload_id=None, **kwargs):
+        session = self._session(request, upload_id, **kwargs)
+        if request.content_type != OFFSET_CONTENT_TYPE:
+            raise UploadError(415, f'Content-Type must be {OFFSET_CONTENT_TYPE}')
+        try:
+            offset = int(request.headers.get('Upload-Offset', ''))
+        except ValueError:
+            raise UploadError(400, 'Upload-Offset is required')
+
+        new_offset = write_chunk(session, request, offset, request.headers.get('Upload-Checksum'))
+        headers = {'Upload_Offset': new_offset, 'Upload_Expires': http_date(session.expires_at.timestamp())}
+        if session.is_complete:
+            document = complete_upload(session)
+            self.on_complete(request, session, document, **kwargs)
+            headers.update(Upload_Document=document.pk, Upload_Sha256=session.sha256)
+        return tus_response(204, **headers)
+
+    def delete(self, request, upload_id=None, **kwargs):
+        discard(self._session(request, upload_id, **kwargs))
+        return tus_response(204)
+
+    def _session(self, request, upload_id, **kwargs):
+        if upload_id is None:
+            raise UploadError(405, 'Use the upload URL returned on creation')
+        session = self.get_sessions(request, **kwargs).filter(key=upload_id).first()
+        if session is None:
+            raise UploadError(404, 'Unknown upload')
+        return session
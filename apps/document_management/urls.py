@@ -8,6 +8,10 @@ app_name = 'document_management'
 urlpatterns = [
     path('', TemplateView.as_view(template_name='document_management/list.html'), name='list'),
     path('upload/<str:token>/', views.PublicDocumentUploadView.as_view(), name='public-upload'),
+    path('upload/<str:token>/files/', views.PublicChunkedUploadView.as_view(), name='public-chunked-uploads'),
+    path('upload/<str:token>/files/<uuid:upload_id>/', views.PublicChunkedUploadView.as_view(), name='public-chunked-upload'),
+    path('uploads/', views.ChunkedUploadView.as_view(), name='chunked-uploads'),
+    path('uploads/<uuid:upload_id>/', views.ChunkedUploadView.as_view(), name='chunked-upload'),
     path('requests/', views.DocumentRequestListView.as_view(), name='documentrequest-list'),
     path('requests/add/', views.DocumentRequestCreateView.as_view(), name='documentrequest-add'),
     path('requests/<int:pk>/', views.DocumentRequestDetailView.as_view(), name='documentrequest-detail'),
@@ -16,6 +20,7 @@ urlpatterns = [
     path('documents/', views.DocumentListView.as_view(), name='document-list'),
     path('documents/add/', views.DocumentCreateView.as_view(), name='document-add'),
     path('documents/<int:pk>/', views.DocumentDetailView.as_view(), name='document-detail'),
+    path('documents/<int:pk>/download/', views.DocumentDownloadView.as_view(), name='document-download'),
     path('documents/<int:pk>/edit/', views.DocumentUpdateView.as_view(), name='document-edit'),
     path('documents/<int:pk>/delete/', views.DocumentDeleteView.as_view(), name='document-delete'),
     path('dashboard/', views.DocumentManagementDashboardView.as_view(), name='dashboard'),
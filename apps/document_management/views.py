@@ -1,5 +1,6 @@
 from django.shortcuts import render, get_object_or_404, redirect
 from django.views import View
+from django.conf import settings
 from django.utils import timezone
 from django.contrib import messages
 from .models import DocumentRequest, Document
@@ -7,8 +8,10 @@ from .forms import DocumentForm, DocumentRequestForm, DocumentRequestFilterForm
 from django.http import Http404, JsonResponse
 from django.views.generic import ListView, DetailView, CreateView, UpdateView, DeleteView
 from core.mixins.permissions import OrganizationPermissionMixin
-from django.urls import reverse_lazy
+from django.urls import reverse, reverse_lazy
 from rest_framework import viewsets, permissions
+from rest_framework.decorators import action
+from rest_framework.response import Response
 from .serializers import DocumentRequestSerializer, DocumentSerializer
 import json
 from django.db.models import Count
@@ -18,10 +21,35 @@ from core.mixins.organization import OrganizationScopedQuerysetMixin
 from django.db.models import Q
 from django.contrib.auth.decorators import login_required
 from django.core.cache import cache
+from django.db.models.functions import TruncDate
+from core.dashboard import DashboardMetrics, bucket_counts
+from core.chart_cache import chart_cache
+from core.periods import PeriodFilter, range_q
+from core.downloads import ProtectedFileView, signed_url
+from django.utils.decorators import method_decorator
+from .models import UploadSession
+from .uploads import ChunkedUploadViewBase, UploadError, create_session
 
 _PUBLIC_UPLOAD_RATE = 10  # max POSTs per hour per token+IP
 
 
+def _client_ip(request):
+    ip = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR', ''))
+    if ip and ',' in ip:
+        ip = ip.split(',')[0].strip()
+    return ip
+
+
+def _valid_upload_request(token):
+    try:
+        doc_request = DocumentRequest.objects.get(upload_token=token, status='pending')
+        if doc_request.token_expiry and timezone.now() > doc_request.token_expiry:
+            return None
+        return doc_request
+    except DocumentRequest.DoesNotExist:
+        return None
+
+
 class PublicDocumentUploadView(View):
     template_name = 'document_management/public_upload.html'
 
@@ -37,9 +65,7 @@ class PublicDocumentUploadView(View):
         if not doc_request:
             return render(request, 'document_management/public_upload_invalid.html')
 
-        ip = request.META.get('HTTP_X_FORWARDED_FOR', request.META.get('REMOTE_ADDR', ''))
-        if ip and ',' in ip:
-            ip = ip.split(',')[0].strip()
+        ip = _client_ip(request)
         rate_key = f'public_upload_{token}_{ip}'
         if cache.get(rate_key, 0) >= _PUBLIC_UPLOAD_RATE:
             messages.error(request, 'Too many upload attempts. Please try again later.')
@@ -61,13 +87,59 @@ class PublicDocumentUploadView(View):
         return render(request, self.template_name, {'form': form, 'doc_request': doc_request})
 
     def get_valid_request(self, token):
-        try:
-            doc_request = DocumentRequest.objects.get(upload_token=token, status='pending')
-            if doc_request.token_expiry and timezone.now() > doc_request.token_expiry:
-                return None
-            return doc_request
-        except DocumentRequest.DoesNotExist:
-            return None
+        return _valid_upload_request(token)
+
+
+class PublicChunkedUploadView(ChunkedUploadViewBase):
+    """Resumable uploads through a document request's upload link (no login)."""
+
+    def get_document_request(self, request, metadata, token):
+        doc_request = _valid_upload_request(token)
+        if not doc_request:
+            raise UploadError(404, 'Invalid or expired upload link')
+        rate_key = f'public_upload_{token}_{_client_ip(request)}'
+        if cache.get(rate_key, 0) >= _PUBLIC_UPLOAD_RATE:
+            raise UploadError(429, 'Too many upload attempts. Please try again later.')
+        cache.set(rate_key, cache.get(rate_key, 0) + 1, timeout=3600)
+        return doc_request
+
+    def create_session(self, request, document_request, filename, length, token):
+        return create_session(document_request, filename, length, uploaded_by=None, is_public=True)
+
+    def get_sessions(self, request, token):
+        doc_request = _valid_upload_request(token)
+        if not doc_request:
+            return UploadSession.objects.none()
+        return UploadSession.objects.filter(document_request=doc_request, is_public=True)
+
+    def upload_url(self, request, session, token):
+        return request.build_absolute_uri(reverse('document_management:public-chunked-upload', args=[token, session.key]))
+
+    def on_complete(self, request, session, document, token):
+        doc_request = session.document_request
+        doc_request.status = 'submitted'
+        doc_request.upload_token = None  # Invalidate token after use
+        doc_request.save()
+
+
+@method_decorator(login_required, name='dispatch')
+class ChunkedUploadView(ChunkedUploadViewBase):
+    """Resumable uploads by signed-in users; ``document_request`` (id) goes in Upload-Metadata."""
+
+    def get_document_request(self, request, metadata):
+        doc_request_id = metadata.get('document_request', '')
+        doc_request = None
+        if doc_request_id.isdigit():
+            doc_request = DocumentRequest.objects.filter(organization=request.organization, pk=doc_request_id).first()
+        if doc_request is None:
+            raise UploadError(400, 'Upload-Metadata must include a document_request of your organization')
+        return doc_request
+
+    def get_sessions(self, request):
+        return UploadSession.objects.filter(organization=request.organization, uploaded_by=request.user)
+
+    def upload_url(self, request, session):
+        return request.build_absolute_uri(reverse('document_management:chunked-upload', args=[session.key]))
 
 class DocumentRequestListView(OrganizationPermissionMixin, ListView):
     model = DocumentRequest
@@ -151,6 +223,13 @@ class DocumentDetailView(OrganizationPermissionMixin, DetailView):
     def get_queryset(self):
         return super().get_queryset().filter(organization=self.request.organization)
 
+class DocumentDownloadView(OrganizationPermissionMixin, ProtectedFileView):
+    """Documents still in (or failing) virus-scan quarantine are not served."""
+    model = Document
+
+    def is_downloadable(self, document):
+        return document.is_available
+
 class DocumentCreateView(OrganizationPermissionMixin, CreateView):
     model = Document
     form_class = DocumentForm
@@ -195,61 +274,41 @@ class DocumentManagementDashboardView(OrganizationPermissionMixin, ListView):
         context = super().get_context_data(**kwargs)
         org = self.request.organization
         # --- Period Filter Logic (aligned with Audit) ---
-        from django.utils import timezone
-        import calendar
-        from django.db.models import Q
-        org_created = getattr(org, 'created_at', timezone.now()).date()
-        today = timezone.now().date()
-        years = list(range(org_created.year, today.year + 1))
-        months = [(i, calendar.month_name[i]) for i in range(1, 13)]
-        selected_years = self.request.GET.getlist('year') or [str(today.year)]
-        selected_months = self.request.GET.getlist('month')
-        filter_all = 'All' in selected_years
-        year_ints = [int(y) for y in selected_years if y.isdigit()]
-        month_ints = [int(m) for m in selected_months if m.isdigit()]
+        period = PeriodFilter.from_request(self.request, org)
+        request_period_q = period.q('created_at', DocumentRequest)
+        upload_period_q = period.q('uploaded_at', Document)
+        
+        # Analytics: uploads over the last 7 days
+        today = now().date()
+        days = [today - timedelta(days=i) for i in range(6, -1, -1)]
         
-        # Basic counts
-        dr_qs = DocumentRequest.objects.filter(organization=org)
         doc_qs = Document.objects.filter(organization=org)
-        if not filter_all:
-            drr = Q(created_at__year__in=year_ints)
-            if month_ints:
-                drr &= Q(created_at__month__in=month_ints)
-            dr_qs = dr_qs.filter(drr)
-            dq = Q(uploaded_at__year__in=year_ints)
-            if month_ints:
-                dq &= Q(uploaded_at__month__in=month_ints)
-            doc_qs = doc_qs.filter(dq)
-        context['request_count'] = dr_qs.count()
-        context['document_count'] = doc_qs.count()
-        context['pending_count'] = dr_qs.filter(status='pending').count()
-        context['recent_uploads'] = doc_qs.order_by('-uploaded_at')[:5]
+        metrics = DashboardMetrics()
+        requests = metrics.source(DocumentRequest.objects.filter(organization=org))
+        requests.count('request_count', request_period_q)
+        requests.count('pending_count', request_period_q & Q(status='pending'))
+        requests.histogram('status_chart', 'status', filter=request_period_q)
+        documents = metrics.source(doc_qs)
+        documents.count('document_count', upload_period_q)
+        documents.histogram(
+            'uploads_chart', TruncDate('uploaded_at'),
+            filter=upload_period_q & range_q('uploaded_at', Document, start=days[0]), key=str,
+        )
+        results = metrics.evaluate()
+        
+        context['request_count'] = results['request_count']
+        context['document_count'] = results['document_count']
+        context['pending_count'] = results['pending_count']
+        context['recent_uploads'] = doc_qs.filter(upload_period_q).order_by('-uploaded_at')[:5]
         
-        # Analytics: Requests by status
-        status_qs = dr_qs.values('status').annotate(count=Count('id'))
-        status_data = {s['status']: s['count'] for s in status_qs}
         # Ensure we have default values for common statuses
         default_statuses = {'pending': 0, 'approved': 0, 'rejected': 0, 'completed': 0}
-        for status in default_statuses:
-            if status not in status_data:
-                status_data[status] = 0
-        context['status_chart'] = json.dumps(status_data or default_statuses)
-        
-        # Analytics: Uploads over last 7 days
-        today = now().date()
-        days = [today - timedelta(days=i) for i in range(6, -1, -1)]
-        uploads_qs = doc_qs.filter(uploaded_at__date__gte=days[0]).values('uploaded_at__date').annotate(count=Count('id'))
-        
-        uploads_map = {str(u['uploaded_at__date']): u['count'] for u in uploads_qs}
-        uploads_data = {str(day): uploads_map.get(str(day), 0) for day in days}
-        context['uploads_chart'] = json.dumps(uploads_data or {str(today): 0})
+        status_data = {**default_statuses, **results['status_chart']}
+        context['status_chart'] = json.dumps(status_data)
+        context['uploads_chart'] = json.dumps(bucket_counts(results['uploads_chart'], [str(day) for day in days]))
         
         # Period filter context
-        context['available_years'] = years
-        context['available_months'] = months
-        context['selected_years'] = selected_years
-        context['selected_months'] = selected_months
-        context['filter_all'] = filter_all
+        context.update(period.context())
 
         return context
 
@@ -265,7 +324,18 @@ class DocumentViewSet(OrganizationScopedQuerysetMixin, viewsets.ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(organization=self.request.organization, uploaded_by=self.request.user)
 
+    @action(detail=True, methods=['get'], url_path='download-link')
+    def download_link(self, request, pk=None):
+        """Signed, expiring URL for the file, usable without a session"""
+        document = self.get_object()
+        if not document.file or not document.is_available:
+            raise Http404('File not available')
+        expires_in = getattr(settings, 'SIGNED_DOWNLOAD_EXPIRY_SECONDS', 3600)
+        url = signed_url(document.file, expires_in=expires_in)
+        return Response({'url': request.build_absolute_uri(url), 'expires_in': expires_in})
+
 @login_required
+@chart_cache(DocumentRequest)
 def api_status_data(request):
     org = request.organization
     from .models import DocumentRequest
@@ -275,6 +345,7 @@ def api_status_data(request):
     return JsonResponse(status_data, safe=False)
 
 @login_required
+@chart_cache(Document, daily=True)
 def api_uploads_data(request):
     org = request.organization
     from .models import Document
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.14 on 2026-10-18 21:45
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('legal', '0006_alter_legaldocument_file'),
+        ('organizations', '0002_initial'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='legalcase',
+            index=models.Index(fields=['organization', 'created_at'], name='legal_legal_organiz_1ced56_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='legaltask',
+            index=models.Index(fields=['organization', 'created_at'], name='legal_legal_organiz_e3fb7b_idx'),
+        ),
+    ]
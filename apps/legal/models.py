@@ -6,6 +6,7 @@ from core.models.abstract_models import TimeStampedModel, OrganizationOwnedModel
 from users.models import CustomUser
 from organizations.models import Organization
 from core.models.validators import file_upload_validators
+from core.blobstore import get_blob_storage
 from django.core.validators import MinValueValidator, MaxValueValidator
 
 class CaseType(OrganizationOwnedModel):
@@ -79,6 +80,7 @@ class LegalCase(OrganizationOwnedModel, AuditableModel):
     class Meta:
         indexes = [
             models.Index(fields=['organization', 'status']),
+            models.Index(fields=['organization', 'created_at']),
             models.Index(fields=['opened_date', 'closed_date']),
         ]
 
@@ -126,6 +128,7 @@ class LegalTask(OrganizationOwnedModel, AuditableModel):
     class Meta:
         indexes = [
             models.Index(fields=['case', 'status']),
+            models.Index(fields=['organization', 'created_at']),
             models.Index(fields=['due_date']),
         ]
 
@@ -139,6 +142,7 @@ class LegalDocument(OrganizationOwnedModel, AuditableModel):
     description = models.TextField(blank=True, null=True)
     file = models.FileField(
         upload_to='legal_documents/',
+        storage=get_blob_storage,
         validators=file_upload_validators()
     )
     version = models.CharField(max_length=50, default='1.0')
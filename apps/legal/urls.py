@@ -44,6 +44,7 @@ urlpatterns = [
     path('documents/', views.LegalDocumentListView.as_view(), name='legaldocument_list'),
     path('documents/create/', views.LegalDocumentCreateView.as_view(), name='legaldocument_create'),
     path('documents/<int:pk>/', views.LegalDocumentDetailView.as_view(), name='legaldocument_detail'),
+    path('documents/<int:pk>/download/', views.LegalDocumentDownloadView.as_view(), name='legaldocument_download'),
     path('documents/<int:pk>/edit/', views.LegalDocumentUpdateView.as_view(), name='legaldocument_update'),
     path('documents/<int:pk>/delete/', views.LegalDocumentDeleteView.as_view(), name='legaldocument_delete'),
 
@@ -8,12 +8,31 @@ from .forms import (
 )
 from django.contrib.auth.mixins import LoginRequiredMixin
 from django.shortcuts import render
-from django.utils import timezone
 from django.db.models import Q
 from django.http import JsonResponse
 from django.contrib.auth.decorators import login_required
+from core.dashboard import DashboardMetrics
+from core.periods import PeriodFilter
+from core.downloads import ProtectedFileView
 from users.models import CustomUser
 
+LEGAL_OPEN_CASE_STATUSES = ['intake', 'investigation', 'litigation', 'settlement_negotiation']
+# Map status values to display names for the dashboard charts
+LEGAL_CASE_STATUS_LABELS = {
+    'intake': 'Open',
+    'investigation': 'Open',
+    'litigation': 'Open',
+    'settlement_negotiation': 'Open',
+    'closed': 'Closed',
+    'archived': 'Archived',
+}
+LEGAL_TASK_STATUS_LABELS = {
+    'pending': 'Pending',
+    'in_progress': 'In Progress',
+    'completed': 'Completed',
+    'overdue': 'Overdue',
+}
+
 # CaseType Views
 class CaseTypeListView(OrganizationPermissionMixin, ListView):
     model = CaseType
@@ -286,6 +305,9 @@ class LegalDocumentDetailView(OrganizationPermissionMixin, DetailView):
     def get_queryset(self):
         return super().get_queryset().filter(organization=self.request.organization)
 
+class LegalDocumentDownloadView(OrganizationPermissionMixin, ProtectedFileView):
+    model = LegalDocument
+
 class LegalDocumentCreateView(OrganizationPermissionMixin, CreateView):
     model = LegalDocument
     form_class = LegalDocumentForm
@@ -368,105 +390,44 @@ class LegalDashboardView(LoginRequiredMixin, TemplateView):
             return context
         
         # --- Period Filter Logic (aligned with Audit) ---
-        from django.utils import timezone
-        import calendar
-        from django.db.models import Q
-        org_created = getattr(org, 'created_at', timezone.now()).date()
-        today = timezone.now().date()
-        years = list(range(org_created.year, today.year + 1))
-        months = [(i, calendar.month_name[i]) for i in range(1, 13)]
-        selected_years = self.request.GET.getlist('year') or [str(today.year)]
-        selected_months = self.request.GET.getlist('month')
-        filter_all = 'All' in selected_years
-        year_ints = [int(y) for y in selected_years if y.isdigit()]
-        month_ints = [int(m) for m in selected_months if m.isdigit()]
+        period = PeriodFilter.from_request(self.request, org)
+        case_period_q = period.q('created_at', LegalCase)
+        task_period_q = period.q('created_at', LegalTask)
 
         case_qs = LegalCase.objects.filter(organization=org)
-        if not filter_all:
-            cq = Q(created_at__year__in=year_ints)
-            if month_ints:
-                cq &= Q(created_at__month__in=month_ints)
-            case_qs = case_qs.filter(cq)
-
-        # Case counts
-        context['case_count'] = case_qs.count()
-        context['open_cases'] = LegalCase.objects.filter(organization=org, status='intake').count() + \
-                                 LegalCase.objects.filter(organization=org, status='investigation').count() + \
-                                 LegalCase.objects.filter(organization=org, status='litigation').count() + \
-                                 LegalCase.objects.filter(organization=org, status='settlement_negotiation').count()
-        context['closed_cases'] = case_qs.filter(status='closed').count()
-        context['archived_cases'] = case_qs.filter(status='archived').count()
-        
-        # Party, document, task counts
-        party_qs = LegalParty.objects.filter(organization=org)
-        doc_qs = LegalDocument.objects.filter(organization=org)
+        doc_qs = LegalDocument.objects.filter(organization=org)  # no date field; kept unfiltered
         task_qs = LegalTask.objects.filter(organization=org)
-        if not filter_all:
-            if month_ints:
-                task_qs = task_qs.filter(created_at__year__in=year_ints, created_at__month__in=month_ints)
-                doc_qs = doc_qs.filter(id__isnull=False)  # no date field; keep unfiltered safely
-            else:
-                task_qs = task_qs.filter(created_at__year__in=year_ints)
-        context['party_count'] = party_qs.count()
-        context['document_count'] = doc_qs.count()
-        context['task_count'] = task_qs.count()
-        
-        # Overdue tasks: status is 'overdue'
-        context['overdue_tasks'] = task_qs.filter(status='overdue').count()
-        
-        # Task status chart data
-        context['completed_tasks'] = task_qs.filter(status='completed').count()
-        context['pending_tasks'] = task_qs.filter(status__in=['pending','in_progress']).count()
-        
+
+        metrics = DashboardMetrics()
+        cases = metrics.source(case_qs)
+        cases.count('case_count', case_period_q)
+        cases.count('open_cases', Q(status__in=LEGAL_OPEN_CASE_STATUSES))
+        cases.count('closed_cases', case_period_q & Q(status='closed'))
+        cases.count('archived_cases', case_period_q & Q(status='archived'))
+        cases.histogram(
+            'case_status_chart', 'status', filter=case_period_q,
+            labels=LEGAL_CASE_STATUS_LABELS, default={'Open': 0, 'Closed': 0, 'Archived': 0},
+        )
+        metrics.source(LegalParty.objects.filter(organization=org)).count('party_count')
+        metrics.source(doc_qs).count('document_count')
+        tasks = metrics.source(task_qs)
+        tasks.count('task_count', task_period_q)
+        tasks.count('overdue_tasks', task_period_q & Q(status='overdue'))
+        tasks.count('completed_tasks', task_period_q & Q(status='completed'))
+        tasks.count('pending_tasks', task_period_q & Q(status__in=['pending', 'in_progress']))
+        tasks.histogram(
+            'task_status_chart', 'status', filter=task_period_q, labels=LEGAL_TASK_STATUS_LABELS,
+            default={'Pending': 0, 'In Progress': 0, 'Completed': 0, 'Overdue': 0},
+        )
+        context.update(metrics.evaluate())
+
         # Recent activity (latest 8 cases, documents, or tasks)
-        context['recent_cases'] = case_qs.order_by('-created_at')[:4]
+        context['recent_cases'] = case_qs.filter(case_period_q).order_by('-created_at')[:4]
         context['recent_documents'] = doc_qs.order_by('-id')[:2]
-        context['recent_tasks'] = task_qs.order_by('-id')[:2]
-        
-        # Chart data for Plotly - Case Status Distribution
-        from collections import Counter
-        case_status_qs = case_qs.values_list('status', flat=True)
-        case_status_counter = Counter(case_status_qs)
-        # Map status values to display names
-        status_mapping = {
-            'intake': 'Open',
-            'investigation': 'Open', 
-            'litigation': 'Open',
-            'settlement_negotiation': 'Open',
-            'closed': 'Closed',
-            'archived': 'Archived'
-        }
-        case_status_chart = {}
-        for status, count in case_status_counter.items():
-            display_name = status_mapping.get(status, status.title())
-            if display_name in case_status_chart:
-                case_status_chart[display_name] += count
-            else:
-                case_status_chart[display_name] = count
-        context['case_status_chart'] = case_status_chart or {'Open': 0, 'Closed': 0, 'Archived': 0}
-        
-        # Task Status Distribution
-        task_status_qs = task_qs.values_list('status', flat=True)
-        task_status_counter = Counter(task_status_qs)
-        # Map task status values to display names
-        task_status_mapping = {
-            'pending': 'Pending',
-            'in_progress': 'In Progress',
-            'completed': 'Completed',
-            'overdue': 'Overdue'
-        }
-        task_status_chart = {}
-        for status, count in task_status_counter.items():
-            display_name = task_status_mapping.get(status, status.title())
-            task_status_chart[display_name] = count
-        context['task_status_chart'] = task_status_chart or {'Pending': 0, 'In Progress': 0, 'Completed': 0, 'Overdue': 0}
+        context['recent_tasks'] = task_qs.filter(task_period_q).order_by('-id')[:2]
         
         # Period filter context
-        context['available_years'] = years
-        context['available_months'] = months
-        context['selected_years'] = selected_years
-        context['selected_months'] = selected_months
-        context['filter_all'] = filter_all
+        context.update(period.context())
 
         return context
 
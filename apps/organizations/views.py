@@ -201,10 +201,14 @@ class OrganizationDashboardView(LoginRequiredMixin, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
         user_organizations = Organization.objects.filter(users=self.request.user)
+        counts = user_organizations.aggregate(
+            total=Count('pk', distinct=True),
+            active=Count('pk', filter=Q(is_active=True), distinct=True),
+        )
         context.update({
             'organizations': user_organizations,
-            'total_organizations': user_organizations.count(),
-            'active_organizations': user_organizations.filter(is_active=True).count(),
+            'total_organizations': counts['total'],
+            'active_organizations': counts['active'],
             'recent_activities': self.get_recent_activities(user_organizations)
         })
         return context
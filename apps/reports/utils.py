@@ -1,10 +1,12 @@
 """Helpers for report views — date parsing and queryset filters."""
 from __future__ import annotations
 
-from datetime import datetime
+from datetime import datetime, timedelta
 
 from django.utils.dateparse import parse_date
 
+from core.periods import range_q
+
 
 def parse_report_date_filters(request):
     """
@@ -26,9 +28,17 @@ def parse_report_date_filters(request):
 
 
 def apply_date_filter(qs, field_name: str, filters: dict):
-    """Apply start/end date filters to a queryset when values are present."""
-    if filters.get('start_date'):
-        qs = qs.filter(**{f'{field_name}__gte': filters['start_date']})
-    if filters.get('end_date'):
-        qs = qs.filter(**{f'{field_name}__lte': filters['end_date']})
-    return qs
+    """
+    Apply start/end date filters to a queryset when values are present.
+
+    Both dates are inclusive. The end is turned into an exclusive bound on the
+    following day so datetime columns keep rows from the whole end date, and
+    the comparison stays on the raw column so it can use an index.
+    """
+    start = parse_date(filters['start_date']) if filters.get('start_date') else None
+    end = parse_date(filters['end_date']) if filters.get('end_date') else None
+    if start is None and end is None:
+        return qs
+    if end is not None:
+        end += timedelta(days=1)
+    return qs.filter(range_q(field_name, qs.model, start, end))
@@ -0,0 +1,149 @@
+"""
+Management command to benchmark bulk risk scoring.
+
+Inside a tenant (``--organization``) and a transaction that is rolled back,
+creates ``--risks`` register risks (default 100,000) with stale scores and
+levels, then measures:
+
+- the previous approach, ``save()`` plus ``log_change`` per risk, on a
+  ``--sample`` of them, extrapolated to the whole register
+- ``risk_scorer.recalculate_register``: batched UPDATEs banded by the active
+  risk matrix, and the number of audit entries written
+
+When the tenant has an audit objective, the same is done for audit risks
+(``risk_scorer.recalculate_audit_risks``) under that objective.
+"""
+
+import random
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django_tenants.utils import tenant_context
+
+from core.models import AuditLog
+from core.signals import log_change
+from organizations.models import Organization
+from risk.scoring import risk_scorer
+
+
+class Rollback(Exception):
+    pass
+
+
+class Command(BaseCommand):
+    help = 'Benchmark bulk risk score recalculation against per-row saves'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            type=int,
+            required=True,
+            help='Tenant to run the benchmark in (rolled back)'
+        )
+        parser.add_argument(
+            '--risks',
+            type=int,
+            default=100000,
+            help='Risks to generate per register (default: 100000)'
+        )
+        parser.add_argument(
+            '--sample',
+            type=int,
+            default=1000,
+            help='Risks saved one by one for the per-row baseline (default: 1000)'
+        )
+
+    def handle(self, *args, **options):
+        organization = Organization.objects.filter(pk=options['organization']).first()
+        if organization is None:
+            raise CommandError(f'Organization with ID {options["organization"]} not found')
+
+        self.rng = random.Random(50)
+        with tenant_context(organization):
+            try:
+                with transaction.atomic():
+                    self._register(organization, options['risks'], options['sample'])
+                    self._audit(organization, options['risks'], options['sample'])
+                    raise Rollback
+            except Rollback:
+                pass
+
+    def _report(self, label, risks, count, sample, recalculate):
+        rows = list(risks.order_by('?')[:sample])
+        started = time.perf_counter()
+        for risk in rows:
+            risk.save()
+            log_change(risk, 'update')
+        per_row = (time.perf_counter() - started) / max(len(rows), 1)
+        self.stdout.write(
+            f'{label}: save() per risk {per_row * 1000:.2f} ms -> ~{per_row * count:.0f}s for {count} risks'
+        )
+
+        logged = AuditLog.objects.count()
+        started = time.perf_counter()
+        updated = recalculate()
+        elapsed = time.perf_counter() - started
+        self.stdout.write(
+            f'{label}: bulk {elapsed:.2f}s for {updated} risks ({updated / elapsed:.0f} risks/s), '
+            f'{AuditLog.objects.count() - logged} audit entries'
+        )
+        started = time.perf_counter()
+        unchanged = recalculate()
+        self.stdout.write(f'{label}: second pass {time.perf_counter() - started:.2f}s, {unchanged} risks rewritten')
+
+    def _register(self, organization, count, sample):
+        from risk.models import Risk, RiskMatrixConfig, RiskRegister
+
+        if not RiskMatrixConfig.objects.filter(organization=organization, is_active=True).exists():
+            RiskMatrixConfig.objects.create(organization=organization)
+        register = RiskRegister.objects.create(
+            organization=organization, register_name='Scoring benchmark', register_period='2025',
+        )
+        scores = range(1, 6)
+        started = time.perf_counter()
+        Risk.objects.bulk_create(
+            (
+                Risk(
+                    organization=organization, risk_register=register, code=f'B{n}', risk_name=f'Benchmark risk {n}',
+                    inherent_impact_score=self.rng.choice(scores), inherent_likelihood_score=self.rng.choice(scores),
+                    residual_impact_score=self.rng.choice(scores), residual_likelihood_score=self.rng.choice(scores),
+                )
+                for n in range(count)
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(f'register: {count} risks created in {time.perf_counter() - started:.1f}s')
+        self._report(
+            'register', Risk.objects.filter(risk_register=register), count, sample,
+            lambda: risk_scorer.recalculate_register(organization),
+        )
+
+    def _audit(self, organization, count, sample):
+        from audit.models import Objective, Risk
+
+        objective = Objective.objects.filter(organization=organization).first()
+        if objective is None:
+            self.stdout.write('audit: no audit objective in this organization, skipped')
+            return
+        scale = range(1, 4)
+        started = time.perf_counter()
+        # Residual scores left empty, which Risk.save() and the bulk path fill in
+        Risk.objects.bulk_create(
+            (
+                Risk(
+                    organization=organization, objective=objective, title=f'Benchmark risk {n}',
+                    likelihood=likelihood, impact=impact, control_effectiveness=self.rng.choice(scale),
+                    inherent_risk_score=likelihood * impact, residual_risk_score=0,
+                )
+                for n, (likelihood, impact) in enumerate(
+                    (self.rng.choice(scale), self.rng.choice(scale)) for _ in range(count)
+                )
+            ),
+            batch_size=5000,
+        )
+        self.stdout.write(f'audit: {count} risks created in {time.perf_counter() - started:.1f}s')
+        self._report(
+            'audit', Risk.objects.filter(objective=objective), count, sample,
+            lambda: risk_scorer.recalculate_audit_risks(organization),
+        )
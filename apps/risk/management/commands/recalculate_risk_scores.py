@@ -0,0 +1,40 @@
+"""
+Management command to recalculate stored risk scores and levels.
+
+Rescores register risks against the active risk matrix and audit risks
+from likelihood, impact and control effectiveness, for one organization
+(``--organization``) or every tenant. Only risks whose stored values are
+out of date are written, in batches of ``RISK_SCORING_BATCH_SIZE`` with one
+audit log entry per batch. Run it once after deploying stored risk levels;
+matrix changes are picked up automatically afterwards.
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django_tenants.utils import tenant_context
+
+from core.tasks import tenant_organizations
+from risk.scoring import risk_scorer
+
+
+class Command(BaseCommand):
+    help = 'Recalculate register and audit risk scores and levels in bulk'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--organization',
+            type=int,
+            help='Only recalculate this organization (ID)'
+        )
+
+    def handle(self, *args, **options):
+        organizations = tenant_organizations(options['organization'])
+        if options['organization'] is not None and not organizations.exists():
+            raise CommandError(f'Organization with ID {options["organization"]} not found')
+
+        for organization in organizations:
+            with tenant_context(organization):
+                register = risk_scorer.recalculate_register(organization)
+                audit = risk_scorer.recalculate_audit_risks(organization)
+                self.stdout.write(self.style.SUCCESS(
+                    f'{organization.name}: {register} register risks, {audit} audit risks rescored'
+                ))
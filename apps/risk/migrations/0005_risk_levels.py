@@ -0,0 +1,30 @@
+# Generated by Django 5.1.14 on 2026-10-18 23:35
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('organizations', '0002_initial'),
+        ('risk', '0004_objective_risk_objectives_and_more'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='risk',
+            name='inherent_risk_level',
+            field=models.CharField(blank=True, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('very_high', 'Very High'), ('critical', 'Critical')], editable=False, max_length=10, verbose_name='Inherent Risk Level'),
+        ),
+        migrations.AddField(
+            model_name='risk',
+            name='residual_risk_level',
+            field=models.CharField(blank=True, choices=[('low', 'Low'), ('medium', 'Medium'), ('high', 'High'), ('very_high', 'Very High'), ('critical', 'Critical')], editable=False, max_length=10, verbose_name='Residual Risk Level'),
+        ),
+        migrations.AddIndex(
+            model_name='risk',
+            index=models.Index(fields=['organization', 'residual_risk_level'], name='risk_risk_organiz_a6f063_idx'),
+        ),
+    ]
@@ -35,4 +35,12 @@ STATUS_CHOICES = [
     ('in-progress', 'In Progress'),
     ('closed', 'Closed'),
     ('archived', 'Archived'),
-] 
\ No newline at end of file
+]
+
+RISK_LEVEL_CHOICES = [
+    ('low', 'Low'),
+    ('medium', 'Medium'),
+    ('high', 'High'),
+    ('very_high', 'Very High'),
+    ('critical', 'Critical'),
+]
@@ -11,7 +11,8 @@ from .risk_register import RiskRegister
 from .risk_matrix import RiskMatrixConfig
 from common.constants import RISK_CATEGORY_CHOICES
 from .choices import (
-    RISK_RESPONSE_CHOICES, CONTROL_STATUS_CHOICES, CONTROL_RATING_CHOICES, ACTION_PLAN_STATUS_CHOICES, STATUS_CHOICES
+    RISK_RESPONSE_CHOICES, CONTROL_STATUS_CHOICES, CONTROL_RATING_CHOICES, ACTION_PLAN_STATUS_CHOICES, STATUS_CHOICES,
+    RISK_LEVEL_CHOICES
 )
 from .objective import Objective
 
@@ -40,6 +41,8 @@ class Risk(OrganizationOwnedModel, AuditableModel):
     residual_impact_score = models.IntegerField(default=3, validators=[MinValueValidator(1), MaxValueValidator(5)], verbose_name="Residual Impact Score")
     residual_likelihood_score = models.IntegerField(default=3, validators=[MinValueValidator(1), MaxValueValidator(5)], verbose_name="Residual Likelihood Score")
     residual_risk_score = models.IntegerField(editable=False, verbose_name="Residual Risk Score", default=1)
+    inherent_risk_level = models.CharField(max_length=10, choices=RISK_LEVEL_CHOICES, blank=True, editable=False, verbose_name="Inherent Risk Level")
+    residual_risk_level = models.CharField(max_length=10, choices=RISK_LEVEL_CHOICES, blank=True, editable=False, verbose_name="Residual Risk Level")
     risk_response_strategy = models.CharField(max_length=20, choices=RISK_RESPONSE_CHOICES, default='mitigate', verbose_name="Risk Response Strategy")
     risk_appetite = models.IntegerField(default=15, verbose_name="Risk Appetite")
     controls_description = CKEditor5Field('Controls', config_name='extends', blank=True, null=True)
@@ -76,11 +79,16 @@ class Risk(OrganizationOwnedModel, AuditableModel):
             models.Index(fields=['status']),
             models.Index(fields=['risk_owner']),
             models.Index(fields=['date_identified']),
+            models.Index(fields=['organization', 'residual_risk_level']),
         ]
 
     def save(self, *args, **kwargs):
         self.inherent_risk_score = self.calculate_inherent_risk()
         self.residual_risk_score = self.calculate_residual_risk()
+        # Levels are stored so that a matrix change can re-band the register in bulk (risk.scoring)
+        matrix_config = self.get_matrix_config
+        self.inherent_risk_level = matrix_config.get_risk_level(self.inherent_risk_score) if matrix_config else ''
+        self.residual_risk_level = matrix_config.get_risk_level(self.residual_risk_score) if matrix_config else ''
         self.check_action_due()
         super().save(*args, **kwargs)
 
@@ -142,13 +150,15 @@ class Risk(OrganizationOwnedModel, AuditableModel):
         return self.residual_impact_score * self.residual_likelihood_score
 
     def get_risk_level(self):
+        if self.residual_risk_level:
+            return self.residual_risk_level
         risk_score = self.residual_risk_score
         matrix_config = self.get_matrix_config
         return matrix_config.get_risk_level(risk_score) if matrix_config else None
 
     @cached_property
     def get_matrix_config(self):
-        return RiskMatrixConfig.objects.filter(organization=self.organization, is_active=True).first()
+        return RiskMatrixConfig.objects.filter(organization_id=self.organization_id, is_active=True).first()
 
     def is_within_appetite(self):
         return self.residual_risk_score <= self.risk_appetite
@@ -0,0 +1,145 @@
+# apps/risk/scoring.py
+"""
+Bulk risk scoring.
+
+Recalculating a register after a matrix or control change used to load every
+risk and call ``save()`` on it, each save writing its own audit log entry
+(and, for audit risks, a revision and a history row). ``RiskScorer`` has the
+database compute the new scores and levels instead: one UPDATE per batch of
+risks whose stored values are out of date, with a single summary audit entry
+per batch.
+
+- ``risk.Risk`` (the ERM register): inherent/residual scores are
+  impact × likelihood, levels are banded with a ``CASE`` over the
+  thresholds of the organization's active ``RiskMatrixConfig``.
+- ``audit.Risk`` (3x3 audit matrix): as in ``Risk.save``, scores entered by
+  hand are kept. The stored inherent score is never 0 (a check constraint
+  keeps it in 1-9), so only a residual score that is missing or above the
+  inherent one is recalculated from control effectiveness
+  (``Risk.calculate_residual``).
+"""
+
+import logging
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Case, F, PositiveSmallIntegerField, Q, Value, When
+from django.db.models.lookups import LessThanOrEqual
+from django.utils import timezone
+
+from core import chart_cache
+from core.signals import log_change
+
+logger = logging.getLogger(__name__)
+
+# Ordered bands of RiskMatrixConfig, as in RiskMatrixConfig.get_risk_level
+LEVEL_THRESHOLDS = (
+    ('low', 'low_threshold'),
+    ('medium', 'medium_threshold'),
+    ('high', 'high_threshold'),
+    ('very_high', 'very_high_threshold'),
+)
+
+# Audit risks are scored on a 3x3 matrix with controls rated 1-3
+AUDIT_SCALE = range(1, 4)
+INHERENT_SCALE = range(1, 10)  # risk_score_range_risk
+
+
+class RiskScorer:
+    """Recalculate stored risk scores and levels with set-based updates."""
+
+    def __init__(self, batch_size=None):
+        self.batch_size = batch_size or getattr(settings, 'RISK_SCORING_BATCH_SIZE', 5000)
+
+    @staticmethod
+    def level_case(matrix, score):
+        """SQL expression giving the level of ``score`` in ``matrix`` ('' without a matrix)."""
+        if matrix is None:
+            return Value('')
+        return Case(
+            *[
+                When(LessThanOrEqual(score, getattr(matrix, threshold)), then=Value(level))
+                for level, threshold in LEVEL_THRESHOLDS
+            ],
+            default=Value('critical'),
+        )
+
+    def register_values(self, matrix):
+        inherent = F('inherent_impact_score') * F('inherent_likelihood_score')
+        residual = F('residual_impact_score') * F('residual_likelihood_score')
+        return {
+            'inherent_risk_score': inherent,
+            'residual_risk_score': residual,
+            'inherent_risk_level': self.level_case(matrix, inherent),
+            'residual_risk_level': self.level_case(matrix, residual),
+        }
+
+    def audit_values(self):
+        from audit.models import Risk
+
+        # The scale is small enough to spell out Risk.save() as a lookup
+        residual = Case(
+            *[
+                When(
+                    Q(inherent_risk_score=score, control_effectiveness=effectiveness)
+                    & (Q(residual_risk_score=0) | Q(residual_risk_score__gt=score)),
+                    then=Value(Risk.calculate_residual(score, effectiveness)),
+                )
+                for score in INHERENT_SCALE for effectiveness in AUDIT_SCALE
+            ],
+            default=F('residual_risk_score'),
+            output_field=PositiveSmallIntegerField(),
+        )
+        return {'residual_risk_score': residual}
+
+    def recalculate(self, risks, values, organization, user=None):
+        """
+        Write ``values`` (field -> expression) to the ``risks`` that differ from
+        them. Returns the number of risks updated.
+        """
+        model = risks.model
+        stale = Q()
+        for field, expression in values.items():
+            stale |= ~Q(**{field: expression})
+        risk_ids = list(risks.filter(stale).order_by('pk').values_list('pk', flat=True))
+
+        now = timezone.now()
+        for start in range(0, len(risk_ids), self.batch_size):
+            batch = risk_ids[start:start + self.batch_size]
+            with transaction.atomic():
+                updated = risks.filter(pk__in=batch).update(**values, updated_at=now)
+                # One consolidated audit entry replaces the per-row post_save logging
+                log_change(organization, 'update', user=user, changes={
+                    'risk_scores': {
+                        'model': model._meta.label,
+                        'updated': updated,
+                        'first_id': batch[0],
+                        'last_id': batch[-1],
+                    },
+                })
+        if risk_ids:
+            chart_cache.invalidate(model, organization.pk)
+            logger.info(f"Rescored {len(risk_ids)} {model._meta.label} risks for organization {organization.pk}")
+        return len(risk_ids)
+
+    def recalculate_register(self, organization, risk_ids=None, user=None):
+        """Rescore the organization's register risks against its active matrix."""
+        from .models import Risk, RiskMatrixConfig
+
+        matrix = RiskMatrixConfig.objects.filter(organization=organization, is_active=True).first()
+        risks = Risk.objects.filter(organization=organization)
+        if risk_ids is not None:
+            risks = risks.filter(pk__in=risk_ids)
+        return self.recalculate(risks, self.register_values(matrix), organization, user)
+
+    def recalculate_audit_risks(self, organization, risk_ids=None, user=None):
+        """Rescore the organization's audit risks from likelihood, impact and controls."""
+        from audit.models import Risk
+
+        risks = Risk.objects.filter(organization=organization)
+        if risk_ids is not None:
+            risks = risks.filter(pk__in=risk_ids)
+        return self.recalculate(risks, self.audit_values(), organization, user)
+
+
+risk_scorer = RiskScorer()
@@ -1,6 +1,7 @@
+from django.db import transaction
 from django.db.models.signals import post_save, post_delete
 from django.dispatch import receiver
-from .models import Risk, Control
+from .models import Risk, Control, RiskMatrixConfig
 
 @receiver(post_save, sender=Risk)
 def risk_post_save(sender, instance, created, **kwargs):
@@ -23,4 +24,12 @@ def control_post_save(sender, instance, created, **kwargs):
 @receiver(post_delete, sender=Control)
 def control_post_delete(sender, instance, **kwargs):
     # TODO: Implement audit logging or notifications
-    pass 
\ No newline at end of file
+    pass
+
+@receiver(post_save, sender=RiskMatrixConfig)
+@receiver(post_delete, sender=RiskMatrixConfig)
+def risk_matrix_changed(sender, instance, **kwargs):
+    # Stored risk levels follow the active matrix; re-band the register in bulk
+    from .tasks import recalculate_register_scores
+    organization_id = instance.organization_id
+    transaction.on_commit(lambda: recalculate_register_scores.delay(organization_id=organization_id), robust=True)
@@ -0,0 +1,27 @@
+# apps/risk/tasks.py
+
+from celery import shared_task
+from django_tenants.utils import tenant_context
+
+from core.tasks import tenant_organizations
+from .scoring import risk_scorer
+
+
+@shared_task
+def recalculate_register_scores(risk_ids=None, organization_id=None):
+    """
+    Recalculate register risk scores and levels in bulk.
+    Queued when a risk matrix changes so that stored levels follow its thresholds.
+
+    Args:
+        risk_ids (list): IDs of the risks to recalculate (default: all)
+        organization_id (int): Limit to one organization (default: every tenant);
+            required with ``risk_ids``, which are only unique within a tenant
+    """
+    if risk_ids is not None and organization_id is None:
+        raise ValueError('risk_ids need an organization_id')
+    results = {}
+    for organization in tenant_organizations(organization_id):
+        with tenant_context(organization):
+            results[organization.pk] = risk_scorer.recalculate_register(organization, risk_ids)
+    return results
@@ -0,0 +1,109 @@
+# apps/risk/tests/test_scoring.py
+
+from unittest import mock
+
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+
+from audit.models import AuditWorkplan, Engagement, Objective
+from audit.models import Risk as AuditRisk
+from audit.tasks import recalculate_risk_scores
+
+from core.models import AuditLog
+from risk.models import Risk, RiskMatrixConfig, RiskRegister
+from risk.scoring import RiskScorer, risk_scorer
+
+
+class RiskScorerTests(TenantTestCase):
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Scoring Org'
+        tenant.code = 'SCORING'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        self.matrix = RiskMatrixConfig.objects.create(organization=self.tenant)
+        register = RiskRegister.objects.create(organization=self.tenant, register_name='ERM', register_period='2025')
+        self.risks = [
+            Risk.objects.create(
+                organization=self.tenant, risk_register=register, code=f'R{n}',
+                inherent_impact_score=impact, inherent_likelihood_score=likelihood,
+                residual_impact_score=2, residual_likelihood_score=2,
+            )
+            for n, (impact, likelihood) in enumerate([(1, 2), (3, 4), (5, 5)])
+        ]
+
+    def test_save_stores_matrix_levels(self):
+        self.assertEqual(
+            [(risk.inherent_risk_level, risk.residual_risk_level) for risk in self.risks],
+            [('low', 'low'), ('high', 'low'), ('critical', 'low')],
+        )
+
+    def test_bulk_rescoring_matches_save_with_one_audit_entry_per_batch(self):
+        Risk.objects.update(inherent_risk_score=1, residual_risk_score=1, inherent_risk_level='', residual_risk_level='')
+        logged = AuditLog.objects.count()
+        self.assertEqual(RiskScorer(batch_size=2).recalculate_register(self.tenant), 3)
+        self.assertEqual(AuditLog.objects.count() - logged, 2)
+
+        for risk in self.risks:
+            expected = (risk.inherent_risk_score, risk.residual_risk_score, risk.inherent_risk_level, risk.residual_risk_level)
+            risk.refresh_from_db()
+            self.assertEqual(
+                (risk.inherent_risk_score, risk.residual_risk_score, risk.inherent_risk_level, risk.residual_risk_level),
+                expected,
+            )
+        self.assertEqual(risk_scorer.recalculate_register(self.tenant), 0)
+
+    def test_matrix_change_rebands_the_register(self):
+        with mock.patch('risk.tasks.recalculate_register_scores.delay') as delay:
+            with self.captureOnCommitCallbacks(execute=True):
+                self.matrix.low_threshold = 3
+                self.matrix.medium_threshold = 4
+                self.matrix.save()
+        delay.assert_called_once_with(organization_id=self.tenant.pk)
+
+        self.assertEqual(risk_scorer.recalculate_register(self.tenant), 3)
+        self.assertEqual(
+            list(Risk.objects.order_by('code').values_list('inherent_risk_level', 'residual_risk_level')),
+            [('low', 'medium'), ('high', 'medium'), ('critical', 'medium')],
+        )
+
+    def test_audit_rescoring_keeps_scores_entered_by_hand(self):
+        workplan = AuditWorkplan.objects.create(organization=self.tenant, code='WP-1', name='Plan', fiscal_year=2025)
+        engagement = Engagement.objects.create(
+            organization=self.tenant, code='ENG-1', annual_workplan=workplan, title='Payroll',
+            project_start_date=timezone.localdate(),
+        )
+        objective = Objective.objects.create(organization=self.tenant, engagement=engagement, title='Accuracy')
+        stale = {}
+        for n, (likelihood, impact, effectiveness, inherent, residual) in enumerate([
+            (3, 3, 3, 5, 2),  # entered by hand: kept
+            (3, 3, 3, 9, 0),  # missing residual
+            (2, 3, 2, 4, 7),  # residual above the inherent score
+            (3, 2, 3, 6, 2),
+        ]):
+            risk = AuditRisk.objects.create(
+                organization=self.tenant, objective=objective, title=f'Risk {n}',
+                likelihood=likelihood, impact=impact, control_effectiveness=effectiveness,
+            )
+            stale[risk.pk] = {'inherent_risk_score': inherent, 'residual_risk_score': residual}
+
+        def restore():
+            for pk, scores in stale.items():
+                AuditRisk.objects.filter(pk=pk).update(**scores)
+
+        restore()
+        for risk in AuditRisk.objects.all():
+            risk.save()
+        expected = dict(AuditRisk.objects.values_list('pk', 'residual_risk_score'))
+        expected_inherent = dict(AuditRisk.objects.values_list('pk', 'inherent_risk_score'))
+        self.assertEqual(expected_inherent[min(stale)], 5)
+
+        restore()
+        self.assertEqual(risk_scorer.recalculate_audit_risks(self.tenant), 2)
+        self.assertEqual(dict(AuditRisk.objects.values_list('pk', 'residual_risk_score')), expected)
+        self.assertEqual(dict(AuditRisk.objects.values_list('pk', 'inherent_risk_score')), expected_inherent)
+
+    def test_risk_ids_need_an_organization(self):
+        with self.assertRaises(ValueError):
+            recalculate_risk_scores(risk_ids=[self.risks[0].pk])
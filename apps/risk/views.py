@@ -11,6 +11,9 @@ from django_scopes import scope
 from core.mixins.permissions import OrganizationPermissionMixin
 from django.http import JsonResponse, HttpResponse
 from django.db.models import Count, Q, Max, Avg
+from core.dashboard import DashboardMetrics
+from core.chart_cache import chart_cache
+from core.periods import PeriodFilter
 from django.db import models
 from django.utils import timezone
 from rest_framework.decorators import api_view, permission_classes
@@ -558,6 +561,21 @@ class RiskAssessmentDeleteView(OrganizationPermissionMixin, LoginRequiredMixin,
 def get_active_matrix_config(org):
     return RiskMatrixConfig.objects.filter(organization=org, is_active=True).first()
 
+def _risk_level_band_filters(matrix):
+    """Return (low_q, medium_q, high_q) filters on residual_risk_score.
+
+    Database-side equivalent of ``_bucket_risk_levels``: the bands come from
+    the active matrix thresholds, or the default 5/10 thresholds when no
+    matrix is configured.
+    """
+    low_threshold = matrix.low_threshold if matrix else 5
+    medium_threshold = matrix.medium_threshold if matrix else 10
+    return (
+        Q(residual_risk_score__lte=low_threshold),
+        Q(residual_risk_score__gt=low_threshold, residual_risk_score__lte=medium_threshold),
+        Q(residual_risk_score__gt=medium_threshold),
+    )
+
 # Helper: collapse detailed risk levels into Low/Medium/High buckets
 def _bucket_risk_levels(risks, matrix):
     """Return tuple (low_count, medium_count, high_count).
@@ -600,48 +618,16 @@ class RiskDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, ListVie
         context = super().get_context_data(**kwargs)
         org = self.request.organization
         # --- Period Filter Logic (aligned with Audit) ---
-        from django.utils import timezone
-        import calendar
-        from django.db.models import Q
-        org_created = getattr(org, 'created_at', timezone.now()).date()
-        today = timezone.now().date()
-        years = list(range(org_created.year, today.year + 1))
-        months = [(i, calendar.month_name[i]) for i in range(1, 13)]
-        selected_years = self.request.GET.getlist('year') or [str(today.year)]
-        selected_months = self.request.GET.getlist('month')
-        filter_all = 'All' in selected_years
-        year_ints = [int(y) for y in selected_years if y.isdigit()]
-        month_ints = [int(m) for m in selected_months if m.isdigit()]
+        period = PeriodFilter.from_request(self.request, org)
         selected_register = self.request.GET.get('register')
         riskregisters = RiskRegister.objects.filter(organization=org)
-        risks = Risk.objects.filter(organization=org)
-        if not filter_all:
-            q = Q(date_identified__year__in=year_ints)
-            if month_ints:
-                q &= Q(date_identified__month__in=month_ints)
-            risks = risks.filter(q)
+        risks = period.filter(Risk.objects.filter(organization=org), 'date_identified')
         if selected_register:
             risks = risks.filter(risk_register_id=selected_register)
-        controls = Control.objects.filter(organization=org)
-        if not filter_all:
-            cq = Q()
-            # Prefer review dates for period where available
-            cq |= Q(last_review_date__year__in=year_ints)
-            if month_ints:
-                cq &= Q(last_review_date__month__in=month_ints)
-            controls = controls.filter(cq)
-        kris = KRI.objects.filter(risk__organization=org)
-        if not filter_all:
-            kq = Q(timestamp__year__in=year_ints)
-            if month_ints:
-                kq &= Q(timestamp__month__in=month_ints)
-            kris = kris.filter(kq)
-        assessments = RiskAssessment.objects.filter(risk__organization=org)
-        if not filter_all:
-            aq = Q(assessment_date__year__in=year_ints)
-            if month_ints:
-                aq &= Q(assessment_date__month__in=month_ints)
-            assessments = assessments.filter(aq)
+        # Prefer review dates for period where available
+        controls = period.filter(Control.objects.filter(organization=org), 'last_review_date')
+        kris = period.filter(KRI.objects.filter(risk__organization=org), 'timestamp')
+        assessments = period.filter(RiskAssessment.objects.filter(risk__organization=org), 'assessment_date')
         matrix = get_active_matrix_config(org)
         
         # COBIT Data
@@ -659,108 +645,78 @@ class RiskDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, ListVie
         nist_threats = NISTThreat.objects.filter(organization=org)
         nist_incidents = NISTIncident.objects.filter(organization=org)
         
-        # Advanced analytics
-        from collections import Counter
-        # Risks by category
-        category_dist = risks.values_list('category', flat=True)
-        # Risks by status
-        status_dist = risks.values_list('status', flat=True)
-        # Risks by owner
-        owner_dist = risks.values_list('risk_owner', flat=True)
-        # Risks by register
-        register_dist = risks.values_list('risk_register__register_name', flat=True)
-        # KRI status breakdown
-        kri_status_dist = [kri.get_status() for kri in kris]
-        # Control effectiveness
-        control_effectiveness_dist = controls.values_list('effectiveness_rating', flat=True)
-        
-        # COBIT Analytics
-        cobit_domain_dist = cobit_domains.values_list('domain_code', flat=True)
-        cobit_capability_maturity_dist = cobit_capabilities.values_list('current_maturity', flat=True)
-        cobit_control_status_dist = cobit_controls.values_list('implementation_status', flat=True)
+        metrics = DashboardMetrics()
+        low_q, medium_q, high_q = _risk_level_band_filters(matrix)
+        risk_metrics = metrics.source(risks)
+        risk_metrics.count('total_risks')
+        risk_metrics.count('low_risks', low_q)
+        risk_metrics.count('medium_risks', medium_q)
+        risk_metrics.count('high_risks', high_q)
+        risk_metrics.histogram('risk_category_dist', 'category')
+        risk_metrics.histogram('risk_status_dist', 'status')
+        risk_metrics.histogram('risk_owner_dist', 'risk_owner')
+        risk_metrics.histogram('risk_register_dist', 'risk_register__register_name')
+        risk_metrics.date_histogram('risk_trend', 'date_identified', 'month', format='%Y-%m')
+        control_metrics = metrics.source(controls)
+        control_metrics.count('total_controls')
+        control_metrics.histogram('control_effectiveness_dist', 'effectiveness_rating')
+        metrics.source(kris).count('total_kris')
+        assessment_metrics = metrics.source(assessments)
+        assessment_metrics.count('total_assessments')
+        assessment_metrics.count(
+            'recent_activity_count', Q(assessment_date__gte=timezone.now() - timezone.timedelta(days=7))
+        )
         
-        # NIST Analytics
-        nist_function_dist = nist_functions.values_list('function_code', flat=True)
-        nist_category_dist = nist_categories.values_list('category_code', flat=True)
-        nist_threat_severity_dist = nist_threats.values_list('severity', flat=True)
-        nist_incident_status_dist = nist_incidents.values_list('status', flat=True)
+        # COBIT
+        metrics.source(cobit_domains).count('total_cobit_domains').histogram('cobit_domain_dist', 'domain_code')
+        metrics.source(cobit_processes).count('total_cobit_processes')
+        capability_metrics = metrics.source(cobit_capabilities)
+        capability_metrics.count('total_cobit_capabilities')
+        capability_metrics.count('high_maturity_capabilities', Q(current_maturity__in=[4, 5]))
+        capability_metrics.histogram('cobit_capability_maturity_dist', 'current_maturity')
+        cobit_control_metrics = metrics.source(cobit_controls)
+        cobit_control_metrics.count('total_cobit_controls')
+        cobit_control_metrics.count('active_cobit_controls', Q(implementation_status='fully_implemented'))
+        cobit_control_metrics.histogram('cobit_control_status_dist', 'implementation_status')
+        cobit_control_metrics.date_histogram('cobit_trend', 'created_at', 'month', format='%Y-%m')
+        metrics.source(cobit_governance).count('total_cobit_governance')
         
-        # Always provide valid structures for charting, even if empty
-        context['risk_category_dist'] = dict(Counter(category_dist)) or {}
-        context['risk_status_dist'] = dict(Counter(status_dist)) or {}
-        context['risk_owner_dist'] = dict(Counter(owner_dist)) or {}
-        context['risk_register_dist'] = dict(Counter(register_dist)) or {}
-        context['kri_status_dist'] = dict(Counter(kri_status_dist)) or {}
-        context['control_effectiveness_dist'] = dict(Counter(control_effectiveness_dist)) or {}
+        # NIST
+        metrics.source(nist_functions).count('total_nist_functions').histogram('nist_function_dist', 'function_code')
+        metrics.source(nist_categories).count('total_nist_categories').histogram('nist_category_dist', 'category_code')
+        metrics.source(nist_subcategories).count('total_nist_subcategories')
+        metrics.source(nist_implementations).count('total_nist_implementations')
+        threat_metrics = metrics.source(nist_threats)
+        threat_metrics.count('total_nist_threats')
+        threat_metrics.count('high_severity_threats', Q(severity__in=['high', 'critical']))
+        threat_metrics.histogram('nist_threat_severity_dist', 'severity')
+        incident_metrics = metrics.source(nist_incidents)
+        incident_metrics.count('total_nist_incidents')
+        incident_metrics.count('open_incidents', Q(status='detected'))
+        incident_metrics.histogram('nist_incident_status_dist', 'status')
+        incident_metrics.date_histogram('nist_trend', 'detected_date', 'month', format='%Y-%m')
         
-        # COBIT distributions
-        context['cobit_domain_dist'] = dict(Counter(cobit_domain_dist)) or {}
-        context['cobit_capability_maturity_dist'] = dict(Counter(cobit_capability_maturity_dist)) or {}
-        context['cobit_control_status_dist'] = dict(Counter(cobit_control_status_dist)) or {}
+        results = metrics.evaluate()
+        # Trends are rendered as lists of {'month', 'count'}
+        for trend in ('risk_trend', 'cobit_trend', 'nist_trend'):
+            results[trend] = [{'month': month, 'count': count} for month, count in results[trend].items()]
+        context.update(results)
+        context['high_critical_risks'] = results['high_risks']  # maintain existing key semantics
         
-        # NIST distributions
-        context['nist_function_dist'] = dict(Counter(nist_function_dist)) or {}
-        context['nist_category_dist'] = dict(Counter(nist_category_dist)) or {}
-        context['nist_threat_severity_dist'] = dict(Counter(nist_threat_severity_dist)) or {}
-        context['nist_incident_status_dist'] = dict(Counter(nist_incident_status_dist)) or {}
-        
-        # Risk trend: always a list
-        from django.db.models.functions import TruncMonth
-        risk_trend = risks.annotate(month=TruncMonth('date_identified')).values('month').annotate(count=Count('id')).order_by('month')
-        context['risk_trend'] = [{'month': r['month'].strftime('%Y-%m') if r['month'] else '', 'count': r['count']} for r in risk_trend] if risk_trend else []
-        
-        # COBIT trend
-        cobit_trend = cobit_controls.annotate(month=TruncMonth('created_at')).values('month').annotate(count=Count('id')).order_by('month')
-        context['cobit_trend'] = [{'month': r['month'].strftime('%Y-%m') if r['month'] else '', 'count': r['count']} for r in cobit_trend] if cobit_trend else []
-        
-        # NIST trend
-        nist_trend = nist_incidents.annotate(month=TruncMonth('detected_date')).values('month').annotate(count=Count('id')).order_by('month')
-        context['nist_trend'] = [{'month': r['month'].strftime('%Y-%m') if r['month'] else '', 'count': r['count']} for r in nist_trend] if nist_trend else []
+        # KRI status breakdown (status is computed from the KRI's own thresholds)
+        from collections import Counter
+        context['kri_status_dist'] = dict(Counter(kri.get_status() for kri in kris)) or {}
         
         # Debug output for troubleshooting
         import json
         context['risk_trend_debug'] = json.dumps(context['risk_trend'], indent=2)
 
         # Period filter context for template
-        context['available_years'] = years
-        context['available_months'] = months
-        context['selected_years'] = selected_years
-        context['selected_months'] = selected_months
-        context['filter_all'] = filter_all
+        context.update(period.context())
         
         # Summary cards
         context['riskregisters'] = riskregisters
         context['selected_register'] = int(selected_register) if selected_register else None
-        context['total_risks'] = risks.count()
-        context['total_controls'] = controls.count()
-        context['total_kris'] = kris.count()
-        context['total_assessments'] = assessments.count()
-        # Three-band breakdown (High bucket aggregates very_high/critical)
-        low_c, med_c, high_c = _bucket_risk_levels(list(risks), matrix)
-        context['low_risks'] = low_c
-        context['medium_risks'] = med_c
-        context['high_risks'] = high_c
-        context['high_critical_risks'] = high_c  # maintain existing key semantics
-        context['recent_activity_count'] = assessments.filter(assessment_date__gte=timezone.now()-timezone.timedelta(days=7)).count()
-        
-        # COBIT Summary Cards
-        context['total_cobit_domains'] = cobit_domains.count()
-        context['total_cobit_processes'] = cobit_processes.count()
-        context['total_cobit_capabilities'] = cobit_capabilities.count()
-        context['total_cobit_controls'] = cobit_controls.count()
-        context['total_cobit_governance'] = cobit_governance.count()
-        context['active_cobit_controls'] = cobit_controls.filter(implementation_status='fully_implemented').count()
-        context['high_maturity_capabilities'] = cobit_capabilities.filter(current_maturity__in=[4, 5]).count()
-        
-        # NIST Summary Cards
-        context['total_nist_functions'] = nist_functions.count()
-        context['total_nist_categories'] = nist_categories.count()
-        context['total_nist_subcategories'] = nist_subcategories.count()
-        context['total_nist_implementations'] = nist_implementations.count()
-        context['total_nist_threats'] = nist_threats.count()
-        context['total_nist_incidents'] = nist_incidents.count()
-        context['high_severity_threats'] = nist_threats.filter(severity__in=['high', 'critical']).count()
-        context['open_incidents'] = nist_incidents.filter(status='detected').count()
         
         # Top risks
         context['top_risks'] = risks.order_by('-residual_risk_score')[:5]
@@ -772,7 +728,7 @@ class RiskDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, ListVie
         context['top_nist_threats'] = nist_threats.order_by('-severity')[:5]
         
         # KRI status
-        context['kris_status'] = kris.order_by('-timestamp')[:10]
+        context['kris_status'] = kris.select_related('risk').order_by('-timestamp')[:10]
         
         # Recent COBIT activity
         context['recent_cobit_activity'] = [
@@ -788,7 +744,7 @@ class RiskDashboardView(OrganizationPermissionMixin, LoginRequiredMixin, ListVie
         
         # Recent activity (simple example)
         context['recent_activity'] = [
-            f"Assessment for {a.risk.risk_name} on {a.assessment_date}" for a in assessments.order_by('-assessment_date')[:10]
+            f"Assessment for {a.risk.risk_name} on {a.assessment_date}" for a in assessments.select_related('risk').order_by('-assessment_date')[:10]
         ]
         
         context['report_links'] = [
@@ -949,6 +905,7 @@ class RiskReportsView(OrganizationPermissionMixin, LoginRequiredMixin, TemplateV
 # --- API Endpoints for Dashboard Widgets ---
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk, RiskMatrixConfig)
 def api_heatmap_data(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -983,6 +940,7 @@ def api_heatmap_data(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk, RiskAssessment)
 def api_assessment_timeline(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1010,6 +968,7 @@ def api_assessment_timeline(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk, Control, KRI, RiskAssessment, daily=True)
 def api_summary_cards(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1036,6 +995,7 @@ def api_summary_cards(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk)
 def api_top_risks(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1048,6 +1008,7 @@ def api_top_risks(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(KRI, Risk)
 def api_kri_status(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1060,6 +1021,7 @@ def api_kri_status(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk, RiskAssessment)
 def api_recent_activity(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1075,6 +1037,7 @@ def api_recent_activity(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk, RiskAssessment)
 def api_assessment_timeline_details(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1090,6 +1053,7 @@ def api_assessment_timeline_details(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk)
 def api_risk_category_distribution(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1101,6 +1065,7 @@ def api_risk_category_distribution(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk)
 def api_risk_status_distribution(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1112,6 +1077,7 @@ def api_risk_status_distribution(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Control)
 def api_control_effectiveness(request):
     org = request.organization
     controls = Control.objects.filter(organization=org)
@@ -1122,6 +1088,7 @@ def api_control_effectiveness(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(KRI)
 def api_kri_status_counts(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -1139,6 +1106,7 @@ def api_kri_status_counts(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(Risk, RiskAssessment)
 def api_assessment_type_counts(request):
     org = request.organization
     selected_register = request.GET.get('register')
@@ -2170,6 +2138,7 @@ class NISTIncidentDeleteView(OrganizationPermissionMixin, LoginRequiredMixin, De
 # --- COBIT API Endpoints for Dashboard Widgets ---
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(COBITDomain)
 def api_cobit_domain_distribution(request):
     org = request.organization
     domains = COBITDomain.objects.filter(organization=org)
@@ -2194,6 +2163,7 @@ def api_cobit_domain_distribution(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(COBITControl)
 def api_cobit_control_status(request):
     org = request.organization
     controls = COBITControl.objects.filter(organization=org)
@@ -2216,6 +2186,7 @@ def api_cobit_control_status(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(COBITCapability)
 def api_cobit_maturity_trend(request):
     org = request.organization
     from django.db.models.functions import TruncMonth
@@ -2248,6 +2219,7 @@ def api_cobit_maturity_trend(request):
 # --- NIST API Endpoints for Dashboard Widgets ---
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(NISTFunction)
 def api_nist_function_distribution(request):
     org = request.organization
     functions = NISTFunction.objects.filter(organization=org)
@@ -2272,6 +2244,7 @@ def api_nist_function_distribution(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(NISTThreat)
 def api_nist_threat_severity(request):
     org = request.organization
     threats = NISTThreat.objects.filter(organization=org)
@@ -2294,6 +2267,7 @@ def api_nist_threat_severity(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(NISTIncident)
 def api_nist_incident_timeline(request):
     org = request.organization
     from django.db.models.functions import TruncMonth
@@ -2325,6 +2299,7 @@ def api_nist_incident_timeline(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated, IsOrgManagerOrReadOnly])
+@chart_cache(COBITDomain, COBITProcess, COBITControl, NISTFunction, NISTCategory, NISTThreat, NISTIncident)
 def api_cobit_nist_summary(request):
     org = request.organization
     
@@ -1,21 +1,151 @@
 """
-Custom JWT Authentication with Access Token Blacklisting
+Custom JWT Authentication with Access Token Blacklisting and Token Versions
+
+Two ways to revoke access tokens before they expire:
+
+- one token: its ``jti`` is blacklisted in the shared cache (``blacklist_access_token``)
+- every token of a user: tokens carry a ``token_version`` claim, and raising
+  ``CustomUser.token_version`` (``bump_token_version``) makes all tokens with
+  a lower version invalid
+
+Both are read through ``RevocationState``: an in-process TTL cache in front of
+the shared cache (Redis), so most requests make no network round trip. Every
+revocation replaces a shared epoch token; each process re-reads the epoch at
+most every ``JWT_REVOCATION_POLL_INTERVAL`` seconds and drops its local
+entries when it changed, which bounds how long a revoked token stays usable
+in other processes.
 """
+import threading
+import time
+
+from django.conf import settings
 from rest_framework_simplejwt.authentication import JWTAuthentication
 from rest_framework_simplejwt.exceptions import InvalidToken, TokenError
+from rest_framework_simplejwt.settings import api_settings
 from rest_framework_simplejwt.tokens import UntypedToken
 from django.core.cache import cache
 import logging
 
 logger = logging.getLogger('users.authentication')
 
+TOKEN_VERSION_CLAIM = 'token_version'
+EPOCH_KEY = 'jwt_revocation_epoch'
+
+
+def _version_key(user_id):
+    return f"jwt_token_version:{user_id}"
+
+
+def _blacklist_key(jti):
+    return f"jwt_blacklist:{jti}"
+
+
+class LocalTTLCache:
+    """Small thread-safe in-process cache with one TTL for all entries"""
+
+    def __init__(self, ttl, max_entries=10000):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._data = {}
+        self._lock = threading.Lock()
+
+    def get(self, key, default=None):
+        entry = self._data.get(key)
+        if entry is None or entry[1] < time.monotonic():
+            return default
+        return entry[0]
+
+    def set(self, key, value):
+        with self._lock:
+            if len(self._data) >= self.max_entries:
+                # Cheaper than LRU bookkeeping on every hit; entries refill on demand
+                self._data.clear()
+            self._data[key] = (value, time.monotonic() + self.ttl)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RevocationState:
+    """Per-process view of token versions and blacklisted jtis"""
+
+    _MISSING = object()
+
+    def __init__(self, local_ttl=None, poll_interval=None):
+        self.local = LocalTTLCache(
+            local_ttl if local_ttl is not None else getattr(settings, 'JWT_REVOCATION_LOCAL_TTL', 60)
+        )
+        self.poll_interval = (
+            poll_interval if poll_interval is not None else getattr(settings, 'JWT_REVOCATION_POLL_INTERVAL', 1.0)
+        )
+        self.epoch = None
+        self._next_poll = 0.0
+
+    def lookup(self, user_id, jti=None):
+        """
+        ``(token_version, blacklisted)`` for a user and token id.
+
+        ``token_version`` is None for unknown users.
+        """
+        self._sync()
+        version = self.local.get(('version', user_id), self._MISSING)
+        blacklisted = self.local.get(('jti', jti), self._MISSING) if jti else False
+
+        missing = []
+        if version is self._MISSING:
+            missing.append(_version_key(user_id))
+        if blacklisted is self._MISSING:
+            missing.append(_blacklist_key(jti))
+        if missing:
+            # One round trip for whatever the local cache does not know
+            found = cache.get_many(missing)
+            if version is self._MISSING:
+                version = found.get(_version_key(user_id))
+                if version is None:
+                    version = self._load_version(user_id)
+                self.local.set(('version', user_id), version)
+            if blacklisted is self._MISSING:
+                blacklisted = bool(found.get(_blacklist_key(jti)))
+                self.local.set(('jti', jti), blacklisted)
+        return version, blacklisted
+
+    def broadcast(self):
+        """Make every process drop its local entries within one poll interval"""
+        self.epoch = time.time_ns()
+        cache.set(EPOCH_KEY, self.epoch, None)
+        self.local.clear()
+
+    def _sync(self):
+        now = time.monotonic()
+        if now < self._next_poll:
+            return
+        self._next_poll = now + self.poll_interval
+        epoch = cache.get(EPOCH_KEY)
+        if epoch != self.epoch:
+            self.epoch = epoch
+            self.local.clear()
+
+    def _load_version(self, user_id):
+        from django.contrib.auth import get_user_model
+
+        version = get_user_model().objects.filter(pk=user_id).values_list('token_version', flat=True).first()
+        if version is not None:
+            cache.set(_version_key(user_id), version, None)
+        return version
+
+
+revocation_state = RevocationState()
+
 
 class BlacklistedJWTAuthentication(JWTAuthentication):
     """
-    JWT Authentication that checks if access tokens are blacklisted.
+    JWT Authentication that checks if access tokens are blacklisted or revoked.
     
     This prevents using access tokens after logout by checking a blacklist
-    stored in Redis (or cache) with the token's jti (JWT ID) as the key.
+    stored in Redis (or cache) with the token's jti (JWT ID) as the key, and
+    the token's ``token_version`` claim against the user's current version.
+    Tokens issued before versions existed count as version 0.
     """
     
     def authenticate(self, request):
@@ -32,10 +162,16 @@ class BlacklistedJWTAuthentication(JWTAuthentication):
 
         validated_token = self.get_validated_token(raw_token)
         
-        # Check if token is blacklisted
-        if self.is_token_blacklisted(validated_token):
+        # Check if token is blacklisted or revoked, before loading the user
+        version, blacklisted = revocation_state.lookup(
+            validated_token.get(api_settings.USER_ID_CLAIM), validated_token.get('jti')
+        )
+        if blacklisted:
             logger.warning(f"Blacklisted access token attempted: jti={validated_token.get('jti')}")
             raise InvalidToken("Token has been blacklisted (user logged out)")
+        if version is not None and (validated_token.get(TOKEN_VERSION_CLAIM) or 0) < version:
+            logger.warning(f"Revoked access token attempted: jti={validated_token.get('jti')}")
+            raise InvalidToken("Token has been revoked")
         
         return self.get_user(validated_token), validated_token
     
@@ -55,10 +191,9 @@ class BlacklistedJWTAuthentication(JWTAuthentication):
             # This shouldn't happen with proper token generation, but handle gracefully
             return False
         
-        # Check Redis/cache for blacklisted token
+        # Check the local cache, then Redis/cache, for the blacklisted token
         # Key format: "jwt_blacklist:{jti}"
-        cache_key = f"jwt_blacklist:{jti}"
-        is_blacklisted = cache.get(cache_key)
+        _, is_blacklisted = revocation_state.lookup(token.get(api_settings.USER_ID_CLAIM), jti)
         
         if is_blacklisted:
             logger.debug(f"Token jti={jti} found in blacklist")
@@ -90,10 +225,10 @@ def blacklist_access_token(token_string):
         # Get token expiration time to set TTL
         exp = untyped_token.get('exp')
         if exp:
-            from datetime import datetime
+            from datetime import datetime, timezone as dt_timezone
             from django.utils import timezone
             # Calculate TTL: expiration time - current time
-            exp_datetime = datetime.fromtimestamp(exp, tz=timezone.utc)
+            exp_datetime = datetime.fromtimestamp(exp, tz=dt_timezone.utc)
             ttl = int((exp_datetime - timezone.now()).total_seconds())
             # Ensure TTL is positive and not too large (max 1 hour for access tokens)
             ttl = max(0, min(ttl, 3600))
@@ -102,8 +237,8 @@ def blacklist_access_token(token_string):
             ttl = 3600
         
         # Store in cache with TTL matching token expiration
-        cache_key = f"jwt_blacklist:{jti}"
-        cache.set(cache_key, True, ttl)
+        cache.set(_blacklist_key(jti), True, ttl)
+        revocation_state.broadcast()
         
         logger.info(f"Access token blacklisted: jti={jti}, ttl={ttl}s")
         return jti
@@ -113,32 +248,42 @@ def blacklist_access_token(token_string):
         return None
 
 
-def blacklist_user_access_tokens(user):
+def bump_token_version(user):
     """
-    Attempt to blacklist access tokens for a user.
+    Revoke every access (and refresh) token issued to ``user`` so far.
     
-    Note: OutstandingToken only tracks refresh tokens, not access tokens.
-    Access tokens are stateless and not tracked. This function is a placeholder
-    for potential future enhancement if we decide to track access token jti.
-    
-    The main protection comes from blacklisting the specific access token
-    used during logout (handled in the logout view).
+    Raises the user's ``token_version``, publishes it to the shared cache and
+    broadcasts the change to all processes.
     
     Args:
         user: User object
     
     Returns:
-        int: Number of tokens blacklisted (currently always 0)
+        int: The new token version
     """
-    # Note: We cannot blacklist all access tokens for a user because:
-    # 1. Access tokens are stateless and not tracked in OutstandingToken
-    # 2. OutstandingToken only stores refresh tokens
-    # 3. The main protection is blacklisting the specific token used during logout
+    from django.db.models import F
+
+    type(user).objects.filter(pk=user.pk).update(token_version=F('token_version') + 1)
+    user.refresh_from_db(fields=['token_version'])
+    cache.set(_version_key(user.pk), user.token_version, None)
+    revocation_state.broadcast()
+    logger.info(f"Token version of user {user.pk} raised to {user.token_version}")
+    return user.token_version
+
+
+def blacklist_user_access_tokens(user):
+    """
+    Revoke all access tokens of a user.
     
-    # Future enhancement: If we want to track access tokens, we could:
-    # - Store access token jti in a separate model when tokens are issued
-    # - Or use a token version/sequence number that increments on logout
+    Access tokens are stateless and not tracked in OutstandingToken, so instead
+    of listing them this raises the user's token version (see
+    ``bump_token_version``): every token carrying an older ``token_version``
+    claim is rejected from then on.
     
-    logger.debug(f"blacklist_user_access_tokens called for user {user.id} (access tokens are stateless and not tracked)")
-    return 0
-
+    Args:
+        user: User object
+    
+    Returns:
+        int: The user's new token version
+    """
+    return bump_token_version(user)
@@ -0,0 +1,280 @@
+"""
+Offline lookup of breached passwords.
+
+Password changes used to call the pwnedpasswords range API synchronously, so
+every uncached prefix could add seconds to the request. Breach counts are now
+read from a local corpus file that operators refresh with
+``manage.py refresh_breach_corpus``:
+
+- the file holds the leading ``KEY_BYTES`` bytes of every breached password's
+  SHA-1, sorted, plus its breach count
+- it is memory-mapped, so every process shares the page cache and a lookup is
+  a binary search within one of 65536 buckets (microseconds, no I/O once warm)
+- a refreshed file replaces the old one atomically and is picked up by running
+  processes within ``PASSWORD_BREACH_CORPUS_RELOAD`` seconds
+
+Without a corpus the range API is used as a fallback when
+``PASSWORD_BREACH_API_FALLBACK`` is on; its responses are cached per prefix
+in the shared cache. ``breach_lookup`` is shared by the password validators,
+``PasswordHistory`` and the management commands.
+
+File layout (integers little-endian)::
+
+    MAGIC | record count (u64) | built at (u64, unix time)
+    fanout: 65537 x u64, index of the first record of each 2-byte bucket
+    keys:   count x KEY_BYTES, ascending
+    counts: count x u32
+"""
+import hashlib
+import logging
+import mmap
+import os
+import struct
+import tempfile
+import threading
+import time
+from array import array
+from pathlib import Path
+
+import requests
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'OBREACH1'
+KEY_BYTES = 8
+BUCKETS = 1 << 16
+HEADER = struct.Struct('<8sQQ')
+FANOUT_SIZE = (BUCKETS + 1) * 8
+API_URL = 'https://api.pwnedpasswords.com/range/'
+COUNT_MAX = 0xFFFFFFFF
+
+
+class CorpusError(Exception):
+    """Raised for a missing, truncated or malformed corpus file"""
+
+
+def default_corpus_path():
+    return Path(getattr(settings, 'PASSWORD_BREACH_CORPUS_PATH', settings.BASE_DIR / 'var' / 'pwned-passwords.bin'))
+
+
+def sha1_digest(password):
+    return hashlib.sha1(password.encode('utf-8')).digest()
+
+
+class BreachCorpus:
+    """Read-only view of one corpus file"""
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, 'rb') as f:
+            stat = os.fstat(f.fileno())
+            if stat.st_size < HEADER.size + FANOUT_SIZE:
+                raise CorpusError(f'{self.path} is too small to be a breach corpus')
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        self.identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+        magic, self.records, self.built_at = HEADER.unpack_from(self._mmap, 0)
+        if magic != MAGIC:
+            self.close()
+            raise CorpusError(f'{self.path} is not a breach corpus')
+        self._keys = HEADER.size + FANOUT_SIZE
+        self._counts = self._keys + self.records * KEY_BYTES
+        if stat.st_size != self._counts + self.records * 4:
+            self.close()
+            raise CorpusError(f'{self.path} is truncated')
+        self._fanout = memoryview(self._mmap)[HEADER.size:self._keys].cast('Q')
+
+    def count(self, digest):
+        """Breach count of the SHA-1 ``digest`` (bytes), 0 when it is not in the corpus"""
+        key = digest[:KEY_BYTES]
+        bucket = (key[0] << 8) | key[1]
+        lo, hi = self._fanout[bucket], self._fanout[bucket + 1]
+        data, base = self._mmap, self._keys
+        while lo < hi:
+            mid = (lo + hi) >> 1
+            offset = base + mid * KEY_BYTES
+            candidate = data[offset:offset + KEY_BYTES]
+            if candidate < key:
+                lo = mid + 1
+            elif candidate > key:
+                hi = mid
+            else:
+                return struct.unpack_from('<I', data, self._counts + mid * 4)[0]
+        return 0
+
+    def close(self):
+        if getattr(self, '_fanout', None) is not None:
+            self._fanout.release()
+            self._fanout = None
+        self._mmap.close()
+
+
+def build_corpus(records, path, min_count=1):
+    """
+    Write a corpus of ``records`` to ``path``, replacing it atomically.
+
+    ``records`` yields ``(sha1, count)`` in ascending hash order, ``sha1`` as
+    40 hex digits or 20 bytes, which is the order of the published hash lists
+    and of the range API. Hashes sharing the stored key prefix are merged
+    with the highest count. Returns the number of records written.
+    """
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fanout = array('Q', bytes(8 * (BUCKETS + 1)))
+    written, previous, previous_count = 0, b'', 0
+
+    with tempfile.TemporaryFile() as keys, tempfile.TemporaryFile() as counts:
+        pending = array('I')
+
+        def flush_count():
+            counts.write(pending.tobytes())
+            del pending[:]
+
+        for sha1, count in records:
+            if count < min_count:
+                continue
+            digest = bytes.fromhex(sha1) if isinstance(sha1, str) else bytes(sha1)
+            key = digest[:KEY_BYTES]
+            if key == previous:
+                # Same stored key: keep one record with the highest count
+                if count > previous_count:
+                    pending[-1] = previous_count = min(count, COUNT_MAX)
+                continue
+            if key < previous:
+                raise ValueError('Breach records must be sorted by hash')
+            keys.write(key)
+            pending.append(min(count, COUNT_MAX))
+            if len(pending) >= 65536:
+                # pending[-1] may still be raised by a duplicate; keep it back
+                last = pending.pop()
+                flush_count()
+                pending.append(last)
+            fanout[((key[0] << 8) | key[1]) + 1] += 1
+            previous, previous_count = key, min(count, COUNT_MAX)
+            written += 1
+        flush_count()
+
+        for bucket in range(BUCKETS):
+            fanout[bucket + 1] += fanout[bucket]
+
+        handle, temp_path = tempfile.mkstemp(dir=path.parent, prefix=f'.{path.name}.')
+        try:
+            with os.fdopen(handle, 'wb') as out:
+                out.write(HEADER.pack(MAGIC, written, int(time.time())))
+                out.write(fanout.tobytes())
+                for source in (keys, counts):
+                    source.seek(0)
+                    while chunk := source.read(1 << 20):
+                        out.write(chunk)
+                out.flush()
+                os.fsync(out.fileno())
+            os.chmod(temp_path, 0o644)
+            os.replace(temp_path, path)
+        except BaseException:
+            if os.path.exists(temp_path):
+                os.unlink(temp_path)
+            raise
+    return written
+
+
+class BreachLookup:
+    """
+    Breach counts from the local corpus, with the range API as optional fallback.
+
+    ``breach_count`` returns None when neither source could answer; callers
+    treat that as "not known to be breached", as they did when the API failed.
+    """
+
+    def __init__(self, path=None, api_fallback=None, api_timeout=None, cache_timeout=None, reload_interval=None):
+        self._path = path
+        self._api_fallback = api_fallback
+        self.api_timeout = api_timeout if api_timeout is not None else getattr(settings, 'PASSWORD_BREACH_API_TIMEOUT', 2)
+        self.cache_timeout = (
+            cache_timeout if cache_timeout is not None else getattr(settings, 'PASSWORD_BREACH_CACHE_TIMEOUT', 3600)
+        )
+        self.reload_interval = (
+            reload_interval if reload_interval is not None else getattr(settings, 'PASSWORD_BREACH_CORPUS_RELOAD', 60)
+        )
+        self._corpus = None
+        self._checked_at = None
+        self._lock = threading.Lock()
+
+    @property
+    def path(self):
+        return Path(self._path) if self._path is not None else default_corpus_path()
+
+    @property
+    def api_fallback(self):
+        if self._api_fallback is not None:
+            return self._api_fallback
+        return getattr(settings, 'PASSWORD_BREACH_API_FALLBACK', True)
+
+    def corpus(self):
+        """The current corpus, reopened when the file was replaced; None without one"""
+        now = time.monotonic()
+        if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+            return self._corpus
+        with self._lock:
+            if self._checked_at is not None and now - self._checked_at < self.reload_interval:
+                return self._corpus
+            try:
+                stat = os.stat(self.path)
+                identity = (stat.st_ino, stat.st_mtime_ns, stat.st_size)
+            except OSError:
+                identity = None
+            current = self._corpus
+            if identity is None:
+                self._corpus = None
+            elif current is None or current.identity != identity:
+                try:
+                    self._corpus = BreachCorpus(self.path)
+                    logger.info(f'Loaded breach corpus {self.path} ({self._corpus.records} records)')
+                except (OSError, CorpusError) as e:
+                    logger.error(f'Cannot use breach corpus: {e}')
+                    self._corpus = None
+            # The replaced mapping is left to the garbage collector: another
+            # thread may still be searching it
+            self._checked_at = now
+            return self._corpus
+
+    def breach_count(self, password):
+        """Number of breaches ``password`` appeared in; None when no source was available"""
+        digest = sha1_digest(password)
+        corpus = self.corpus()
+        if corpus is not None:
+            return corpus.count(digest)
+        if self.api_fallback:
+            return self._api_count(digest.hex().upper())
+        return None
+
+    def _api_count(self, password_hash):
+        prefix, suffix = password_hash[:5], password_hash[5:]
+        cache_key = f'pwned_password_{prefix}'
+        results = cache.get(cache_key)
+        if results is None:
+            try:
+                response = requests.get(f'{API_URL}{prefix}', timeout=self.api_timeout)
+            except requests.RequestException as e:
+                logger.warning(f'Password breach check failed: {e}')
+                return None
+            if response.status_code != 200:
+                logger.warning(f'HaveIBeenPwned API unavailable: {response.status_code}')
+                return None
+            results = response.text
+            cache.set(cache_key, results, self.cache_timeout)
+        for line in results.splitlines():
+            if line.startswith(suffix):
+                return int(line.split(':')[1])
+        return 0
+
+    def status(self):
+        """Description of the active source for reports and management commands"""
+        corpus = self.corpus()
+        if corpus is not None:
+            return {'source': 'corpus', 'path': str(corpus.path), 'records': corpus.records,
+                    'built_at': corpus.built_at}
+        return {'source': 'api' if self.api_fallback else 'none', 'path': str(self.path)}
+
+
+breach_lookup = BreachLookup()
@@ -0,0 +1,104 @@
+"""
+Management command to measure JWT authentication overhead per request.
+
+Authenticates the same bearer token repeatedly (optionally from several
+threads) with the previous scheme, a shared-cache blacklist lookup on every
+request, and with the current one, token versions and blacklist read through
+the in-process revocation cache. Shared-cache calls are counted and can be
+given an artificial latency to model a Redis round trip.
+"""
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from rest_framework_simplejwt.authentication import JWTAuthentication
+
+from users import authentication
+from users.serializers import CustomTokenObtainPairSerializer
+
+
+class CountingCache:
+    """Shared cache proxy that counts calls and adds a fixed latency to each"""
+
+    def __init__(self, latency):
+        self.latency = latency
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    def __getattr__(self, name):
+        target = getattr(cache, name)
+
+        def call(*args, **kwargs):
+            with self._lock:
+                self.calls += 1
+            if self.latency:
+                time.sleep(self.latency)
+            return target(*args, **kwargs)
+        return call
+
+
+class PreviousJWTAuthentication(JWTAuthentication):
+    """The scheme before token versions: one shared-cache lookup per request"""
+
+    def authenticate(self, request):
+        result = super().authenticate(request)
+        if result and authentication.cache.get(f"jwt_blacklist:{result[1].get('jti')}"):
+            raise authentication.InvalidToken("Token has been blacklisted (user logged out)")
+        return result
+
+
+class Command(BaseCommand):
+    help = 'Measure per-request JWT authentication overhead before and after the revocation cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--user', type=str, help='Email of the user to authenticate as (default: first active user)')
+        parser.add_argument('--requests', type=int, default=2000, help='Requests per scheme (default: 2000)')
+        parser.add_argument('--threads', type=int, default=8, help='Concurrent callers (default: 8)')
+        parser.add_argument('--cache-latency', type=float, default=0.3,
+                            help='Milliseconds added to every shared-cache call (default: 0.3)')
+
+    def handle(self, *args, **options):
+        User = get_user_model()
+        users = User.objects.filter(is_active=True)
+        user = users.filter(email=options['user']).first() if options['user'] else users.order_by('pk').first()
+        if user is None:
+            raise CommandError('No active user to authenticate as')
+
+        token = CustomTokenObtainPairSerializer.get_token(user).access_token
+        request = RequestFactory().get('/api/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+        self.stdout.write(
+            f'{options["requests"]} requests, {options["threads"]} threads, '
+            f'{options["cache_latency"]}ms per shared-cache call'
+        )
+        self.stdout.write(f'{"scheme":<12}{"us/request":>12}{"p95 us":>10}{"cache calls/request":>22}')
+        for label, backend in (
+            ('previous', PreviousJWTAuthentication()),
+            ('versioned', authentication.BlacklistedJWTAuthentication()),
+        ):
+            timings, calls = self._run(backend, request, options)
+            self.stdout.write(
+                f'{label:<12}{statistics.mean(timings) * 1e6:>12.0f}'
+                f'{timings[int(len(timings) * 0.95) - 1] * 1e6:>10.0f}{calls / len(timings):>22.3f}'
+            )
+
+    def _run(self, backend, request, options):
+        counting = CountingCache(options['cache_latency'] / 1000)
+        authentication.revocation_state.local.clear()
+        authentication.revocation_state.epoch = None
+
+        def timed(_):
+            started = time.perf_counter()
+            backend.authenticate(request)
+            return time.perf_counter() - started
+
+        with mock.patch.object(authentication, 'cache', counting):
+            with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+                timings = sorted(pool.map(timed, range(options['requests'])))
+        return timings, counting.calls
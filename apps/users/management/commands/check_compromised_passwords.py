@@ -3,7 +3,9 @@ from django.utils import timezone
 from core.utils import send_tenant_email as send_mail
 from django.template.loader import render_to_string
 from django.conf import settings
+from users.breach_corpus import breach_lookup
 from users.models import PasswordHistory, CustomUser
+import datetime
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,6 +36,7 @@ class Command(BaseCommand):
         user_email = options['user']
         
         self.stdout.write(self.style.SUCCESS('Starting compromised password check...'))
+        self.report_breach_source()
         
         # Get compromised passwords
         compromised_passwords = PasswordHistory.objects.filter(
@@ -70,6 +73,26 @@ class Command(BaseCommand):
         else:
             self.stdout.write(self.style.SUCCESS(f'Processed {processed_count} compromised passwords'))
     
+    def report_breach_source(self):
+        """Show which breach lookup flagged the passwords at the time they were set"""
+        status = breach_lookup.status()
+        if status['source'] == 'corpus':
+            built_at = datetime.datetime.fromtimestamp(status['built_at'], tz=datetime.timezone.utc)
+            older = PasswordHistory.objects.filter(last_checked__lt=built_at).count()
+            self.stdout.write(
+                f"Breach corpus: {status['path']} ({status['records']} hashes, built {built_at:%Y-%m-%d %H:%M} UTC); "
+                f"{older} passwords were checked against an older corpus"
+            )
+        elif status['source'] == 'api':
+            self.stdout.write(self.style.WARNING(
+                f"No breach corpus at {status['path']}; passwords are checked against the HaveIBeenPwned API. "
+                f"Run refresh_breach_corpus to check offline."
+            ))
+        else:
+            self.stdout.write(self.style.WARNING(
+                f"No breach corpus at {status['path']} and the API fallback is off; new passwords are not checked"
+            ))
+    
     def send_compromise_notification(self, user, password_record):
         """Send password compromise notification email"""
         try:
@@ -0,0 +1,109 @@
+"""
+Management command to build or refresh the local breached-password corpus.
+
+Sources, all in ascending hash order:
+
+- ``--source FILE``: a published SHA-1 hash list, one ``HASH:COUNT`` per line
+  (e.g. ``pwned-passwords-sha1-ordered-by-hash``)
+- ``--source DIR``: range files as written by the pwned-passwords downloader,
+  one file per 5-hex-digit prefix holding ``SUFFIX:COUNT`` lines
+- ``--download``: every range straight from the pwnedpasswords API
+
+The new file replaces the old one atomically; running processes pick it up
+within ``PASSWORD_BREACH_CORPUS_RELOAD`` seconds.
+"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import requests
+from django.core.management.base import BaseCommand, CommandError
+
+from users.breach_corpus import API_URL, BreachCorpus, build_corpus, default_corpus_path
+
+PREFIXES = 16 ** 5
+
+
+def _parse(lines, prefix=''):
+    for line in lines:
+        line = line.strip()
+        if not line:
+            continue
+        suffix, _, count = line.partition(':')
+        yield prefix + suffix, int(count or 1)
+
+
+class Command(BaseCommand):
+    help = 'Build the local breached-password corpus used for offline password breach checks'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--source', type=str, help='Hash list file or directory of range files')
+        parser.add_argument('--download', action='store_true', help='Download every range from the pwnedpasswords API')
+        parser.add_argument('--workers', type=int, default=32, help='Concurrent range downloads (default: 32)')
+        parser.add_argument('--min-count', type=int, default=1,
+                            help='Leave out hashes seen in fewer breaches, to shrink the file (default: 1)')
+        parser.add_argument('--path', type=str, help='Corpus file to write (default: PASSWORD_BREACH_CORPUS_PATH)')
+
+    def handle(self, *args, **options):
+        if bool(options['source']) == bool(options['download']):
+            raise CommandError('Give exactly one of --source or --download')
+        path = Path(options['path']) if options['path'] else default_corpus_path()
+
+        if options['download']:
+            records = self._download(options['workers'])
+        else:
+            source = Path(options['source'])
+            if source.is_dir():
+                records = self._range_files(source)
+            elif source.is_file():
+                records = self._hash_list(source)
+            else:
+                raise CommandError(f'{source} does not exist')
+
+        started = time.monotonic()
+        try:
+            written = build_corpus(records, path, min_count=options['min_count'])
+        except ValueError as e:
+            raise CommandError(str(e))
+        corpus = BreachCorpus(path)
+        size = path.stat().st_size
+        corpus.close()
+        self.stdout.write(self.style.SUCCESS(
+            f'Wrote {written} hashes to {path} ({size / 1e6:.1f} MB) in {time.monotonic() - started:.1f}s'
+        ))
+
+    def _hash_list(self, source):
+        with open(source, encoding='ascii') as f:
+            yield from _parse(f)
+
+    def _range_files(self, source):
+        for prefix in range(PREFIXES):
+            name = f'{prefix:05X}'
+            for candidate in (source / name, source / f'{name}.txt'):
+                if candidate.exists():
+                    with open(candidate, encoding='ascii') as f:
+                        yield from _parse(f, name)
+                    break
+
+    def _download(self, workers):
+        session = requests.Session()
+        session.mount('https://', requests.adapters.HTTPAdapter(pool_maxsize=workers))
+
+        def fetch(prefix):
+            name = f'{prefix:05X}'
+            for attempt in range(5):
+                try:
+                    response = session.get(f'{API_URL}{name}', timeout=30)
+                    if response.status_code == 200:
+                        return name, response.text
+                except requests.RequestException:
+                    pass
+                time.sleep(2 ** attempt)
+            raise CommandError(f'Could not download range {name}')
+
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            # map() keeps prefix order, which build_corpus relies on
+            for done, (name, text) in enumerate(pool.map(fetch, range(PREFIXES)), 1):
+                if done % 65536 == 0:
+                    self.stdout.write(f'{done}/{PREFIXES} ranges')
+                yield from _parse(text.splitlines(), name)
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.14 on 2026-10-18 22:16
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0011_alter_profile_avatar'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='customuser',
+            name='token_version',
+            field=models.PositiveIntegerField(default=0, help_text="Issued JWTs carry this number; raising it revokes all of the user's tokens.", verbose_name='Token Version'),
+        ),
+    ]
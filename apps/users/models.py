@@ -86,6 +86,11 @@ class CustomUser(AbstractUser):
         verbose_name=_("Admin Created"),
         help_text=_("Whether this user was created by an admin (requires first-time setup).")
     )
+    token_version = models.PositiveIntegerField(
+        default=0,
+        verbose_name=_("Token Version"),
+        help_text=_("Issued JWTs carry this number; raising it revokes all of the user's tokens.")
+    )
     
     # Password expiration settings
     PASSWORD_EXPIRATION_NEVER = 'never'
@@ -455,10 +460,11 @@ class PasswordHistory(models.Model):
         """
         Store a password hash in the history with enhanced features.
         """
-        from django.contrib.auth.hashers import make_password
         from django.utils import timezone
+        from .password_history import password_history
         
-        password_hash = password if is_hashed else make_password(password)
+        # History hashes use their own (PASSWORD_HISTORY_ARGON2_*) cost
+        password_hash = password if is_hashed else password_history.make_history_hash(password)
         
         # Calculate expiration - use user's setting if not specified
         expires_at = None
@@ -469,8 +475,8 @@ class PasswordHistory(models.Model):
         if expires_in_days:
             expires_at = timezone.now() + timezone.timedelta(days=expires_in_days)
         
-        # Check if password is compromised
-        is_compromised, breach_count = cls._check_password_breach(password)
+        # Check if password is compromised; a stored hash cannot be checked
+        is_compromised, breach_count = (False, 0) if is_hashed else cls._check_password_breach(password)
         
         return cls.objects.create(
             user=user,
@@ -487,8 +493,10 @@ class PasswordHistory(models.Model):
         """
         Enhanced check if a password has been used recently.
         Returns True if the password is found in recent history.
+        Verifications run in the shared password history pool and are
+        remembered on ``user`` for the rest of the request.
         """
-        from django.contrib.auth.hashers import check_password
+        from .password_history import password_history
         
         # If the user instance is not saved yet (no primary key),
         # there cannot be any password history. Short-circuit safely.
@@ -496,13 +504,11 @@ class PasswordHistory(models.Model):
             return False
 
         # Get the most recent password history entries
-        recent_passwords = cls.objects.filter(user=user).order_by('-created_at')[:history_count]
+        recent_hashes = cls.objects.filter(user=user).order_by('-created_at').values_list(
+            'password_hash', flat=True
+        )[:history_count]
         
-        for password_record in recent_passwords:
-            if check_password(password, password_record.password_hash):
-                return True
-        
-        return False
+        return password_history.is_reused(user, password, recent_hashes)
     
     @classmethod
     def cleanup_old_passwords(cls, user, keep_count=10):
@@ -537,44 +543,21 @@ class PasswordHistory(models.Model):
     @classmethod
     def _check_password_breach(cls, password):
         """
-        Check if password has been compromised using HaveIBeenPwned API.
+        Check if password has been compromised, using the shared breach lookup
+        (local corpus, HaveIBeenPwned API as fallback).
         Returns (is_compromised, breach_count)
         """
-        import hashlib
-        import requests
-        from django.core.cache import cache
-        from django.conf import settings
-        
+        from .breach_corpus import breach_lookup
+
         try:
-            # Create SHA-1 hash of password
-            password_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
-            prefix = password_hash[:5]
-            suffix = password_hash[5:]
-            
-            # Check cache first
-            cache_key = f"pwned_password_{prefix}"
-            cached_results = cache.get(cache_key)
-            
-            if cached_results is None:
-                # Make API request
-                response = requests.get(f"https://api.pwnedpasswords.com/range/{prefix}", timeout=5)
-                if response.status_code == 200:
-                    cached_results = response.text
-                    cache.set(cache_key, cached_results, 3600)  # Cache for 1 hour
-                else:
-                    return False, 0
-            
-            # Check if our password hash suffix is in the results
-            for line in cached_results.split('\n'):
-                if line.startswith(suffix):
-                    count = int(line.split(':')[1])
-                    return True, count
-            
-            return False, 0
-            
-        except Exception:
-            # If API check fails, assume not compromised
+            breach_count = breach_lookup.breach_count(password)
+        except Exception as e:
+            logger.error(f"Password breach check failed: {e}")
+            breach_count = None
+        # Unknown (no corpus, API unavailable): assume not compromised
+        if not breach_count:
             return False, 0
+        return True, breach_count
     
     @classmethod
     def update_breach_status(cls, user=None):
@@ -0,0 +1,137 @@
+"""
+Bounded-cost password history checks.
+
+Checking a new password against the history used to run one full-cost
+Argon2 verification per stored hash, serially, and the history, first-time
+setup and form validators each repeated them within the same request, so a
+single password change could cost seconds of CPU. ``password_history``:
+
+- hashes history entries with their own, cheaper Argon2 parameters
+  (``PASSWORD_HISTORY_ARGON2_*``); login hashes keep the full cost
+- verifies at most ``PASSWORD_HISTORY_MAX_CHECKS`` distinct hashes in a
+  process-wide pool of ``PASSWORD_HISTORY_WORKERS`` threads (Argon2 releases
+  the GIL) and stops at the first match; the shared pool also caps the CPU
+  all concurrent password changes can take
+- remembers every verification on the user instance, so validators that run
+  in the same request never verify the same (password, hash) pair twice
+"""
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+from django.conf import settings
+from django.contrib.auth.hashers import Argon2PasswordHasher, check_password, make_password
+
+logger = logging.getLogger(__name__)
+
+MEMO_ATTRIBUTE = '_password_verifications'
+
+
+class HistoryArgon2PasswordHasher(Argon2PasswordHasher):
+    """
+    Argon2 with the history's own cost parameters.
+
+    Hashes carry their parameters, so the regular Argon2 hasher verifies them
+    and this class never needs to be listed in ``PASSWORD_HASHERS``.
+    """
+
+    @property
+    def time_cost(self):
+        return getattr(settings, 'PASSWORD_HISTORY_ARGON2_TIME_COST', 2)
+
+    @property
+    def memory_cost(self):
+        return getattr(settings, 'PASSWORD_HISTORY_ARGON2_MEMORY_COST', 19456)
+
+    @property
+    def parallelism(self):
+        return getattr(settings, 'PASSWORD_HISTORY_ARGON2_PARALLELISM', 1)
+
+
+class PasswordHistoryEngine:
+    """Verifies candidate passwords against stored hashes with a shared, bounded pool"""
+
+    def __init__(self, workers=None, max_checks=None):
+        self._workers = workers
+        self._max_checks = max_checks
+        self._pool = None
+        self._pool_pid = None
+        self._lock = threading.Lock()
+        self.hasher = HistoryArgon2PasswordHasher()
+
+    @property
+    def workers(self):
+        return self._workers or getattr(settings, 'PASSWORD_HISTORY_WORKERS', 4)
+
+    @property
+    def max_checks(self):
+        return self._max_checks or getattr(settings, 'PASSWORD_HISTORY_MAX_CHECKS', 8)
+
+    def make_history_hash(self, password):
+        return make_password(password, hasher=self.hasher)
+
+    def matches(self, user, password, encoded):
+        """``check_password(password, encoded)``, remembered on ``user`` for the rest of the request"""
+        memo = self._memo(user)
+        key = self._key(password, encoded)
+        if key not in memo:
+            memo[key] = bool(encoded) and check_password(password, encoded)
+        return memo[key]
+
+    def is_reused(self, user, password, hashes):
+        """True if ``password`` matches any of ``hashes`` (newest first)"""
+        memo = self._memo(user)
+        pending = []
+        for encoded in dict.fromkeys(h for h in hashes if h):
+            known = memo.get(self._key(password, encoded))
+            if known:
+                return True
+            if known is None:
+                pending.append(encoded)
+        if len(pending) > self.max_checks:
+            logger.warning(f"Password history check limited to the {self.max_checks} newest of {len(pending)} hashes")
+            pending = pending[:self.max_checks]
+        if not pending:
+            return False
+        if len(pending) == 1 or self.workers <= 1:
+            return any(self.matches(user, password, encoded) for encoded in pending)
+
+        futures = {self._executor().submit(check_password, password, encoded): encoded for encoded in pending}
+        try:
+            while futures:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    encoded = futures.pop(future)
+                    memo[self._key(password, encoded)] = future.result()
+                    if memo[self._key(password, encoded)]:
+                        return True
+            return False
+        finally:
+            # Early exit: drop the verifications that have not started yet
+            for future in futures:
+                future.cancel()
+
+    def _executor(self):
+        # Threads do not survive a fork; a worker process builds its own pool
+        if self._pool is None or self._pool_pid != os.getpid():
+            with self._lock:
+                if self._pool is None or self._pool_pid != os.getpid():
+                    self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix='password-history')
+                    self._pool_pid = os.getpid()
+        return self._pool
+
+    def _memo(self, user):
+        memo = getattr(user, MEMO_ATTRIBUTE, None)
+        if memo is None:
+            memo = {}
+            setattr(user, MEMO_ATTRIBUTE, memo)
+        return memo
+
+    @staticmethod
+    def _key(password, encoded):
+        return hashlib.sha256(password.encode('utf-8')).digest(), encoded
+
+
+password_history = PasswordHistoryEngine()
@@ -1,7 +1,9 @@
 # apps/users/serializers.py
 from django.contrib.auth import get_user_model, authenticate
 from rest_framework import serializers
-from rest_framework_simplejwt.serializers import TokenObtainPairSerializer
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.serializers import TokenObtainPairSerializer, TokenRefreshSerializer
+from rest_framework_simplejwt.settings import api_settings
 from django.utils.translation import gettext_lazy as _
 from django.core.cache import cache
 from django.db.models import Q
@@ -123,6 +125,8 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         token['username'] = user.username
         token['organization'] = user.organization.pk if user.organization else None
         token['role'] = user.role
+        # Raising the user's version revokes this token (see users.authentication)
+        token['token_version'] = user.token_version
         return token
 
     def validate(self, attrs):
@@ -165,6 +169,18 @@ class CustomTokenObtainPairSerializer(TokenObtainPairSerializer):
         }
         return data
 
+class TokenVersionRefreshSerializer(TokenRefreshSerializer):
+    """Refresh that keeps the ``token_version`` claim and refuses revoked refresh tokens"""
+    def validate(self, attrs):
+        from users.authentication import TOKEN_VERSION_CLAIM, revocation_state
+
+        refresh = self.token_class(attrs['refresh'])
+        version, _blacklisted = revocation_state.lookup(refresh.get(api_settings.USER_ID_CLAIM))
+        if version is not None and (refresh.get(TOKEN_VERSION_CLAIM) or 0) < version:
+            raise InvalidToken(_('Token has been revoked'))
+        # The new access (and rotated refresh) token copy the refresh token's claims, token_version included
+        return super().validate(attrs)
+
 class OTPVerifySerializer(serializers.Serializer):
     """Serializer for OTP verification"""
     code = serializers.CharField(max_length=6, write_only=True)
@@ -0,0 +1,102 @@
+# apps/users/tests/test_breach_corpus.py
+
+import hashlib
+import os
+import shutil
+import tempfile
+import time
+from io import StringIO
+from pathlib import Path
+from unittest import mock
+
+from django.core.exceptions import ValidationError
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from users import breach_corpus
+from users.breach_corpus import BreachLookup, build_corpus
+from users.models import PasswordHistory
+from users.validators import PasswordBreachValidator
+
+BREACHED = {'password123': 2254650, 'letmein': 434713, 'Summer2024!': 12}
+
+
+def _records(passwords):
+    hashes = sorted((hashlib.sha1(p.encode()).hexdigest().upper(), n) for p, n in passwords.items())
+    # Filler so lookups search real buckets
+    filler = sorted((hashlib.sha1(str(i).encode()).hexdigest().upper(), 1) for i in range(5000))
+    return sorted(hashes + filler)
+
+
+class BreachCorpusTests(SimpleTestCase):
+    def setUp(self):
+        self.dir = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.dir)
+        self.path = self.dir / 'pwned.bin'
+        build_corpus(_records(BREACHED), self.path)
+        self.lookup = BreachLookup(path=self.path, api_fallback=False, reload_interval=0)
+
+    def test_counts_come_from_the_corpus(self):
+        with mock.patch.object(breach_corpus.requests, 'get') as get:
+            for password, count in BREACHED.items():
+                self.assertEqual(self.lookup.breach_count(password), count)
+            self.assertEqual(self.lookup.breach_count('c0rrect-h0rse-battery-staple'), 0)
+        get.assert_not_called()
+
+    def test_lookups_take_microseconds(self):
+        self.lookup.breach_count('warm up')
+        self.lookup.reload_interval = 60
+        started = time.perf_counter()
+        for i in range(2000):
+            self.lookup.breach_count(f'candidate-{i}')
+        per_lookup = (time.perf_counter() - started) / 2000
+        self.assertLess(per_lookup, 200e-6)
+
+    def test_unsorted_records_are_rejected(self):
+        with self.assertRaises(ValueError):
+            build_corpus(reversed(_records(BREACHED)), self.dir / 'bad.bin')
+        self.assertFalse((self.dir / 'bad.bin').exists())
+
+    def test_refreshed_corpus_is_picked_up(self):
+        self.assertEqual(self.lookup.breach_count('hunter2'), 0)
+        source = self.dir / 'hashes.txt'
+        source.write_text(''.join(f'{h}:{n}\n' for h, n in _records({**BREACHED, 'hunter2': 17})))
+
+        call_command('refresh_breach_corpus', source=str(source), path=str(self.path), stdout=StringIO())
+
+        self.assertEqual(self.lookup.breach_count('hunter2'), 17)
+
+    def test_range_files_as_source(self):
+        ranges = self.dir / 'ranges'
+        ranges.mkdir()
+        by_prefix = {}
+        for sha1, count in _records(BREACHED):
+            by_prefix.setdefault(sha1[:5], []).append(f'{sha1[5:]}:{count}')
+        for prefix, lines in by_prefix.items():
+            (ranges / f'{prefix}.txt').write_text('\r\n'.join(lines))
+
+        path = self.dir / 'from-ranges.bin'
+        call_command('refresh_breach_corpus', source=str(ranges), path=str(path), min_count=10, stdout=StringIO())
+
+        lookup = BreachLookup(path=path, api_fallback=False)
+        self.assertEqual(lookup.breach_count('letmein'), 434713)
+        self.assertEqual(lookup.breach_count('1'), 0)
+        self.assertEqual(lookup.corpus().records, len(BREACHED))
+
+    def test_validator_and_history_share_the_lookup(self):
+        with mock.patch.object(breach_corpus, 'breach_lookup', self.lookup), \
+                mock.patch('users.validators.breach_lookup', self.lookup):
+            with self.assertRaisesMessage(ValidationError, '2254650 data breaches'):
+                PasswordBreachValidator().validate('password123')
+            PasswordBreachValidator(min_breach_count=100).validate('Summer2024!')
+            self.assertEqual(PasswordHistory._check_password_breach('letmein'), (True, 434713))
+            self.assertEqual(PasswordHistory._check_password_breach('unbreached-passphrase'), (False, 0))
+
+    @override_settings(PASSWORD_BREACH_API_FALLBACK=False)
+    def test_missing_corpus_without_fallback_is_unknown(self):
+        os.unlink(self.path)
+        lookup = BreachLookup(path=self.path)
+        with mock.patch.object(breach_corpus.requests, 'get') as get:
+            self.assertIsNone(lookup.breach_count('password123'))
+        get.assert_not_called()
+        self.assertEqual(lookup.status()['source'], 'none')
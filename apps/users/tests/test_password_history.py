@@ -0,0 +1,73 @@
+# apps/users/tests/test_password_history.py
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+
+from users import password_history as history_module
+from users.models import PasswordHistory
+from users.password_history import PasswordHistoryEngine, password_history
+from users.validators import FirstTimeSetupPasswordValidator, PasswordHistoryValidator
+
+User = get_user_model()
+
+# Cheap history hashes keep the tests fast; the parameters still come from settings
+FAST_HISTORY = {'PASSWORD_HISTORY_ARGON2_TIME_COST': 1, 'PASSWORD_HISTORY_ARGON2_MEMORY_COST': 256}
+
+
+@override_settings(**FAST_HISTORY)
+class PasswordHistoryEngineTests(TestCase):
+    def setUp(self):
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.user = User.objects.create_user(
+                email='history@test.com', username='history', password='Current-Passw0rd!', role='staff',
+            )
+        for i in range(6):
+            PasswordHistory.store_password(self.user, f'Old-Passw0rd!{i}')
+        self.user = User.objects.get(pk=self.user.pk)
+
+    def test_history_hashes_use_their_own_cost(self):
+        encoded = PasswordHistory.objects.filter(user=self.user).first().password_hash
+        self.assertIn('m=256,t=1,p=1', encoded)
+        self.assertNotIn('m=256', self.user.password)
+
+    def test_reuse_is_detected(self):
+        self.assertTrue(PasswordHistory.is_password_reused(self.user, 'Old-Passw0rd!0'))
+        self.assertFalse(PasswordHistory.is_password_reused(self.user, 'Brand-New-Passw0rd!'))
+        with self.assertRaises(ValidationError):
+            PasswordHistoryValidator().validate('Old-Passw0rd!5', self.user)
+
+    def test_validators_in_one_request_verify_each_hash_once(self):
+        with mock.patch.object(history_module, 'check_password', wraps=history_module.check_password) as check:
+            for _ in range(3):
+                PasswordHistoryValidator().validate('Brand-New-Passw0rd!', self.user)
+            FirstTimeSetupPasswordValidator().validate('Brand-New-Passw0rd!', self.user)
+            FirstTimeSetupPasswordValidator().validate('Brand-New-Passw0rd!', self.user)
+        # Six history entries and the current password
+        self.assertEqual(check.call_count, 7)
+
+        with self.assertRaises(ValidationError):
+            FirstTimeSetupPasswordValidator().validate('Current-Passw0rd!', self.user)
+
+    def test_checks_are_bounded_and_stop_at_the_first_match(self):
+        engine = PasswordHistoryEngine(workers=1, max_checks=3)
+        hashes = [engine.make_history_hash(f'Old-Passw0rd!{i}') for i in range(6)]
+
+        with mock.patch.object(history_module, 'check_password', wraps=history_module.check_password) as check:
+            self.assertFalse(engine.is_reused(User(), 'Old-Passw0rd!5', hashes))
+            self.assertEqual(check.call_count, 3)
+
+            check.reset_mock()
+            self.assertTrue(engine.is_reused(User(), 'Old-Passw0rd!0', hashes))
+            self.assertEqual(check.call_count, 1)
+
+    def test_pool_finds_a_match(self):
+        engine = PasswordHistoryEngine(workers=4)
+        hashes = [engine.make_history_hash(f'Old-Passw0rd!{i}') for i in range(8)]
+
+        self.assertTrue(engine.is_reused(User(), 'Old-Passw0rd!6', hashes))
+        self.assertFalse(engine.is_reused(User(), 'Brand-New-Passw0rd!', hashes))
+        self.assertEqual(password_history.hasher.memory_cost, 256)
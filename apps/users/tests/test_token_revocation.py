@@ -0,0 +1,109 @@
+# apps/users/tests/test_token_revocation.py
+
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from rest_framework.test import APIRequestFactory
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.tokens import AccessToken
+from rest_framework_simplejwt.views import TokenObtainPairView, TokenRefreshView
+
+from users import authentication
+from users.authentication import (
+    BlacklistedJWTAuthentication,
+    RevocationState,
+    blacklist_access_token,
+    blacklist_user_access_tokens,
+)
+from users.serializers import CustomTokenObtainPairSerializer
+
+User = get_user_model()
+
+
+class TokenRevocationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        authentication.revocation_state.local.clear()
+        # User creation queues welcome/OTP tasks, which would need a broker
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.user = User.objects.create_user(
+                email='revoke@test.com', username='revoke', password='Sup3r-Secret-Pass!', role='staff',
+            )
+        self.backend = BlacklistedJWTAuthentication()
+
+    def _request(self, token):
+        return RequestFactory().get('/api/', HTTP_AUTHORIZATION=f'Bearer {token}')
+
+    def _token(self):
+        return str(CustomTokenObtainPairSerializer.get_token(self.user).access_token)
+
+    def test_bumping_the_version_revokes_all_tokens(self):
+        first, second = self._token(), self._token()
+        self.assertEqual(self.backend.authenticate(self._request(first))[0], self.user)
+
+        self.assertEqual(blacklist_user_access_tokens(self.user), 1)
+
+        for token in (first, second):
+            with self.assertRaises(InvalidToken):
+                self.backend.authenticate(self._request(token))
+        # Tokens issued afterwards carry the new version
+        self.assertEqual(self.backend.authenticate(self._request(self._token()))[0], self.user)
+
+    def test_blacklisted_token_is_rejected(self):
+        token, other = self._token(), self._token()
+        self.backend.authenticate(self._request(token))
+
+        blacklist_access_token(token)
+
+        with self.assertRaises(InvalidToken):
+            self.backend.authenticate(self._request(token))
+        self.assertEqual(self.backend.authenticate(self._request(other))[0], self.user)
+
+    def test_repeat_requests_skip_the_shared_cache(self):
+        request = self._request(self._token())
+        self.backend.authenticate(request)
+
+        with mock.patch.object(authentication, 'cache', wraps=cache) as shared:
+            for _ in range(20):
+                self.backend.authenticate(request)
+        # At most the epoch poll, never the version or blacklist keys
+        self.assertFalse(shared.get_many.called)
+
+    def test_revocations_reach_other_processes_through_the_epoch(self):
+        # Another worker with its own local cache
+        other = RevocationState(poll_interval=0)
+        self.assertEqual(other.lookup(self.user.pk), (0, False))
+
+        blacklist_user_access_tokens(self.user)
+
+        self.assertEqual(other.lookup(self.user.pk), (1, False))
+
+        # Without polling, the local entry is served until it expires
+        stale = RevocationState(poll_interval=3600)
+        stale.lookup(self.user.pk)
+        blacklist_user_access_tokens(self.user)
+        self.assertEqual(stale.lookup(self.user.pk), (1, False))
+
+    def test_token_endpoints_issue_the_version_claim(self):
+        User.objects.filter(pk=self.user.pk).update(is_first_time_setup_complete=True)
+        factory = APIRequestFactory()
+        response = TokenObtainPairView.as_view()(factory.post(
+            '/api/token/', {'email': 'revoke@test.com', 'password': 'Sup3r-Secret-Pass!'}, format='json',
+        ))
+        self.assertEqual(response.status_code, 200, response.data)
+        refresh = response.data['refresh']
+        self.assertEqual(AccessToken(response.data['access'])['token_version'], 0)
+
+        blacklist_user_access_tokens(self.user)
+        response = TokenRefreshView.as_view()(factory.post('/api/token/refresh/', {'refresh': refresh}, format='json'))
+        self.assertEqual(response.status_code, 401)
+
+        self.user.refresh_from_db()
+        refresh = str(CustomTokenObtainPairSerializer.get_token(self.user))
+        response = TokenRefreshView.as_view()(factory.post('/api/token/refresh/', {'refresh': refresh}, format='json'))
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(AccessToken(response.data['access'])['token_version'], 1)
+        self.assertEqual(self.backend.authenticate(self._request(response.data['access']))[0], self.user)
@@ -2,14 +2,13 @@ from django.core.exceptions import ValidationError
 from django.utils.translation import gettext as _
 from django.contrib.auth.password_validation import validate_password
 from django.conf import settings
-from django.core.cache import cache
 import re
-import hashlib
-import requests
 from typing import List, Dict, Any
 import logging
 
+from .breach_corpus import breach_lookup
 from .models import PasswordHistory
+from .password_history import password_history
 
 logger = logging.getLogger(__name__)
 
@@ -117,56 +116,28 @@ class EnhancedPasswordStrengthValidator:
 class PasswordBreachValidator:
     """
     Validator that checks if a password has been compromised in known data breaches.
-    Uses HaveIBeenPwned API (k-anonymity approach for privacy).
+    Uses the shared breach lookup: the local breach corpus, with the HaveIBeenPwned
+    range API (k-anonymity approach for privacy) as optional fallback.
     """
     
     def __init__(self, min_breach_count=1):
         self.min_breach_count = min_breach_count
-        self.api_url = "https://api.pwnedpasswords.com/range/"
-        self.cache_timeout = 3600  # 1 hour cache
     
     def validate(self, password: str, user=None) -> None:
         """
-        Check if password has been compromised using k-anonymity approach.
+        Check if password appears in the breach corpus.
         """
         try:
-            # Create SHA-1 hash of password
-            password_hash = hashlib.sha1(password.encode('utf-8')).hexdigest().upper()
-            prefix = password_hash[:5]
-            suffix = password_hash[5:]
-            
-            # Check cache first
-            cache_key = f"pwned_password_{prefix}"
-            cached_results = cache.get(cache_key)
-            
-            if cached_results is None:
-                # Make API request
-                response = requests.get(f"{self.api_url}{prefix}", timeout=5)
-                if response.status_code == 200:
-                    cached_results = response.text
-                    cache.set(cache_key, cached_results, self.cache_timeout)
-                else:
-                    # If API is unavailable, skip validation
-                    logger.warning(f"HaveIBeenPwned API unavailable: {response.status_code}")
-                    return
-            
-            # Check if our password hash suffix is in the results
-            for line in cached_results.split('\n'):
-                if line.startswith(suffix):
-                    count = int(line.split(':')[1])
-                    if count >= self.min_breach_count:
-                        raise ValidationError(
-                            _("This password has been found in {count} data breaches. Please choose a different password.").format(count=count)
-                        )
-                    break
-                    
-        except requests.RequestException as e:
-            logger.warning(f"Password breach check failed: {e}")
-            # Don't fail validation if API is unavailable
-            return
+            count = breach_lookup.breach_count(password)
         except Exception as e:
             logger.error(f"Password breach validation error: {e}")
             return
+        
+        # None: no corpus and the API is off or unavailable; don't fail validation
+        if count and count >= self.min_breach_count:
+            raise ValidationError(
+                _("This password has been found in {count} data breaches. Please choose a different password.").format(count=count)
+            )
     
     def get_help_text(self) -> str:
         return _("Your password will be checked against known data breaches to ensure it hasn't been compromised.")
@@ -208,7 +179,7 @@ class FirstTimeSetupPasswordValidator:
         
         # For first-time setup, we need to check against the current password
         # which is typically a temporary password set by admin
-        if user.check_password(password):
+        if password_history.matches(user, password, user.password):
             raise ValidationError(
                 _("You cannot reuse the same password. Please choose a different password for security."),
                 code='password_reused_first_time'
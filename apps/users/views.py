@@ -507,7 +507,13 @@ class FirstTimeSetupView(LoginRequiredMixin, TemplateView):
 
 @method_decorator(skip_org_check, name='dispatch')
 class UserLogoutView(LogoutView):
-    """Logs out user and blacklists their refresh tokens and access tokens."""
+    """
+    Logs out user and blacklists their refresh tokens and access tokens.
+
+    This is a sign-out everywhere: raising the token version revokes the
+    user's API access tokens too, as blacklisting the refresh tokens already
+    does for their API sessions.
+    """
     def dispatch(self, request, *args, **kwargs):
         response = super().dispatch(request, *args, **kwargs)
         if request.user.is_authenticated:
@@ -1,8 +1,20 @@
+import logging
 import os
 from celery import Celery
+from celery.signals import worker_init
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings.production')
 
 app = Celery('config')
 app.config_from_object('django.conf:settings', namespace='CELERY')
-app.autodiscover_tasks() 
\ No newline at end of file
+app.autodiscover_tasks() 
+
+
+@worker_init.connect
+def load_schema_index(**kwargs):
+    """Load the agent schema index once in the parent so forked pool processes inherit it"""
+    try:
+        from services.agent.schema_index import get_schema_index
+        get_schema_index()
+    except Exception as e:
+        logging.getLogger('services.agent.schema_index').warning(f"Could not load schema index at worker boot: {e}")
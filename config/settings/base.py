@@ -180,6 +180,9 @@ SIMPLE_JWT = {
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
     'AUTH_TOKEN_CLASSES': ('rest_framework_simplejwt.tokens.AccessToken',),
+    # Every endpoint issuing tokens adds the token_version claim (see users.authentication)
+    'TOKEN_OBTAIN_SERIALIZER': 'users.serializers.CustomTokenObtainPairSerializer',
+    'TOKEN_REFRESH_SERIALIZER': 'users.serializers.TokenVersionRefreshSerializer',
 }
 
 # Crispy Forms configuration
@@ -591,6 +594,7 @@ LOGIN_REQUIRED_EXEMPT_URLS = [
     '/robots.txt',              # robots file
     '/health/',                 # health check
     '/document_management/upload/',  # token-based external document upload
+    '/files/',                  # signed, expiring download links
 
     # Static files and assets
     '/static/', '/media/', '/favicon.ico',
@@ -618,6 +622,40 @@ MAX_UPLOAD_SIZE_MB = 15
 ENABLE_VIRUS_SCANNING = os.getenv('ENABLE_VIRUS_SCANNING', 'False').lower() in ('true', '1', 'yes')
 FAIL_IF_SCANNER_UNAVAILABLE = False
 FAIL_ON_SCAN_ERROR = True
+CLAMD_SOCKET = os.getenv('CLAMD_SOCKET') or None  # unix socket; falls back to CLAMD_HOST:CLAMD_PORT
+CLAMD_HOST = os.getenv('CLAMD_HOST', '127.0.0.1')
+CLAMD_PORT = int(os.getenv('CLAMD_PORT', '3310'))
+CLAMD_TIMEOUT = 30
+CLAMD_POOL_SIZE = int(os.getenv('CLAMD_POOL_SIZE', '4'))  # pooled sessions per worker process
+CLAMD_IDLE_TIMEOUT = 20  # below clamd's IdleTimeout (30s)
+CLAMD_VERSION_TTL = 300  # how often to re-check the signature database version
+VIRUS_SCAN_VERDICT_TIMEOUT = 7 * 24 * 3600
+VIRUS_SCAN_BATCH_SIZE = 50  # documents per scan_pending_documents batch
+
+# Resumable (tus) document uploads
+CHUNKED_UPLOAD_MAX_SIZE_MB = int(os.getenv('CHUNKED_UPLOAD_MAX_SIZE_MB', '2048'))
+CHUNKED_UPLOAD_EXPIRY_HOURS = 24
+
+# Policy document ingestion (compliance.ingestion)
+POLICY_INGESTION_BATCH_SIZE = 500
+POLICY_SEARCH_CONFIG = 'english'  # PostgreSQL text search configuration
+
+# Segregation of duties analysis (compliance.sod)
+SOD_BATCH_SIZE = 1000  # violation rows per bulk write
+
+# Bulk risk scoring (risk.scoring)
+RISK_SCORING_BATCH_SIZE = 5000  # risks per UPDATE and summary audit entry
+
+# Protected downloads (core.downloads): hand transfers to the front proxy with
+# 'nginx' (X-Accel-Redirect to PROTECTED_DOWNLOADS_INTERNAL_URL) or 'sendfile'
+# (X-Sendfile); unset streams from the worker with Range support
+PROTECTED_DOWNLOADS_BACKEND = os.getenv('PROTECTED_DOWNLOADS_BACKEND') or None
+PROTECTED_DOWNLOADS_INTERNAL_URL = '/protected/'
+PROTECTED_DOWNLOADS_CHUNK_SIZE = 1024 * 1024
+SIGNED_DOWNLOAD_EXPIRY_SECONDS = 3600
+
+# Content-addressed file store (core.blobstore); unreferenced blobs are kept this long
+BLOB_STORE_GC_GRACE_HOURS = 24
 
 # ------------------------------------------------------------------------------
 # Custom Settings
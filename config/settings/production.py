@@ -163,7 +163,7 @@ REST_FRAMEWORK['DEFAULT_RENDERER_CLASSES'] = [
     'rest_framework.renderers.JSONRenderer',
 ]
 REST_FRAMEWORK['DEFAULT_AUTHENTICATION_CLASSES'] = [
-    'rest_framework_simplejwt.authentication.JWTAuthentication',
+    'users.authentication.BlacklistedJWTAuthentication',  # Honors logout blacklist and token versions
     'rest_framework.authentication.SessionAuthentication',
 ]
 
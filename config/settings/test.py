@@ -24,3 +24,7 @@ MIDDLEWARE = [mw for mw in MIDDLEWARE if mw != "debug_toolbar.middleware.DebugTo
 TENANT_CREATE_SCHEMA_AUTOMATICALLY = False
 TENANT_SYNC_SCHEMA_AUTOMATICALLY = False
 
+# ---------------------------------------------------------------------------
+# Password breach checks: local corpus only, never the pwnedpasswords API
+# ---------------------------------------------------------------------------
+PASSWORD_BREACH_API_FALLBACK = False
@@ -19,6 +19,8 @@ from rest_framework_simplejwt.views import (
     TokenRefreshView,
 )
 from common.views import service_paused
+from core.deadlines import DeadlineCalendarView
+from core.downloads import SignedDownloadView
 from audit import views as audit_views  # type: ignore[reportMissingImports]
 
 # Define a simple home view
@@ -82,6 +84,12 @@ urlpatterns = [
     # CKEditor 5
     path('upload/', include('django_ckeditor_5.urls')),
     
+    # Signed, expiring file links (core.downloads.signed_url)
+    path('files/<str:token>/', SignedDownloadView.as_view(), name='signed-download'),
+
+    # Deadline calendar feed (core.deadlines)
+    path('deadlines/calendar/', DeadlineCalendarView.as_view(), name='deadline-calendar'),
+
     # Health Check
     path('health/', lambda request: HttpResponse('ok'), name='health'),
 
@@ -6,6 +6,9 @@ from django.core.exceptions import FieldDoesNotExist
 from django_tenants.utils import tenant_context
 from rest_framework.exceptions import ValidationError
 
+from services.agent.field_matcher import FieldMatcher
+from services.agent.read_engine import ReadEngine
+from services.agent.relations import RelationResolver, relation_references
 from services.agent.schema_index import get_schema_index
 
 
@@ -24,6 +27,9 @@ class AgentExecutor:
         self.tenant = getattr(request, 'tenant', None)
         self.user = request.user
         self.schema_index = get_schema_index()
+        organization_id = getattr(self.user, 'organization_id', None) if getattr(self.user, 'is_authenticated', False) else None
+        # Memoizes resolved references for the lifetime of this executor
+        self.relations = RelationResolver(organization_id)
 
     def execute(self, intent: dict, preview: bool = False) -> dict:
         action = intent.get('action')
@@ -51,7 +57,7 @@ class AgentExecutor:
             if action == 'delete':
                 return self._delete(model_path, model_schema, obj_id, preview=preview)
             if action == 'read':
-                return self._read(model_path, model_schema, filters)
+                return self._read(model_path, model_schema, filters, intent)
 
         raise ValidationError({'detail': f'Unsupported intent: {action} {model_path}'})
 
@@ -74,7 +80,7 @@ class AgentExecutor:
                 'action': 'create',
                 'preview': True,
                 'data': serializer.validated_data,
-                'warnings': warnings,
+                'warnings': warnings + self.relations.warnings(),
                 'missing_required': self._missing_required_fields(mapped, schema),
             }
         obj = serializer.save()
@@ -111,7 +117,7 @@ class AgentExecutor:
                 'id': obj_id,
                 'preview': True,
                 'changes': changes,
-                'warnings': warnings,
+                'warnings': warnings + self.relations.warnings(),
                 'missing_required': self._missing_required_fields(mapped, schema),
             }
         obj = serializer.save()
@@ -133,21 +139,12 @@ class AgentExecutor:
             self._audit('agent_delete', model_path, obj_id, {})
         return {'model': model_path, 'id': obj_id, 'deleted': True}
 
-    def _read(self, model_path: str, schema: Dict[str, Any], filters: Dict[str, Any]) -> dict:
+    def _read(self, model_path: str, schema: Dict[str, Any], filters: Dict[str, Any], intent: dict = None) -> dict:
+        """Projected, aggregated or paged read; see ``services.agent.read_engine``"""
         model_cls = self._get_model_class(model_path)
         qs = self._scoped_queryset(model_cls, schema)
-
-        # Apply simple filters
-        safe_filters = {}
-        for key, value in (filters or {}).items():
-            if key in schema.get('fields', {}):
-                safe_filters[key] = value
-        if safe_filters:
-            qs = qs.filter(**safe_filters)
-
-        # Limit to avoid heavy responses
-        results = list(qs.values()[:50])
-        return {'model': model_path, 'results': results}
+        engine = ReadEngine(model_path, qs, schema, field_matcher=self._field_matcher(schema))
+        return engine.run({**(intent or {}), 'filters': filters})
 
     # ------------------------------------------------------------------ #
     # Helpers
@@ -193,18 +190,12 @@ class AgentExecutor:
 
     def _map_fields(self, incoming: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
         """Map intent fields to real field names using schema synonyms and ignore unknowns."""
-        mapped = {}
-        fields_meta = schema.get('fields', {})
-        for user_key, value in (incoming or {}).items():
-            if user_key in fields_meta:
-                mapped[user_key] = value
-                continue
-            # check synonyms
-            for field_name, meta in fields_meta.items():
-                if user_key.lower() in [s.lower() for s in meta.get('synonyms', [])]:
-                    mapped[field_name] = value
-                    break
-        return mapped
+        return self._field_matcher(schema).map(incoming)
+
+    def _field_matcher(self, schema: Dict[str, Any]) -> FieldMatcher:
+        """Precompiled matcher from the schema index; compiled ad hoc for schemas not in it"""
+        matcher = self.schema_index.get_field_matcher(f"{schema.get('app')}.{schema.get('model')}")
+        return matcher or FieldMatcher(schema.get('fields', {}))
 
     def _inject_org_if_needed(self, fields: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
         if 'organization' in schema.get('fields', {}) and hasattr(self.user, 'organization') and self.user.organization:
@@ -218,6 +209,8 @@ class AgentExecutor:
         """Resolve FK and M2M fields using schema metadata."""
         resolved = dict(fields)
         fields_meta = schema.get('fields', {})
+        # One query per related model for every reference in the payload
+        self.relations.prefetch(relation_references(resolved, fields_meta))
         for fname, meta in fields_meta.items():
             if fname not in resolved:
                 continue
@@ -231,50 +224,23 @@ class AgentExecutor:
         return resolved
 
     def _resolve_fk(self, related_model_path: str, value: Any):
-        model_cls = self._get_model_class(related_model_path)
-        if isinstance(value, int):
-            return value
+        self._get_model_class(related_model_path)  # validates the path
         if isinstance(value, str):
-            qs = self._scoped_queryset(model_cls, self.schema_index.get_model_schema(related_model_path) or {})
-            # heuristics for user-like models
-            if model_cls._meta.model_name in ['user', 'customuser']:
-                for field in ['email', 'username']:
-                    if field in [f.name for f in model_cls._meta.fields]:
-                        found = qs.filter(**{field: value}).values_list('id', flat=True)[:1]
-                        if found:
-                            return found[0]
-            for field in ['code', 'name', 'title']:
-                if field in [f.name for f in model_cls._meta.fields]:
-                    found = qs.filter(**{field: value}).values_list('id', flat=True)[:1]
-                    if found:
-                        return found[0]
+            found = self.relations.lookup(related_model_path, value)
+            if found is not None:
+                return found
         return value  # fallback unmodified
 
     def _resolve_m2m(self, related_model_path: str, value: Any):
-        model_cls = self._get_model_class(related_model_path)
+        self._get_model_class(related_model_path)  # validates the path
         if not isinstance(value, (list, tuple)):
             return value
         resolved_ids = []
         for item in value:
-            if isinstance(item, int):
-                resolved_ids.append(item)
-                continue
-            if isinstance(item, str):
-                qs = self._scoped_queryset(model_cls, self.schema_index.get_model_schema(related_model_path) or {})
-                if model_cls._meta.model_name in ['user', 'customuser']:
-                    for field in ['email', 'username']:
-                        if field in [f.name for f in model_cls._meta.fields]:
-                            found = qs.filter(**{field: item}).values_list('id', flat=True)[:1]
-                            if found:
-                                resolved_ids.append(found[0])
-                                break
-                    continue
-                for field in ['code', 'name', 'title']:
-                    if field in [f.name for f in model_cls._meta.fields]:
-                        found = qs.filter(**{field: item}).values_list('id', flat=True)[:1]
-                        if found:
-                            resolved_ids.append(found[0])
-                            break
+            if isinstance(item, (int, str)):
+                found = self.relations.lookup(related_model_path, item)
+                if found is not None:
+                    resolved_ids.append(found)
         return resolved_ids
 
     def _check_permissions(self, action: str, model_path: str):
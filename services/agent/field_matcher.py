@@ -0,0 +1,123 @@
+"""
+Precompiled field matching for agent payloads.
+
+Agents receive field names the way users phrase them ("fy", "Status",
+"fiscal year"). A ``FieldMatcher`` is compiled once per model from its schema
+index entry, so mapping a payload costs one dictionary lookup per key:
+
+1. exact field name
+2. synonym (case-insensitive), optionally the field name case-insensitively
+3. fuzzy fallback: the normalized key ("Fiscal Year" -> "fiscal_year"),
+   then the most similar name or synonym by trigram similarity
+
+Steps 1 and 2 give the same results as the previous per-key scan over every
+field and synonym; where several fields share a synonym the first field in
+schema order wins, as before.
+"""
+import re
+from collections import defaultdict
+from typing import Any, Dict, Optional
+
+from django.conf import settings
+
+_NON_WORD = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_key(key: str) -> str:
+    """Lower-case, with runs of non-alphanumerics collapsed to ``_``"""
+    return _NON_WORD.sub('_', str(key).lower()).strip('_')
+
+
+def trigrams(token: str) -> set:
+    """Trigrams of ``token`` padded like pg_trgm (two leading, one trailing space)"""
+    padded = f"  {token.replace('_', ' ')} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class FieldMatcher:
+    """Maps user-supplied keys to the fields of one model"""
+
+    def __init__(self, fields_meta: Dict[str, Any], fuzzy_threshold: Optional[float] = None):
+        self.fields = list(fields_meta)
+        self._field_set = set(self.fields)
+        if fuzzy_threshold is None:
+            fuzzy_threshold = getattr(settings, 'AGENT_FIELD_FUZZY_THRESHOLD', 0.6)
+        self.fuzzy_threshold = fuzzy_threshold
+
+        self._by_synonym: Dict[str, str] = {}
+        self._by_synonym_or_name: Dict[str, str] = {}
+        self._by_normalized: Dict[str, str] = {}
+        self._trigram_index: Dict[str, set] = defaultdict(set)
+        self._token_trigrams: Dict[str, set] = {}
+        self._token_order: Dict[str, int] = {}
+
+        for position, (field_name, meta) in enumerate(fields_meta.items()):
+            synonyms = [synonym.lower() for synonym in (meta or {}).get('synonyms', [])]
+            for synonym in synonyms:
+                self._by_synonym.setdefault(synonym, field_name)
+            for token in synonyms + [field_name.lower()]:
+                self._by_synonym_or_name.setdefault(token, field_name)
+            for token in [field_name] + synonyms:
+                normalized = normalize_key(token)
+                if not normalized or normalized in self._by_normalized:
+                    continue
+                self._by_normalized[normalized] = field_name
+                self._token_order[normalized] = position
+                grams = trigrams(normalized)
+                self._token_trigrams[normalized] = grams
+                for gram in grams:
+                    self._trigram_index[gram].add(normalized)
+
+    def match(self, key: str, field_names: bool = False, fuzzy: bool = True) -> Optional[str]:
+        """
+        Field for ``key`` or None.
+
+        Args:
+            key: User-supplied field name
+            field_names: Also match field names case-insensitively (step 2)
+            fuzzy: Fall back to normalized/trigram matching (step 3)
+        """
+        if key in self._field_set:
+            return key
+        token = str(key).lower()
+        table = self._by_synonym_or_name if field_names else self._by_synonym
+        if token in table:
+            return table[token]
+        if fuzzy:
+            return self._fuzzy(key)
+        return None
+
+    def map(self, incoming: Dict[str, Any], field_names: bool = False, fuzzy: bool = True) -> Dict[str, Any]:
+        """Map a payload's keys to field names, dropping keys that match nothing"""
+        mapped = {}
+        for key, value in (incoming or {}).items():
+            field_name = self.match(key, field_names=field_names, fuzzy=fuzzy)
+            if field_name is not None:
+                mapped[field_name] = value
+        return mapped
+
+    def _fuzzy(self, key: str) -> Optional[str]:
+        normalized = normalize_key(key)
+        if not normalized:
+            return None
+        if normalized in self._by_normalized:
+            return self._by_normalized[normalized]
+        if not self.fuzzy_threshold:
+            return None
+
+        grams = trigrams(normalized)
+        shared = defaultdict(int)
+        for gram in grams:
+            for token in self._trigram_index.get(gram, ()):
+                shared[token] += 1
+
+        # Most similar token; ties go to the field that comes first
+        best, best_rank = None, None
+        for token, count in shared.items():
+            score = count / (len(grams) + len(self._token_trigrams[token]) - count)
+            if score < self.fuzzy_threshold:
+                continue
+            rank = (score, -self._token_order[token])
+            if best_rank is None or rank > best_rank:
+                best, best_rank = token, rank
+        return self._by_normalized[best] if best else None
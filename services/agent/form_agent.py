@@ -10,6 +10,8 @@ from django.db import models
 import logging
 import re
 
+from .field_matcher import FieldMatcher
+from .relations import RelationResolver, relation_references
 from .schema_index import get_schema_index
 from organizations.models import Organization  # type: ignore[reportMissingImports]
 
@@ -40,6 +42,8 @@ class FormAgent:
         self.user = user
         self.organization = organization or getattr(user, 'organization', None)
         self.schema_index = get_schema_index()
+        # Memoizes resolved references for the lifetime of this agent
+        self.relations = RelationResolver(self.organization.id if self.organization else None)
         
         if not self.organization:
             logger.warning(f"FormAgent initialized without organization for user {user.id}")
@@ -98,26 +102,17 @@ class FormAgent:
     def _map_input_to_fields(self, user_input: Dict[str, Any], schema: Dict[str, Any]) -> Dict[str, Any]:
         """Map user input to actual field names using synonyms"""
         mapped = {}
-        fields = schema.get('fields', {})
+        matcher = self.schema_index.get_field_matcher(f"{schema.get('app')}.{schema.get('model')}") \
+            or FieldMatcher(schema.get('fields', {}))
         
         for input_key, input_value in user_input.items():
-            # Try exact match first
-            if input_key in fields:
-                mapped[input_key] = input_value
-                continue
-            
-            # Try synonym matching
-            found = False
-            for field_name, field_info in fields.items():
-                synonyms = field_info.get('synonyms', [])
-                if input_key.lower() in [s.lower() for s in synonyms] or input_key.lower() == field_name.lower():
-                    mapped[field_name] = input_value
-                    found = True
-                    logger.debug(f"Mapped '{input_key}' -> '{field_name}' (synonym)")
-                    break
-            
-            if not found:
+            field_name = matcher.match(input_key, field_names=True)
+            if field_name is None:
                 logger.debug(f"Could not map input field '{input_key}' to any model field")
+                continue
+            if field_name != input_key:
+                logger.debug(f"Mapped '{input_key}' -> '{field_name}' (synonym)")
+            mapped[field_name] = input_value
         
         return mapped
     
@@ -219,6 +214,8 @@ class FormAgent:
         """Resolve ForeignKey and ManyToMany relationships"""
         resolved = mapped_fields.copy()
         fields = schema.get('fields', {})
+        # One query per related model for every reference in the input
+        self.relations.prefetch(relation_references(mapped_fields, fields))
         
         for field_name, field_value in mapped_fields.items():
             if field_name not in fields:
@@ -256,55 +253,10 @@ class FormAgent:
         return resolved
     
     def _resolve_foreign_key(self, related_model_path: Optional[str], value: Any, field_name: str) -> Optional[int]:
-        """Resolve a ForeignKey value (name/code) to an ID"""
+        """Resolve a ForeignKey value (name/code/email/ID) to an ID within the organization"""
         if not related_model_path:
             return None
-        
-        try:
-            model = apps.get_model(*related_model_path.split('.'))
-            
-            # If already an ID, return it
-            if isinstance(value, int):
-                return value
-            
-            # Try to find by name/title/code
-            value_str = str(value).strip()
-            
-            # Common field names to search
-            search_fields = ['name', 'title', 'code', 'email', 'username']
-            
-            for search_field in search_fields:
-                if hasattr(model, search_field):
-                    try:
-                        obj = model.objects.filter(**{search_field: value_str}).first()
-                        if obj:
-                            # Check organization if model has it
-                            if hasattr(obj, 'organization') and self.organization:
-                                if obj.organization_id == self.organization.id:
-                                    return obj.id
-                            else:
-                                return obj.id
-                    except Exception:
-                        continue
-            
-            # Try exact ID match
-            try:
-                obj_id = int(value_str)
-                obj = model.objects.filter(id=obj_id).first()
-                if obj:
-                    # Check organization if model has it
-                    if hasattr(obj, 'organization') and self.organization:
-                        if obj.organization_id == self.organization.id:
-                            return obj.id
-                    else:
-                        return obj.id
-            except ValueError:
-                pass
-        
-        except Exception as e:
-            logger.debug(f"Error resolving ForeignKey {related_model_path} with value {value}: {e}")
-        
-        return None
+        return self.relations.lookup(related_model_path, value)
     
     def _check_security(self, model_path: str, schema: Dict[str, Any], 
                        fields: Dict[str, Any]) -> Dict[str, Any]:
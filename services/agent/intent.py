@@ -7,5 +7,13 @@ class IntentSerializer(serializers.Serializer):
     fields = serializers.DictField(child=serializers.JSONField(), required=False)  # type: ignore[assignment]
     filters = serializers.DictField(child=serializers.JSONField(), required=False)  # type: ignore[assignment]
     id = serializers.IntegerField(required=False)
+    # Reads: projection, aggregation ("count", "avg:<field>"), keyset paging
+    select = serializers.ListField(child=serializers.CharField(), required=False)
+    aggregate = serializers.ListField(child=serializers.CharField(), required=False)
+    group_by = serializers.ListField(child=serializers.CharField(), required=False)
+    order_by = serializers.ListField(child=serializers.CharField(), required=False)
+    limit = serializers.IntegerField(required=False, min_value=1)
+    cursor = serializers.CharField(required=False, allow_blank=True)
+    max_tokens = serializers.IntegerField(required=False, min_value=1)
     preview = serializers.BooleanField(required=False, default=False)
     confidence = serializers.FloatField(required=False, default=0.0)
@@ -0,0 +1,71 @@
+"""
+Management command to build the persisted schema index artifact.
+
+Run at deploy (and on worker boot) so agent requests load the index in
+milliseconds instead of introspecting every model, serializer and form.
+"""
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from services.agent.schema_index import EnhancedSchemaIndex, artifact_path, registry_hash
+
+
+class Command(BaseCommand):
+    help = 'Build the schema index artifact used by the form/data agent'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path',
+            type=str,
+            help='Artifact location (default: SCHEMA_INDEX_PATH); .json writes JSON, anything else msgpack',
+        )
+        parser.add_argument(
+            '--if-stale',
+            action='store_true',
+            help='Only build when the artifact is missing or the model registry changed',
+        )
+        parser.add_argument(
+            '--check',
+            action='store_true',
+            help='Do not build; exit with status 1 if the artifact is missing or stale',
+        )
+
+    def handle(self, *args, **options):
+        path = options.get('path') or artifact_path()
+        if not path:
+            self.stdout.write(self.style.WARNING('SCHEMA_INDEX_PATH is disabled; nothing to build.'))
+            return
+
+        started = time.perf_counter()
+        current_hash = registry_hash()
+        hash_ms = (time.perf_counter() - started) * 1000
+        existing = EnhancedSchemaIndex.load(path, expected_hash=current_hash)
+
+        if options['check']:
+            if existing is None:
+                self.stdout.write(self.style.ERROR(f'Schema index artifact {path} is missing or stale.'))
+                sys.exit(1)
+            self.stdout.write(self.style.SUCCESS(f'Schema index artifact {path} is current ({current_hash[:12]}).'))
+            return
+
+        if options['if_stale'] and existing is not None:
+            self.stdout.write(
+                f'Schema index artifact {path} is current ({current_hash[:12]}); '
+                f'loaded in {existing.timings["seconds"] * 1000:.1f}ms.'
+            )
+            return
+
+        index = EnhancedSchemaIndex().build()
+        path = index.save(path)
+        loaded = EnhancedSchemaIndex.load(path, expected_hash=current_hash)
+
+        self.stdout.write(self.style.SUCCESS(f'Schema index written to {path}'))
+        self.stdout.write(f'  registry hash: {current_hash[:12]} (computed in {hash_ms:.1f}ms)')
+        self.stdout.write(
+            f'  contents:      {len(index.models)} models, {len(index.serializers)} serializers, '
+            f'{len(index.forms)} forms, {path.stat().st_size / 1024:.0f} KiB'
+        )
+        self.stdout.write(f'  build:         {index.timings["seconds"] * 1000:.0f}ms')
+        self.stdout.write(f'  load:          {loaded.timings["seconds"] * 1000:.1f}ms')
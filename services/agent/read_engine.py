@@ -0,0 +1,307 @@
+"""
+Structured reads for agent data questions.
+
+``AgentExecutor._read`` used to return ``list(qs.values()[:50])``: every
+column, a hard cap and no way to page or aggregate. ``ReadEngine`` runs a
+read intent as:
+
+- projection: only the requested fields (``select``), resolved through the
+  model's field matcher; ``__`` paths follow forward relations
+- aggregation: ``aggregate=["count", "avg:residual_risk_score"]`` with an
+  optional ``group_by``, computed by the database
+- keyset paging: each page carries a signed ``next_cursor`` that continues
+  after the last row (or group) without OFFSET
+- a token budget: long text is shortened and rows stream in only until the
+  estimated prompt size is reached; a summary describes what was left out
+
+Example intent::
+
+    {"action": "read", "model": "audit.Issue", "filters": {"issue_status": "open"},
+     "aggregate": ["count"], "group_by": ["engagement__title"], "order_by": ["-count"]}
+"""
+import hashlib
+import json
+import re
+from collections import Counter
+from typing import Any, Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.exceptions import FieldDoesNotExist
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Avg, Count, F, Max, Min, Q, Sum
+from rest_framework.exceptions import ValidationError
+
+AGGREGATES = {'count': Count, 'sum': Sum, 'avg': Avg, 'min': Min, 'max': Max}
+
+NUMERIC_TYPES = {
+    'IntegerField', 'BigIntegerField', 'SmallIntegerField', 'PositiveIntegerField',
+    'PositiveBigIntegerField', 'PositiveSmallIntegerField', 'FloatField', 'DecimalField',
+}
+
+FILTER_LOOKUPS = {'exact', 'iexact', 'in', 'gt', 'gte', 'lt', 'lte', 'contains', 'icontains', 'isnull', 'range'}
+
+# Never selectable, filterable or groupable through an agent
+SENSITIVE_FIELD = re.compile(r'password|secret|token|api_key|private_key', re.IGNORECASE)
+
+CURSOR_SALT = 'services.agent.read_engine.cursor'
+
+
+def estimate_tokens(value: Any) -> int:
+    """Rough prompt size of a JSON value (about four characters per token)"""
+    return len(json.dumps(value, cls=DjangoJSONEncoder)) // 4 + 1
+
+
+class ReadEngine:
+    """Runs one read intent against an already scoped queryset"""
+
+    def __init__(self, model_path: str, queryset, schema: Dict[str, Any], field_matcher=None):
+        self.model_path = model_path
+        self.queryset = queryset
+        self.model = queryset.model
+        self.schema = schema
+        self.field_matcher = field_matcher
+        self.max_rows = getattr(settings, 'AGENT_READ_MAX_ROWS', 500)
+        self.max_text = getattr(settings, 'AGENT_READ_MAX_TEXT', 300)
+
+    # ------------------------------------------------------------------ #
+    # Entry point
+    # ------------------------------------------------------------------ #
+    def run(self, intent: Dict[str, Any]) -> dict:
+        limit = min(int(intent.get('limit') or 50), self.max_rows)
+        budget = int(intent.get('max_tokens') or getattr(settings, 'AGENT_READ_TOKEN_BUDGET', 2000))
+        qs = self.queryset.filter(self._filters(intent.get('filters') or {}))
+
+        aggregates = self._aggregates(intent.get('aggregate') or [])
+        group_by = [self._path(key) for key in intent.get('group_by') or []]
+        spec_hash = self._spec_hash(intent)
+
+        if aggregates and not group_by:
+            return {'model': self.model_path, 'aggregates': qs.aggregate(**aggregates)}
+        if aggregates:
+            return self._grouped(qs, aggregates, group_by, intent, limit, budget, spec_hash)
+        return self._rows(qs, intent, limit, budget, spec_hash)
+
+    # ------------------------------------------------------------------ #
+    # Reads
+    # ------------------------------------------------------------------ #
+    def _rows(self, qs, intent, limit, budget, spec_hash) -> dict:
+        select = [self._path(key) for key in intent.get('select') or []] or self._default_projection()
+        ordering = self._ordering(intent.get('order_by') or [], aliases=()) + [('pk', False)]
+        matching = qs
+        qs = self._apply_cursor(qs, ordering, intent.get('cursor'), spec_hash)
+
+        order_paths = [path for path, _ in ordering]
+        columns = list(dict.fromkeys(select + order_paths))
+        rows = qs.order_by(*self._order_expressions(ordering)).values(*columns)[:limit + 1]
+
+        results, last, has_more, budget_hit = [], None, False, False
+        used = estimate_tokens({'model': self.model_path, 'fields': select})
+        for row in rows.iterator(chunk_size=limit + 1):
+            if len(results) == limit:
+                has_more = True
+                break
+            item = {key: self._shorten(row[key]) for key in select}
+            cost = estimate_tokens(item)
+            if results and used + cost > budget:
+                has_more = budget_hit = True
+                break
+            results.append(item)
+            used += cost
+            last = [row[path] for path in order_paths]
+
+        response = {
+            'model': self.model_path,
+            'fields': select,
+            'results': results,
+            'count': len(results),
+            'next_cursor': self._cursor(spec_hash, last) if has_more and last else None,
+            'truncated': budget_hit,
+        }
+        if has_more:
+            response['summary'] = self._summary(matching, select, results, budget_hit)
+        return response
+
+    def _grouped(self, qs, aggregates, group_by, intent, limit, budget, spec_hash) -> dict:
+        ordering = self._ordering(intent.get('order_by') or [], aliases=aggregates) or []
+        ordering += [(path, False) for path in group_by if path not in {p for p, _ in ordering}]
+        qs = qs.order_by().values(*group_by).annotate(**aggregates)
+        qs = self._apply_cursor(qs, ordering, intent.get('cursor'), spec_hash)
+        groups = list(qs.order_by(*self._order_expressions(ordering))[:limit + 1])
+
+        has_more = len(groups) > limit
+        groups = groups[:limit]
+        used, kept = 0, []
+        for group in groups:
+            cost = estimate_tokens(group)
+            if kept and used + cost > budget:
+                has_more = True
+                break
+            kept.append(group)
+            used += cost
+        last = [kept[-1][path] for path, _ in ordering] if kept else None
+        return {
+            'model': self.model_path,
+            'group_by': group_by,
+            'groups': kept,
+            'count': len(kept),
+            'next_cursor': self._cursor(spec_hash, last) if has_more and last else None,
+            'truncated': len(kept) < len(groups),
+        }
+
+    def _summary(self, qs, select, results, budget_hit) -> dict:
+        """What the page leaves out: the total across all pages and per-column overviews of this page"""
+        summary = {'total': qs.count(), 'returned': len(results)}
+        if budget_hit:
+            summary['note'] = 'Rows were cut to fit the token budget; pass next_cursor to continue.'
+        columns = {}
+        for key in select:
+            values = [row[key] for row in results if row[key] is not None]
+            field = self._field(key)
+            if getattr(field, 'choices', None):
+                columns[key] = dict(Counter(values).most_common(10))
+            elif field is not None and field.get_internal_type() in NUMERIC_TYPES and values:
+                columns[key] = {'min': min(values), 'max': max(values)}
+        if columns:
+            summary['columns'] = columns
+        return summary
+
+    # ------------------------------------------------------------------ #
+    # Intent parsing
+    # ------------------------------------------------------------------ #
+    def _path(self, key: str) -> str:
+        """Validate a field path, mapping its first segment through the field matcher"""
+        head, _, rest = str(key).partition('__')
+        if self.field_matcher is not None:
+            head = self.field_matcher.match(head, field_names=True) or head
+        path = f'{head}__{rest}' if rest else head
+        self._resolve(path)
+        return path
+
+    def _resolve(self, path: str):
+        model, field = self.model, None
+        for name in path.split('__'):
+            if SENSITIVE_FIELD.search(name):
+                raise ValidationError({'detail': f'Field not readable: {path}'})
+            if field is not None:
+                if not field.is_relation:
+                    raise ValidationError({'detail': f'Unknown field: {path}'})
+                model = field.related_model
+            try:
+                field = model._meta.get_field(name)
+            except FieldDoesNotExist:
+                raise ValidationError({'detail': f'Unknown field: {path}'})
+            if field.one_to_many or field.many_to_many:
+                raise ValidationError({'detail': f'Cannot read across a to-many relation: {path}'})
+        return field
+
+    def _field(self, path: str):
+        try:
+            return self._resolve(path)
+        except ValidationError:
+            return None
+
+    def _default_projection(self) -> List[str]:
+        return [
+            field.attname if field.is_relation else field.name
+            for field in self.model._meta.concrete_fields
+            if not SENSITIVE_FIELD.search(field.name)
+        ]
+
+    def _filters(self, filters: Dict[str, Any]) -> Q:
+        q = Q()
+        for key, value in filters.items():
+            path, _, lookup = str(key).rpartition('__')
+            if lookup not in FILTER_LOOKUPS:
+                path, lookup = key, 'exact'
+            try:
+                path = self._path(path)
+            except ValidationError:
+                # Unknown keys are ignored, as before
+                continue
+            q &= Q(**{f'{path}__{lookup}': value})
+        return q
+
+    def _aggregates(self, specs: List[str]) -> Dict[str, Any]:
+        aggregates = {}
+        for spec in specs:
+            fn, _, key = str(spec).partition(':')
+            fn = fn.strip().lower()
+            if fn not in AGGREGATES:
+                raise ValidationError({'detail': f'Unsupported aggregate: {spec}'})
+            if not key or key == '*':
+                if fn != 'count':
+                    raise ValidationError({'detail': f'{fn} needs a field: {spec}'})
+                aggregates['count'] = Count('pk')
+                continue
+            path = self._path(key)
+            if fn in ('sum', 'avg') and self._resolve(path).get_internal_type() not in NUMERIC_TYPES:
+                raise ValidationError({'detail': f'{fn} needs a numeric field: {spec}'})
+            aggregates[f'{fn}_{path}'] = AGGREGATES[fn](path)
+        return aggregates
+
+    def _ordering(self, order_by: List[str], aliases) -> List[Tuple[str, bool]]:
+        ordering = []
+        for key in order_by:
+            descending = str(key).startswith('-')
+            name = str(key).lstrip('-')
+            ordering.append((name if name in aliases else self._path(name), descending))
+        return ordering
+
+    # ------------------------------------------------------------------ #
+    # Keyset paging
+    # ------------------------------------------------------------------ #
+    def _order_expressions(self, ordering):
+        return [
+            F(path).desc(nulls_first=True) if descending else F(path).asc(nulls_last=True)
+            for path, descending in ordering
+        ]
+
+    def _apply_cursor(self, qs, ordering, cursor: Optional[str], spec_hash: str):
+        if not cursor:
+            return qs
+        try:
+            data = signing.loads(cursor, salt=CURSOR_SALT)
+        except signing.BadSignature:
+            raise ValidationError({'detail': 'Invalid cursor'})
+        if data.get('m') != self.model_path or data.get('s') != spec_hash or len(data.get('k', [])) != len(ordering):
+            raise ValidationError({'detail': 'Cursor does not belong to this query'})
+        values = [self._from_cursor(path, value) for (path, _), value in zip(ordering, data['k'])]
+        return qs.filter(self._after(ordering, values))
+
+    def _after(self, ordering, values) -> Q:
+        """Rows strictly after ``values`` in ``ordering`` (ASC NULLS LAST / DESC NULLS FIRST)"""
+        condition = Q(pk__in=[])
+        ties = Q()
+        for (path, descending), value in zip(ordering, values):
+            if value is None:
+                step = Q(**{f'{path}__isnull': False}) if descending else Q(pk__in=[])
+                tie = Q(**{f'{path}__isnull': True})
+            else:
+                step = Q(**{f'{path}__{"lt" if descending else "gt"}': value})
+                if not descending:
+                    step |= Q(**{f'{path}__isnull': True})
+                tie = Q(**{path: value})
+            condition |= ties & step
+            ties &= tie
+        return condition
+
+    def _cursor(self, spec_hash: str, values) -> str:
+        values = json.loads(json.dumps(values, cls=DjangoJSONEncoder))
+        return signing.dumps({'m': self.model_path, 's': spec_hash, 'k': values}, salt=CURSOR_SALT, compress=True)
+
+    def _from_cursor(self, path: str, value):
+        field = self._field(path) if path != 'pk' else self.model._meta.pk
+        if value is None or field is None:
+            return value
+        target = getattr(field, 'target_field', field) if field.is_relation else field
+        return target.to_python(value)
+
+    def _spec_hash(self, intent: Dict[str, Any]) -> str:
+        spec = {key: intent.get(key) for key in ('filters', 'select', 'aggregate', 'group_by', 'order_by')}
+        return hashlib.sha256(json.dumps(spec, sort_keys=True, cls=DjangoJSONEncoder).encode()).hexdigest()[:16]
+
+    def _shorten(self, value):
+        if isinstance(value, str) and len(value) > self.max_text:
+            return value[:self.max_text] + '…'
+        return value
@@ -0,0 +1,155 @@
+"""
+Batched relation resolution for agent payloads.
+
+Agents receive relations as human references ("Q3 Audit", "jane@example.com",
+"42"). The resolver collects every reference in a payload, resolves each
+target model with a single OR-ed query across all candidate lookup fields,
+ranks ambiguous matches and memoizes results for the lifetime of the agent
+(one ``AgentExecutor`` or ``FormAgent``).
+"""
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from django.apps import apps
+from django.db.models import Q
+import logging
+
+logger = logging.getLogger('services.agent.relations')
+
+# Candidate lookup fields, best first: identifiers before display names
+LOOKUP_FIELDS = ['email', 'username', 'code', 'name', 'title']
+
+TEXT_FIELD_TYPES = {'CharField', 'EmailField', 'SlugField', 'TextField'}
+
+RELATION_TYPES = {'ForeignKey', 'ManyToManyField'}
+
+
+def relation_references(fields: Dict[str, Any], fields_meta: Dict[str, Any]) -> List[Tuple[str, Any]]:
+    """``(related model, value)`` pairs for every FK/M2M value in an agent payload"""
+    references = []
+    for field_name, value in fields.items():
+        meta = fields_meta.get(field_name) or {}
+        related_model = meta.get('related_model')
+        if not related_model or meta.get('type') not in RELATION_TYPES:
+            continue
+        values = value if isinstance(value, (list, tuple)) else [value]
+        references.extend((related_model, item) for item in values)
+    return references
+
+
+def _is_id(value: str) -> bool:
+    return value.isascii() and value.isdigit()
+
+
+class RelationResolver:
+    """
+    Resolves references to primary keys, one query per target model.
+
+    Matches are ranked by lookup field (see ``LOOKUP_FIELDS``, numeric strings
+    as primary keys last); several rows matching on the best field are
+    ambiguous, the most recently created one wins and the candidates are kept
+    in ``ambiguous`` for the caller to report.
+    """
+
+    def __init__(self, organization_id: Optional[int] = None):
+        self.organization_id = organization_id
+        self.ambiguous: Dict[Tuple[str, str], List[int]] = {}
+        self._memo: Dict[Tuple[str, str], Optional[int]] = {}
+        self._lookup_fields: Dict[str, List[str]] = {}
+
+    def lookup(self, model_path: str, value: Any) -> Optional[int]:
+        """Primary key for ``value`` (ints pass through), or None when nothing matches"""
+        if isinstance(value, int) and not isinstance(value, bool):
+            return value
+        key = self._key(model_path, value)
+        if key is None:
+            return None
+        if key not in self._memo:
+            self.prefetch([(model_path, value)])
+        return self._memo.get(key)
+
+    def prefetch(self, references: Iterable[Tuple[str, Any]]) -> None:
+        """Resolve all not yet memoized references, one query per target model"""
+        pending = defaultdict(set)
+        for model_path, value in references:
+            if isinstance(value, int):
+                continue
+            key = self._key(model_path, value)
+            if key is not None and key not in self._memo:
+                pending[model_path].add(key[1])
+        for model_path, values in pending.items():
+            self._resolve_model(model_path, values)
+
+    def warnings(self) -> List[str]:
+        return [
+            f"'{value}' matches several {model_path} records {candidates}; using {candidates[0]}"
+            for (model_path, value), candidates in self.ambiguous.items()
+        ]
+
+    def _key(self, model_path: str, value: Any) -> Optional[Tuple[str, str]]:
+        if value is None or isinstance(value, (dict, list, tuple, bool)):
+            return None
+        text = str(value).strip()
+        return (model_path, text) if text else None
+
+    def _model_lookup_fields(self, model) -> List[str]:
+        label = model._meta.label
+        if label not in self._lookup_fields:
+            concrete = {field.name: field for field in model._meta.concrete_fields}
+            self._lookup_fields[label] = [
+                name for name in LOOKUP_FIELDS
+                if name in concrete and concrete[name].get_internal_type() in TEXT_FIELD_TYPES
+            ]
+        return self._lookup_fields[label]
+
+    def _queryset(self, model):
+        queryset = model._default_manager.all()
+        if self.organization_id and any(field.name == 'organization' for field in model._meta.concrete_fields):
+            queryset = queryset.filter(organization_id=self.organization_id)
+        return queryset
+
+    def _resolve_model(self, model_path: str, values) -> None:
+        for value in values:
+            self._memo[(model_path, value)] = None
+        try:
+            model = apps.get_model(*model_path.split('.'))
+        except (LookupError, ValueError):
+            logger.debug(f"Cannot resolve references to unknown model {model_path}")
+            return
+
+        lookup_fields = self._model_lookup_fields(model)
+        ids = {int(value) for value in values if _is_id(value)}
+        condition = Q()
+        for field_name in lookup_fields:
+            condition |= Q(**{f'{field_name}__in': values})
+        if ids:
+            condition |= Q(pk__in=ids)
+        if not condition:
+            return
+
+        try:
+            rows = list(self._queryset(model).filter(condition).values_list('pk', *lookup_fields))
+        except Exception as e:
+            logger.debug(f"Error resolving references to {model_path}: {e}")
+            return
+
+        # rank: position of the matching field, then newest first
+        ranks = len(lookup_fields)
+        for value in values:
+            best_rank, candidates = None, []
+            for row in rows:
+                pk, row_values = row[0], row[1:]
+                rank = next((i for i, field_value in enumerate(row_values) if field_value == value), None)
+                if rank is None and _is_id(value) and pk == int(value):
+                    rank = ranks
+                if rank is None or (best_rank is not None and rank > best_rank):
+                    continue
+                if best_rank is None or rank < best_rank:
+                    best_rank, candidates = rank, []
+                candidates.append(pk)
+            if not candidates:
+                continue
+            candidates.sort(reverse=True)
+            self._memo[(model_path, value)] = candidates[0]
+            if len(candidates) > 1:
+                self.ambiguous[(model_path, value)] = candidates
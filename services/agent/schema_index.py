@@ -1,10 +1,23 @@
 """
 Enhanced Schema Indexer for Oreno GRC
 Comprehensively indexes all models, serializers, and forms with full metadata
+
+Building the index imports every serializer and form module and takes
+seconds, so it is persisted: ``manage.py build_schema_index`` (run at deploy
+and on worker boot) writes a versioned msgpack/JSON artifact keyed by a hash
+of the model registry, and workers load it in milliseconds. The index is only
+rebuilt when the hash no longer matches.
 """
+import hashlib
+import importlib.util
 import inspect
+import json
+import os
+import time
+from pathlib import Path
 from typing import Dict, Any, List, Optional, Set
 from django.apps import apps
+from django.conf import settings
 from django.db import models
 from django.core.validators import BaseValidator
 from django.forms import ModelForm
@@ -12,8 +25,40 @@ from rest_framework import serializers
 from rest_framework.serializers import ModelSerializer
 import logging
 
+from .field_matcher import FieldMatcher
+
+try:
+    import msgpack
+except ImportError:
+    msgpack = None
+
 logger = logging.getLogger('services.agent.schema_index')
 
+# Bump when the structure of the indexed metadata changes
+INDEX_FORMAT_VERSION = 1
+
+DEFAULT_TARGET_APPS = frozenset({
+    "audit", "risk", "compliance", "contracts",
+    "legal", "document_management", "ai_governance",
+    "organizations", "users"
+})
+
+SERIALIZER_MODULES = [
+    'audit.serializers',
+    'risk.serializers',
+    'compliance.serializers',
+    'contracts.serializers',
+    'legal.serializers',
+]
+
+FORM_MODULES = [
+    'audit.forms',
+    'risk.forms',
+    'compliance.forms',
+    'contracts.forms',
+    'legal.forms',
+]
+
 
 class EnhancedSchemaIndex:
     """
@@ -31,6 +76,10 @@ class EnhancedSchemaIndex:
         self.forms: Dict[str, Any] = {}
         self._serializer_cache: Dict[str, Any] = {}
         self._form_cache: Dict[str, Any] = {}
+        self.field_matchers: Dict[str, FieldMatcher] = {}
+        self.registry_hash: Optional[str] = None
+        # How this instance was obtained: {"source": "build"|"artifact", "seconds": ...}
+        self.timings: Dict[str, Any] = {}
         
     def build(self, target_apps: Optional[Set[str]] = None) -> 'EnhancedSchemaIndex':
         """
@@ -41,13 +90,10 @@ class EnhancedSchemaIndex:
         """
         if target_apps is None:
             # Default to GRC apps
-            target_apps = {
-                "audit", "risk", "compliance", "contracts", 
-                "legal", "document_management", "ai_governance",
-                "organizations", "users"
-            }
+            target_apps = DEFAULT_TARGET_APPS
         
         logger.info(f"Building schema index for apps: {target_apps}")
+        started = time.perf_counter()
         
         # Index all models
         for app_config in apps.get_app_configs():
@@ -67,7 +113,12 @@ class EnhancedSchemaIndex:
         # Index forms
         self._index_forms()
         
-        logger.info(f"Schema index built: {len(self.models)} models, {len(self.serializers)} serializers, {len(self.forms)} forms")
+        self.registry_hash = registry_hash(target_apps)
+        self.timings = {"source": "build", "seconds": time.perf_counter() - started}
+        logger.info(
+            f"Schema index built in {self.timings['seconds']:.2f}s: {len(self.models)} models, "
+            f"{len(self.serializers)} serializers, {len(self.forms)} forms"
+        )
         return self
     
     def _index_model(self, model) -> Dict[str, Any]:
@@ -311,15 +362,7 @@ class EnhancedSchemaIndex:
     def _index_serializers(self):
         """Index all serializers and map them to models"""
         # Import common serializer modules
-        serializer_modules = [
-            'audit.serializers',
-            'risk.serializers',
-            'compliance.serializers',
-            'contracts.serializers',
-            'legal.serializers',
-        ]
-        
-        for module_name in serializer_modules:
+        for module_name in SERIALIZER_MODULES:
             try:
                 module = __import__(module_name, fromlist=[''])
                 for name, obj in inspect.getmembers(module):
@@ -403,15 +446,7 @@ class EnhancedSchemaIndex:
     
     def _index_forms(self):
         """Index all forms and map them to models"""
-        form_modules = [
-            'audit.forms',
-            'risk.forms',
-            'compliance.forms',
-            'contracts.forms',
-            'legal.forms',
-        ]
-        
-        for module_name in form_modules:
+        for module_name in FORM_MODULES:
             try:
                 module = __import__(module_name, fromlist=[''])
                 for name, obj in inspect.getmembers(module):
@@ -486,21 +521,226 @@ class EnhancedSchemaIndex:
         """Get form info for a model"""
         return self.forms.get(model_path)
 
+    def get_field_matcher(self, model_path: str) -> Optional[FieldMatcher]:
+        """Get the field matcher for a model, compiled on first use and kept with the index"""
+        matcher = self.field_matchers.get(model_path)
+        if matcher is None and model_path in self.models:
+            matcher = self.field_matchers[model_path] = FieldMatcher(self.models[model_path].get("fields", {}))
+        return matcher
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain, serialisable representation of the index (the artifact payload)"""
+        return {
+            "format": INDEX_FORMAT_VERSION,
+            "registry_hash": self.registry_hash,
+            "built_at": time.time(),
+            "build_seconds": self.timings.get("seconds"),
+            "models": _plain(self.models),
+            "serializers": _plain(self.serializers),
+            "forms": _plain(self.forms),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'EnhancedSchemaIndex':
+        """Recreate an index from :meth:`to_dict` output"""
+        index = cls()
+        index.models = data["models"]
+        index.serializers = data["serializers"]
+        index.forms = data["forms"]
+        index.registry_hash = data["registry_hash"]
+        return index
+
+    def save(self, path=None) -> Path:
+        """Write the index artifact; the file is replaced atomically"""
+        path = Path(path or artifact_path())
+        path.parent.mkdir(parents=True, exist_ok=True)
+        payload = _dump(self.to_dict(), path)
+        tmp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(payload)
+        os.replace(tmp_path, path)
+        return path
+
+    @classmethod
+    def load(cls, path=None, expected_hash: Optional[str] = None) -> Optional['EnhancedSchemaIndex']:
+        """
+        Load an index artifact.
+
+        Returns None when the file is missing or unreadable, was written by
+        another format version, or (with ``expected_hash``) describes a
+        different model registry.
+        """
+        path = Path(path or artifact_path())
+        started = time.perf_counter()
+        try:
+            data = _parse(path.read_bytes(), path)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable schema index artifact {path}: {e}")
+            return None
+        if data.get("format") != INDEX_FORMAT_VERSION:
+            logger.info(f"Schema index artifact {path} has format {data.get('format')}, expected {INDEX_FORMAT_VERSION}")
+            return None
+        if expected_hash is not None and data.get("registry_hash") != expected_hash:
+            logger.info(f"Schema index artifact {path} is stale (model registry changed)")
+            return None
+        index = cls.from_dict(data)
+        index.timings = {"source": "artifact", "seconds": time.perf_counter() - started, "path": str(path)}
+        return index
+
+
+def _plain(value):
+    """Convert index metadata into msgpack/JSON-safe values (lazy strings, tuples, enums...)"""
+    if value is None or isinstance(value, (bool, int, float, str)):
+        return value
+    if isinstance(value, dict):
+        return {str(key): _plain(item) for key, item in value.items()}
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return [_plain(item) for item in value]
+    return str(value)
+
+
+def artifact_path() -> Optional[Path]:
+    """Location of the persisted index (``SCHEMA_INDEX_PATH``; falsy disables persistence)"""
+    default = Path(settings.BASE_DIR) / 'var' / ('schema_index.msgpack' if msgpack else 'schema_index.json')
+    path = getattr(settings, 'SCHEMA_INDEX_PATH', default)
+    return Path(path) if path else None
+
+
+def _use_msgpack(path: Path) -> bool:
+    return msgpack is not None and path.suffix != '.json'
+
+
+def _dump(data: Dict[str, Any], path: Path) -> bytes:
+    if _use_msgpack(path):
+        return msgpack.packb(data, use_bin_type=True)
+    return json.dumps(data, separators=(',', ':')).encode()
+
+
+def _parse(payload: bytes, path: Path) -> Dict[str, Any]:
+    if _use_msgpack(path):
+        return msgpack.unpackb(payload, raw=False, strict_map_key=False)
+    return json.loads(payload)
+
+
+def _field_signature(field) -> tuple:
+    default = getattr(field, 'default', models.NOT_PROVIDED)
+    if default is models.NOT_PROVIDED:
+        default = None
+    elif callable(default):
+        default = getattr(default, '__qualname__', default.__class__.__name__)
+    related = getattr(field, 'related_model', None)
+    return (
+        field.name,
+        field.__class__.__name__,
+        getattr(field, 'null', None),
+        getattr(field, 'blank', None),
+        getattr(field, 'max_length', None),
+        str(default),
+        related._meta.label if related is not None and not isinstance(related, str) else str(related),
+        str(getattr(field, 'related_name', None)),
+        str(getattr(field, 'verbose_name', '')),
+        str(getattr(field, 'help_text', '')),
+        str([(value, str(label)) for value, label in _flat_choices(getattr(field, 'choices', None))]),
+    )
+
+
+def _flat_choices(choices):
+    for choice in choices or []:
+        if isinstance(choice, (list, tuple)) and len(choice) == 2:
+            yield choice[0], choice[1]
+        else:
+            yield choice, choice
+
+
+def _module_files(module_name: str) -> List[Path]:
+    """Source files of a module (all of them for a package) without importing it"""
+    try:
+        spec = importlib.util.find_spec(module_name)
+    except (ImportError, ValueError):
+        return []
+    if spec is None or not spec.origin or not spec.origin.endswith('.py'):
+        return []
+    if spec.submodule_search_locations:
+        return sorted(
+            path for location in spec.submodule_search_locations for path in Path(location).rglob('*.py')
+        )
+    return [Path(spec.origin)]
+
+
+def registry_hash(target_apps: Optional[Set[str]] = None) -> str:
+    """
+    Fingerprint of everything the index is derived from: the indexed models
+    and their fields, and the source of the serializer and form modules.
+    Cheap compared to a build; no serializer or form module is imported.
+    """
+    target_apps = DEFAULT_TARGET_APPS if target_apps is None else target_apps
+    digest = hashlib.sha256(f"format:{INDEX_FORMAT_VERSION}".encode())
+    digest.update(repr(sorted(target_apps)).encode())
+    for app_config in sorted(apps.get_app_configs(), key=lambda config: config.label):
+        if app_config.name.split('.')[-1] not in target_apps:
+            continue
+        for model in sorted(app_config.get_models(), key=lambda model: model.__name__):
+            meta = model._meta
+            digest.update(repr((meta.label, meta.db_table, str(meta.verbose_name), meta.ordering)).encode())
+            for field in meta.get_fields():
+                if hasattr(field, 'name'):
+                    digest.update(repr(_field_signature(field)).encode())
+    for module_name in SERIALIZER_MODULES + FORM_MODULES:
+        for path in _module_files(module_name):
+            digest.update(path.name.encode())
+            digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def load_or_build_schema_index(path=None) -> EnhancedSchemaIndex:
+    """Load the persisted index if it matches the model registry, otherwise build and persist it"""
+    path = path or artifact_path()
+    started = time.perf_counter()
+    current_hash = registry_hash()
+    hash_seconds = time.perf_counter() - started
+
+    index = EnhancedSchemaIndex.load(path, expected_hash=current_hash) if path else None
+    if index is not None:
+        index.timings["hash_seconds"] = hash_seconds
+        logger.info(
+            f"Schema index loaded from {path} in {index.timings['seconds'] * 1000:.1f}ms "
+            f"(registry hash {hash_seconds * 1000:.1f}ms)"
+        )
+        return index
+
+    index = EnhancedSchemaIndex().build()
+    index.timings["hash_seconds"] = hash_seconds
+    if path:
+        _save_quietly(index, path)
+    return index
+
+
+def _save_quietly(index: EnhancedSchemaIndex, path) -> None:
+    try:
+        index.save(path)
+    except OSError as e:
+        # A read-only deployment still works, it just builds per process
+        logger.warning(f"Could not write schema index artifact {path}: {e}")
+
 
 # Singleton instance
 _schema_index: Optional[EnhancedSchemaIndex] = None
 
 
 def get_schema_index() -> EnhancedSchemaIndex:
-    """Get or create the global schema index instance"""
+    """Get or create the global schema index instance (see ``index.timings`` for build vs load cost)"""
     global _schema_index
     if _schema_index is None:
-        _schema_index = EnhancedSchemaIndex().build()
+        _schema_index = load_or_build_schema_index()
     return _schema_index
 
 
-def rebuild_schema_index():
-    """Rebuild the schema index (useful after migrations)"""
+def rebuild_schema_index(save: bool = True, path=None):
+    """Rebuild the schema index (useful after migrations) and refresh the persisted artifact"""
     global _schema_index
     _schema_index = EnhancedSchemaIndex().build()
+    path = path or artifact_path()
+    if save and path:
+        _save_quietly(_schema_index, path)
     return _schema_index
@@ -0,0 +1,111 @@
+"""
+Tests for the precompiled field matcher
+"""
+from django.test import SimpleTestCase, TestCase
+
+from services.agent.field_matcher import FieldMatcher, normalize_key
+from services.agent.schema_index import EnhancedSchemaIndex
+
+FIELDS = {
+    'name': {'synonyms': ['title', 'workplan_name']},
+    'fiscal_year': {'synonyms': ['year', 'fiscal', 'fy']},
+    'state': {'synonyms': ['status', 'approval_status']},
+    'status': {'synonyms': ['state', 'approval_status']},
+    'engagement_owner': {'synonyms': []},
+}
+
+
+def legacy_executor_map(incoming, fields_meta):
+    """AgentExecutor._map_fields before precompiled matching"""
+    mapped = {}
+    for user_key, value in incoming.items():
+        if user_key in fields_meta:
+            mapped[user_key] = value
+            continue
+        for field_name, meta in fields_meta.items():
+            if user_key.lower() in [s.lower() for s in meta.get('synonyms', [])]:
+                mapped[field_name] = value
+                break
+    return mapped
+
+
+def legacy_form_agent_map(incoming, fields_meta):
+    """FormAgent._map_input_to_fields before precompiled matching"""
+    mapped = {}
+    for input_key, input_value in incoming.items():
+        if input_key in fields_meta:
+            mapped[input_key] = input_value
+            continue
+        for field_name, field_info in fields_meta.items():
+            synonyms = field_info.get('synonyms', [])
+            if input_key.lower() in [s.lower() for s in synonyms] or input_key.lower() == field_name.lower():
+                mapped[field_name] = input_value
+                break
+    return mapped
+
+
+class FieldMatcherTestCase(SimpleTestCase):
+    """Test cases for field matching"""
+
+    def setUp(self):
+        self.matcher = FieldMatcher(FIELDS, fuzzy_threshold=0.5)
+
+    def test_exact_and_synonym_matches(self):
+        """Test exact names and case-insensitive synonyms"""
+        self.assertEqual(self.matcher.match('status'), 'status')
+        self.assertEqual(self.matcher.match('FY'), 'fiscal_year')
+        # A synonym shared by several fields maps to the first one
+        self.assertEqual(self.matcher.match('approval_status'), 'state')
+
+    def test_field_names_are_case_insensitive_only_on_request(self):
+        """Test the form agent's case-insensitive field name matching"""
+        self.assertIsNone(self.matcher.match('Engagement_Owner', fuzzy=False))
+        self.assertEqual(self.matcher.match('Engagement_Owner', field_names=True, fuzzy=False), 'engagement_owner')
+
+    def test_fuzzy_fallback(self):
+        """Test normalized and trigram fallbacks"""
+        self.assertEqual(normalize_key(' Fiscal  Year '), 'fiscal_year')
+        self.assertEqual(self.matcher.match('Fiscal Year'), 'fiscal_year')
+        self.assertEqual(self.matcher.match('engagment owner'), 'engagement_owner')
+        self.assertIsNone(self.matcher.match('budget'))
+        self.assertIsNone(FieldMatcher(FIELDS, fuzzy_threshold=0).match('engagment owner'))
+
+    def test_map_drops_unknown_keys(self):
+        """Test mapping a whole payload"""
+        self.assertEqual(
+            self.matcher.map({'title': 'Plan', 'fy': 2025, 'budget': 10}),
+            {'name': 'Plan', 'fiscal_year': 2025},
+        )
+
+
+class FieldMatcherIndexTestCase(TestCase):
+    """Test that precompiled matching agrees with the previous scans on every indexed model"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.schema_index = EnhancedSchemaIndex().build()
+
+    def test_matches_legacy_mapping_for_every_name_and_synonym(self):
+        """Test unchanged results across the existing synonym set"""
+        checked = 0
+        for model_path, schema in self.schema_index.models.items():
+            fields_meta = schema['fields']
+            matcher = self.schema_index.get_field_matcher(model_path)
+            keys = {'unrelated_key'}
+            for field_name, meta in fields_meta.items():
+                for key in [field_name] + meta.get('synonyms', []):
+                    keys.update({key, key.upper(), key.title()})
+            for key in keys:
+                incoming = {key: 1}
+                legacy = legacy_executor_map(incoming, fields_meta)
+                self.assertEqual(matcher.map(incoming, fuzzy=False), legacy, f'{model_path}: {key}')
+                if legacy:
+                    self.assertEqual(matcher.map(incoming), legacy, f'{model_path}: {key}')
+
+                legacy = legacy_form_agent_map(incoming, fields_meta)
+                self.assertEqual(matcher.map(incoming, field_names=True, fuzzy=False), legacy, f'{model_path}: {key}')
+                if legacy:
+                    self.assertEqual(matcher.map(incoming, field_names=True), legacy, f'{model_path}: {key}')
+                checked += 1
+        self.assertGreater(checked, 1000)
@@ -0,0 +1,135 @@
+"""
+Tests for structured agent reads
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django_tenants.test.cases import TenantTestCase
+from rest_framework.exceptions import ValidationError
+
+from ai_governance.models import ModelAsset
+from services.agent.executor import AgentExecutor
+from services.agent.field_matcher import FieldMatcher
+from services.agent.read_engine import ReadEngine
+
+User = get_user_model()
+
+MODEL = 'ai_governance.ModelAsset'
+
+
+class ReadEngineTestCase(TenantTestCase):
+    """Test cases for projection, aggregation, keyset paging and token budgets"""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Agent Reads Org'
+        tenant.code = 'AGENTREAD'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        # User creation queues welcome/OTP tasks, which would need a broker
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.user = User.objects.create_user(
+                username='reader', email='reader@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='admin',
+            )
+        types = ['tabular'] * 5 + ['image'] * 3 + ['generative'] * 2
+        self.assets = [
+            ModelAsset.objects.create(
+                organization=self.tenant, name=f'Model {i:02d}', model_type=model_type,
+                uri='s3://models/' + 'x' * 600, version=str(i % 3) if i % 4 else None,
+            )
+            for i, model_type in enumerate(types)
+        ]
+
+    def _engine(self, matcher=None):
+        return ReadEngine(MODEL, ModelAsset.objects.filter(organization=self.tenant), {}, field_matcher=matcher)
+
+    def test_projection_selects_only_requested_columns(self):
+        """Test that only the requested fields are fetched and returned"""
+        matcher = FieldMatcher({'name': {'synonyms': ['model name']}, 'model_type': {'synonyms': ['type']}})
+        with CaptureQueriesContext(connection) as queries:
+            result = self._engine(matcher).run({'select': ['model name', 'type'], 'limit': 3})
+
+        self.assertEqual(result['fields'], ['name', 'model_type'])
+        self.assertEqual(result['results'][0], {'name': 'Model 00', 'model_type': 'tabular'})
+        select = queries.captured_queries[0]['sql'].split(' FROM ')[0]
+        self.assertNotIn('"uri"', select)
+        self.assertNotIn('"signature"', select)
+
+    def test_grouped_aggregation_runs_in_the_database(self):
+        """Test count/max with group-by, ordered by an aggregate"""
+        with self.assertNumQueries(1):
+            result = self._engine().run({
+                'aggregate': ['count', 'max:version'], 'group_by': ['model_type'], 'order_by': ['-count'],
+            })
+        self.assertEqual(
+            [(group['model_type'], group['count']) for group in result['groups']],
+            [('tabular', 5), ('image', 3), ('generative', 2)],
+        )
+        self.assertEqual(self._engine().run({'aggregate': ['count']})['aggregates'], {'count': 10})
+
+        with self.assertRaises(ValidationError):
+            self._engine().run({'aggregate': ['avg:name']})
+        with self.assertRaises(ValidationError):
+            self._engine().run({'select': ['created_by__password']})
+
+    def test_keyset_cursor_pages_through_everything_once(self):
+        """Test that continuation tokens page rows, including NULL sort keys, without gaps"""
+        intent = {'select': ['name', 'version'], 'order_by': ['-version'], 'limit': 3}
+        seen, pages = [], 0
+        while True:
+            result = self._engine().run(intent)
+            seen += [row['name'] for row in result['results']]
+            pages += 1
+            if not result['next_cursor']:
+                break
+            self.assertEqual(result['summary']['total'], 10)
+            intent = {**intent, 'cursor': result['next_cursor']}
+
+        self.assertEqual(pages, 4)
+        self.assertEqual(sorted(seen), sorted(asset.name for asset in self.assets))
+        self.assertEqual(len(seen), len(set(seen)))
+
+        # A cursor only continues the query it was issued for
+        with self.assertRaises(ValidationError):
+            self._engine().run({'select': ['name'], 'limit': 3, 'cursor': intent['cursor']})
+
+        groups = self._engine().run({'aggregate': ['count'], 'group_by': ['model_type'], 'limit': 2})
+        rest = self._engine().run({
+            'aggregate': ['count'], 'group_by': ['model_type'], 'limit': 2, 'cursor': groups['next_cursor'],
+        })
+        self.assertEqual(len(groups['groups']) + len(rest['groups']), 3)
+        self.assertIsNone(rest['next_cursor'])
+
+    @override_settings(AGENT_READ_MAX_TEXT=40)
+    def test_token_budget_truncates_and_summarises(self):
+        """Test that large pages are cut to the budget, summarised and resumable"""
+        result = self._engine().run({'select': ['name', 'model_type', 'uri'], 'max_tokens': 60})
+
+        self.assertTrue(result['truncated'])
+        self.assertLess(result['count'], 10)
+        self.assertTrue(result['results'][0]['uri'].endswith('…'))
+        self.assertLessEqual(len(result['results'][0]['uri']), 41)
+        self.assertEqual(result['summary']['total'], 10)
+        self.assertIn('model_type', result['summary']['columns'])
+
+        rest = self._engine().run({
+            'select': ['name', 'model_type', 'uri'], 'max_tokens': 60, 'cursor': result['next_cursor'],
+        })
+        self.assertEqual(rest['results'][0]['name'], f'Model {result["count"]:02d}')
+
+    def test_executor_read_uses_the_engine(self):
+        """Test that read intents are scoped to the organization and projected"""
+        request = SimpleNamespace(user=self.user, tenant=self.tenant, META={})
+        with mock.patch('services.agent.executor.get_schema_index'):
+            executor = AgentExecutor(request)
+        executor.schema_index.get_field_matcher.return_value = None
+        schema = {'app': 'ai_governance', 'model': 'ModelAsset', 'fields': {'name': {}, 'model_type': {}}}
+
+        result = executor._read(MODEL, schema, {'model_type': 'image'}, {'select': ['name']})
+        self.assertEqual([row['name'] for row in result['results']], ['Model 05', 'Model 06', 'Model 07'])
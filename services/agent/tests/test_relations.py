@@ -0,0 +1,102 @@
+"""
+Tests for batched relation resolution
+"""
+from types import SimpleNamespace
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django_tenants.test.cases import TenantTestCase
+
+from ai_governance.models import ModelAsset
+from services.agent.executor import AgentExecutor
+from services.agent.form_agent import FormAgent
+
+User = get_user_model()
+
+SCHEMA = {
+    'fields': {
+        'owner': {'type': 'ForeignKey', 'related_model': 'users.CustomUser'},
+        'reviewers': {'type': 'ManyToManyField', 'related_model': 'users.CustomUser'},
+        'model_asset': {'type': 'ForeignKey', 'related_model': 'ai_governance.ModelAsset'},
+        'related_assets': {'type': 'ManyToManyField', 'related_model': 'ai_governance.ModelAsset'},
+        'title': {'type': 'CharField'},
+    }
+}
+
+
+class RelationResolverTestCase(TenantTestCase):
+    """Test cases for resolving agent relation references"""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Agent Relations Org'
+        tenant.code = 'AGENTREL'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        # User creation queues welcome/OTP tasks, which would need a broker
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.alice, self.bob, self.carol = [
+                User.objects.create_user(
+                    username=name, email=f'{name}@example.com', password='Sup3r-Secret-Pass!',
+                    organization=self.tenant, role='staff',
+                )
+                for name in ('alice', 'bob', 'carol')
+            ]
+        self.ranker, self.old_scorer, self.new_scorer = [
+            ModelAsset.objects.create(organization=self.tenant, name=name, model_type='tabular', uri='s3://m')
+            for name in ('Ranker', 'Scorer', 'Scorer')
+        ]
+        self.payload = {
+            'owner': 'alice@example.com',
+            'reviewers': ['bob', 'carol@example.com', self.alice.pk],
+            'model_asset': 'Ranker',
+            'related_assets': ['Scorer', str(self.ranker.pk), 'Missing'],
+            'title': 'Quarterly model review',
+        }
+
+    def _executor(self):
+        request = SimpleNamespace(user=self.alice, tenant=self.tenant, META={})
+        with mock.patch('services.agent.executor.get_schema_index'):
+            return AgentExecutor(request)
+
+    def test_executor_resolves_each_related_model_with_one_query(self):
+        """Test that a multi-relation payload costs one query per related model"""
+        executor = self._executor()
+        with self.assertNumQueries(2):
+            resolved = executor._resolve_relationships(self.payload, SCHEMA)
+
+        self.assertEqual(resolved['owner'], self.alice.pk)
+        self.assertEqual(resolved['reviewers'], [self.bob.pk, self.carol.pk, self.alice.pk])
+        self.assertEqual(resolved['model_asset'], self.ranker.pk)
+        # Ambiguous names resolve to the newest match; unknown names are dropped
+        self.assertEqual(resolved['related_assets'], [self.new_scorer.pk, self.ranker.pk])
+        self.assertEqual(resolved['title'], 'Quarterly model review')
+        self.assertEqual(len(executor.relations.warnings()), 1)
+        self.assertEqual(
+            executor.relations.ambiguous[('ai_governance.ModelAsset', 'Scorer')],
+            [self.new_scorer.pk, self.old_scorer.pk],
+        )
+
+        # Memoized for the rest of the session
+        with self.assertNumQueries(0):
+            self.assertEqual(executor._resolve_relationships(self.payload, SCHEMA), resolved)
+
+    def test_identifiers_rank_above_display_names(self):
+        """Test that a code/email match wins over a name match"""
+        executor = self._executor()
+        ModelAsset.objects.filter(pk=self.ranker.pk).update(name=str(self.old_scorer.pk))
+        # '<pk>' is the name of one asset and the id of another: the name wins
+        self.assertEqual(executor.relations.lookup('ai_governance.ModelAsset', str(self.old_scorer.pk)), self.ranker.pk)
+
+    def test_form_agent_resolves_each_related_model_with_one_query(self):
+        """Test that the form agent shares the batched resolution"""
+        with mock.patch('services.agent.form_agent.get_schema_index'):
+            agent = FormAgent(self.alice, self.tenant)
+        with self.assertNumQueries(2):
+            resolved = agent._resolve_relationships('ai_governance.TestRun', SCHEMA, self.payload, None)
+
+        self.assertEqual(resolved['owner'], self.alice.pk)
+        self.assertEqual(resolved['reviewers'], [self.bob.pk, self.carol.pk, self.alice.pk])
+        self.assertEqual(resolved['related_assets'], [self.new_scorer.pk, self.ranker.pk])
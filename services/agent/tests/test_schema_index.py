@@ -1,8 +1,14 @@
 """
 Tests for Enhanced Schema Index
 """
-from django.test import TestCase
-from services.agent.schema_index import EnhancedSchemaIndex, get_schema_index, rebuild_schema_index
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.test import TestCase, override_settings
+from services.agent.schema_index import (
+    EnhancedSchemaIndex, get_schema_index, load_or_build_schema_index, rebuild_schema_index, registry_hash,
+)
 
 
 class SchemaIndexTestCase(TestCase):
@@ -80,15 +86,79 @@ class SchemaIndexTestCase(TestCase):
         self.assertGreater(len(audit_models), 0)
         self.assertTrue(all(m.startswith('audit.') for m in audit_models))
     
+    @override_settings(SCHEMA_INDEX_PATH=None)
     def test_get_schema_index_singleton(self):
         """Test that get_schema_index returns singleton"""
         index1 = get_schema_index()
         index2 = get_schema_index()
         self.assertIs(index1, index2)
     
+    @override_settings(SCHEMA_INDEX_PATH=None)
     def test_rebuild_schema_index(self):
         """Test rebuilding schema index"""
         new_index = rebuild_schema_index()
         self.assertIsNotNone(new_index)
         self.assertGreater(len(new_index.models), 0)
 
+
+
+class SchemaIndexArtifactTestCase(TestCase):
+    """Test cases for the persisted schema index artifact"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.built = EnhancedSchemaIndex().build()
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp_dir.cleanup)
+
+    def test_artifact_round_trip(self):
+        """Test that a loaded artifact matches the built index"""
+        for name in ('schema_index.msgpack', 'schema_index.json'):
+            path = Path(self.tmp_dir.name) / name
+            self.built.save(path)
+            loaded = EnhancedSchemaIndex.load(path, expected_hash=registry_hash())
+
+            self.assertIsNotNone(loaded)
+            self.assertEqual(loaded.timings['source'], 'artifact')
+            expected = self.built.to_dict()
+            self.assertEqual(loaded.models, expected['models'])
+            self.assertEqual(loaded.serializers, expected['serializers'])
+            self.assertEqual(loaded.forms, expected['forms'])
+            self.assertEqual(
+                loaded.get_field_info('audit.AuditWorkplan', 'code'),
+                expected['models']['audit.AuditWorkplan']['fields']['code'],
+            )
+
+    def test_stale_or_missing_artifact_is_ignored(self):
+        """Test that an artifact for another model registry is not loaded"""
+        path = Path(self.tmp_dir.name) / 'schema_index.msgpack'
+        self.assertIsNone(EnhancedSchemaIndex.load(path))
+
+        self.built.save(path)
+        self.assertIsNone(EnhancedSchemaIndex.load(path, expected_hash='0' * 64))
+
+        path.write_bytes(b'not an index')
+        self.assertIsNone(EnhancedSchemaIndex.load(path))
+
+    def test_registry_hash_is_stable_and_tracks_target_apps(self):
+        """Test that the registry hash only changes with its inputs"""
+        self.assertEqual(registry_hash(), registry_hash())
+        self.assertEqual(self.built.registry_hash, registry_hash())
+        self.assertNotEqual(registry_hash({'audit'}), registry_hash())
+
+    def test_get_schema_index_loads_artifact_instead_of_building(self):
+        """Test that workers load a current artifact and rebuild on mismatch"""
+        path = Path(self.tmp_dir.name) / 'schema_index.msgpack'
+        self.built.save(path)
+
+        with mock.patch.object(EnhancedSchemaIndex, 'build', side_effect=AssertionError('built')):
+            index = load_or_build_schema_index(path)
+        self.assertEqual(index.timings['source'], 'artifact')
+        self.assertIn('hash_seconds', index.timings)
+
+        with mock.patch('services.agent.schema_index.registry_hash', return_value='changed'):
+            index = load_or_build_schema_index(path)
+        self.assertEqual(index.timings['source'], 'build')
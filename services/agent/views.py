@@ -40,6 +40,11 @@ class AgentParseView(APIView):
             "  'action': 'create' | 'update' | 'delete' | 'read' | 'generate_report' | 'unknown',\n"
             "  'model': one of the available models: " + model_list + " (or null if action is 'unknown'),\n"
             "  'fields': { 'field_name': 'value', ... } (only include fields mentioned in the request),\n"
+            "  'filters': { 'field_name': 'value', ... } (read only; lookups like 'due_date__lte' are allowed),\n"
+            "  'select': ['field_name', ...] (read only; just the fields the user asks about),\n"
+            "  'aggregate': ['count' | 'sum:<field>' | 'avg:<field>' | 'min:<field>' | 'max:<field>', ...] (read only),\n"
+            "  'group_by': ['field_name', ...] (read only, with aggregate),\n"
+            "  'order_by': ['field_name' | '-field_name', ...] (read only),\n"
             "  'confidence': float between 0.0 and 1.0\n"
             "}\n\n"
             "Rules:\n"
@@ -47,6 +52,7 @@ class AgentParseView(APIView):
             "- If the user wants to modify something, use action='update'\n"
             "- If the user wants to delete something, use action='delete'\n"
             "- If the user wants to view/query something, use action='read'\n"
+            "- For counts, totals or averages use 'aggregate' (with 'group_by' for breakdowns) instead of listing rows\n"
             "- Extract field values from the user's request\n"
             "- Set confidence based on how certain you are (0.0 = uncertain, 1.0 = very certain)\n"
             "- If you cannot parse the request or it's not an action request, return: {'action': 'unknown', 'model': null, 'confidence': 0.0}\n"
@@ -7,6 +7,8 @@ from django.db.models import Q, Count
 from django.utils import timezone
 from datetime import datetime, timedelta
 from .ollama_adapter import ask_ollama
+from .ollama_client import OllamaBusyError
+from .semantic_cache import semantic_cache
 from .llm_adapter import ask_llm
 
 logger = logging.getLogger('services.ai.ai_service')
@@ -436,7 +438,33 @@ def validate_ai_response(response: str, user_context: Optional[Dict[str, Any]] =
     
     return True
 
-def ai_assistant_answer(question: str, user, org, system_prompt: Optional[str] = None, return_meta: bool = False):
+# Models behind the organization summary; writes to them change the answers
+ASSISTANT_DATA_MODELS = [
+    'audit.AuditWorkplan', 'audit.Engagement', 'audit.Issue', 'risk.Risk',
+    'compliance.ComplianceObligation', 'contracts.Contract',
+]
+
+
+def assistant_data_version(org) -> Optional[str]:
+    """
+    Version of the organization data the assistant answers from, or None if
+    unavailable. It includes today's date: answers such as "what is overdue"
+    or "due in 7 days" change at midnight without any write.
+    """
+    try:
+        from core.chart_cache import data_version
+        return f'{data_version(ASSISTANT_DATA_MODELS, org.id)}:{timezone.localdate().isoformat()}'
+    except Exception as e:
+        logger.warning(f"Assistant data version unavailable: {e}")
+        return None
+
+
+def assistant_cache_scope(user) -> str:
+    """Askers sharing cached answers: those with the same role (``user_role`` in ``get_user_context``)"""
+    return str(getattr(user, 'role', 'user') or '')
+
+def ai_assistant_answer(question: str, user, org, system_prompt: Optional[str] = None, return_meta: bool = False,
+                        on_queue=None):
     """
     Main AI assistant function that handles user questions.
     Uses FAQ first, then data-aware LLM responses with organization context.
@@ -447,6 +475,7 @@ def ai_assistant_answer(question: str, user, org, system_prompt: Optional[str] =
         org: Organization object
         system_prompt: Optional custom system prompt
         return_meta: If True, returns tuple (response, metadata), else just response string
+        on_queue: Called with the queue position while waiting for an LLM slot
     
     Returns:
         str if return_meta=False, tuple (str, dict) if return_meta=True
@@ -479,25 +508,42 @@ def ai_assistant_answer(question: str, user, org, system_prompt: Optional[str] =
         # For non-exact matches, let DeepSeek provide dynamic responses
         logger.info("FAQ not exact match, using DeepSeek for dynamic response")
     
-    # 2. Get user context and organization data
+    # 2. Reuse the answer to an equivalent question from the same role, while the organization's data is unchanged
+    data_version = assistant_data_version(org) if not system_prompt else None
+    cache_scope = assistant_cache_scope(user)
+    if data_version:
+        cached = semantic_cache.lookup(org.id, question, data_version, cache_scope)
+        if cached:
+            if return_meta:
+                return cached['answer'], {
+                    **cached['meta'],
+                    'provider': 'semantic_cache',
+                    'source': 'semantic_cache',
+                    'tokens': 0,
+                    'cached_question': cached['question'],
+                    'similarity': cached['similarity'],
+                }
+            return cached['answer']
+    
+    # 3. Get user context and organization data
     user_context = get_user_context(user, org)
     data_provider = OrganizationDataProvider(user, org)
     org_data = data_provider.get_organization_summary()
     
-    # 3. Create data-aware prompt (unless custom system prompt provided)
+    # 4. Create data-aware prompt (unless custom system prompt provided)
     if system_prompt:
         data_aware_prompt = question  # Use question as-is with custom system prompt
     else:
         data_aware_prompt = create_data_aware_prompt(question, user_context, org_data)
     
-    # 4. Use DeepSeek for AI responses (via Ollama)
+    # 5. Use DeepSeek for AI responses (via Ollama)
     try:
         logger.info("Attempting DeepSeek response with organization data")
         if return_meta:
-            response_raw, meta = ask_ollama(data_aware_prompt, user, org, system_prompt=system_prompt, return_meta=True)
+            response_raw, meta = ask_ollama(data_aware_prompt, user, org, system_prompt=system_prompt, return_meta=True, on_queue=on_queue)
             response: str = cast(str, response_raw) if isinstance(response_raw, str) else str(response_raw)
         else:
-            response_raw = ask_ollama(data_aware_prompt, user, org, system_prompt=system_prompt, return_meta=False)
+            response_raw = ask_ollama(data_aware_prompt, user, org, system_prompt=system_prompt, return_meta=False, on_queue=on_queue)
             response = cast(str, response_raw) if isinstance(response_raw, str) else str(response_raw)
             meta = {'provider': 'deepseek'}
         
@@ -505,6 +551,8 @@ def ai_assistant_answer(question: str, user, org, system_prompt: Optional[str] =
             # Validate the response
             if validate_ai_response(response, user_context):
                 logger.info("DeepSeek response successful and validated")
+                if data_version:
+                    semantic_cache.store(org.id, question, response.strip(), meta, data_version, cache_scope)
                 if return_meta:
                     return response.strip(), meta
                 return response.strip()
@@ -521,6 +569,14 @@ def ai_assistant_answer(question: str, user, org, system_prompt: Optional[str] =
                 return error_response, {'error': 'Empty response', 'provider': 'deepseek'}
             return error_response
             
+    except OllamaBusyError as e:
+        error_response = (
+            f"The AI assistant is busy right now ({e.waiting} requests ahead of yours). "
+            "Please try again in a moment."
+        )
+        if return_meta:
+            return error_response, {'error': str(e), 'provider': 'deepseek', 'busy': True, 'queue_length': e.waiting}
+        return error_response
     except Exception as e:
         error_msg = str(e)
         logger.error(f"DeepSeek error: {error_msg}")
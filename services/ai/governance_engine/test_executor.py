@@ -117,7 +117,9 @@ class TestExecutor:
         test_plan: TestExecutionPlan,
         model: Any,
         dataset: Any = None,
-        progress_callback: Optional[callable] = None
+        progress_callback: Optional[callable] = None,
+        result_callback: Optional[callable] = None,
+        sampler: Optional[callable] = None
     ) -> List[TestResult]:
         """
         Execute a complete test plan.
@@ -127,6 +129,11 @@ class TestExecutor:
             model: Model to test
             dataset: Dataset to use for testing
             progress_callback: Optional callback for progress updates
+            result_callback: Optional callback receiving each adapter's results
+                as soon as they complete (used for checkpointing)
+            sampler: Optional callable ``(adapter_name, dataset, test_configs, model)``
+                returning ``(adapter_dataset, sampling_info)``; each adapter runs
+                on its own sample and the info is added to its results' metadata
             
         Returns:
             List of test results
@@ -152,17 +159,29 @@ class TestExecutor:
             self.logger.info(f"Executing {len(test_configs)} tests with {adapter_name} adapter")
             
             try:
+                adapter_dataset = dataset
+                sampling_info = None
+                if sampler is not None and dataset is not None:
+                    adapter_dataset, sampling_info = sampler(adapter_name, dataset, test_configs, model)
+                
                 # Execute tests with this adapter
                 results = adapter.execute_tests(
                     model=model,
-                    dataset=dataset,
+                    dataset=adapter_dataset,
                     test_configs=test_configs,
                     **test_plan.execution_parameters
                 )
                 
+                if sampling_info:
+                    for result in results:
+                        result.metadata["sampling"] = sampling_info
+                
                 all_results.extend(results)
                 completed_tests += len(test_configs)
                 
+                if result_callback:
+                    result_callback(results)
+                
                 # Update progress
                 if progress_callback:
                     progress_callback(completed_tests, total_tests, adapter_name)
@@ -0,0 +1,106 @@
+"""
+Management command to benchmark the Ollama client layer against a stub server.
+
+Sends the same burst of questions twice to a local stub that generates
+slowly: once the old way (a status check plus ``requests.post`` per
+question, no limit) and once through ``OllamaClient`` (pooled session,
+cached status, shared concurrency limit with fast-fail).
+"""
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import requests
+from django.core.management.base import BaseCommand
+
+from services.ai.ollama_client import FileSemaphore, OllamaBusyError, OllamaClient
+from services.ai.ollama_stub import StubOllamaServer
+
+PAYLOAD = {'model': 'deepseek-r1:8b', 'messages': [{'role': 'user', 'content': 'What is our top risk?'}],
+           'stream': False}
+
+
+class Command(BaseCommand):
+    help = 'Benchmark pooled/governed Ollama calls against a stub server that simulates slow generation'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=40, help='Questions to send (default: 40)')
+        parser.add_argument('--threads', type=int, default=16, help='Concurrent callers (default: 16)')
+        parser.add_argument('--delay', type=float, default=0.2, help='Seconds per generation (default: 0.2)')
+        parser.add_argument('--parallel', type=int, default=2, help='Generations the stub runs at once (default: 2)')
+        parser.add_argument('--max-concurrency', type=int, default=2, help='Client-side slot limit (default: 2)')
+        parser.add_argument('--max-queue', type=int, default=8, help='Backlog before failing fast (default: 8)')
+
+    def handle(self, *args, **options):
+        with StubOllamaServer(delay=options['delay'], parallel=options['parallel']) as stub:
+            baseline = self._run(stub, options, self._baseline_call(stub))
+
+            with tempfile.TemporaryDirectory() as directory:
+                semaphore = FileSemaphore(directory, options['max_concurrency'], options['max_queue'])
+                client = OllamaClient(base_url=stub.url, semaphore=semaphore, status_ttl=30)
+                client.status_failure_ttl = 0
+                governed = self._run(stub, options, self._client_call(client))
+
+        self.stdout.write(
+            f'{options["requests"]} questions, {options["threads"]} callers, {options["delay"]}s per generation, '
+            f'stub parallelism {options["parallel"]}'
+        )
+        self.stdout.write(f'{"":<22}{"baseline":>12}{"pooled+governed":>18}')
+        for label, key, fmt in (
+            ('wall time (s)', 'wall', '{:.2f}'),
+            ('p50 latency (s)', 'p50', '{:.2f}'),
+            ('p95 latency (s)', 'p95', '{:.2f}'),
+            ('answered', 'ok', '{}'),
+            ('rejected fast', 'busy', '{}'),
+            ('TCP connections', 'connections', '{}'),
+            ('status checks sent', 'tags', '{}'),
+            ('peak generations', 'peak', '{}'),
+        ):
+            self.stdout.write(f'{label:<22}{fmt.format(baseline[key]):>12}{fmt.format(governed[key]):>18}')
+
+    def _baseline_call(self, stub):
+        def call():
+            requests.get(f'{stub.url}/api/tags', timeout=10)
+            return requests.post(f'{stub.url}/api/chat', json=PAYLOAD, timeout=120)
+        return call
+
+    def _client_call(self, client):
+        def call():
+            client.check_status(PAYLOAD['model'])
+            response, _ = client.chat(PAYLOAD, timeout=120)
+            return response
+        return call
+
+    def _run(self, stub, options, call):
+        stub.reset_counters()
+        latencies, busy = [], 0
+
+        def timed(_):
+            started = time.perf_counter()
+            try:
+                call().raise_for_status()
+            except OllamaBusyError:
+                return None
+            return time.perf_counter() - started
+
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=options['threads']) as pool:
+            for latency in pool.map(timed, range(options['requests'])):
+                if latency is None:
+                    busy += 1
+                else:
+                    latencies.append(latency)
+        wall = time.perf_counter() - started
+
+        latencies.sort()
+        return {
+            'wall': wall,
+            'p50': statistics.median(latencies) if latencies else 0,
+            'p95': latencies[int(len(latencies) * 0.95) - 1] if latencies else 0,
+            'ok': len(latencies),
+            'busy': busy,
+            'connections': stub.connections,
+            'tags': stub.requests['tags'],
+            'peak': stub.peak_in_flight,
+        }
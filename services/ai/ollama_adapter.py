@@ -1,7 +1,6 @@
 import logging
 import requests
-import json
-from typing import Optional  # type: ignore[reportMissingImports]
+from typing import Callable, Optional  # type: ignore[reportMissingImports]
 from .ollama_config import (
     OLLAMA_BASE_URL,
     OLLAMA_MODEL,
@@ -9,6 +8,7 @@ from .ollama_config import (
     DEFAULT_TEMPERATURE,
     REQUEST_TIMEOUT
 )
+from .ollama_client import OllamaBusyError, get_ollama_client
 
 logger = logging.getLogger('services.ai.ollama_adapter')
 
@@ -51,25 +51,11 @@ def log_prompt_response(user, org, prompt, response):
     logger.info(f"Ollama AI Query | user={user} | org={org} | prompt={prompt!r} | response={response!r}")
 
 def check_ollama_status():
-    """Check if Ollama is running and accessible, and verify model is available"""
-    try:
-        response = requests.get(f"{OLLAMA_BASE_URL}/api/tags", timeout=10)
-        if response.status_code == 200:
-            # Also check if the model is available
-            models = response.json().get('models', [])
-            model_names = [m.get('name', '') for m in models]
-            if FORCED_MODEL not in model_names:
-                logger.warning(f"Model {FORCED_MODEL} not found in Ollama. Available models: {model_names}")
-            return True
-        return False
-    except requests.exceptions.ConnectionError:
-        logger.error(f"Cannot connect to Ollama at {OLLAMA_BASE_URL}. Is Ollama running?")
-        return False
-    except Exception as e:
-        logger.error(f"Ollama status check failed: {e}")
-        return False
+    """Check if Ollama is running and accessible, and verify model is available (cached briefly)"""
+    return get_ollama_client().check_status(FORCED_MODEL)
 
-def ask_ollama(prompt: str, user, org, context: Optional[str] = None, system_prompt: Optional[str] = None, return_meta: bool = False):
+def ask_ollama(prompt: str, user, org, context: Optional[str] = None, system_prompt: Optional[str] = None, return_meta: bool = False,
+               on_queue: Optional[Callable[[int], None]] = None):
     """
     Send a query to Ollama's local API
     
@@ -80,9 +66,13 @@ def ask_ollama(prompt: str, user, org, context: Optional[str] = None, system_pro
         context: Additional context string
         system_prompt: Custom system prompt (overrides default)
         return_meta: If True, returns tuple (response, metadata_dict), else just response string
+        on_queue: Called with the queue position while waiting for a generation slot
     
     Returns:
         str if return_meta=False, tuple (str, dict) if return_meta=True
+    
+    Raises:
+        OllamaBusyError: The generation queue is full or no slot freed up in time
     """
     import time
     start_time = time.time()
@@ -150,14 +140,11 @@ def ask_ollama(prompt: str, user, org, context: Optional[str] = None, system_pro
     logger.info(f"Sending request to Ollama: {OLLAMA_BASE_URL}/api/chat with model {model_to_use}")
     
     try:
-        # Call Ollama API with configurable timeout
+        # Call Ollama API with configurable timeout over the pooled session, once a slot is free
         # DeepSeek can take longer to generate responses, so we use a longer timeout
-        response = requests.post(
-            f"{OLLAMA_BASE_URL}/api/chat",
-            headers={"Content-Type": "application/json"},
-            data=json.dumps(payload),
-            timeout=REQUEST_TIMEOUT
-        )
+        response, queue = get_ollama_client().chat(payload, timeout=REQUEST_TIMEOUT, on_wait=on_queue)
+        if queue['queue_position']:
+            logger.info(f"Ollama request waited {queue['queue_wait']:.1f}s at queue position {queue['queue_position']}")
         
         processing_time = time.time() - start_time
         
@@ -176,6 +163,8 @@ def ask_ollama(prompt: str, user, org, context: Optional[str] = None, system_pro
                 'model': model_to_use,
                 'processing_time': processing_time,
                 'tokens': result.get('eval_count', 0),  # Approximate token count
+                'queue_position': queue['queue_position'],
+                'queue_wait': queue['queue_wait'],
                 'raw_response': result,
             }
             
@@ -189,6 +178,9 @@ def ask_ollama(prompt: str, user, org, context: Optional[str] = None, system_pro
                 raise Exception(error_msg)
             raise Exception(error_msg)
     
+    except OllamaBusyError as e:
+        logger.warning(f"Ollama request rejected: {e}")
+        raise
     except requests.exceptions.Timeout:
         error_msg = "Ollama request timed out"
         logger.error(error_msg)
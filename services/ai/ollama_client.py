@@ -0,0 +1,398 @@
+"""
+Pooled HTTP client and concurrency governor for the local Ollama server.
+
+- One keep-alive ``requests.Session`` per worker process, so consecutive
+  questions reuse TCP connections (re-created after fork).
+- A semaphore shared by all workers caps concurrent generations at
+  ``OLLAMA_MAX_CONCURRENCY``: Redis when ``OLLAMA_REDIS_URL``/``REDIS_URL`` is
+  set, otherwise ``flock``ed slot files (processes on one host). Locks of
+  crashed processes expire (Redis leases) or are dropped by the kernel (files).
+- Waiters queue FIFO and can be told their position; once
+  ``OLLAMA_MAX_QUEUE`` requests are waiting, new ones fail fast with
+  ``OllamaBusyError`` instead of sitting out ``REQUEST_TIMEOUT``.
+- ``check_status`` is cached in the Django cache for ``OLLAMA_STATUS_TTL``
+  seconds (failures for a shorter window).
+"""
+import fcntl
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+import uuid
+from contextlib import contextmanager
+from typing import Callable, Optional
+
+import requests
+from django.core.cache import cache
+from requests.adapters import HTTPAdapter
+
+from .ollama_config import (
+    OLLAMA_BASE_URL,
+    OLLAMA_LOCK_DIR,
+    OLLAMA_MAX_CONCURRENCY,
+    OLLAMA_MAX_QUEUE,
+    OLLAMA_POOL_SIZE,
+    OLLAMA_QUEUE_TIMEOUT,
+    OLLAMA_REDIS_URL,
+    OLLAMA_SEMAPHORE_BACKEND,
+    OLLAMA_STATUS_TTL,
+    REQUEST_TIMEOUT,
+)
+
+logger = logging.getLogger('services.ai.ollama_client')
+
+QueueCallback = Optional[Callable[[int], None]]
+
+
+class OllamaBusyError(Exception):
+    """Too many generations are already queued, or the wait for a slot timed out"""
+
+    def __init__(self, waiting: int, message: Optional[str] = None):
+        self.waiting = waiting
+        super().__init__(message or f"Ollama is busy: {waiting} requests are already waiting")
+
+
+class FileSemaphore:
+    """
+    Counting semaphore for processes on one host.
+
+    Slots are ``flock``ed files (``slot-<n>``); waiters hold a locked file in
+    ``queue/`` named by arrival time, which gives FIFO positions and lets dead
+    waiters be recognised (their lock is gone) and removed.
+    """
+
+    # Waiters next in line poll often, so a freed slot is handed over quickly
+    poll_interval = 0.05
+    head_poll_interval = 0.005
+
+    def __init__(self, directory: str, limit: int, max_queue: int):
+        self.directory = directory
+        self.queue_dir = os.path.join(directory, 'queue')
+        self.limit = limit
+        self.max_queue = max_queue
+        os.makedirs(self.queue_dir, exist_ok=True)
+
+    @contextmanager
+    def slot(self, timeout: float = OLLAMA_QUEUE_TIMEOUT, on_wait: QueueCallback = None):
+        """Hold one generation slot; yields ``{'queue_position', 'queue_wait'}``"""
+        started = time.monotonic()
+        ticket, ticket_fd = self._enqueue()
+        first_position = reported = None
+        try:
+            while True:
+                position = self._position(ticket)
+                slot_fd = self._try_slots() if position < self.limit else None
+                if slot_fd is not None:
+                    break
+                if first_position is None:
+                    first_position = position + 1
+                if on_wait and position + 1 != reported:
+                    reported = position + 1
+                    on_wait(reported)
+                if time.monotonic() - started > timeout:
+                    raise OllamaBusyError(position + 1, f"Timed out after {timeout}s waiting for an Ollama slot")
+                time.sleep(self.head_poll_interval if position < self.limit else self.poll_interval)
+        finally:
+            self._dequeue(ticket, ticket_fd)
+        try:
+            yield {'queue_position': first_position or 0, 'queue_wait': time.monotonic() - started}
+        finally:
+            os.close(slot_fd)
+
+    def status(self) -> dict:
+        active = 0
+        for index in range(self.limit):
+            fd = self._lock(os.path.join(self.directory, f'slot-{index}'))
+            if fd is None:
+                active += 1
+            else:
+                os.close(fd)
+        return {'active': active, 'waiting': len(self._waiters()), 'limit': self.limit}
+
+    def _enqueue(self):
+        # queue.lock makes the backlog check and the insert one step
+        guard = os.open(os.path.join(self.directory, 'queue.lock'), os.O_RDWR | os.O_CREAT, 0o600)
+        try:
+            fcntl.flock(guard, fcntl.LOCK_EX)
+            waiting = len(self._waiters())
+            if waiting >= self.max_queue:
+                raise OllamaBusyError(waiting)
+            ticket = f'{time.time_ns():020d}-{os.getpid()}-{uuid.uuid4().hex[:8]}'
+            # Lock before the file becomes visible, so it is never mistaken for a dead waiter
+            pending = os.path.join(self.directory, f'.{ticket}')
+            fd = os.open(pending, os.O_RDWR | os.O_CREAT, 0o600)
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            os.rename(pending, os.path.join(self.queue_dir, ticket))
+            return ticket, fd
+        finally:
+            os.close(guard)
+
+    def _dequeue(self, ticket: str, fd: int):
+        try:
+            os.unlink(os.path.join(self.queue_dir, ticket))
+        except FileNotFoundError:
+            pass
+        os.close(fd)
+
+    def _position(self, ticket: str) -> int:
+        waiters = self._waiters(keep=ticket)
+        return waiters.index(ticket) if ticket in waiters else 0
+
+    def _waiters(self, keep: Optional[str] = None):
+        """Live waiters in arrival order; files of crashed waiters are removed"""
+        live = []
+        for name in sorted(os.listdir(self.queue_dir)):
+            if name == keep:
+                live.append(name)
+                continue
+            path = os.path.join(self.queue_dir, name)
+            try:
+                fd = self._lock(path, create=False)
+            except FileNotFoundError:
+                continue
+            if fd is None:
+                live.append(name)
+                continue
+            try:
+                os.unlink(path)
+            except FileNotFoundError:
+                pass
+            os.close(fd)
+        return live
+
+    def _try_slots(self) -> Optional[int]:
+        for index in range(self.limit):
+            fd = self._lock(os.path.join(self.directory, f'slot-{index}'))
+            if fd is not None:
+                return fd
+        return None
+
+    @staticmethod
+    def _lock(path: str, create: bool = True) -> Optional[int]:
+        """Descriptor holding a non-blocking exclusive lock on ``path``, or None if it is taken"""
+        fd = os.open(path, os.O_RDWR | (os.O_CREAT if create else 0), 0o600)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            return fd
+        except BlockingIOError:
+            os.close(fd)
+            return None
+
+
+class RedisSemaphore:
+    """
+    Counting semaphore shared by every worker that can reach one Redis.
+
+    Holders are a sorted set scored by acquisition time and expire after
+    ``lease`` seconds; waiters are a FIFO sorted set with heartbeats, so
+    abandoned waiters drop out of the queue. All bookkeeping runs in Lua
+    scripts using the Redis clock.
+    """
+
+    ENQUEUE = """
+    local t = redis.call('time')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    for _, token in ipairs(redis.call('zrangebyscore', KEYS[2], '-inf', now - tonumber(ARGV[2]))) do
+        redis.call('zrem', KEYS[1], token)
+        redis.call('zrem', KEYS[2], token)
+    end
+    local waiting = redis.call('zcard', KEYS[1])
+    if waiting >= tonumber(ARGV[3]) then
+        return {0, waiting}
+    end
+    redis.call('zadd', KEYS[1], redis.call('incr', KEYS[3]), ARGV[1])
+    redis.call('zadd', KEYS[2], now, ARGV[1])
+    return {1, waiting}
+    """
+
+    ACQUIRE = """
+    local t = redis.call('time')
+    local now = tonumber(t[1]) + tonumber(t[2]) / 1000000
+    redis.call('zremrangebyscore', KEYS[1], '-inf', now - tonumber(ARGV[2]))
+    for _, token in ipairs(redis.call('zrangebyscore', KEYS[3], '-inf', now - tonumber(ARGV[3]))) do
+        if token ~= ARGV[1] then
+            redis.call('zrem', KEYS[2], token)
+            redis.call('zrem', KEYS[3], token)
+        end
+    end
+    local rank = redis.call('zrank', KEYS[2], ARGV[1])
+    if not rank then
+        return -1
+    end
+    if rank < tonumber(ARGV[4]) - redis.call('zcard', KEYS[1]) then
+        redis.call('zrem', KEYS[2], ARGV[1])
+        redis.call('zrem', KEYS[3], ARGV[1])
+        redis.call('zadd', KEYS[1], now, ARGV[1])
+        return 0
+    end
+    redis.call('zadd', KEYS[3], now, ARGV[1])
+    return rank + 1
+    """
+
+    poll_interval = 0.1
+    # A waiter that has not polled for this long is considered gone
+    stale_after = 10
+
+    def __init__(self, client, limit: int, max_queue: int, lease: float, prefix: str = 'oreno:ollama'):
+        self.client = client
+        self.limit = limit
+        self.max_queue = max_queue
+        self.lease = lease
+        self.keys = {name: f'{prefix}:{name}' for name in ('holders', 'queue', 'seen', 'tickets')}
+        self._enqueue_script = client.register_script(self.ENQUEUE)
+        self._acquire_script = client.register_script(self.ACQUIRE)
+
+    @contextmanager
+    def slot(self, timeout: float = OLLAMA_QUEUE_TIMEOUT, on_wait: QueueCallback = None):
+        """Hold one generation slot; yields ``{'queue_position', 'queue_wait'}``"""
+        started = time.monotonic()
+        token = uuid.uuid4().hex
+        self._enqueue(token)
+        first_position = reported = None
+        try:
+            while True:
+                position = self._acquire_script(
+                    keys=[self.keys['holders'], self.keys['queue'], self.keys['seen']],
+                    args=[token, self.lease, self.stale_after, self.limit],
+                )
+                if position == 0:
+                    break
+                if position == -1:
+                    # Dropped as stale (e.g. a long GC pause): queue again
+                    self._enqueue(token)
+                    continue
+                if first_position is None:
+                    first_position = position
+                if on_wait and position != reported:
+                    reported = position
+                    on_wait(position)
+                if time.monotonic() - started > timeout:
+                    raise OllamaBusyError(position, f"Timed out after {timeout}s waiting for an Ollama slot")
+                time.sleep(self.poll_interval)
+        except BaseException:
+            self.client.zrem(self.keys['queue'], token)
+            self.client.zrem(self.keys['seen'], token)
+            raise
+        try:
+            yield {'queue_position': first_position or 0, 'queue_wait': time.monotonic() - started}
+        finally:
+            self.client.zrem(self.keys['holders'], token)
+
+    def status(self) -> dict:
+        return {
+            'active': self.client.zcard(self.keys['holders']),
+            'waiting': self.client.zcard(self.keys['queue']),
+            'limit': self.limit,
+        }
+
+    def _enqueue(self, token: str):
+        accepted, waiting = self._enqueue_script(
+            keys=[self.keys['queue'], self.keys['seen'], self.keys['tickets']],
+            args=[token, self.stale_after, self.max_queue],
+        )
+        if not accepted:
+            raise OllamaBusyError(waiting)
+
+
+def build_semaphore(backend: str = OLLAMA_SEMAPHORE_BACKEND):
+    """Semaphore for the configured backend; Redis falls back to files when unreachable"""
+    if backend in ('auto', 'redis') and OLLAMA_REDIS_URL:
+        try:
+            import redis
+
+            client = redis.Redis.from_url(OLLAMA_REDIS_URL, socket_timeout=5, socket_connect_timeout=5)
+            client.ping()
+            return RedisSemaphore(
+                client, OLLAMA_MAX_CONCURRENCY, OLLAMA_MAX_QUEUE, lease=REQUEST_TIMEOUT + 30,
+            )
+        except Exception as e:
+            logger.warning(f"Redis semaphore unavailable ({e}); limiting Ollama concurrency per host")
+    directory = OLLAMA_LOCK_DIR or os.path.join(tempfile.gettempdir(), 'oreno-ollama')
+    return FileSemaphore(directory, OLLAMA_MAX_CONCURRENCY, OLLAMA_MAX_QUEUE)
+
+
+class OllamaClient:
+    """Pooled session, shared concurrency limit and cached health checks for one Ollama server"""
+
+    status_failure_ttl = 5
+
+    def __init__(self, base_url: str = OLLAMA_BASE_URL, semaphore=None, pool_size: int = OLLAMA_POOL_SIZE,
+                 status_ttl: int = OLLAMA_STATUS_TTL):
+        self.base_url = base_url.rstrip('/')
+        self.semaphore = semaphore if semaphore is not None else build_semaphore()
+        self.pool_size = pool_size
+        self.status_ttl = status_ttl
+        self._session = None
+        self._session_pid = None
+        self._lock = threading.Lock()
+        self._status_lock = threading.Lock()
+
+    @property
+    def session(self) -> requests.Session:
+        """Keep-alive session of this process (sessions must not cross a fork)"""
+        if self._session is None or self._session_pid != os.getpid():
+            with self._lock:
+                if self._session is None or self._session_pid != os.getpid():
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_size)
+                    session.mount('http://', adapter)
+                    session.mount('https://', adapter)
+                    session.headers['Content-Type'] = 'application/json'
+                    self._session, self._session_pid = session, os.getpid()
+        return self._session
+
+    def chat(self, payload: dict, timeout: float = REQUEST_TIMEOUT, on_wait: QueueCallback = None):
+        """
+        POST ``payload`` to ``/api/chat`` once a generation slot is free.
+
+        Returns ``(response, queue)`` where ``queue`` holds ``queue_position``
+        (0 when no wait was needed) and ``queue_wait`` in seconds. Raises
+        ``OllamaBusyError`` when the backlog is full or no slot frees up in
+        time.
+        """
+        with self.semaphore.slot(on_wait=on_wait) as queue:
+            response = self.session.post(f'{self.base_url}/api/chat', data=json.dumps(payload), timeout=timeout)
+        return response, queue
+
+    def check_status(self, model: str) -> bool:
+        """Whether Ollama answers; cached for ``status_ttl`` seconds (failures for 5)"""
+        key = f'ollama:status:{self.base_url}:{model}'
+        status = cache.get(key)
+        if status is None:
+            # One probe per process when the entry expires, not one per waiting thread
+            with self._status_lock:
+                status = cache.get(key)
+                if status is None:
+                    status = self._check_status(model)
+                    cache.set(key, status, self.status_ttl if status else self.status_failure_ttl)
+        return status
+
+    def _check_status(self, model: str) -> bool:
+        try:
+            response = self.session.get(f'{self.base_url}/api/tags', timeout=10)
+            if response.status_code == 200:
+                # Also check if the model is available
+                model_names = [m.get('name', '') for m in response.json().get('models', [])]
+                if model not in model_names:
+                    logger.warning(f"Model {model} not found in Ollama. Available models: {model_names}")
+                return True
+            return False
+        except requests.exceptions.ConnectionError:
+            logger.error(f"Cannot connect to Ollama at {self.base_url}. Is Ollama running?")
+            return False
+        except Exception as e:
+            logger.error(f"Ollama status check failed: {e}")
+            return False
+
+
+_client: Optional[OllamaClient] = None
+
+
+def get_ollama_client() -> OllamaClient:
+    """Process-wide client, built on first use"""
+    global _client
+    if _client is None:
+        _client = OllamaClient()
+    return _client
@@ -27,6 +27,16 @@ DEFAULT_TEMPERATURE = float(os.getenv('OLLAMA_TEMPERATURE', '0.9'))  # Increased
 # Timeout settings - increased for DeepSeek which may take longer to generate responses
 REQUEST_TIMEOUT = int(os.getenv('OLLAMA_TIMEOUT', '120'))  # 2 minutes for complex queries
 
+# Connection pooling and concurrency governor (see ollama_client.py)
+OLLAMA_POOL_SIZE = int(os.getenv('OLLAMA_POOL_SIZE', '10'))  # keep-alive connections per worker
+OLLAMA_MAX_CONCURRENCY = int(os.getenv('OLLAMA_MAX_CONCURRENCY', '2'))  # generations across all workers
+OLLAMA_MAX_QUEUE = int(os.getenv('OLLAMA_MAX_QUEUE', '8'))  # fail fast once this many requests are waiting
+OLLAMA_QUEUE_TIMEOUT = int(os.getenv('OLLAMA_QUEUE_TIMEOUT', '60'))  # max seconds to wait for a slot
+OLLAMA_SEMAPHORE_BACKEND = os.getenv('OLLAMA_SEMAPHORE_BACKEND', 'auto').lower()  # auto, redis or file
+OLLAMA_REDIS_URL = os.getenv('OLLAMA_REDIS_URL', os.getenv('REDIS_URL', ''))
+OLLAMA_LOCK_DIR = os.getenv('OLLAMA_LOCK_DIR', '')  # file backend; defaults to <tmp>/oreno-ollama
+OLLAMA_STATUS_TTL = int(os.getenv('OLLAMA_STATUS_TTL', '30'))  # seconds a health check is reused
+
 # Logging configuration
 LOG_LEVEL = os.getenv('OLLAMA_LOG_LEVEL', 'INFO')
 
@@ -0,0 +1,109 @@
+"""
+Local stand-in for the Ollama HTTP API, used by the client benchmark and tests.
+
+Answers ``/api/tags`` and ``/api/chat`` like Ollama does, generating at most
+``parallel`` responses at a time (``OLLAMA_NUM_PARALLEL``), each taking
+``delay`` seconds; further requests wait inside the server. Counts TCP
+connections, requests and the peak number of generations in flight.
+"""
+import json
+import socket
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubOllamaServer:
+    def __init__(self, delay: float = 0.2, parallel: int = 1, model: str = 'deepseek-r1:8b'):
+        self.delay = delay
+        self.model = model
+        self.generation_slots = threading.Semaphore(parallel)
+        self.lock = threading.Lock()
+        self.connections = 0
+        self.requests = {'tags': 0, 'chat': 0}
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def reset_counters(self):
+        with self.lock:
+            self.connections = 0
+            self.requests = {'tags': 0, 'chat': 0}
+            self.peak_in_flight = 0
+
+    def _generate(self, payload: dict) -> dict:
+        with self.lock:
+            self.requests['chat'] += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        try:
+            with self.generation_slots:
+                time.sleep(self.delay)
+        finally:
+            with self.lock:
+                self.in_flight -= 1
+        question = payload.get('messages', [{}])[-1].get('content', '')
+        return {'model': self.model, 'message': {'role': 'assistant', 'content': f'Answer to: {question[:40]}'},
+                'done': True, 'eval_count': 12}
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            # HTTP/1.1 keeps connections open between requests
+            protocol_version = 'HTTP/1.1'
+
+            def setup(self):
+                super().setup()
+                # Headers and body go out in separate writes; don't let Nagle hold the body back
+                self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+                with stub.lock:
+                    stub.connections += 1
+
+            def do_GET(self):
+                if self.path != '/api/tags':
+                    return self._send(404, {'error': 'not found'})
+                with stub.lock:
+                    stub.requests['tags'] += 1
+                self._send(200, {'models': [{'name': stub.model}]})
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get('Content-Length') or 0))
+                if self.path != '/api/chat':
+                    return self._send(404, {'error': 'not found'})
+                self._send(200, stub._generate(json.loads(body or b'{}')))
+
+            def _send(self, status, data):
+                body = json.dumps(data).encode()
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
@@ -0,0 +1,243 @@
+"""
+Semantic response cache for assistant questions.
+
+"how many open risks" and "How many risks are open?" ask the same thing, but
+an exact-key cache treats them as different prompts and generates twice. The
+semantic cache:
+
+1. normalizes a question (case, punctuation, stop words, plurals, phrases
+   like "how many"/"number of")
+2. embeds it locally as a signed hashed vector of words, word pairs and
+   character trigrams (no model or network needed)
+3. keeps a per-organization index of cached answers in the Django cache
+   (one per ``scope`` within it, e.g. the asker's role) and finds the nearest
+   one by cosine similarity
+4. serves it when the similarity reaches ``AI_SEMANTIC_CACHE_THRESHOLD``, the
+   organization's data version is unchanged and the two questions agree on
+   every content word, number and negation ("open" vs "closed" risks never
+   share an answer)
+
+Hits, misses and stale entries are counted (``semantic_cache_stats``) and
+every avoided LLM call is logged.
+"""
+import hashlib
+import logging
+import re
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+logger = logging.getLogger('services.ai.semantic_cache')
+
+KEY_PREFIX = 'oreno:ai:semantic'
+STAT_FIELDS = ('hits', 'misses', 'stale')
+
+PHRASES = [
+    (re.compile(r'\b(how many|number of|count of|total number of|how much)\b'), ' count '),
+    (re.compile(r'\b(show me|show|display|give me|list out|list|what are|which are|which)\b'), ' list '),
+    (re.compile(r'\b(past due|overdue|late)\b'), ' overdue '),
+]
+
+STOP_WORDS = {
+    'a', 'an', 'the', 'is', 'are', 'am', 'was', 'were', 'be', 'been', 'do', 'does', 'did', 'we', 'our', 'ours',
+    'us', 'i', 'me', 'my', 'you', 'your', 'have', 'has', 'had', 'there', 'please', 'of', 'in', 'for', 'to', 'on',
+    'can', 'could', 'would', 'currently', 'current', 'right', 'now', 'still', 'at', 'moment', 'all', 'any',
+    'that', 'this', 'these', 'those', 'it', 'its', 'tell', 'about', 'with', 'by', 'what', 'whats', 'so', 'far',
+    'today', 'just', 'exactly', 'get', 'kindly', 'let', 'know', 'presently',
+}
+
+# Phrasing rather than meaning ("top 5 risks" = "show me the top 5 risks"); not required to match
+WEAK_TOKENS = {'list'}
+
+NEGATIONS = {'not', 'no', 'non', 'without', 'never', 'none', 'nor', 'dont', 'doesnt', 'isnt', 'arent', 'unassigned'}
+
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def _stem(token: str) -> str:
+    if token.isdigit() or len(token) <= 3:
+        return token
+    if token.endswith('ies'):
+        return token[:-3] + 'y'
+    if token.endswith('sses'):
+        return token[:-2]
+    if token.endswith('s') and not token.endswith(('ss', 'us', 'is')):
+        return token[:-1]
+    return token
+
+
+def question_tokens(question: str) -> List[str]:
+    """Content words of ``question``, normalized and in their original order"""
+    text = ' ' + str(question).lower().replace("'", '') + ' '
+    text = _NON_WORD.sub(' ', text)
+    for pattern, replacement in PHRASES:
+        text = pattern.sub(replacement, text)
+    tokens = []
+    for word in text.split():
+        if word in STOP_WORDS:
+            continue
+        token = _stem(word)
+        if token not in tokens:
+            tokens.append(token)
+    return tokens
+
+
+def _trigrams(token: str) -> set:
+    padded = f'#{token}#'
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def embed(tokens: List[str], dimensions: int) -> np.ndarray:
+    """Unit-length signed hashed feature vector of words, word pairs and character trigrams"""
+    features = [(token, 1.0) for token in tokens]
+    features += [(f'{a}|{b}', 0.5) for i, a in enumerate(sorted(tokens)) for b in sorted(tokens)[i + 1:]]
+    features += [(f'#{gram}', 0.3) for token in tokens for gram in _trigrams(token)]
+    vector = np.zeros(dimensions, dtype=np.float32)
+    for feature, weight in features:
+        value = int.from_bytes(hashlib.blake2b(feature.encode(), digest_size=8).digest(), 'little')
+        vector[value % dimensions] += weight if value >> 63 else -weight
+    norm = np.linalg.norm(vector)
+    return vector / norm if norm else vector
+
+
+def same_question(tokens: List[str], other: List[str]) -> bool:
+    """Both questions agree on numbers and negations, and every content word has a counterpart in the other"""
+    def strict(words):
+        return {word for word in words if word.isdigit() or word in NEGATIONS}
+
+    if strict(tokens) != strict(other):
+        return False
+
+    def covered(words, candidates):
+        for word in words:
+            if word in candidates:
+                continue
+            grams = _trigrams(word)
+            # Spelling variants ("organisation"/"organization") still count
+            if not any(len(grams & _trigrams(c)) / len(grams | _trigrams(c)) >= 0.6 for c in candidates):
+                return False
+        return True
+
+    tokens, other = [t for t in tokens if t not in WEAK_TOKENS], [t for t in other if t not in WEAK_TOKENS]
+    return covered(tokens, other) and covered(other, tokens)
+
+
+class SemanticCache:
+    """Per-organization nearest-neighbour cache of assistant answers"""
+
+    def __init__(self, threshold: Optional[float] = None, ttl: Optional[int] = None,
+                 max_entries: Optional[int] = None, dimensions: Optional[int] = None):
+        self.threshold = threshold if threshold is not None else getattr(settings, 'AI_SEMANTIC_CACHE_THRESHOLD', 0.8)
+        self.ttl = ttl if ttl is not None else getattr(settings, 'AI_SEMANTIC_CACHE_TTL', 86400)
+        self.max_entries = max_entries or getattr(settings, 'AI_SEMANTIC_CACHE_MAX_ENTRIES', 200)
+        self.dimensions = dimensions or getattr(settings, 'AI_SEMANTIC_CACHE_DIMENSIONS', 512)
+
+    def lookup(self, organization_id, question: str, data_version: str, scope: str = '') -> Optional[Dict[str, Any]]:
+        """
+        Cached answer for a question like ``question``, or None.
+
+        Returns ``{'answer', 'meta', 'question', 'similarity'}``.
+        """
+        tokens = question_tokens(question)
+        index = self._load(organization_id, scope)
+        match = self._nearest(index, tokens) if tokens else None
+        if match is None:
+            self._count('misses')
+            return None
+        entry, similarity = match
+        if entry['data_version'] != data_version:
+            self._count('stale')
+            logger.debug(f"Semantic cache entry for org {organization_id} is stale: {entry['question']!r}")
+            return None
+        self._count('hits')
+        logger.info(
+            f"Semantic cache hit, LLM call avoided | org={organization_id} | question={question!r} | "
+            f"cached_question={entry['question']!r} | similarity={similarity:.3f}"
+        )
+        return {'answer': entry['answer'], 'meta': entry['meta'], 'question': entry['question'],
+                'similarity': similarity}
+
+    def store(self, organization_id, question: str, answer: str, meta: Dict[str, Any], data_version: str,
+              scope: str = ''):
+        tokens = question_tokens(question)
+        if not tokens:
+            return
+        index = self._load(organization_id, scope)
+        now = time.time()
+        # Entries computed from older data can never be served again
+        keep = [
+            i for i, entry in enumerate(index['entries'])
+            if entry['data_version'] == data_version and entry['tokens'] != tokens
+        ][-(self.max_entries - 1):] if self.max_entries > 1 else []
+        entries = [index['entries'][i] for i in keep]
+        vectors = [index['vectors'][i] for i in keep]
+        entries.append({
+            'question': question, 'tokens': tokens, 'answer': answer, 'data_version': data_version,
+            'meta': {key: value for key, value in (meta or {}).items() if key != 'raw_response'},
+            'expires': now + self.ttl,
+        })
+        vectors.append(embed(tokens, self.dimensions))
+        try:
+            cache.set(self._key(organization_id, scope), {
+                'dimensions': self.dimensions,
+                'entries': entries,
+                'vectors': np.vstack(vectors).astype(np.float32).tobytes(),
+            }, self.ttl)
+        except Exception as e:
+            logger.warning(f"Failed to store semantic cache entry for org {organization_id}: {e}")
+
+    def clear(self, organization_id, scope: str = ''):
+        cache.delete(self._key(organization_id, scope))
+
+    def _nearest(self, index, tokens) -> Optional[Tuple[Dict[str, Any], float]]:
+        if not index['entries']:
+            return None
+        similarities = index['vectors'] @ embed(tokens, self.dimensions)
+        now = time.time()
+        for position in np.argsort(-similarities):
+            similarity = float(similarities[position])
+            if similarity < self.threshold:
+                return None
+            entry = index['entries'][position]
+            if entry['expires'] > now and same_question(tokens, entry['tokens']):
+                return entry, similarity
+        return None
+
+    def _load(self, organization_id, scope: str = '') -> Dict[str, Any]:
+        try:
+            stored = cache.get(self._key(organization_id, scope))
+        except Exception as e:
+            logger.warning(f"Failed to read semantic cache for org {organization_id}: {e}")
+            stored = None
+        if not stored or stored.get('dimensions') != self.dimensions:
+            return {'entries': [], 'vectors': np.zeros((0, self.dimensions), dtype=np.float32)}
+        vectors = np.frombuffer(stored['vectors'], dtype=np.float32).reshape(-1, self.dimensions)
+        return {'entries': stored['entries'], 'vectors': vectors}
+
+    def _key(self, organization_id, scope: str = '') -> str:
+        return f'{KEY_PREFIX}:{organization_id}:{scope}' if scope else f'{KEY_PREFIX}:{organization_id}'
+
+    def _count(self, field: str):
+        key = f'{KEY_PREFIX}:stats:{field}'
+        try:
+            cache.incr(key)
+        except ValueError:
+            if not cache.add(key, 1, None):
+                cache.incr(key)
+        except Exception:
+            pass
+
+
+def semantic_cache_stats() -> Dict[str, Any]:
+    """``{hits, misses, stale, hit_rate}``; each hit is an LLM call avoided"""
+    found = cache.get_many([f'{KEY_PREFIX}:stats:{field}' for field in STAT_FIELDS])
+    stats = {field: found.get(f'{KEY_PREFIX}:stats:{field}', 0) for field in STAT_FIELDS}
+    total = sum(stats.values())
+    stats['hit_rate'] = stats['hits'] / total if total else 0.0
+    return stats
+
+
+semantic_cache = SemanticCache()
@@ -38,7 +38,9 @@ def run_ai_query(self, user_id, org_id, prompt, system_prompt=None, session_id=N
             user,
             org,
             system_prompt=system_prompt,  # type: ignore[arg-type]
-            return_meta=True
+            return_meta=True,
+            # Job status polling shows the position while waiting for an LLM slot
+            on_queue=lambda position: self.update_state(state='QUEUED', meta={'queue_position': position}),
         )
         
         # Type assertion: meta is guaranteed to be a dict when return_meta=True
@@ -0,0 +1,91 @@
+"""
+Tests for the pooled, governed Ollama client
+"""
+import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.cache import cache
+from django.test import SimpleTestCase
+
+from services.ai.ollama_client import FileSemaphore, OllamaBusyError, OllamaClient
+from services.ai.ollama_stub import StubOllamaServer
+
+PAYLOAD = {'model': 'deepseek-r1:8b', 'messages': [{'role': 'user', 'content': 'Top risks?'}], 'stream': False}
+
+
+class OllamaClientTestCase(SimpleTestCase):
+    """Test cases for connection reuse, the concurrency limit and cached health checks"""
+
+    def setUp(self):
+        cache.clear()
+        self.stub = StubOllamaServer(delay=0.1, parallel=4).start()
+        self.addCleanup(self.stub.stop)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.directory = directory.name
+
+    def _client(self, limit=2, max_queue=8):
+        return OllamaClient(base_url=self.stub.url, semaphore=FileSemaphore(self.directory, limit, max_queue))
+
+    def test_generations_are_limited_and_connections_reused(self):
+        """Test that at most `limit` generations run and callers share keep-alive connections"""
+        client = self._client(limit=2)
+        positions = []
+
+        def ask(_):
+            response, queue = client.chat(PAYLOAD, on_wait=positions.append)
+            return response.status_code, queue['queue_position']
+
+        with ThreadPoolExecutor(max_workers=6) as pool:
+            results = list(pool.map(ask, range(6)))
+
+        self.assertEqual([status for status, _ in results], [200] * 6)
+        self.assertEqual(self.stub.peak_in_flight, 2)
+        self.assertLessEqual(self.stub.connections, 6)
+        self.assertTrue(any(position for _, position in results))
+        self.assertTrue(positions)
+        self.assertEqual(self.stub.requests['chat'], 6)
+
+        # A second burst reuses the pooled connections
+        connections = self.stub.connections
+        with ThreadPoolExecutor(max_workers=2) as pool:
+            list(pool.map(ask, range(4)))
+        self.assertEqual(self.stub.connections, connections)
+
+    def test_full_backlog_fails_fast(self):
+        """Test that callers beyond the queue limit are rejected instead of waiting"""
+        client = self._client(limit=1, max_queue=1)
+
+        def ask(_):
+            try:
+                return client.chat(PAYLOAD)[0].status_code
+            except OllamaBusyError as e:
+                return e
+
+        with ThreadPoolExecutor(max_workers=5) as pool:
+            results = list(pool.map(ask, range(5)))
+
+        rejected = [result for result in results if isinstance(result, OllamaBusyError)]
+        self.assertTrue(rejected)
+        self.assertIn(200, results)
+        self.assertEqual(self.stub.requests['chat'], len(results) - len(rejected))
+        self.assertEqual(client.semaphore.status(), {'active': 0, 'waiting': 0, 'limit': 1})
+
+    def test_status_is_cached(self):
+        """Test that health checks are served from the cache within the TTL"""
+        client = self._client()
+        self.assertTrue(client.check_status(PAYLOAD['model']))
+        self.assertTrue(client.check_status(PAYLOAD['model']))
+        self.assertEqual(self.stub.requests['tags'], 1)
+
+        self.assertFalse(OllamaClient(base_url='http://127.0.0.1:9', semaphore=client.semaphore).check_status('x'))
+
+    def test_abandoned_queue_entries_are_dropped(self):
+        """Test that queue files whose owner died no longer count as waiting"""
+        semaphore = FileSemaphore(self.directory, limit=1, max_queue=1)
+        open(os.path.join(semaphore.queue_dir, f'{0:020d}-1-dead'), 'w').close()
+
+        with semaphore.slot(timeout=1) as queue:
+            self.assertEqual(queue['queue_position'], 0)
+        self.assertEqual(os.listdir(semaphore.queue_dir), [])
@@ -0,0 +1,149 @@
+"""
+Tests for the semantic assistant cache, including a paraphrase precision set
+"""
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase
+from django.utils import timezone
+from django_tenants.test.cases import TenantTestCase
+
+from core.chart_cache import invalidate
+from services.ai.ai_service import ai_assistant_answer
+from services.ai.semantic_cache import SemanticCache, semantic_cache_stats
+
+User = get_user_model()
+
+# Should share an answer
+PARAPHRASES = [
+    ('how many open risks', 'How many risks are open?'),
+    ('How many open risks do we have?', 'number of open risks'),
+    ('Show me overdue compliance obligations', 'Which compliance obligations are overdue?'),
+    ('list all high risks', 'what are our high risks'),
+    ('How many engagements are in progress?', 'number of engagements in progress'),
+    ('Which contracts expire in 2025?', 'show contracts that expire in 2025'),
+    ('What are the open audit issues?', 'list open audit issues'),
+    ('How many issues are past due?', 'how many overdue issues'),
+    ('Give me the list of active contracts', 'show active contracts'),
+    ('how many risks does our organisation have', 'How many risks does our organization have?'),
+]
+
+# Look alike but must not share an answer
+DISTINCT = [
+    ('how many open risks', 'how many closed risks'),
+    ('how many open risks', 'how many risks'),
+    ('list high risks', 'list medium risks'),
+    ('Which contracts expire in 2025?', 'Which contracts expire in 2026?'),
+    ('list overdue compliance obligations', 'list overdue audit issues'),
+    ('show risks with an owner', 'show risks without an owner'),
+    ('How many engagements are in progress?', 'How many engagements are completed?'),
+    ('top 5 risks', 'top 10 risks'),
+    ('list active contracts', 'list expired contracts'),
+    ('how many issues are overdue', 'how many obligations are overdue'),
+]
+
+
+class SemanticCacheTestCase(SimpleTestCase):
+    """Test cases for semantic matching, data versions and tenant isolation"""
+
+    def setUp(self):
+        cache.clear()
+        self.cache = SemanticCache()
+
+    def _hit(self, cached_question, question, version='v1'):
+        self.cache.clear(1)
+        self.cache.store(1, cached_question, f'answer: {cached_question}', {'provider': 'deepseek'}, version)
+        return self.cache.lookup(1, question, version)
+
+    def test_paraphrase_precision(self):
+        """Test that paraphrases hit and look-alike questions never do"""
+        hits = [pair for pair in PARAPHRASES if self._hit(*pair)]
+        false_hits = [pair for pair in DISTINCT if self._hit(*pair)]
+
+        self.assertEqual(false_hits, [])
+        self.assertGreaterEqual(len(hits) / len(PARAPHRASES), 0.9, set(PARAPHRASES) - set(hits))
+
+    def test_changed_data_version_is_a_miss(self):
+        """Test that answers are only served for the data version they were computed from"""
+        self.cache.store(1, 'how many open risks', '4 open risks', {'provider': 'deepseek'}, 'v1')
+
+        self.assertEqual(self.cache.lookup(1, 'number of open risks', 'v1')['answer'], '4 open risks')
+        self.assertIsNone(self.cache.lookup(1, 'number of open risks', 'v2'))
+        self.assertEqual(semantic_cache_stats()['stale'], 1)
+
+        # Storing under the new version drops the outdated entries
+        self.cache.store(1, 'list high risks', 'R-1, R-7', {}, 'v2')
+        self.assertEqual(len(self.cache._load(1)['entries']), 1)
+
+    def test_entries_are_per_organization(self):
+        self.cache.store(1, 'how many open risks', '4 open risks', {}, 'v1')
+        self.assertIsNone(self.cache.lookup(2, 'how many open risks', 'v1'))
+
+    def test_nearest_entry_wins_among_many(self):
+        questions = [pair[0] for pair in DISTINCT]
+        for question in dict.fromkeys(questions + ['how many closed risks']):
+            self.cache.store(1, question, f'answer: {question}', {}, 'v1')
+
+        self.assertEqual(self.cache.lookup(1, 'number of closed risks', 'v1')['answer'], 'answer: how many closed risks')
+        self.assertEqual(self.cache.lookup(1, 'show me the top 5 risks', 'v1')['answer'], 'answer: top 5 risks')
+        self.assertEqual(semantic_cache_stats()['hits'], 2)
+
+
+class AssistantSemanticCacheTestCase(TenantTestCase):
+    """Test cases for the cache in front of the assistant's LLM calls"""
+
+    @classmethod
+    def setup_tenant(cls, tenant):
+        tenant.name = 'Semantic Cache Org'
+        tenant.code = 'SEMCACHE'
+        tenant.auto_create_schema = True
+
+    def setUp(self):
+        cache.clear()
+        # User creation queues welcome/OTP tasks, which would need a broker
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            self.user = User.objects.create_user(
+                username='asker', email='asker@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='admin',
+            )
+
+    @mock.patch('services.ai.ai_service.ask_ollama')
+    def test_paraphrase_skips_the_llm_until_data_changes(self, ask_ollama):
+        ask_ollama.return_value = ('You have 4 open risks.', {'provider': 'deepseek', 'model': 'deepseek-r1:8b'})
+
+        first, _ = ai_assistant_answer('How many open risks do we have?', self.user, self.tenant, return_meta=True)
+        second, meta = ai_assistant_answer('number of open risks', self.user, self.tenant, return_meta=True)
+
+        self.assertEqual(second, first)
+        self.assertEqual(meta['provider'], 'semantic_cache')
+        self.assertEqual(meta['cached_question'], 'How many open risks do we have?')
+        self.assertEqual(ask_ollama.call_count, 1)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            invalidate('risk.Risk', self.tenant.pk)
+        ai_assistant_answer('number of open risks', self.user, self.tenant, return_meta=True)
+        self.assertEqual(ask_ollama.call_count, 2)
+
+    @mock.patch('services.ai.ai_service.ask_ollama')
+    def test_answers_are_not_shared_across_roles_or_days(self, ask_ollama):
+        ask_ollama.return_value = ('2 obligations are overdue.', {'provider': 'deepseek', 'model': 'deepseek-r1:8b'})
+        with mock.patch('users.signals.send_welcome_email.delay'), \
+                mock.patch('users.signals.cleanup_old_otps.delay'):
+            staff = User.objects.create_user(
+                username='staff_asker', email='staff_asker@example.com', password='Sup3r-Secret-Pass!',
+                organization=self.tenant, role='staff',
+            )
+
+        ai_assistant_answer('What is overdue?', self.user, self.tenant)
+        ai_assistant_answer('What is overdue?', self.user, self.tenant)
+        self.assertEqual(ask_ollama.call_count, 1)
+        ai_assistant_answer('What is overdue?', staff, self.tenant)
+        self.assertEqual(ask_ollama.call_count, 2)
+
+        tomorrow = timezone.localdate() + timedelta(days=1)
+        with mock.patch('services.ai.ai_service.timezone.localdate', return_value=tomorrow):
+            ai_assistant_answer('What is overdue?', self.user, self.tenant)
+        self.assertEqual(ask_ollama.call_count, 3)
@@ -92,6 +92,14 @@ class AIAssistantAPIView(APIView):
             # Get AI response with metadata
             ai_response, llm_meta = ai_assistant_answer(question, user, org, return_meta=True)
             
+            # Backlog full: fail fast instead of holding the request open
+            if isinstance(llm_meta, dict) and llm_meta.get('busy'):
+                return Response(
+                    {'error': ai_response, 'queue_length': llm_meta.get('queue_length')},
+                    status=status.HTTP_503_SERVICE_UNAVAILABLE,
+                    headers={'Retry-After': '10'}
+                )
+            
             if not ai_response:
                 return Response(
                     {'error': 'Unable to generate response. Please try again.'}, 
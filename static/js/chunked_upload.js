@@ -0,0 +1,106 @@
+// chunked_upload.js
+// Resumable (tus) upload for the public document upload form: the file is sent
+// in chunks, each with a SHA-256 checksum, and resumes after network errors.
+// Falls back to the plain multipart form when the browser lacks the needed APIs.
+
+document.addEventListener('DOMContentLoaded', function() {
+    const form = document.getElementById('public-upload-form');
+    if (!form || !window.fetch || !window.crypto || !window.crypto.subtle || !window.Blob.prototype.slice) {
+        return;
+    }
+    const endpoint = form.getAttribute('data-chunked-url');
+    const chunkSize = parseInt(form.getAttribute('data-chunk-size'), 10) || 5 * 1024 * 1024;
+    const progress = document.getElementById('upload-progress');
+    const status = document.getElementById('upload-status');
+    const csrfToken = form.querySelector('input[name="csrfmiddlewaretoken"]').value;
+
+    function headers(extra) {
+        return Object.assign({'Tus-Resumable': '1.0.0', 'X-CSRFToken': csrfToken}, extra || {});
+    }
+
+    function b64(text) {
+        return btoa(unescape(encodeURIComponent(text)));
+    }
+
+    async function checksum(blob) {
+        const digest = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+        return btoa(String.fromCharCode.apply(null, new Uint8Array(digest)));
+    }
+
+    async function currentOffset(location) {
+        const response = await fetch(location, {method: 'HEAD', headers: headers(), credentials: 'same-origin'});
+        if (!response.ok) throw new Error('Upload can no longer be resumed');
+        return parseInt(response.headers.get('Upload-Offset'), 10);
+    }
+
+    function show(offset, total) {
+        const percent = total ? Math.floor(offset * 100 / total) : 100;
+        if (progress) {
+            progress.classList.remove('d-none');
+            progress.querySelector('.progress-bar').style.width = percent + '%';
+            progress.querySelector('.progress-bar').textContent = percent + '%';
+        }
+    }
+
+    async function upload(file) {
+        const created = await fetch(endpoint, {
+            method: 'POST',
+            credentials: 'same-origin',
+            headers: headers({'Upload-Length': String(file.size), 'Upload-Metadata': 'filename ' + b64(file.name)}),
+        });
+        if (created.status !== 201) throw new Error(await created.text() || 'Upload could not be started');
+        const location = created.headers.get('Location');
+
+        let offset = 0;
+        let failures = 0;
+        while (offset < file.size || file.size === 0) {
+            const chunk = file.slice(offset, offset + chunkSize);
+            try {
+                const response = await fetch(location, {
+                    method: 'PATCH',
+                    credentials: 'same-origin',
+                    headers: headers({
+                        'Content-Type': 'application/offset+octet-stream',
+                        'Upload-Offset': String(offset),
+                        'Upload-Checksum': 'sha256 ' + await checksum(chunk),
+                    }),
+                    body: chunk,
+                });
+                if (response.status === 204) {
+                    offset = parseInt(response.headers.get('Upload-Offset'), 10);
+                    failures = 0;
+                    show(offset, file.size);
+                    if (file.size === 0) break;
+                    continue;
+                }
+                if (response.status < 500 && response.status !== 409 && response.status !== 423 && response.status !== 460) {
+                    throw new Error(await response.text());
+                }
+            } catch (e) {
+                if (!(e instanceof TypeError)) throw e;  // TypeError: network failure, retry
+            }
+            if (++failures > 10) throw new Error('Upload failed after repeated network errors');
+            await new Promise(function(resolve) { setTimeout(resolve, Math.min(1000 * 2 ** failures, 30000)); });
+            offset = await currentOffset(location);
+        }
+    }
+
+    form.addEventListener('submit', function(event) {
+        const input = form.querySelector('input[type="file"]');
+        if (!input || !input.files.length) return;
+        event.preventDefault();
+        const button = form.querySelector('button[type="submit"]');
+        button.disabled = true;
+        if (status) status.textContent = '';
+        upload(input.files[0]).then(function() {
+            form.classList.add('d-none');
+            if (status) {
+                status.className = 'alert alert-success';
+                status.textContent = 'Document uploaded successfully! It will be available once it has passed the virus scan.';
+            }
+        }).catch(function(e) {
+            button.disabled = false;
+            if (status) status.textContent = e.message;
+        });
+    });
+});